@@ -9,4 +9,6 @@ from api.admin.delivery import *
 from api.admin.area import *
 from api.admin.checklist import *
 from api.admin.work import *
-from api.admin.memo import *
\ No newline at end of file
+from api.admin.memo import *
+from api.admin.upload import *
+from api.admin.storage import *
@@ -2,23 +2,32 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
-from api.models.log import Log, LogLevel, LogCategory
+from api.models.log import Log, LogLevel, LogCategory, LogHourlyRollup, ViewCounter
 
 
 @admin.register(Log)
 class LogAdmin(admin.ModelAdmin):
-    list_display = ('id', 'level_badge', 'category_badge', 'message_short', 'created_at')
-    list_filter = ('level', 'category', 'created_at')
-    search_fields = ('message',)
-    readonly_fields = ('created_at', 'modified_at')
+    list_display = ('id', 'level_badge', 'category_badge', 'message_short', 'response_status', 'duration_ms', 'created_at')
+    list_filter = ('level', 'category', 'template', 'request_method', 'created_at')
+    search_fields = ('message', 'params')
+    readonly_fields = ('text', 'created_at', 'modified_at')
     ordering = ('-created_at',)
     list_per_page = 50
     
     fieldsets = (
         ("📊 Основная информация", {
-            "fields": ("level", "category", "message"),
+            "fields": ("level", "category", "text"),
             "classes": ("wide",)
         }),
+        ("🧩 Шаблон", {
+            "fields": ("template", "params", "message"),
+            "classes": ("collapse",)
+        }),
+        ("🌐 Запрос", {
+            "fields": ("user", "object", "request_method", "request_path", "response_status",
+                       "duration_ms", "db_time_ms", "db_queries"),
+            "classes": ("collapse",)
+        }),
         ("📅 Даты", {
             "fields": ("created_at", "modified_at"),
             "classes": ("collapse",)
@@ -72,7 +81,44 @@ class LogAdmin(admin.ModelAdmin):
     category_badge.admin_order_field = "category"
 
     def message_short(self, obj):
-        if len(obj.message) > 100:
-            return f"{obj.message[:100]}..."
-        return obj.message
-    message_short.short_description = "Сообщение"
\ No newline at end of file
+        text = obj.text
+        if len(text) > 100:
+            return f"{text[:100]}..."
+        return text
+    message_short.short_description = "Сообщение"
+
+    def text(self, obj):
+        return obj.text
+    text.short_description = "Сообщение"
+
+
+@admin.register(LogHourlyRollup)
+class LogHourlyRollupAdmin(admin.ModelAdmin):
+    list_display = ('hour', 'level', 'category', 'count')
+    list_filter = ('level', 'category', 'hour')
+    readonly_fields = ('hour', 'level', 'category', 'count', 'created_at', 'modified_at')
+    ordering = ('-hour',)
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ViewCounter)
+class ViewCounterAdmin(admin.ModelAdmin):
+    # Счётчики могут жить в отдельной БД журнала — без JOIN с пользователями
+    list_display = ('hour', 'entity_type', 'entity_id', 'user_id', 'count')
+    list_filter = ('entity_type', 'hour')
+    search_fields = ('=entity_id',)
+    readonly_fields = ('entity_type', 'entity_id', 'user', 'hour', 'count', 'created_at', 'modified_at')
+    ordering = ('-hour',)
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
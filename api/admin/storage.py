@@ -0,0 +1,100 @@
+from django.contrib import admin
+from django.db.models import Count, Sum
+from django.template.defaultfilters import filesizeformat
+
+from api.models.documents import StorageSyncState
+from api.models.storage import StoredFile, FileDedupeStat, PhotoThumbnail, PhotoHash, StorageUsage
+
+
+@admin.register(StoredFile)
+class StoredFileAdmin(admin.ModelAdmin):
+    list_display = ("scope", "sha256", "size_bytes", "content_type", "hits", "last_hit_at", "created_at")
+    list_filter = ("content_type", "created_at")
+    search_fields = ("scope", "sha256", "url")
+    readonly_fields = ("scope", "sha256", "url", "size_bytes", "content_type", "hits", "last_hit_at", "created_at", "modified_at")
+    list_per_page = 25
+
+    fieldsets = (
+        ("📦 Файл", {
+            "fields": ("scope", "sha256", "url", "size_bytes", "content_type"),
+            "classes": ("wide",)
+        }),
+        ("📊 Дедупликация", {
+            "fields": ("hits", "last_hit_at"),
+        }),
+        ("🔧 Системная информация", {
+            "fields": ("created_at", "modified_at"),
+            "classes": ("collapse",)
+        }),
+    )
+
+
+@admin.register(FileDedupeStat)
+class FileDedupeStatAdmin(admin.ModelAdmin):
+    list_display = ("date", "hits", "misses", "bytes_saved", "bytes_uploaded")
+    date_hierarchy = "date"
+    readonly_fields = ("date", "hits", "misses", "bytes_saved", "bytes_uploaded")
+    list_per_page = 31
+
+
+@admin.register(PhotoThumbnail)
+class PhotoThumbnailAdmin(admin.ModelAdmin):
+    list_display = ("url", "thumbnail_url", "width", "height", "original_size_bytes", "size_bytes", "created_at")
+    search_fields = ("url", "thumbnail_url")
+    readonly_fields = ("url", "thumbnail_url", "width", "height", "original_size_bytes", "size_bytes", "created_at", "modified_at")
+    list_per_page = 25
+
+
+@admin.register(PhotoHash)
+class PhotoHashAdmin(admin.ModelAdmin):
+    list_display = ("url", "kind", "entity_id", "object", "status", "phash", "created_at")
+    list_filter = ("kind", "status")
+    search_fields = ("url",)
+    readonly_fields = ("phash", "block0", "block1", "block2", "block3", "error", "created_at", "modified_at")
+    list_per_page = 25
+
+
+@admin.register(StorageSyncState)
+class StorageSyncStateAdmin(admin.ModelAdmin):
+    list_display = ("object", "status", "files_count", "total_size_bytes", "cursor", "last_synced_at")
+    list_filter = ("status",)
+    search_fields = ("object__name",)
+    readonly_fields = ("cursor", "last_synced_at", "files_count", "total_size_bytes", "error", "created_at", "modified_at")
+    list_per_page = 25
+
+
+@admin.register(StorageUsage)
+class StorageUsageAdmin(admin.ModelAdmin):
+    """Отчёт об объёме хранилища: только счётчики StorageUsage, без обхода хранилища и JSON-полей."""
+
+    list_display = ("object", "category", "files_count", "size_display", "last_upload_at")
+    list_filter = ("category",)
+    search_fields = ("object__name",)
+    ordering = ("-size_bytes",)
+    readonly_fields = ("object", "category", "files_count", "size_bytes", "last_upload_at", "created_at", "modified_at")
+    list_per_page = 50
+
+    def size_display(self, obj):
+        return filesizeformat(obj.size_bytes)
+    size_display.short_description = "Объём"
+    size_display.admin_order_field = "size_bytes"
+
+    def has_add_permission(self, request):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context=extra_context)
+        cl = getattr(response, "context_data", {}).get("cl")
+        if cl is not None:
+            labels = dict(StorageUsage.CATEGORY)
+            rows = (
+                cl.queryset.order_by().values("category")
+                .annotate(objects=Count("object", distinct=True), files=Sum("files_count"), size=Sum("size_bytes"))
+            )
+            totals = [{"label": labels.get(r["category"], r["category"]), **r} for r in rows]
+            response.context_data["usage_totals"] = sorted(totals, key=lambda r: -r["size"])
+            response.context_data["usage_total"] = {
+                "files": sum(r["files"] for r in totals),
+                "size": sum(r["size"] for r in totals),
+            }
+        return response
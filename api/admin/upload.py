@@ -0,0 +1,85 @@
+from django.contrib import admin
+
+from api.models.upload import UploadJob, UploadJobFile, UploadSession, UploadTicket
+
+
+class UploadJobFileInline(admin.TabularInline):
+    model = UploadJobFile
+    extra = 0
+    can_delete = False
+    readonly_fields = ("position", "name", "size_bytes", "status", "url", "error", "modified_at")
+    fields = readonly_fields
+
+
+@admin.register(UploadJob)
+class UploadJobAdmin(admin.ModelAdmin):
+    list_display = ("uuid_job", "kind", "status", "object", "delivery", "total_files", "created_by", "created_at", "finished_at")
+    list_filter = ("kind", "status", "created_at")
+    search_fields = ("uuid_job", "object__name")
+    readonly_fields = ("uuid_job", "started_at", "finished_at", "created_at", "modified_at")
+    autocomplete_fields = ("object", "delivery", "created_by")
+    list_per_page = 25
+    inlines = [UploadJobFileInline]
+
+    fieldsets = (
+        ("📤 Задача", {
+            "fields": ("kind", "status", "object", "delivery", "created_by", "total_files", "error"),
+            "classes": ("wide",)
+        }),
+        ("📅 Даты", {
+            "fields": ("started_at", "finished_at"),
+            "classes": ("collapse",)
+        }),
+        ("🔧 Системная информация", {
+            "fields": ("uuid_job", "created_at", "modified_at"),
+            "classes": ("collapse",)
+        }),
+    )
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ("uuid_session", "filename", "object", "status", "received_bytes", "total_size", "created_by", "created_at", "completed_at")
+    list_filter = ("status", "created_at")
+    search_fields = ("uuid_session", "filename", "object__name")
+    readonly_fields = ("uuid_session", "received_bytes", "received_ranges", "url", "completed_at", "created_at", "modified_at")
+    autocomplete_fields = ("object", "created_by")
+    list_per_page = 25
+
+    fieldsets = (
+        ("📄 Документ", {
+            "fields": ("object", "filename", "content_type", "total_size", "created_by"),
+            "classes": ("wide",)
+        }),
+        ("📥 Загрузка", {
+            "fields": ("status", "received_bytes", "received_ranges", "url", "error", "completed_at"),
+        }),
+        ("🔧 Системная информация", {
+            "fields": ("uuid_session", "created_at", "modified_at"),
+            "classes": ("collapse",)
+        }),
+    )
+
+
+@admin.register(UploadTicket)
+class UploadTicketAdmin(admin.ModelAdmin):
+    list_display = ("jti", "kind", "entity_id", "object", "status", "created_by", "expires_at", "confirmed_at")
+    list_filter = ("kind", "status", "created_at")
+    search_fields = ("jti", "storage_path", "object__name")
+    readonly_fields = ("jti", "kind", "entity_id", "object", "storage_path", "max_files", "created_by",
+                       "expires_at", "confirmed_at", "urls", "created_at", "modified_at")
+    list_per_page = 25
+
+    fieldsets = (
+        ("🎫 Билет", {
+            "fields": ("kind", "entity_id", "object", "storage_path", "max_files", "status", "created_by"),
+            "classes": ("wide",)
+        }),
+        ("📎 Загруженные файлы", {
+            "fields": ("urls", "expires_at", "confirmed_at"),
+        }),
+        ("🔧 Системная информация", {
+            "fields": ("jti", "created_at", "modified_at"),
+            "classes": ("collapse",)
+        }),
+    )
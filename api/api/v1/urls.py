@@ -14,7 +14,7 @@ from api.api.v1.views.health import PingView
 from api.api.v1.views.memos import MemosView
 from api.api.v1.views.objects import (ObjectsListCreateView, ObjectsDetailView,
                                     ObjectSuspendView, ObjectResumeView, ObjectCompleteBySSKView, ObjectCompleteView,
-                                    ObjectFullDetailView)
+                                    ObjectFullDetailView, ObjectFilesArchiveView)
 from api.api.v1.views.prescriptions import (PrescriptionFixView, PrescriptionVerifyView,
                                             ViolationsListView, PrescriptionsDetailView,
                                             PrescriptionsCollectionView)
@@ -26,7 +26,10 @@ from api.api.v1.views.work_plans import (WorkPlanCreateView, WorkPlanDetailView,
 from api.api.v1.views.areas import AreasCreateView, AreasDetailView, AreasListView, SubAreasCreateView
 from api.api.v1.views.works import WorksListView, WorkCreateView
 from api.api.v1.views.admin import AdminStatsView
-from api.api.v1.views.logs import LogsListView, LogsStatsView
+from api.api.v1.views.logs import LogsListView, LogsStatsView, LogsExportView, LogsViewsView
+from api.api.v1.views.uploads import (UploadJobDetailView, ObjectUploadSessionsCreateView,
+                                      UploadSessionDetailView, UploadSessionCompleteView,
+                                      UploadTicketsCreateView, UploadTicketConfirmView)
 
 urlpatterns = [
     path("auth/login",   AuthLoginView.as_view(),   name="auth-login"),
@@ -42,6 +45,7 @@ urlpatterns = [
     path("objects",              ObjectsListCreateView.as_view(), name="objects-list-create"),
     path("objects/<int:id>",     ObjectsDetailView.as_view(),     name="objects-detail"),
     path("objects/<int:id>/full", ObjectFullDetailView.as_view(), name="objects-full-detail"),
+    path("objects/<int:id>/files.zip", ObjectFilesArchiveView.as_view(), name="objects-files-archive"),
 
     path("objects/<int:id>/activation/request",   ActivationRequestView.as_view(), name="object-activation-request"),
     path("objects/<int:id>/activation/iko-check", ActivationIkoCheckView.as_view(), name="object-activation-iko-check"),
@@ -90,6 +94,13 @@ urlpatterns = [
     path("deliveries/<int:id>/status", DeliverySetStatusView.as_view(), name="deliveries-set-status"),
     path("labs/orders", LabOrdersCreateView.as_view(), name="labs-orders-create"),
 
+    path("upload-jobs/<uuid:id>", UploadJobDetailView.as_view(), name="upload-job-detail"),
+    path("objects/<int:id>/upload-sessions", ObjectUploadSessionsCreateView.as_view(), name="object-upload-sessions-create"),
+    path("upload-sessions/<uuid:id>", UploadSessionDetailView.as_view(), name="upload-session-detail"),
+    path("upload-sessions/<uuid:id>/complete", UploadSessionCompleteView.as_view(), name="upload-session-complete"),
+    path("upload-tickets", UploadTicketsCreateView.as_view(), name="upload-tickets-create"),
+    path("upload-tickets/confirm", UploadTicketConfirmView.as_view(), name="upload-ticket-confirm"),
+
     path("works", WorksListView.as_view(), name="works-list"),
     path("works/create", WorkCreateView.as_view(), name="works-create"),
 
@@ -104,6 +115,8 @@ urlpatterns = [
 
     path("logs", LogsListView.as_view(), name="logs-list"),
     path("logs/stats", LogsStatsView.as_view(), name="logs-stats"),
+    path("logs/export", LogsExportView.as_view(), name="logs-export"),
+    path("logs/views", LogsViewsView.as_view(), name="logs-views"),
 
     path("ping", PingView.as_view(), name="ping"),
 ]
@@ -3,9 +3,11 @@ from rest_framework.response import Response
 from rest_framework import status
 
 from api.models.area import Area, SubArea
+from api.models.log import ViewEntity
 from api.serializers.areas import AreaCreateSerializer, AreaOutSerializer, AreaListOutSerializer, SubAreaCreateSerializer, SubAreaOutSerializer
 from api.api.v1.views.objects import _paginated
-from api.utils.logging import log_area_created, log_area_viewed
+from api.utils.logging import log_area_created
+from api.utils.view_counters import record_view
 
 
 class AreasCreateView(APIView):
@@ -29,7 +31,7 @@ class AreasDetailView(APIView):
         except Area.DoesNotExist:
             return Response({"detail": "Not found"}, status=404)
         
-        log_area_viewed(area.name, request.user.full_name, request.user.role)
+        record_view(ViewEntity.AREA, area.id, request.user.id)
         
         return Response(AreaOutSerializer(area).data, status=200)
 
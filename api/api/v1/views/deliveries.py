@@ -1,5 +1,7 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser
+from api.api.v1.views.parsers import SpooledFilesJSONParser
 from api.models.user import Roles
 from api.models.delivery import Delivery, Invoice, LabOrder, Material
 from api.models.object import ConstructionObject
@@ -7,14 +9,18 @@ from api.api.v1.views.objects import _visible_object_ids_for_user, _paginated
 from api.serializers.deliveries import (DeliveryCreateSerializer, DeliveryOutSerializer, DeliveryReceiveSerializer,
                                         InvoiceCreateSerializer, ParseTTNSerializer, DeliveryStatusSerializer,
                                         LabOrderCreateSerializer, InvoiceDataSerializer, DeliveryConfirmSerializer)
+from api.serializers.uploads import UploadJobOutSerializer
+from api.api.v1.views.utils import wants_async_upload
 from api.utils.logging import log_delivery_created, log_delivery_received, log_delivery_accepted, log_delivery_sent_to_lab
 
 
 class DeliveriesCreateView(APIView):
+    parser_classes = [SpooledFilesJSONParser, MultiPartParser]
+
     def post(self, request):
         if request.user.role not in (Roles.SSK, Roles.ADMIN):
             return Response({"detail":"Forbidden"}, status=403)
-        ser = DeliveryCreateSerializer(data=request.data, context={'request': request})
+        ser = DeliveryCreateSerializer(data=request.data, context={'request': request, 'upload_async': wants_async_upload(request)})
         ser.is_valid(raise_exception=True)
         try:
             obj = ConstructionObject.objects.get(id=ser.validated_data["object_id"])
@@ -26,9 +32,15 @@ class DeliveriesCreateView(APIView):
         
         log_delivery_created(obj.name, d.id, request.user.full_name, request.user.role)
         
-        return Response(DeliveryOutSerializer(d).data, status=201)
+        data = DeliveryOutSerializer(d).data
+        if ser.upload_job:
+            data["upload_job"] = UploadJobOutSerializer(ser.upload_job).data
+            return Response(data, status=202)
+        return Response(data, status=201)
 
 class DeliveryReceiveView(APIView):
+    parser_classes = [SpooledFilesJSONParser, MultiPartParser]
+
     def post(self, request, id: int):
         ser = DeliveryReceiveSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
@@ -42,18 +54,35 @@ class DeliveryReceiveView(APIView):
             return Response({"detail":"Forbidden"}, status=403)
         
         invoice_photos = ser.validated_data.get("invoice_photos", [])
-        if invoice_photos:
-            from api.utils.file_storage import upload_invoice_photos_base64
+        job = None
+        if invoice_photos and wants_async_upload(request):
+            from api.utils.upload_jobs import create_upload_job
+
+            job = create_upload_job("invoice_photos", invoice_photos, d.object, delivery=d, user=request.user)
+        elif invoice_photos:
+            from api.utils.file_storage import upload_invoice_photos_base64, photo_thumbnail_urls
+            from api.utils.photo_hashes import register_photos
             
             urls = upload_invoice_photos_base64(invoice_photos, d.object_id, d.id, request.user.full_name, request.user.role)
             
             if urls:
                 d.invoice_photos_folder_url = urls
+                d.invoice_photos_thumbnail_urls = photo_thumbnail_urls(urls)
+                register_photos("invoice", d.id, d.object_id, urls)
         
         d.status = "received"
         d.notes = ser.validated_data.get("notes","")
-        d.save(update_fields=["status","notes","invoice_photos_folder_url","modified_at"])
-        return Response(DeliveryOutSerializer(d).data, status=201)
+        update_fields = ["status","notes","modified_at"]
+        if not job:
+            # При отложенной загрузке фото накладной записывает воркер — не затираем их
+            update_fields += ["invoice_photos_folder_url","invoice_photos_thumbnail_urls"]
+        d.save(update_fields=update_fields)
+
+        data = DeliveryOutSerializer(d).data
+        if job:
+            data["upload_job"] = UploadJobOutSerializer(job).data
+            return Response(data, status=202)
+        return Response(data, status=201)
 
 class DeliveriesListView(APIView):
     def get(self, request):
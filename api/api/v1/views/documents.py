@@ -1,3 +1,4 @@
+from django.db.models import Sum
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -14,9 +15,17 @@ class DocumentsListView(APIView):
         if not object_id:
             return Response({"detail":"object_id is required"}, status=400)
         visible = _visible_object_ids_for_user(request.user)
-        qs = DocumentFile.objects.filter(object_id=object_id, object_id__in=visible).order_by("-created_at")
-        page, total = _paginated(qs, request)
-        return Response({"items": DocumentOutSerializer(page, many=True).data, "total": total}, status=200)
+        qs = DocumentFile.objects.filter(object_id=object_id, object_id__in=visible)
+        # Таблицы наполняет синхронизация с хранилищем (sync_storage_tree), в хранилище не ходим
+        folder_id = request.query_params.get("folder_id")
+        if folder_id:
+            qs = qs.filter(folder_id=folder_id)
+        q = request.query_params.get("q")
+        if q:
+            qs = qs.filter(name__icontains=q)
+        total_size = qs.aggregate(total=Sum("size_bytes"))["total"] or 0
+        page, total = _paginated(qs.order_by("-created_at"), request)
+        return Response({"items": DocumentOutSerializer(page, many=True).data, "total": total, "total_size_bytes": total_size}, status=200)
 
 class ExecDocsView(APIView):
     permission_classes_post = [RoleRequired.as_permitted(Roles.SSK, Roles.IKO, Roles.ADMIN)]
@@ -1,13 +1,183 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Q, Count, Avg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections, router
+from django.db.models import Q, Count, Avg, Max, Sum
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+import csv
+import json
 
 from api.models import Roles
-from api.models.log import Log, LogLevel, LogCategory
+from api.models.log import Log, LogLevel, LogCategory, ViewCounter, ViewEntity
+from api.models.user import User
 from api.api.v1.views.objects import _paginated
+from api.utils.log_stats import log_counts
+from api.utils.log_templates import render_log_message
+from api.utils.logging import buffered_stream
+
+
+def _filter_logs(request):
+    """Фильтры журнала из query-параметров (общие для списка и выгрузки); True — режим полнотекстового поиска."""
+    qs = Log.objects.all()
+    
+    level = request.query_params.get("level")
+    if level and level in [choice[0] for choice in LogLevel.choices]:
+        qs = qs.filter(level=level)
+    
+    category = request.query_params.get("category")
+    if category and category in [choice[0] for choice in LogCategory.choices]:
+        qs = qs.filter(category=category)
+    
+    user_id = request.query_params.get("user_id")
+    if user_id:
+        qs = qs.filter(user_id=user_id)
+    
+    object_id = request.query_params.get("object_id")
+    if object_id:
+        qs = qs.filter(object_id=object_id)
+    
+    date_from = request.query_params.get("date_from")
+    if date_from:
+        try:
+            date_from = timezone.datetime.fromisoformat(date_from.replace('Z', '+00:00'))
+            qs = qs.filter(created_at__gte=date_from)
+        except ValueError:
+            pass
+    
+    date_to = request.query_params.get("date_to")
+    if date_to:
+        try:
+            date_to = timezone.datetime.fromisoformat(date_to.replace('Z', '+00:00'))
+            qs = qs.filter(created_at__lte=date_to)
+        except ValueError:
+            pass
+    
+    template = request.query_params.get("template")
+    if template:
+        qs = qs.filter(template=template)
+    
+    search = request.query_params.get("search")
+    fulltext = bool(search) and request.query_params.get("search_mode") == "fulltext"
+    if search and fulltext:
+        # Полнотекстовый поиск по словоформам (русская морфология) с ранжированием; у шаблонных
+        # записей ищется по параметрам (имена, названия), постоянная часть шаблона в БД не хранится
+        query = SearchQuery(search, config="russian", search_type="websearch")
+        qs = qs.alias(search_vector=SearchVector("message", "params", config="russian")).filter(search_vector=query).annotate(
+            rank=SearchRank(SearchVector("message", "params", config="russian"), query),
+        )
+    elif search:
+        # Поиск подстроки; индексы по триграммам UPPER(message) и UPPER(params::text) делают его индексным
+        qs = qs.filter(Q(message__icontains=search) | Q(params__icontains=search))
+    
+    method = request.query_params.get("method")
+    if method:
+        qs = qs.filter(request_method=method.upper())
+    
+    path = request.query_params.get("path")
+    if path:
+        qs = qs.filter(request_path__startswith=path)
+    
+    min_duration_ms = request.query_params.get("min_duration_ms")
+    if min_duration_ms:
+        try:
+            qs = qs.filter(duration_ms__gte=int(min_duration_ms))
+        except ValueError:
+            pass
+    
+    status_code = request.query_params.get("status_code")
+    if status_code:
+        try:
+            status_code = int(status_code)
+            qs = qs.filter(response_status=status_code)
+        except ValueError:
+            pass
+    
+    return qs, fulltext
+
+
+def _highlights(texts, search):
+    """Подсветка найденного в готовых текстах страницы одним запросом ts_headline."""
+    if not texts:
+        return []
+    with connections[router.db_for_read(Log)].cursor() as cursor:
+        cursor.execute(
+            "SELECT ts_headline('russian', t, websearch_to_tsquery('russian', %s), 'StartSel=<b>, StopSel=</b>') "
+            "FROM unnest(%s::text[]) WITH ORDINALITY AS u(t, n) ORDER BY n",
+            [search, texts],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _keyset_page(qs, request, default_limit=20, max_limit=200):
+    """Страница от курсора (created_at, id) последней записи предыдущей страницы и курсор следующей."""
+    try:
+        limit = max(1, min(int(request.query_params.get("limit", default_limit)), max_limit))
+    except ValueError:
+        limit = default_limit
+    cursor = request.query_params.get("cursor")
+    qs = qs.order_by("-created_at", "-id")
+    if cursor:
+        created_at, last_id = _decode_cursor(cursor)
+        # created_at__lte — граница диапазона для индекса, id разрешает совпадения времени
+        qs = qs.filter(created_at__lte=created_at).filter(Q(created_at__lt=created_at) | Q(id__lt=last_id))
+    page = list(qs[:limit + 1])
+    next_cursor = _encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+def _encode_cursor(log):
+    return urlsafe_b64encode(f"{log.created_at.isoformat()}|{log.id}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    created_at, last_id = raw.rsplit("|", 1)
+    created_at = datetime.fromisoformat(created_at)
+    if timezone.is_naive(created_at):
+        raise ValueError("cursor without timezone")
+    return created_at, int(last_id)
+
+
+EXPORT_FIELDS = ("id", "created_at", "level", "category", "message", "template", "params", "user_id", "object_id",
+                 "request_method", "request_path", "response_status", "duration_ms", "db_time_ms", "db_queries")
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """Файл для csv.writer, который просто возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def _export_items(rows):
+    """Строки values_list → словари; message — готовый текст и для шаблонных записей."""
+    for row in rows:
+        item = dict(zip(EXPORT_FIELDS, row))
+        item["message"] = render_log_message(
+            item["template"], item["params"], item["message"],
+            **{name: item[name] for name in Log.TEMPLATE_FIELDS},
+        )
+        yield item
+
+
+def _ndjson_lines(rows):
+    for item in _export_items(rows):
+        item["created_at"] = item["created_at"].isoformat()
+        yield json.dumps(item, ensure_ascii=False, default=str) + "\n"
+
+
+def _csv_lines(rows):
+    writer = csv.writer(_Echo())
+    # BOM — чтобы Excel открыл кириллицу в UTF-8
+    yield "\ufeff" + writer.writerow(EXPORT_FIELDS)
+    for item in _export_items(rows):
+        item["params"] = json.dumps(item["params"], ensure_ascii=False, default=str) if item["params"] else ""
+        yield writer.writerow(item.values())
 
 
 class LogsListView(APIView):
@@ -16,57 +186,25 @@ class LogsListView(APIView):
         if request.user.role != Roles.ADMIN:
             return Response({"detail": "Forbidden"}, status=403)
         
-        qs = Log.objects.select_related("user").all()
-        
-        level = request.query_params.get("level")
-        if level and level in [choice[0] for choice in LogLevel.choices]:
-            qs = qs.filter(level=level)
-        
-        category = request.query_params.get("category")
-        if category and category in [choice[0] for choice in LogCategory.choices]:
-            qs = qs.filter(category=category)
-        
-        user_id = request.query_params.get("user_id")
-        if user_id:
-            qs = qs.filter(user_id=user_id)
-        
-        object_id = request.query_params.get("object_id")
-        if object_id:
-            qs = qs.filter(object_id=object_id)
-        
-        date_from = request.query_params.get("date_from")
-        if date_from:
-            try:
-                date_from = timezone.datetime.fromisoformat(date_from.replace('Z', '+00:00'))
-                qs = qs.filter(created_at__gte=date_from)
-            except ValueError:
-                pass
+        qs, fulltext = _filter_logs(request)
         
-        date_to = request.query_params.get("date_to")
-        if date_to:
+        # ?cursor= (пустой — первая страница): keyset-пагинация по (created_at, id) без COUNT и OFFSET.
+        # В полнотекстовом режиме порядок по рангу, поэтому там остаётся limit/offset
+        keyset = "cursor" in request.query_params and not fulltext
+        if keyset:
             try:
-                date_to = timezone.datetime.fromisoformat(date_to.replace('Z', '+00:00'))
-                qs = qs.filter(created_at__lte=date_to)
+                page, next_cursor = _keyset_page(qs, request)
             except ValueError:
-                pass
-        
-        search = request.query_params.get("search")
-        if search:
-            qs = qs.filter(message__icontains=search)
-        
-        method = request.query_params.get("method")
-        if method:
-            qs = qs.filter(request_method=method)
+                return Response({"detail": "Invalid cursor"}, status=400)
+        else:
+            ordering = ("-rank", "-created_at") if fulltext else ("-created_at",)
+            page, total = _paginated(qs.order_by(*ordering), request)
         
-        status_code = request.query_params.get("status_code")
-        if status_code:
-            try:
-                status_code = int(status_code)
-                qs = qs.filter(response_status=status_code)
-            except ValueError:
-                pass
-        
-        page, total = _paginated(qs.order_by("-created_at"), request)
+        # Журнал может быть в отдельной БД: имена пользователей берём отдельным запросом к default, а не JOIN
+        page = list(page)
+        names = dict(
+            User.objects.using("default").filter(id__in={log.user_id for log in page if log.user_id}).values_list("id", "full_name")
+        )
         
         logs_data = []
         for log in page:
@@ -74,17 +212,60 @@ class LogsListView(APIView):
                 "id": log.id,
                 "level": log.level,
                 "category": log.category,
-                "message": log.message,
+                "message": log.text,
+                "template": log.template or None,
+                "params": log.params,
+                "user_id": log.user_id,
+                "user_name": names.get(log.user_id),
+                "object_id": log.object_id,
+                "request_method": log.request_method or None,
+                "request_path": log.request_path or None,
+                "response_status": log.response_status,
+                "duration_ms": log.duration_ms,
+                "db_time_ms": log.db_time_ms,
+                "db_queries": log.db_queries,
                 "created_at": log.created_at,
                 "modified_at": log.modified_at,
             })
+            if fulltext:
+                logs_data[-1]["rank"] = log.rank
+        if fulltext:
+            for item, highlight in zip(logs_data, _highlights([item["message"] for item in logs_data], request.query_params["search"])):
+                item["highlight"] = highlight
         
+        if keyset:
+            return Response({
+                "items": logs_data,
+                "next_cursor": next_cursor
+            }, status=200)
         return Response({
             "items": logs_data,
             "total": total
         }, status=200)
 
 
+class LogsExportView(APIView):
+    """Выгрузка журнала с фильтрами списка: NDJSON или CSV потоком через серверный курсор."""
+    
+    def get(self, request):
+        if request.user.role != Roles.ADMIN:
+            return Response({"detail": "Forbidden"}, status=403)
+        
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in ("ndjson", "csv"):
+            return Response({"detail": "export_format must be ndjson or csv"}, status=400)
+        
+        qs, _ = _filter_logs(request)
+        rows = qs.order_by("-created_at", "-id").values_list(*EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        if export_format == "csv":
+            response = StreamingHttpResponse(buffered_stream(_csv_lines(rows)), content_type="text/csv; charset=utf-8")
+        else:
+            response = StreamingHttpResponse(buffered_stream(_ndjson_lines(rows)), content_type="application/x-ndjson")
+        response["Content-Disposition"] = f'attachment; filename="logs_{timezone.now():%Y%m%d_%H%M%S}.{export_format}"'
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
 class LogsStatsView(APIView):
     
     def get(self, request):
@@ -92,37 +273,84 @@ class LogsStatsView(APIView):
             return Response({"detail": "Forbidden"}, status=403)
         
         days = int(request.query_params.get("days", 7))
-        date_from = timezone.now() - timedelta(days=days)
+        now = timezone.now()
+        date_from = now - timedelta(days=days)
         
-        qs = Log.objects.filter(created_at__gte=date_from)
+        # Два GROUP BY: целые часы из почасовой статистики, края периода — из журнала
+        counts = log_counts(date_from, now)
         
-        levels_stats = {}
-        for level, _ in LogLevel.choices:
-            count = qs.filter(level=level).count()
-            levels_stats[level] = count
-        
-        categories_stats = {}
-        for category, _ in LogCategory.choices:
-            count = qs.filter(category=category).count()
-            categories_stats[category] = count
+        levels_stats = {level: 0 for level, _ in LogLevel.choices}
+        categories_stats = {category: 0 for category, _ in LogCategory.choices}
+        per_day = {}
+        for level, category, day, n in counts:
+            levels_stats[level] = levels_stats.get(level, 0) + n
+            categories_stats[category] = categories_stats.get(category, 0) + n
+            per_day[day] = per_day.get(day, 0) + n
         
+        # Как и раньше, ровно days точек: последние days календарных дней, включая сегодняшний
+        today = timezone.localdate(now)
         daily_stats = []
-        for i in range(days):
-            date = date_from + timedelta(days=i)
-            next_date = date + timedelta(days=1)
-            count = qs.filter(created_at__gte=date, created_at__lt=next_date).count()
+        for i in range(days - 1, -1, -1):
+            day = today - timedelta(days=i)
             daily_stats.append({
-                "date": date.date().isoformat(),
-                "count": count
+                "date": day.isoformat(),
+                "count": per_day.get(day, 0)
             })
         
-        errors_stats = qs.filter(level__in=['error', 'critical']).count()
+        errors_stats = levels_stats[LogLevel.ERROR] + levels_stats[LogLevel.CRITICAL]
         
         return Response({
             "period_days": days,
-            "total_logs": qs.count(),
+            "total_logs": sum(levels_stats.values()),
             "levels_stats": levels_stats,
             "categories_stats": categories_stats,
             "daily_stats": daily_stats,
             "errors_count": errors_stats
         }, status=200)
+
+
+class LogsViewsView(APIView):
+    """Просмотры объектов и полигонов за days дней по (сущность, пользователь) из почасовых счётчиков."""
+    
+    def get(self, request):
+        if request.user.role != Roles.ADMIN:
+            return Response({"detail": "Forbidden"}, status=403)
+        
+        try:
+            days = int(request.query_params.get("days", 7))
+        except ValueError:
+            days = 7
+        qs = ViewCounter.objects.filter(hour__gte=timezone.now() - timedelta(days=days))
+        
+        entity_type = request.query_params.get("entity_type")
+        if entity_type and entity_type in [choice[0] for choice in ViewEntity.choices]:
+            qs = qs.filter(entity_type=entity_type)
+        
+        entity_id = request.query_params.get("entity_id")
+        if entity_id:
+            qs = qs.filter(entity_id=entity_id)
+        
+        user_id = request.query_params.get("user_id")
+        if user_id:
+            qs = qs.filter(user_id=user_id)
+        
+        rows = list(
+            qs.values("entity_type", "entity_id", "user_id")
+            .annotate(views=Sum("count"), last_hour=Max("hour"))
+            .order_by("-views")
+        )
+        # Счётчики могут быть в отдельной БД журнала: имена пользователей — отдельным запросом
+        names = dict(User.objects.using("default").filter(id__in={r["user_id"] for r in rows}).values_list("id", "full_name"))
+        
+        return Response({
+            "period_days": days,
+            "total_views": sum(r["views"] for r in rows),
+            "items": [{
+                "entity_type": r["entity_type"],
+                "entity_id": r["entity_id"],
+                "user_id": r["user_id"],
+                "user_name": names.get(r["user_id"]),
+                "views": r["views"],
+                "last_viewed_hour": r["last_hour"],
+            } for r in rows],
+        }, status=200)
@@ -1,14 +1,24 @@
+from urllib.parse import quote
+
 from django.db.models import Q
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
+from rest_framework.parsers import MultiPartParser
+from api.api.v1.views.parsers import SpooledFilesJSONParser
 
 from api.models import Roles
 from api.serializers.objects import (ObjectCreateSerializer, ObjectOutSerializer, ObjectAssignForemanSerializer,
                                      ObjectsListOutSerializer, ObjectPatchSerializer, ObjectFullDetailSerializer)
 from api.models.object import ConstructionObject, ObjectStatus
-from api.utils.logging import log_object_created, log_object_viewed, log_object_updated, log_object_status_changed
-from api.api.v1.views.utils import send_notification
+from api.models.log import ViewEntity
+from api.utils.logging import (log_object_created, log_object_updated, log_object_status_changed,
+                               log_object_files_exported, buffered_stream)
+from api.utils.file_export import object_export_entries, stream_zip
+from api.utils.view_counters import record_view
+from api.api.v1.views.utils import send_notification, wants_async_upload
+from api.serializers.uploads import UploadJobOutSerializer
 
 
 def _visible_object_ids_for_user(user):
@@ -37,6 +47,8 @@ def _paginated(qs, request, default_limit=20, max_limit=200):
 
 
 class ObjectsListCreateView(APIView):
+    parser_classes = [SpooledFilesJSONParser, MultiPartParser]
+
     def get(self, request):
         query = request.query_params.get("query")
         status_param = request.query_params.get("status")
@@ -69,19 +81,25 @@ class ObjectsListCreateView(APIView):
     def post(self, request):
         if request.user.role != Roles.ADMIN:
             return Response({"detail": "Forbidden"}, status=403)
-        ser = ObjectCreateSerializer(data=request.data, context={"request": request})
+        ser = ObjectCreateSerializer(data=request.data, context={"request": request, "upload_async": wants_async_upload(request)})
         ser.is_valid(raise_exception=True)
         obj = ser.save()
         
         log_object_created(obj.name, obj.address, request.user.full_name, request.user.role)
         
-        return Response(ObjectOutSerializer(obj).data, status=status.HTTP_201_CREATED)
+        data = ObjectOutSerializer(obj).data
+        if ser.upload_job:
+            data["upload_job"] = UploadJobOutSerializer(ser.upload_job).data
+            return Response(data, status=status.HTTP_202_ACCEPTED)
+        return Response(data, status=status.HTTP_201_CREATED)
 
 
 class ObjectsDetailView(APIView):
+    parser_classes = [SpooledFilesJSONParser, MultiPartParser]
+
     def get(self, request, id: int):
         try:
-            obj = ConstructionObject.objects.select_related("ssk", "foreman", "iko").prefetch_related("areas__sub_areas").get(id=id)
+            obj = ConstructionObject.objects.select_related("ssk", "foreman", "iko").prefetch_related("areas__sub_areas", "storage_usage").get(id=id)
         except ConstructionObject.DoesNotExist:
             return Response({"detail": "Not found"}, status=404)
 
@@ -94,7 +112,7 @@ class ObjectsDetailView(APIView):
         if not allowed:
             return Response({"detail": "Forbidden"}, status=403)
 
-        log_object_viewed(obj.name, request.user.full_name, request.user.role)
+        record_view(ViewEntity.OBJECT, obj.id, request.user.id)
 
         return Response(ObjectOutSerializer(obj, context={'request': request}).data, status=200)
 
@@ -104,7 +122,7 @@ class ObjectsDetailView(APIView):
         except ConstructionObject.DoesNotExist:
             return Response({"detail": "Not found"}, status=404)
 
-        ser = ObjectPatchSerializer(data=request.data, partial=True, context={"request": request, "object": obj})
+        ser = ObjectPatchSerializer(data=request.data, partial=True, context={"request": request, "object": obj, "upload_async": wants_async_upload(request)})
         ser.is_valid(raise_exception=True)
         before_ssk = obj.ssk_id
         obj = ser.save()
@@ -118,7 +136,11 @@ class ObjectsDetailView(APIView):
             obj.save(update_fields=["status"])
             log_object_status_changed(obj.name, old_status, new_status, request.user.full_name, request.user.role, "Назначен ССК")
             
-        return Response(ObjectOutSerializer(obj).data, status=200)
+        data = ObjectOutSerializer(obj).data
+        if ser.upload_job:
+            data["upload_job"] = UploadJobOutSerializer(ser.upload_job).data
+            return Response(data, status=status.HTTP_202_ACCEPTED)
+        return Response(data, status=200)
 
 
 class ObjectSuspendView(APIView):
@@ -228,7 +250,8 @@ class ObjectFullDetailView(APIView):
                 "prescriptions",
                 "works",
                 "daily_checklists",
-                "activations"
+                "activations",
+                "storage_usage"
             ).get(id=id)
         except ConstructionObject.DoesNotExist:
             return Response({"detail": "Not found"}, status=404)
@@ -243,3 +266,30 @@ class ObjectFullDetailView(APIView):
             return Response({"detail": "Forbidden"}, status=403)
 
         return Response(ObjectFullDetailSerializer(obj, context={'request': request}).data, status=200)
+
+
+class ObjectFilesArchiveView(APIView):
+    def get(self, request, id: int):
+        try:
+            obj = ConstructionObject.objects.get(id=id)
+        except ConstructionObject.DoesNotExist:
+            return Response({"detail": "Not found"}, status=404)
+
+        allowed = (
+            request.user.role == Roles.ADMIN or
+            request.user.role == Roles.SSK or
+            obj.iko_id == request.user.id or
+            obj.foreman_id == request.user.id
+        )
+        if not allowed:
+            return Response({"detail": "Forbidden"}, status=403)
+
+        entries = object_export_entries(obj)
+        log_object_files_exported(obj.name, len(entries), request.user.full_name, request.user.role)
+
+        # Архив отдаётся по мере скачивания файлов из хранилища, размер заранее неизвестен
+        response = StreamingHttpResponse(buffered_stream(stream_zip(entries)), content_type="application/zip")
+        filename = f"{obj.name or 'object'} {obj.id}.zip"
+        response["Content-Disposition"] = f"attachment; filename=\"object_{obj.id}.zip\"; filename*=UTF-8''{quote(filename)}"
+        response["X-Accel-Buffering"] = "no"
+        return response
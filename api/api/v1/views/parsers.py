@@ -0,0 +1,301 @@
+import base64
+import binascii
+import re
+import string
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils import json
+
+# Всё, что не входит в алфавит base64 (переводы строк, пробелы), при декодировании выбрасывается
+_B64_ALPHABET = (string.ascii_letters + string.digits + "+/=").encode("ascii")
+_NOT_B64 = bytes(b for b in range(256) if b not in _B64_ALPHABET)
+_DATA_URL_RE = re.compile(rb"^data:([\w.+-]+/[\w.+-]+)?[^,]*;base64,")
+_DATA_URL_PREFIX_MAX = 256
+_WHITESPACE = b" \t\r\n"
+_ESCAPES = {b'"': b'"', b"\\": b"\\", b"/": b"/", b"b": b"\b", b"f": b"\f", b"n": b"\n", b"r": b"\r", b"t": b"\t"}
+_EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp", "image/heic": "heic", "application/pdf": "pdf"}
+
+
+def _sniff_content_type(head: bytes):
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG"):
+        return "image/png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith(b"%PDF"):
+        return "application/pdf"
+    return None
+
+
+class _Reader:
+    """Тело запроса, читаемое кусками: байтовый буфер не больше одного куска."""
+
+    def __init__(self, stream, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buf = b""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> bytes:
+        if self.pos >= len(self.buf) and not self._fill():
+            return b""
+        return self.buf[self.pos:self.pos + 1]
+
+    def next(self) -> bytes:
+        ch = self.peek()
+        if not ch:
+            raise ParseError("JSON parse error - неожиданный конец тела запроса")
+        self.pos += 1
+        return ch
+
+    def skip_ws(self) -> bytes:
+        while True:
+            ch = self.peek()
+            if ch and ch in _WHITESPACE:
+                self.pos += 1
+                continue
+            return ch
+
+    def expect(self, ch: bytes) -> None:
+        if self.skip_ws() != ch:
+            raise ParseError(f"JSON parse error - ожидался {ch.decode()!r}")
+        self.pos += 1
+
+    def string_chunks(self):
+        """Содержимое строки (открывающая кавычка уже прочитана) кусками с раскрытыми escape-последовательностями."""
+        while True:
+            if self.pos >= len(self.buf) and not self._fill():
+                raise ParseError("JSON parse error - незакрытая строка")
+            end = len(self.buf)
+            quote = self.buf.find(b'"', self.pos)
+            backslash = self.buf.find(b"\\", self.pos, quote if quote != -1 else end)
+            if backslash != -1:
+                if backslash > self.pos:
+                    yield self.buf[self.pos:backslash]
+                self.pos = backslash + 1
+                yield self._escape()
+            elif quote != -1:
+                if quote > self.pos:
+                    yield self.buf[self.pos:quote]
+                self.pos = quote + 1
+                return
+            else:
+                yield self.buf[self.pos:end]
+                self.pos = end
+
+    def _escape(self) -> bytes:
+        ch = self.next()
+        if ch in _ESCAPES:
+            return _ESCAPES[ch]
+        if ch == b"u":
+            digits = b"".join(self.next() for _ in range(4))
+            try:
+                return chr(int(digits, 16)).encode("utf-8", "surrogatepass")
+            except ValueError:
+                raise ParseError("JSON parse error - некорректная \\u-последовательность")
+        raise ParseError("JSON parse error - некорректная escape-последовательность")
+
+    def raw_value(self) -> bytes:
+        """Исходный текст одного JSON-значения (для полей без файлов — они небольшие)."""
+        out = bytearray()
+        depth = 0
+        while True:
+            ch = self.peek()
+            if not ch:
+                if depth:
+                    raise ParseError("JSON parse error - неожиданный конец тела запроса")
+                return bytes(out)
+            if ch == b'"':
+                self.pos += 1
+                out += b'"'
+                while True:
+                    if self.pos >= len(self.buf) and not self._fill():
+                        raise ParseError("JSON parse error - незакрытая строка")
+                    quote = self.buf.find(b'"', self.pos)
+                    backslash = self.buf.find(b"\\", self.pos, quote if quote != -1 else len(self.buf))
+                    if backslash != -1:
+                        out += self.buf[self.pos:backslash + 1]
+                        self.pos = backslash + 1
+                        out += self.next()
+                    elif quote != -1:
+                        out += self.buf[self.pos:quote + 1]
+                        self.pos = quote + 1
+                        break
+                    else:
+                        out += self.buf[self.pos:]
+                        self.pos = len(self.buf)
+                if not depth:
+                    return bytes(out)
+                continue
+            if ch in b"{[":
+                depth += 1
+            elif ch in b"}]":
+                if not depth:
+                    return bytes(out)
+                depth -= 1
+            elif not depth and ch == b",":
+                return bytes(out)
+            self.pos += 1
+            out += ch
+            if not depth and ch in b"}]":
+                return bytes(out)
+
+
+class _Spool:
+    """Один файл из массива: base64 декодируется кусками прямо во временный файл на диске."""
+
+    def __init__(self, field: str, index: int):
+        self.field = field
+        self.index = index
+        self.file = None
+        self.content_type = None
+        self.head = b""
+        self.carry = b""
+        self.prefix_done = False
+
+    def feed(self, data: bytes, final: bool = False) -> None:
+        if not self.prefix_done:
+            self.head += data
+            if not final and b"," not in self.head and len(self.head) < _DATA_URL_PREFIX_MAX:
+                return
+            data, self.head = self.head, b""
+            self.prefix_done = True
+            match = _DATA_URL_RE.match(data)
+            if match:
+                self.content_type = match.group(1).decode("ascii").lower() if match.group(1) else None
+                data = data[match.end():]
+        data = self.carry + data.translate(None, _NOT_B64)
+        usable = len(data) - len(data) % 4
+        self.carry = data[usable:]
+        if usable:
+            self._write(data[:usable])
+
+    def _write(self, encoded: bytes) -> None:
+        try:
+            decoded = base64.b64decode(encoded)
+        except binascii.Error:
+            raise ParseError(f"{self.field}[{self.index}]: некорректный base64")
+        if self.file is None:
+            self.content_type = self.content_type or _sniff_content_type(decoded[:16]) or "application/octet-stream"
+            ext = _EXTENSIONS.get(self.content_type, "bin")
+            self.file = TemporaryUploadedFile(f"{self.field}_{self.index + 1}.{ext}", self.content_type, 0, None)
+        self.file.write(decoded)
+
+    def finish(self):
+        """Готовый файл; пустая строка, если данных не было (сериализатор её отклонит)."""
+        if not self.prefix_done:
+            self.feed(b"", final=True)
+        if self.carry.rstrip(b"="):
+            self._write(self.carry.rstrip(b"=") + b"=" * (-len(self.carry.rstrip(b"=")) % 4))
+        if self.file is None:
+            return ""
+        self.file.size = self.file.tell()
+        self.file.seek(0)
+        return self.file
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+
+class SpooledFilesJSONParser(JSONParser):
+    """
+    JSON-парсер, который не держит в памяти массивы файлов в base64.
+
+    Поля из spool_fields (по умолчанию invoice_photos и document_files) разбираются
+    потоково: каждый элемент-строка декодируется кусками по JSON_SPOOL_CHUNK_SIZE
+    байт во временный файл, и в request.data попадает TemporaryUploadedFile —
+    тот же объект, что и при multipart/form-data, поэтому слой загрузки
+    отправляет его в хранилище потоком. Остальные поля разбираются как обычно.
+    """
+
+    spool_fields = ("invoice_photos", "document_files")
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return {}
+        reader = _Reader(stream, max(4096, int(getattr(settings, "JSON_SPOOL_CHUNK_SIZE", 64 * 1024))))
+        spooled = []
+        try:
+            data = self._parse_object(reader, spooled)
+            if reader.skip_ws():
+                raise ParseError("JSON parse error - лишние данные после объекта")
+        except Exception:
+            for spool in spooled:
+                spool.close()
+            raise
+        return data
+
+    def _parse_object(self, reader: _Reader, spooled):
+        if reader.skip_ws() != b"{":
+            # Не объект (массив, строка...) — такие тела небольшие, разбираем целиком
+            return self._loads(reader.raw_value())
+        reader.pos += 1
+        data = {}
+        if reader.skip_ws() == b"}":
+            reader.pos += 1
+            return data
+        while True:
+            reader.expect(b'"')
+            key = self._decode_key(b"".join(reader.string_chunks()))
+            reader.expect(b":")
+            if key in self.spool_fields and reader.skip_ws() == b"[":
+                data[key] = self._parse_files(reader, key, spooled)
+            else:
+                reader.skip_ws()
+                data[key] = self._loads(reader.raw_value())
+            ch = reader.skip_ws()
+            reader.pos += 1
+            if ch == b"}":
+                return data
+            if ch != b",":
+                raise ParseError("JSON parse error - ожидалась ',' или '}'")
+
+    @staticmethod
+    def _decode_key(raw: bytes) -> str:
+        # _escape кодирует каждую половину суррогатной пары \uD83D\uDE00 отдельно — склеиваем их через UTF-16
+        try:
+            return raw.decode("utf-8", "surrogatepass").encode("utf-16", "surrogatepass").decode("utf-16", "surrogatepass")
+        except UnicodeDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+    def _parse_files(self, reader: _Reader, key: str, spooled):
+        reader.pos += 1
+        items = []
+        if reader.skip_ws() == b"]":
+            reader.pos += 1
+            return items
+        while True:
+            if reader.skip_ws() == b'"':
+                reader.pos += 1
+                spool = _Spool(key, len(items))
+                spooled.append(spool)
+                for chunk in reader.string_chunks():
+                    spool.feed(chunk)
+                items.append(spool.finish())
+            else:
+                items.append(self._loads(reader.raw_value()))
+            ch = reader.skip_ws()
+            reader.pos += 1
+            if ch == b"]":
+                return items
+            if ch != b",":
+                raise ParseError("JSON parse error - ожидалась ',' или ']'")
+
+    def _loads(self, raw: bytes):
+        try:
+            return json.loads(raw.decode("utf-8"), parse_constant=json.strict_constant if self.strict else None)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
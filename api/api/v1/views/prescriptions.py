@@ -11,6 +11,7 @@ from api.models.notify import Notification
 from api.serializers.prescription import (PrescriptionCreateSerializer, PrescriptionOutSerializer,
                                           PrescriptionFixCreateSerializer, PrescriptionListSerializer)
 from api.utils.logging import log_prescription_created, log_prescription_fixed, log_prescription_verified
+from api.utils.photo_hashes import similar_photos_for_prescription
 
 
 class PrescriptionsCollectionView(APIView):
@@ -177,7 +178,9 @@ class PrescriptionVerifyView(APIView):
         except Exception:
             pass
 
-        return Response(PrescriptionOutSerializer(pres).data, status=200)
+        data = PrescriptionOutSerializer(pres).data
+        data["similar_photos"] = similar_photos_for_prescription(pres)
+        return Response(data, status=200)
 
 class ViolationsListView(APIView):
     def get(self, request):
@@ -211,4 +214,6 @@ class PrescriptionsDetailView(APIView):
             pres = Prescription.objects.select_related("object").prefetch_related('fixes').get(id=id, object_id__in=object_ids)
         except Prescription.DoesNotExist:
             return Response({"detail": "Not found"}, status=404)
-        return Response(PrescriptionListSerializer(pres).data, status=200)
\ No newline at end of file
+        data = PrescriptionListSerializer(pres).data
+        data["similar_photos"] = similar_photos_for_prescription(pres)
+        return Response(data, status=200)
\ No newline at end of file
@@ -0,0 +1,186 @@
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from api.api.v1.views.objects import _visible_object_ids_for_user
+from api.models.object import ConstructionObject
+from api.models.user import Roles
+from api.models.upload import UploadJob, UploadSession
+from api.serializers.uploads import (UploadJobOutSerializer, UploadSessionCreateSerializer, UploadSessionOutSerializer,
+                                     UploadTicketCreateSerializer, UploadTicketConfirmSerializer, UploadTicketOutSerializer)
+from api.utils.file_storage import file_storage_client
+from api.utils.logging import log_upload_ticket_issued, log_upload_ticket_confirmed
+from api.utils.upload_sessions import (UploadSessionError, abort_upload_session, complete_upload_session,
+                                       create_upload_session, parse_content_range, write_chunk)
+from api.utils.upload_tickets import (TICKET_ROLES, UploadTicketError, confirm_upload_ticket, decode_upload_ticket,
+                                      issue_upload_ticket, resolve_ticket_entity)
+
+
+class UploadJobDetailView(APIView):
+    def get(self, request, id):
+        try:
+            job = UploadJob.objects.prefetch_related("files").get(uuid_job=id)
+        except UploadJob.DoesNotExist:
+            return Response({"detail": "Not found"}, status=404)
+
+        if job.created_by_id != request.user.id and job.object_id not in _visible_object_ids_for_user(request.user):
+            return Response({"detail": "Forbidden"}, status=403)
+
+        return Response(UploadJobOutSerializer(job).data, status=200)
+
+
+def _get_session_for_user(request, id):
+    try:
+        session = UploadSession.objects.get(uuid_session=id)
+    except UploadSession.DoesNotExist:
+        return None, Response({"detail": "Not found"}, status=404)
+    if session.created_by_id != request.user.id and session.object_id not in _visible_object_ids_for_user(request.user):
+        return None, Response({"detail": "Forbidden"}, status=403)
+    return session, None
+
+
+class ObjectUploadSessionsCreateView(APIView):
+    """
+    POST /objects/{id}/upload-sessions — начать возобновляемую загрузку документа.
+
+    Дальше клиент шлёт части PUT /upload-sessions/{uuid} с заголовком
+    Content-Range, после обрыва узнаёт полученные диапазоны через GET и
+    завершает загрузку POST /upload-sessions/{uuid}/complete.
+    """
+
+    def post(self, request, id: int):
+        try:
+            obj = ConstructionObject.objects.get(id=id)
+        except ConstructionObject.DoesNotExist:
+            return Response({"detail": "Not found"}, status=404)
+        if obj.id not in _visible_object_ids_for_user(request.user):
+            return Response({"detail": "Forbidden"}, status=403)
+        # Документы объекта меняют только ADMIN и ССК, как в PATCH /objects/{id}
+        if request.user.role not in (Roles.ADMIN, Roles.SSK):
+            return Response({"detail": "Forbidden"}, status=403)
+
+        ser = UploadSessionCreateSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        session = create_upload_session(
+            obj,
+            ser.validated_data["filename"],
+            ser.validated_data["size"],
+            ser.validated_data["content_type"],
+            user=request.user,
+        )
+        return Response(UploadSessionOutSerializer(session).data, status=201)
+
+
+class UploadSessionDetailView(APIView):
+    def get(self, request, id):
+        session, error = _get_session_for_user(request, id)
+        if error:
+            return error
+        return Response(UploadSessionOutSerializer(session).data, status=200)
+
+    def put(self, request, id):
+        session, error = _get_session_for_user(request, id)
+        if error:
+            return error
+
+        try:
+            start, end, total_size = parse_content_range(request.headers.get("Content-Range", ""))
+            if total_size != session.total_size:
+                raise UploadSessionError("Размер в Content-Range не совпадает с размером файла сессии")
+            max_chunk = int(getattr(settings, "UPLOAD_SESSION_MAX_CHUNK", 64 * 1024 * 1024))
+            if end - start > max_chunk:
+                raise UploadSessionError(f"Часть больше допустимых {max_chunk} байт")
+            if int(request.headers.get("Content-Length") or 0) != end - start:
+                raise UploadSessionError("Content-Length не совпадает с диапазоном Content-Range")
+            session = write_chunk(session, start, end, request.stream)
+        except UploadSessionError as e:
+            return Response({"detail": str(e), "received_ranges": session.received_ranges}, status=400)
+
+        return Response(UploadSessionOutSerializer(session).data, status=200)
+
+    def delete(self, request, id):
+        session, error = _get_session_for_user(request, id)
+        if error:
+            return error
+        if session.status == "open":
+            abort_upload_session(session)
+        return Response(status=204)
+
+
+class UploadSessionCompleteView(APIView):
+    def post(self, request, id):
+        session, error = _get_session_for_user(request, id)
+        if error:
+            return error
+
+        try:
+            session = complete_upload_session(session)
+        except UploadSessionError as e:
+            return Response({"detail": str(e), "received_ranges": session.received_ranges}, status=409)
+
+        if session.status != "done":
+            return Response(UploadSessionOutSerializer(session).data, status=502)
+        return Response(UploadSessionOutSerializer(session).data, status=200)
+
+
+class UploadTicketsCreateView(APIView):
+    """
+    POST /upload-tickets — билет на загрузку фото/документов напрямую в хранилище.
+
+    Клиент отправляет файлы на upload_url с заголовком X-Upload-Ticket, затем
+    передаёт полученные ссылки в POST /upload-tickets/confirm.
+    """
+
+    def post(self, request):
+        ser = UploadTicketCreateSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        kind, entity_id = ser.validated_data["kind"], ser.validated_data["entity_id"]
+        if request.user.role not in TICKET_ROLES.get(kind, ()):
+            return Response({"detail": "Forbidden"}, status=403)
+
+        try:
+            object_id, _ = resolve_ticket_entity(kind, entity_id, request.user)
+        except ObjectDoesNotExist:
+            return Response({"detail": "Not found"}, status=404)
+        if object_id not in _visible_object_ids_for_user(request.user):
+            return Response({"detail": "Forbidden"}, status=403)
+
+        try:
+            ticket, token = issue_upload_ticket(kind, entity_id, request.user, ser.validated_data["max_files"])
+        except UploadTicketError as e:
+            return Response({"detail": str(e)}, status=503)
+
+        log_upload_ticket_issued(ticket.get_kind_display(), entity_id, request.user.full_name, request.user.role)
+
+        data = UploadTicketOutSerializer(ticket).data
+        data["ticket"] = token
+        data["upload_url"] = f"{file_storage_client.base_url}/upload/{ticket.storage_path}"
+        data["headers"] = {"X-Upload-Ticket": token}
+        return Response(data, status=201)
+
+
+class UploadTicketConfirmView(APIView):
+    def post(self, request):
+        ser = UploadTicketConfirmSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+
+        try:
+            ticket = decode_upload_ticket(ser.validated_data["ticket"])
+        except UploadTicketError as e:
+            return Response({"detail": str(e)}, status=400)
+        if ticket.created_by_id != request.user.id and request.user.role != Roles.ADMIN:
+            return Response({"detail": "Forbidden"}, status=403)
+
+        try:
+            fields = confirm_upload_ticket(ticket, ser.validated_data["urls"])
+        except UploadTicketError as e:
+            return Response({"detail": str(e)}, status=409)
+
+        log_upload_ticket_confirmed(ticket.get_kind_display(), ticket.entity_id, len(ser.validated_data["urls"]),
+                                    request.user.full_name, request.user.role)
+
+        ticket.refresh_from_db()
+        data = UploadTicketOutSerializer(ticket).data
+        data.update(fields)
+        return Response(data, status=200)
@@ -19,6 +19,10 @@ class RoleRequired(BasePermission):
         return request.user.role in self.allowed_roles
 
 
+def wants_async_upload(request) -> bool:
+    return request.query_params.get("async") in {"1", "true", "True"}
+
+
 def send_notification(user_id: str | None, email: str | None, subject: str, message: str, sender_name: str = None, sender_role: str = None) -> None:
     from api.utils.logging import log_notification_sent, log_notification_failed
     
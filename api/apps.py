@@ -1,6 +1,15 @@
+import tracemalloc
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Трассировка памяти включается один раз на процесс: start()/stop() на
+        # каждый запрос ломали бы замеры параллельных запросов
+        if getattr(settings, "FILE_STORAGE_TRACE_MEMORY", False) and not tracemalloc.is_tracing():
+            tracemalloc.start()
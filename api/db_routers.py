@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+LOG_DATABASE = "logs"
+# Журнал, его почасовая статистика и счётчики просмотров живут в одной БД
+LOG_MODELS = {"log", "loghourlyrollup", "viewcounter"}
+
+
+def _log_alias():
+    """Алиас БД журнала; без него (например, в локальных настройках) всё идёт в default."""
+    return LOG_DATABASE if LOG_DATABASE in settings.DATABASES else None
+
+
+def _separate_log_database() -> bool:
+    alias = _log_alias()
+    if alias is None:
+        return False
+    default, logs = settings.DATABASES["default"], settings.DATABASES[alias]
+    # В тестах NAME default подменяется на тестовую БД раньше, чем logs становится её зеркалом
+    if (logs.get("TEST") or {}).get("MIRROR") == "default":
+        return False
+    return any(default.get(key) != logs.get(key) for key in ("ENGINE", "NAME", "HOST", "PORT"))
+
+
+def _is_log(model) -> bool:
+    return model._meta.app_label == "api" and model._meta.model_name in LOG_MODELS
+
+
+class LogRouter:
+    """
+    Модели журнала (LOG_MODELS) читаются и пишутся через отдельное подключение LOG_DATABASE.
+
+    У этого подключения своя транзакция (autocommit), поэтому запись лога внутри
+    transaction.atomic не удлиняет бизнес-транзакцию и не пропадает при её откате.
+    Их таблицы мигрируют в БД журнала, только если та действительно отдельная.
+    """
+
+    def db_for_read(self, model, **hints):
+        return self._db_for(model)
+
+    def db_for_write(self, model, **hints):
+        return self._db_for(model)
+
+    def _db_for(self, model):
+        alias = _log_alias()
+        if alias is None:
+            return None
+        # Явно default: иначе Django берёт БД из подсказки instance, и переход по FK
+        # от записи журнала (log.user, prefetch_related) ушёл бы в БД журнала
+        return alias if _is_log(model) else DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Log ссылается на записи основной БД без внешних ключей на уровне СУБД
+        if _is_log(type(obj1)) or _is_log(type(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        alias = _log_alias()
+        if alias is None:
+            return None
+        is_log = app_label == "api" and model_name in LOG_MODELS
+        if _separate_log_database():
+            if db == alias:
+                return is_log
+            return False if is_log else None
+        # Та же БД: схему целиком ведёт default
+        return False if db == alias else None
@@ -0,0 +1,237 @@
+import base64
+import io
+import math
+import multiprocessing
+import os
+import random
+import resource
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models.storage import StoredFile, PhotoThumbnail, PhotoHash
+from api.utils import file_storage
+from api.utils.images import Image
+from api.utils.storage_stub import StubOptions, serve_storage_stub
+
+# Синтетические id сущностей: не пересекаются с реальными папками и областями дедупликации
+ENTITY_ID_BASE = 900_000_000
+
+
+def _read_rss(pid: int) -> int:
+    """Текущий RSS процесса, байт (Linux /proc); 0, если прочитать нельзя."""
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+class _RssSampler(threading.Thread):
+    """Раз в interval секунд замеряет RSS процесса и его дочерних процессов (пул обработки фото)."""
+
+    def __init__(self, exclude_pids=(), interval: float = 0.05):
+        super().__init__(daemon=True)
+        self.exclude_pids = set(exclude_pids)
+        self.interval = interval
+        self.peak_self = 0
+        self.peak_total = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            own = _read_rss(os.getpid())
+            children = sum(_read_rss(p.pid) for p in multiprocessing.active_children() if p.pid not in self.exclude_pids)
+            self.peak_self = max(self.peak_self, own)
+            self.peak_total = max(self.peak_total, own + children)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Метод ближайшего ранга: ceil(p% от n)-е значение
+    index = min(len(sorted_values) - 1, max(0, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _make_photo(width: int, height: int, seed: int, fallback_kb: int) -> bytes:
+    """JPEG, похожий на снимок с телефона: плавные цвета + шум сенсора (плохо сжимается, как настоящие фото)."""
+    rnd = random.Random(seed)
+    if Image is None:
+        return bytes(rnd.getrandbits(8) for _ in range(fallback_kb * 1024))
+    small = Image.new("RGB", (16, 12))
+    small.putdata([(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)) for _ in range(16 * 12)])
+    img = small.resize((width, height), Image.BICUBIC)
+    noise = Image.effect_noise((width, height), 24).convert("RGB")
+    img = Image.blend(img, noise, 0.15)
+    out = io.BytesIO()
+    img.save(out, "JPEG", quality=92)
+    return out.getvalue()
+
+
+def _make_pdf(size_kb: int, seed: int) -> bytes:
+    rnd = random.Random(seed)
+    return b"%PDF-1.4\n" + bytes(rnd.getrandbits(8) for _ in range(size_kb * 1024)) + b"\n%%EOF\n"
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный прогон загрузки файлов: пачки фото через upload_* хелперы в хранилище "
+        "(по умолчанию — локальную заглушку). Показывает пропускную способность, p50/p95/p99 и пиковый RSS"
+    )
+
+    HELPERS = ("invoice", "violation", "fix", "documents")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--helper", choices=self.HELPERS, default="invoice", help="Какой хелпер загрузки нагружать")
+        parser.add_argument("--batches", type=int, default=20, help="Число пачек (запросов)")
+        parser.add_argument("--photos", type=int, default=5, help="Файлов в пачке")
+        parser.add_argument("--concurrency", type=int, default=1, help="Пачек одновременно (параллельные запросы)")
+        parser.add_argument("--width", type=int, default=4032)
+        parser.add_argument("--height", type=int, default=3024)
+        parser.add_argument("--distinct", type=int, default=8, help="Сколько разных файлов сгенерировать заранее")
+        parser.add_argument("--file-kb", type=int, default=2048, help="Размер PDF (и фото, если Pillow не установлен), КБ")
+        parser.add_argument("--no-image-processing", action="store_true", help="Отключить уменьшение фото перед загрузкой")
+        parser.add_argument("--storage-url", default=None, help="Внешнее хранилище или заглушка (run_storage_stub); по умолчанию заглушка запускается сама")
+        parser.add_argument("--latency", type=float, default=0.05, help="Задержка встроенной заглушки, секунд")
+        parser.add_argument("--jitter", type=float, default=0.05, help="Случайная добавка к задержке заглушки, секунд")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ошибок встроенной заглушки (0..1)")
+        parser.add_argument("--keep-records", action="store_true", help="Не удалять записи StoredFile/PhotoThumbnail/PhotoHash прогона")
+
+    def handle(self, *args, **options):
+        if options["batches"] < 1 or options["photos"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--batches, --photos и --concurrency должны быть положительными")
+
+        stub_process = None
+        storage_url = options["storage_url"]
+        if not storage_url:
+            stub_process, storage_url = self._start_stub(options)
+
+        client = file_storage.file_storage_client
+        original_url = client.base_url
+        original_processing = getattr(settings, "IMAGE_PROCESSING_ENABLED", True)
+        client.base_url = storage_url.rstrip("/")
+        if options["no_image_processing"]:
+            settings.IMAGE_PROCESSING_ENABLED = False
+        try:
+            self._run(options, storage_url, exclude_pids=[stub_process.pid] if stub_process else [])
+        finally:
+            client.base_url = original_url
+            settings.IMAGE_PROCESSING_ENABLED = original_processing
+            if stub_process:
+                stub_process.terminate()
+                stub_process.join()
+            if not options["keep_records"]:
+                self._cleanup(storage_url)
+
+    def _start_stub(self, options):
+        # Заглушка в отдельном процессе: её память и CPU не попадают в замеры
+        ctx = multiprocessing.get_context("spawn")
+        ready = ctx.Queue()
+        stub_options = StubOptions(latency=options["latency"], jitter=options["jitter"], error_rate=options["error_rate"])
+        process = ctx.Process(target=serve_storage_stub, args=("127.0.0.1", 0, stub_options, ready), daemon=True)
+        process.start()
+        url = ready.get(timeout=30)
+        self.stdout.write(f"Заглушка хранилища: {url} (задержка {options['latency']}+{options['jitter']} с, ошибки {options['error_rate']:.0%})")
+        return process, url
+
+    def _helper(self, name: str) -> Callable[[List[str], int], Optional[List[str]]]:
+        if name == "invoice":
+            return lambda files, n: file_storage.upload_invoice_photos_base64(files, ENTITY_ID_BASE + n, ENTITY_ID_BASE + n)
+        if name == "violation":
+            return lambda files, n: file_storage.upload_violation_photos_base64(files, ENTITY_ID_BASE + n)
+        if name == "fix":
+            return lambda files, n: file_storage.upload_fix_photos_base64(files, ENTITY_ID_BASE + n, ENTITY_ID_BASE)
+        return lambda files, n: file_storage.upload_object_documents_base64(files, ENTITY_ID_BASE + n)
+
+    def _run(self, options, storage_url: str, exclude_pids):
+        helper_name = options["helper"]
+        distinct = max(1, options["distinct"])
+        self.stdout.write(f"Готовим {distinct} файл(ов)...")
+        if helper_name == "documents":
+            payloads = [_make_pdf(options["file_kb"], seed) for seed in range(distinct)]
+            mime = "application/pdf"
+        else:
+            payloads = [_make_photo(options["width"], options["height"], seed, options["file_kb"]) for seed in range(distinct)]
+            mime = "image/jpeg"
+        data_urls = [f"data:{mime};base64,{base64.b64encode(p).decode('ascii')}" for p in payloads]
+        sizes = [len(p) for p in payloads]
+        del payloads
+
+        batches = []
+        for n in range(options["batches"]):
+            picked = [(n * options["photos"] + i) % distinct for i in range(options["photos"])]
+            batches.append(([data_urls[i] for i in picked], sum(sizes[i] for i in picked)))
+
+        helper = self._helper(helper_name)
+        latencies: List[float] = []
+        stats: Dict[str, int] = {"ok": 0, "failed": 0, "bytes": 0}
+        lock = threading.Lock()
+
+        def run_batch(n: int):
+            files, size = batches[n]
+            started = time.perf_counter()
+            try:
+                urls = helper(files, n) or []
+            except Exception as e:
+                self.stderr.write(f"Пачка {n}: {e}")
+                urls = []
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                stats["ok"] += len(urls)
+                stats["failed"] += len(files) - len(urls)
+                stats["bytes"] += size
+
+        baseline_rss = _read_rss(os.getpid())
+        sampler = _RssSampler(exclude_pids=exclude_pids)
+        sampler.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"], thread_name_prefix="benchmark") as executor:
+            list(executor.map(run_batch, range(options["batches"])))
+        wall = time.perf_counter() - started
+        sampler.stop()
+
+        latencies.sort()
+        total_files = stats["ok"] + stats["failed"]
+        self.stdout.write("")
+        self.stdout.write(f"Хелпер: {helper_name}, хранилище: {storage_url}")
+        processing = "" if helper_name == "documents" else f", обработка фото: {'выкл' if options['no_image_processing'] else 'вкл'}"
+        self.stdout.write(
+            f"Пачек: {options['batches']} × {options['photos']} файл(ов), одновременно: {options['concurrency']}{processing}"
+        )
+        self.stdout.write(f"Загружено: {stats['ok']}/{total_files}, ошибок: {stats['failed']}, время: {wall:.2f} с")
+        self.stdout.write(
+            f"Пропускная способность: {stats['ok'] / wall:.1f} файл/с, "
+            f"{stats['bytes'] / wall / (1024 * 1024):.1f} МБ/с исходных данных"
+        )
+        self.stdout.write(
+            f"Задержка пачки: p50 {_percentile(latencies, 50) * 1000:.0f} мс, p95 {_percentile(latencies, 95) * 1000:.0f} мс, "
+            f"p99 {_percentile(latencies, 99) * 1000:.0f} мс, max {latencies[-1] * 1000:.0f} мс"
+        )
+        if sampler.peak_self:
+            self.stdout.write(
+                f"RSS: до прогона {baseline_rss / (1024 * 1024):.0f} МБ, пик процесса {sampler.peak_self / (1024 * 1024):.0f} МБ, "
+                f"пик с пулом обработки фото {sampler.peak_total / (1024 * 1024):.0f} МБ"
+            )
+        else:
+            # Без /proc: максимум за всё время жизни процесса (включая подготовку файлов)
+            self.stdout.write(f"Пиковый RSS процесса: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} МБ")
+
+    def _cleanup(self, storage_url: str):
+        prefix = storage_url.rstrip("/") + "/"
+        StoredFile.objects.filter(url__startswith=prefix).delete()
+        PhotoThumbnail.objects.filter(url__startswith=prefix).delete()
+        PhotoHash.objects.filter(url__startswith=prefix).delete()
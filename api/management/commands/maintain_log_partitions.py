@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.log_partitions import maintain_log_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Секции журнала (Log) по месяцам: создаёт секции наперёд, удаляет целиком секции старше срока хранения "
+        "и устаревшие строки секции api_log_legacy "
+        "(с выгрузкой в gzip CSV, если задан каталог архива). Запускать раз в сутки; воркер run_upload_worker делает это сам"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ahead", type=int, default=None, help="На сколько месяцев вперёд создать секции (по умолчанию LOG_PARTITIONS_AHEAD)")
+        parser.add_argument("--retention-months", type=int, default=None, help="Срок хранения в месяцах, 0 — хранить всё (по умолчанию LOG_RETENTION_MONTHS)")
+        parser.add_argument("--archive-dir", default=None, help="Каталог для выгрузки удаляемых секций (по умолчанию LOG_ARCHIVE_DIR, пусто — без выгрузки)")
+        parser.add_argument("--dry-run", action="store_true", help="Только показать, что будет создано и удалено")
+
+    def handle(self, *args, **options):
+        result = maintain_log_partitions(
+            months_ahead=options["ahead"],
+            retention_months=options["retention_months"],
+            archive_dir=options["archive_dir"],
+            dry_run=options["dry_run"],
+        )
+        if result is None:
+            raise CommandError("Таблица журнала не секционирована (нужен PostgreSQL и миграция 0029_partition_log)")
+        prefix = "[dry-run] " if options["dry_run"] else ""
+        for name in result["created"]:
+            self.stdout.write(f"{prefix}Создана секция {name}")
+        for path in result["archived"]:
+            self.stdout.write(f"{prefix}Выгружено: {path}")
+        for name in result["dropped"]:
+            self.stdout.write(f"{prefix}Удалена секция {name}")
+        for name in result["trimmed"]:
+            self.stdout.write(f"{prefix}Удалены устаревшие строки секции {name}")
+        if not any(result.values()):
+            self.stdout.write("Изменений нет")
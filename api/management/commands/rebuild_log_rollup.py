@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.utils.log_stats import rebuild_log_rollup
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает почасовую статистику журнала (LogHourlyRollup) по сырым записям Log"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Только за последние N дней (по умолчанию — весь журнал)")
+
+    def handle(self, *args, **options):
+        date_from = timezone.now() - timedelta(days=options["days"]) if options["days"] else None
+        rows = rebuild_log_rollup(date_from=date_from)
+        self.stdout.write(f"Записано строк статистики: {rows}")
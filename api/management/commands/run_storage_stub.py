@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.utils.storage_stub import StorageStubServer, StubOptions
+
+
+class Command(BaseCommand):
+    help = "Локальная заглушка файлового хранилища (маршруты /upload/... и /browse/...) с задержкой и ошибками"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8099)
+        parser.add_argument("--latency", type=float, default=0.0, help="Задержка ответа, секунд")
+        parser.add_argument("--jitter", type=float, default=0.0, help="Случайная добавка к задержке, секунд")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Доля запросов с ошибкой (0..1)")
+        parser.add_argument("--error-status", type=int, default=503, help="HTTP-статус искусственной ошибки")
+        parser.add_argument("--storage-dir", default=None, help="Сохранять файлы в каталог и отдавать их по /upload/...")
+        parser.add_argument(
+            "--ticket-secret", default=None,
+            help="Секрет билетов прямой загрузки (по умолчанию FILE_STORAGE_TICKET_SECRET)",
+        )
+
+    def handle(self, *args, **options):
+        stub_options = StubOptions(
+            latency=options["latency"],
+            jitter=options["jitter"],
+            error_rate=options["error_rate"],
+            error_status=options["error_status"],
+            storage_dir=options["storage_dir"],
+            ticket_secret=options["ticket_secret"] or getattr(settings, "FILE_STORAGE_TICKET_SECRET", "") or None,
+        )
+        server = StorageStubServer((options["host"], options["port"]), stub_options)
+        self.stdout.write(f"Заглушка хранилища: {server.url} (FILE_STORAGE_URL={server.url})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
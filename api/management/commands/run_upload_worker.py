@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.utils.upload_jobs import claim_next_upload_job, process_upload_job, cleanup_upload_staging
+from api.utils.upload_sessions import expire_upload_sessions
+from api.utils.photo_hashes import hash_pending_photos
+from api.utils.storage_sync import sync_storage_tree
+from api.utils.logging import buffered_logs
+from api.utils.log_partitions import maintain_log_partitions
+
+SESSION_CLEANUP_INTERVAL = 600
+LOG_PARTITIONS_INTERVAL = 86400
+
+
+class Command(BaseCommand):
+    help = "Фоновый воркер: загружает файлы отложенных задач (UploadJob) в файловое хранилище, чистит брошенные сессии загрузки и временное хранилище, ведёт секции журнала, считает перцептивные хэши фото и зеркалирует папки объектов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Обработать очередь и выйти")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Пауза между опросами пустой очереди, секунд")
+
+    def handle(self, *args, **options):
+        last_cleanup = 0.0
+        last_partitions = None
+        while True:
+            close_old_connections()
+            if time.monotonic() - last_cleanup > SESSION_CLEANUP_INTERVAL:
+                expired = expire_upload_sessions()
+                if expired:
+                    self.stdout.write(f"Удалено брошенных сессий загрузки: {expired}")
+                cleaned = cleanup_upload_staging()
+                if cleaned:
+                    self.stdout.write(f"Удалено папок временного хранилища загрузок: {cleaned}")
+                last_cleanup = time.monotonic()
+            if last_partitions is None or time.monotonic() - last_partitions > LOG_PARTITIONS_INTERVAL:
+                result = maintain_log_partitions()
+                if result and (result["created"] or result["dropped"] or result["trimmed"]):
+                    self.stdout.write(f"Секции журнала: создано {len(result['created'])}, удалено {len(result['dropped'])}, очищено {len(result['trimmed'])}")
+                last_partitions = time.monotonic()
+            job = claim_next_upload_job()
+            if job is None:
+                # Очередь загрузок пуста — досчитываем перцептивные хэши фото
+                # и сверяем с хранилищем давно не обновлявшиеся папки объектов
+                if hash_pending_photos() or sync_storage_tree():
+                    continue
+                if options["once"]:
+                    return
+                time.sleep(options["sleep"])
+                continue
+
+            # Записи лога задачи (по файлу на каждую загрузку) пишутся пачкой в конце
+            with buffered_logs():
+                job = process_upload_job(job)
+            self.stdout.write(f"UploadJob {job.uuid_job}: {job.status} ({job.total_files} файлов)")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models.object import ConstructionObject
+from api.utils.storage_sync import StorageSyncError, objects_due_for_sync, sync_object_storage
+
+
+class Command(BaseCommand):
+    help = "Зеркалирует папки объектов из файлового хранилища в Folder/DocumentFile (только изменения с прошлого прогона)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--object-id", type=int, default=None, help="Синхронизировать только этот объект")
+        parser.add_argument("--all", action="store_true", help="Все объекты, а не только давно не сверявшиеся")
+        parser.add_argument("--full", action="store_true", help="Игнорировать курсор и сверить каждый файл")
+        parser.add_argument("--limit", type=int, default=100, help="Сколько объектов обработать за прогон")
+
+    def handle(self, *args, **options):
+        if options["object_id"]:
+            objects = ConstructionObject.objects.filter(id=options["object_id"])
+            if not objects.exists():
+                raise CommandError(f"Объект {options['object_id']} не найден")
+        elif options["all"]:
+            objects = ConstructionObject.objects.order_by("id")
+        else:
+            objects = objects_due_for_sync(options["limit"])
+
+        for obj in objects:
+            try:
+                stats = sync_object_storage(obj, full=options["full"])
+            except StorageSyncError as e:
+                self.stderr.write(f"Объект {obj.id}: {e}")
+                continue
+            self.stdout.write(
+                f"Объект {obj.id}: новых {stats['new']}, изменено {stats['changed']}, удалено {stats['removed']}, всего {stats['total']}"
+            )
@@ -0,0 +1,95 @@
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router
+
+from api.models.log import Log
+from api.utils.logging import buffered_logs, log_api_request
+
+
+class LogBufferMiddleware:
+    """Записи лога, сделанные за время запроса, пишутся в БД одной пачкой после ответа view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with buffered_logs():
+            return self.get_response(request)
+
+
+class _QueryTimer:
+    """execute_wrapper: считает запросы к БД и время их выполнения."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def _object_id(request):
+    match = getattr(request, "resolver_match", None)
+    if match and "objects/<int:id>" in (match.route or ""):
+        return match.kwargs.get("id")
+    value = request.GET.get("object_id")
+    return int(value) if value and value.isdigit() else None
+
+
+class RequestTimingMiddleware:
+    """
+    Пишет запросы к API в Log структурированными полями: метод, путь, статус,
+    время ответа, время и число запросов к БД, пользователь и объект.
+
+    Включается LOG_REQUESTS_ENABLED. Записывается доля LOG_REQUESTS_SAMPLE_RATE
+    запросов, а ответы 5xx и запросы дольше LOG_REQUESTS_SLOW_MS — всегда.
+    Для потоковых ответов время — до начала отдачи тела.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "LOG_REQUESTS_ENABLED", False) or not request.path.startswith(
+            getattr(settings, "LOG_REQUESTS_PATH_PREFIX", "/api/")
+        ):
+            return self.get_response(request)
+
+        timer = _QueryTimer()
+        log_alias = router.db_for_write(Log)
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                # Запись самого журнала в отдельное подключение в замер не входит
+                if alias == log_alias and alias != DEFAULT_DB_ALIAS:
+                    continue
+                stack.enter_context(connections[alias].execute_wrapper(timer))
+            response = self.get_response(request)
+        duration_ms = round((time.perf_counter() - started) * 1000)
+
+        status = response.status_code
+        if (
+            status >= 500
+            or duration_ms >= int(getattr(settings, "LOG_REQUESTS_SLOW_MS", 1000))
+            or random.random() < float(getattr(settings, "LOG_REQUESTS_SAMPLE_RATE", 1.0))
+        ):
+            user = getattr(request, "user", None)
+            log_api_request(
+                request.method,
+                request.path,
+                status,
+                duration_ms,
+                round(timer.seconds * 1000),
+                timer.count,
+                user_id=user.pk if user is not None and user.is_authenticated else None,
+                object_id=_object_id(request),
+            )
+        return response
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:27
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_alter_scheduleitem_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('modified_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('uuid_job', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='UUID задачи загрузки')),
+                ('kind', models.CharField(choices=[('invoice_photos', 'Фото накладных'), ('object_documents', 'Документы объекта')], max_length=32, verbose_name='Тип загрузки')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Загружается'), ('done', 'Завершена'), ('partial', 'Завершена частично'), ('failed', 'Ошибка')], default='pending', max_length=16, verbose_name='Статус')),
+                ('total_files', models.PositiveIntegerField(default=0, verbose_name='Всего файлов')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Начата')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершена')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Инициатор')),
+                ('delivery', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='upload_jobs', to='api.delivery', verbose_name='Поставка')),
+                ('object', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_jobs', to='api.constructionobject', verbose_name='Объект')),
+            ],
+            options={
+                'verbose_name': 'Задача загрузки файлов',
+                'verbose_name_plural': 'Задачи загрузки файлов',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UploadJobFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('modified_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('position', models.PositiveIntegerField(verbose_name='Порядковый номер')),
+                ('name', models.CharField(blank=True, max_length=255, verbose_name='Имя файла')),
+                ('size_bytes', models.BigIntegerField(default=0, verbose_name='Размер, байт')),
+                ('staging_path', models.CharField(max_length=1024, verbose_name='Путь во временном хранилище')),
+                ('is_base64', models.BooleanField(default=False, verbose_name='Содержимое в base64')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает'), ('uploaded', 'Загружен'), ('failed', 'Ошибка')], default='pending', max_length=16, verbose_name='Статус')),
+                ('url', models.URLField(blank=True, max_length=2000, verbose_name='URL в файловом хранилище')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='files', to='api.uploadjob', verbose_name='Задача')),
+            ],
+            options={
+                'verbose_name': 'Файл задачи загрузки',
+                'verbose_name_plural': 'Файлы задач загрузки',
+                'ordering': ['job', 'position'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='uploadjob',
+            index=models.Index(fields=['status', 'created_at'], name='api_uploadj_status_ffb4fc_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_upload_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileDedupeStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Дата')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='Попадания')),
+                ('misses', models.PositiveIntegerField(default=0, verbose_name='Промахи')),
+                ('bytes_saved', models.BigIntegerField(default=0, verbose_name='Сэкономлено, байт')),
+                ('bytes_uploaded', models.BigIntegerField(default=0, verbose_name='Загружено, байт')),
+            ],
+            options={
+                'verbose_name': 'Статистика дедупликации файлов',
+                'verbose_name_plural': 'Статистика дедупликации файлов',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('modified_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('scope', models.CharField(max_length=255, verbose_name='Область (тег/сущность)')),
+                ('sha256', models.CharField(max_length=64, verbose_name='SHA-256 содержимого')),
+                ('url', models.URLField(max_length=2000, verbose_name='URL в файловом хранилище')),
+                ('size_bytes', models.BigIntegerField(default=0, verbose_name='Размер, байт')),
+                ('content_type', models.CharField(blank=True, max_length=100, verbose_name='MIME-тип')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='Повторных загрузок пропущено')),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True, verbose_name='Последнее попадание')),
+            ],
+            options={
+                'verbose_name': 'Файл в хранилище',
+                'verbose_name_plural': 'Файлы в хранилище',
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(fields=('scope', 'sha256'), name='uniq_stored_file_scope_sha256')],
+            },
+        ),
+    ]
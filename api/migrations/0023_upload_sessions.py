@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:34
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_stored_files'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('modified_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('uuid_session', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='UUID сессии загрузки')),
+                ('filename', models.CharField(max_length=255, verbose_name='Имя файла')),
+                ('content_type', models.CharField(default='application/pdf', max_length=100, verbose_name='MIME-тип')),
+                ('total_size', models.BigIntegerField(verbose_name='Размер файла, байт')),
+                ('received_bytes', models.BigIntegerField(default=0, verbose_name='Получено, байт')),
+                ('received_ranges', models.JSONField(blank=True, default=list, help_text='Отсортированные непересекающиеся диапазоны [начало, конец) в байтах', verbose_name='Полученные диапазоны')),
+                ('status', models.CharField(choices=[('open', 'Принимает части'), ('uploading', 'Передаётся в хранилище'), ('done', 'Загружен'), ('failed', 'Ошибка'), ('aborted', 'Отменена')], default='open', max_length=16, verbose_name='Статус')),
+                ('url', models.URLField(blank=True, max_length=2000, verbose_name='URL в файловом хранилище')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершена')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_sessions', to=settings.AUTH_USER_MODEL, verbose_name='Инициатор')),
+                ('object', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='api.constructionobject', verbose_name='Объект')),
+            ],
+            options={
+                'verbose_name': 'Сессия загрузки документа',
+                'verbose_name_plural': 'Сессии загрузки документов',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'modified_at'], name='api_uploads_status_c9f006_idx')],
+            },
+        ),
+    ]
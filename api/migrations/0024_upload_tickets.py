@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:37
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('modified_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('jti', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='Идентификатор билета')),
+                ('kind', models.CharField(choices=[('delivery', 'Фото накладных поставки'), ('prescription', 'Фото нарушения'), ('fix', 'Фото исправления нарушения'), ('object', 'Документы объекта')], max_length=16, verbose_name='Сущность')),
+                ('entity_id', models.BigIntegerField(verbose_name='ID сущности')),
+                ('storage_path', models.CharField(max_length=512, verbose_name='Путь загрузки в хранилище')),
+                ('max_files', models.PositiveIntegerField(default=20, verbose_name='Максимум файлов')),
+                ('status', models.CharField(choices=[('issued', 'Выдан'), ('confirmed', 'Подтверждён')], default='issued', max_length=16, verbose_name='Статус')),
+                ('expires_at', models.DateTimeField(verbose_name='Действителен до')),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True, verbose_name='Подтверждён')),
+                ('urls', models.JSONField(blank=True, default=list, verbose_name='Загруженные файлы')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_tickets', to=settings.AUTH_USER_MODEL, verbose_name='Кому выдан')),
+                ('object', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_tickets', to='api.constructionobject', verbose_name='Объект')),
+            ],
+            options={
+                'verbose_name': 'Билет на загрузку',
+                'verbose_name_plural': 'Билеты на загрузку',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['kind', 'entity_id'], name='api_uploadt_kind_e1da80_idx')],
+            },
+        ),
+    ]
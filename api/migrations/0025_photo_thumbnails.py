@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_upload_tickets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhotoThumbnail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('modified_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('url', models.URLField(max_length=2000, unique=True, verbose_name='URL фото')),
+                ('thumbnail_url', models.URLField(max_length=2000, verbose_name='URL превью')),
+                ('width', models.PositiveIntegerField(default=0, verbose_name='Ширина, px')),
+                ('height', models.PositiveIntegerField(default=0, verbose_name='Высота, px')),
+                ('original_size_bytes', models.BigIntegerField(default=0, verbose_name='Исходный размер, байт')),
+                ('size_bytes', models.BigIntegerField(default=0, verbose_name='Размер после обработки, байт')),
+            ],
+            options={
+                'verbose_name': 'Превью фото',
+                'verbose_name_plural': 'Превью фото',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='delivery',
+            name='invoice_photos_thumbnail_urls',
+            field=models.JSONField(blank=True, default=list, help_text='Ссылки на превью в порядке invoice_photos_folder_url (null — превью нет)', verbose_name='Превью фото накладных'),
+        ),
+        migrations.AddField(
+            model_name='prescription',
+            name='violation_photos_thumbnail_urls',
+            field=models.JSONField(blank=True, default=list, help_text='Ссылки на превью в порядке violation_photos_folder_url (null — превью нет)', verbose_name='Превью фото нарушения'),
+        ),
+        migrations.AddField(
+            model_name='prescriptionfix',
+            name='fix_photos_thumbnail_urls',
+            field=models.JSONField(blank=True, default=list, help_text='Ссылки на превью в порядке fix_photos_folder_url (null — превью нет)', verbose_name='Превью фото исправления'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_photo_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhotoHash',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('modified_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('url', models.URLField(max_length=2000, unique=True, verbose_name='URL фото')),
+                ('kind', models.CharField(blank=True, choices=[('violation', 'Фото нарушения'), ('fix', 'Фото исправления'), ('invoice', 'Фото накладной')], max_length=16, verbose_name='Тип фото')),
+                ('entity_id', models.BigIntegerField(blank=True, null=True, verbose_name='ID сущности')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает расчёта'), ('hashed', 'Рассчитан'), ('failed', 'Ошибка')], default='pending', max_length=16, verbose_name='Статус')),
+                ('phash', models.BigIntegerField(blank=True, null=True, verbose_name='dHash (со знаком)')),
+                ('block0', models.IntegerField(blank=True, db_index=True, null=True, verbose_name='Блок хэша 0')),
+                ('block1', models.IntegerField(blank=True, db_index=True, null=True, verbose_name='Блок хэша 1')),
+                ('block2', models.IntegerField(blank=True, db_index=True, null=True, verbose_name='Блок хэша 2')),
+                ('block3', models.IntegerField(blank=True, db_index=True, null=True, verbose_name='Блок хэша 3')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('object', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='photo_hashes', to='api.constructionobject', verbose_name='Объект')),
+            ],
+            options={
+                'verbose_name': 'Перцептивный хэш фото',
+                'verbose_name_plural': 'Перцептивные хэши фото',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='api_photoha_status_f56185_idx'), models.Index(fields=['kind', 'entity_id'], name='api_photoha_kind_67af66_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_photo_hashes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StorageSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('modified_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('cursor', models.DateTimeField(blank=True, null=True, verbose_name='Курсор (последнее изменение в хранилище)')),
+                ('status', models.CharField(choices=[('ok', 'Синхронизировано'), ('failed', 'Ошибка')], default='ok', max_length=16, verbose_name='Статус')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('last_synced_at', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Последняя синхронизация')),
+                ('files_count', models.PositiveIntegerField(default=0, verbose_name='Файлов')),
+                ('total_size_bytes', models.BigIntegerField(default=0, verbose_name='Общий размер, байт')),
+            ],
+            options={
+                'verbose_name': 'Синхронизация хранилища',
+                'verbose_name_plural': 'Синхронизация хранилища',
+                'ordering': ['last_synced_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='documentfile',
+            name='storage_key',
+            field=models.CharField(blank=True, max_length=1024, verbose_name='Ключ в хранилище'),
+        ),
+        migrations.AddField(
+            model_name='documentfile',
+            name='storage_modified_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Изменён в хранилище'),
+        ),
+        migrations.AddField(
+            model_name='folder',
+            name='path',
+            field=models.CharField(blank=True, max_length=1024, verbose_name='Путь в хранилище'),
+        ),
+        migrations.AlterField(
+            model_name='documentfile',
+            name='url',
+            field=models.URLField(max_length=2000, verbose_name='URL файла'),
+        ),
+        migrations.AddIndex(
+            model_name='documentfile',
+            index=models.Index(fields=['object', '-created_at'], name='api_documen_object__82f62a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentfile',
+            index=models.Index(fields=['object', 'folder'], name='api_documen_object__e6b08f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentfile',
+            index=models.Index(fields=['object', 'name'], name='api_documen_object__6fc3ae_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='documentfile',
+            constraint=models.UniqueConstraint(condition=models.Q(('storage_key', ''), _negated=True), fields=('object', 'storage_key'), name='uniq_document_object_storage_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='folder',
+            constraint=models.UniqueConstraint(condition=models.Q(('path', ''), _negated=True), fields=('object', 'path'), name='uniq_folder_object_path'),
+        ),
+        migrations.AddField(
+            model_name='storagesyncstate',
+            name='object',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='storage_sync', to='api.constructionobject', verbose_name='Объект'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_storage_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StorageUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('modified_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('category', models.CharField(choices=[('documents', 'Документы'), ('invoices', 'Накладные'), ('violations', 'Нарушения'), ('fixes', 'Исправления')], max_length=16, verbose_name='Категория')),
+                ('files_count', models.PositiveIntegerField(default=0, verbose_name='Файлов')),
+                ('size_bytes', models.BigIntegerField(default=0, verbose_name='Объём, байт')),
+                ('last_upload_at', models.DateTimeField(blank=True, null=True, verbose_name='Последняя загрузка')),
+                ('object', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='storage_usage', to='api.constructionobject', verbose_name='Объект')),
+            ],
+            options={
+                'verbose_name': 'Объём хранилища объекта',
+                'verbose_name_plural': 'Объём хранилища по объектам',
+                'ordering': ['object', 'category'],
+                'constraints': [models.UniqueConstraint(fields=('object', 'category'), name='uniq_storage_usage_object_category')],
+            },
+        ),
+    ]
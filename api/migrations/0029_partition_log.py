@@ -0,0 +1,89 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import migrations
+
+
+PARTITIONS_AHEAD = 3
+
+
+def _literal(value):
+    return f"'{value:%Y-%m-%d %H:%M:%S}+00'"
+
+
+def _add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_log(apps, schema_editor):
+    """
+    api_log → таблица, секционированная по месяцам created_at.
+
+    Существующая таблица не копируется: она подключается секцией
+    api_log_legacy с диапазоном «всё до начала следующего месяца» и удаляется
+    командой maintain_log_partitions целиком, когда весь её диапазон устареет.
+    Первичный ключ секционированной таблицы — (id, created_at); для ORM id
+    по-прежнему уникален (общая последовательность).
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    Log = apps.get_model("api", "Log")
+    now = datetime.now(dt_timezone.utc)
+    boundary = _add_months(datetime(now.year, now.month, 1, tzinfo=dt_timezone.utc), 1)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'api_log'::regclass")
+        if cursor.fetchone():
+            return
+        cursor.execute("SELECT COALESCE(MAX(id), 0) + 1, COUNT(*) FROM api_log")
+        next_id, rows = cursor.fetchone()
+
+        cursor.execute("ALTER TABLE api_log RENAME TO api_log_legacy")
+        cursor.execute("ALTER TABLE api_log_legacy ALTER COLUMN id DROP IDENTITY IF EXISTS")
+        cursor.execute("ALTER TABLE api_log_legacy ALTER COLUMN id DROP DEFAULT")
+        cursor.execute("ALTER TABLE api_log_legacy DROP CONSTRAINT IF EXISTS api_log_pkey")
+        # Имена индексов нужны родительской таблице; при подключении секции
+        # PostgreSQL возьмёт эти индексы вместо построения новых
+        for index in Log._meta.indexes:
+            cursor.execute(f'ALTER INDEX IF EXISTS "{index.name}" RENAME TO "{index.name[:50]}_legacy"')
+
+        cursor.execute("CREATE SEQUENCE IF NOT EXISTS api_log_id_seq")
+        cursor.execute("SELECT setval('api_log_id_seq', %s, false)", [next_id])
+        cursor.execute("CREATE TABLE api_log (LIKE api_log_legacy INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+        cursor.execute("ALTER TABLE api_log ALTER COLUMN id SET DEFAULT nextval('api_log_id_seq')")
+        cursor.execute("ALTER SEQUENCE api_log_id_seq OWNED BY api_log.id")
+        cursor.execute("ALTER TABLE api_log ADD CONSTRAINT api_log_pkey PRIMARY KEY (id, created_at)")
+        for index in Log._meta.indexes:
+            schema_editor.add_index(Log, index)
+
+        if rows:
+            cursor.execute(
+                f"ALTER TABLE api_log ATTACH PARTITION api_log_legacy FOR VALUES FROM (MINVALUE) TO ({_literal(boundary)})"
+            )
+            first_month = boundary
+        else:
+            cursor.execute("DROP TABLE api_log_legacy")
+            first_month = _add_months(boundary, -1)
+
+        month = first_month
+        while month <= _add_months(boundary, PARTITIONS_AHEAD - 1):
+            end = _add_months(month, 1)
+            cursor.execute(
+                f'CREATE TABLE "api_log_{month:%Y%m}" PARTITION OF api_log '
+                f"FOR VALUES FROM ({_literal(month)}) TO ({_literal(end)})"
+            )
+            month = end
+        # Страховка: строки вне созданных секций не теряются, команда потом перенесёт их
+        cursor.execute("CREATE TABLE api_log_default PARTITION OF api_log DEFAULT")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_storage_usage'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_log, migrations.RunPython.noop, hints={'model_name': 'log'}),
+    ]
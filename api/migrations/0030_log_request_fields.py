@@ -0,0 +1,71 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_partition_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='log',
+            name='db_queries',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Запросов к БД'),
+        ),
+        migrations.AddField(
+            model_name='log',
+            name='db_time_ms',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Время в БД, мс'),
+        ),
+        migrations.AddField(
+            model_name='log',
+            name='duration_ms',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Время ответа, мс'),
+        ),
+        migrations.AddField(
+            model_name='log',
+            name='object',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.constructionobject', verbose_name='Объект'),
+        ),
+        migrations.AddField(
+            model_name='log',
+            name='request_method',
+            field=models.CharField(blank=True, max_length=10, verbose_name='HTTP-метод'),
+        ),
+        migrations.AddField(
+            model_name='log',
+            name='request_path',
+            field=models.CharField(blank=True, max_length=500, verbose_name='Путь запроса'),
+        ),
+        migrations.AddField(
+            model_name='log',
+            name='response_status',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='HTTP-статус ответа'),
+        ),
+        migrations.AddField(
+            model_name='log',
+            name='user',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(fields=['user', 'created_at'], name='api_log_user_id_f89cbf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(fields=['object', 'created_at'], name='api_log_object__b11cfd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(fields=['request_path', 'created_at'], name='api_log_request_798e4e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(fields=['response_status', 'created_at'], name='api_log_respons_ef8ca9_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:02
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+
+
+def fill_rollup(apps, schema_editor):
+    Log = apps.get_model("api", "Log")
+    LogHourlyRollup = apps.get_model("api", "LogHourlyRollup")
+    db = schema_editor.connection.alias
+    rows = (
+        Log.objects.using(db).annotate(hour=TruncHour("created_at"))
+        .values("hour", "level", "category").annotate(n=Count("id")).order_by()
+    )
+    LogHourlyRollup.objects.using(db).bulk_create(
+        [LogHourlyRollup(hour=r["hour"], level=r["level"], category=r["category"], count=r["n"]) for r in rows.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0030_log_request_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogHourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('modified_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('hour', models.DateTimeField(verbose_name='Час')),
+                ('level', models.CharField(choices=[('debug', 'Debug'), ('info', 'Info'), ('warning', 'Warning'), ('error', 'Error'), ('critical', 'Critical')], max_length=10, verbose_name='Уровень')),
+                ('category', models.CharField(choices=[('auth', 'Авторизация'), ('object', 'Объекты'), ('delivery', 'Поставки'), ('prescription', 'Нарушения'), ('work_plan', 'Графики работ'), ('activation', 'Активация'), ('user', 'Пользователи'), ('area', 'Полигоны'), ('system', 'Система'), ('api', 'API'), ('file_storage', 'Файловое хранилище')], max_length=20, verbose_name='Категория')),
+                ('count', models.BigIntegerField(default=0, verbose_name='Записей')),
+            ],
+            options={
+                'verbose_name': 'Статистика журнала за час',
+                'verbose_name_plural': 'Статистика журнала по часам',
+                'ordering': ['-hour', 'level', 'category'],
+                'constraints': [models.UniqueConstraint(fields=('hour', 'level', 'category'), name='uniq_log_rollup_hour_level_category')],
+            },
+        ),
+        migrations.RunPython(fill_rollup, migrations.RunPython.noop, hints={'model_name': 'loghourlyrollup'}),
+    ]
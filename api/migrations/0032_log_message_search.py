@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:03
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations
+
+
+def create_trgm_extension(apps, schema_editor):
+    # RunPython, а не TrigramExtension: так роутер создаёт расширение в БД журнала
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0031_log_hourly_rollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_extension, migrations.RunPython.noop, hints={'model_name': 'log'}),
+        migrations.AddIndex(
+            model_name='log',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('message'), name='gin_trgm_ops'), name='api_log_message_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('message', config='russian'), name='api_log_message_fts_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:08
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.core.serializers.json
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0032_log_message_search'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='log',
+            name='api_log_message_fts_idx',
+        ),
+        migrations.AddField(
+            model_name='log',
+            name='params',
+            field=models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Параметры сообщения'),
+        ),
+        migrations.AddField(
+            model_name='log',
+            name='template',
+            field=models.CharField(blank=True, max_length=50, verbose_name='Шаблон сообщения'),
+        ),
+        migrations.AlterField(
+            model_name='log',
+            name='message',
+            field=models.TextField(blank=True, verbose_name='Подробное сообщение'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(fields=['template', 'created_at'], name='api_log_templat_21ca05_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper(django.db.models.functions.comparison.Cast('params', models.TextField())), name='gin_trgm_ops'), name='api_log_params_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='log',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('message', 'params', config='russian'), name='api_log_text_fts_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0033_log_message_templates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('modified_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('entity_type', models.CharField(choices=[('object', 'Объект'), ('area', 'Полигон')], max_length=20, verbose_name='Тип')),
+                ('entity_id', models.PositiveBigIntegerField(verbose_name='ID')),
+                ('hour', models.DateTimeField(verbose_name='Час')),
+                ('count', models.BigIntegerField(default=0, verbose_name='Просмотров')),
+                ('user', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Просмотры за час',
+                'verbose_name_plural': 'Просмотры по часам',
+                'ordering': ['-hour', 'entity_type', 'entity_id'],
+                'indexes': [models.Index(fields=['entity_type', 'entity_id', 'hour'], name='api_viewcou_entity__5eb80d_idx'), models.Index(fields=['user', 'hour'], name='api_viewcou_user_id_e8721c_idx')],
+                'constraints': [models.UniqueConstraint(fields=('entity_type', 'entity_id', 'user', 'hour'), name='uniq_view_counter_entity_user_hour')],
+            },
+        ),
+    ]
@@ -6,12 +6,16 @@ from api.models.prescription import Prescription, PrescriptionFix
 from api.models.visit import QrCode, VisitRequest
 from api.models.area import Area, SubArea
 from api.models.delivery import Delivery, Invoice, Material, LabOrder
-from api.models.log import Log, LogLevel, LogCategory
+from api.models.log import Log, LogLevel, LogCategory, LogHourlyRollup, ViewCounter, ViewEntity
+from api.models.upload import UploadJob, UploadJobFile, UploadSession, UploadTicket
+from api.models.storage import StoredFile, FileDedupeStat, PhotoThumbnail, PhotoHash, StorageUsage
 
 __all__ = ["Roles", "User", "RefreshToken", "Invitation",
            "ConstructionObject", "WorkPlan", "WorkItem", "ScheduleItem", "WorkPlanVersion", "WorkPlanChangeRequest", "WorkItemChangeRequest",
            "ObjectActivation", "Notification", "Prescription",
            "PrescriptionFix", "QrCode", "VisitRequest", "Area", "SubArea",
            "Delivery", "Invoice", "Material", "LabOrder",
-           "Log", "LogLevel", "LogCategory"]
+           "Log", "LogLevel", "LogCategory", "LogHourlyRollup", "ViewCounter", "ViewEntity",
+           "UploadJob", "UploadJobFile", "UploadSession", "UploadTicket",
+           "StoredFile", "FileDedupeStat", "PhotoThumbnail", "PhotoHash", "StorageUsage"]
 
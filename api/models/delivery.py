@@ -24,6 +24,7 @@ class Delivery(TimeStampedMixin):
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name="Инициатор (ССК)", on_delete=models.PROTECT, related_name="deliveries_created")
     
     invoice_photos_folder_url = models.JSONField("URL папки с фото накладных", default=list, blank=True, help_text="Массив ссылок на фото накладных в файловом хранилище")
+    invoice_photos_thumbnail_urls = models.JSONField("Превью фото накладных", default=list, blank=True, help_text="Ссылки на превью в порядке invoice_photos_folder_url (null — превью нет)")
 
     class Meta:
         verbose_name = "Поставка"
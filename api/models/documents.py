@@ -15,11 +15,15 @@ class Folder(TimeStampedMixin):
         "self", verbose_name="Родительская папка",
         null=True, blank=True, on_delete=models.CASCADE, related_name="children"
     )
+    path = models.CharField("Путь в хранилище", max_length=1024, blank=True)
 
     class Meta:
         verbose_name = "Папка"
         verbose_name_plural = "Папки"
         ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(fields=["object", "path"], condition=~models.Q(path=""), name="uniq_folder_object_path"),
+        ]
 
     def __str__(self):
         return f"{self.name} (obj={self.object_id})"
@@ -35,18 +39,54 @@ class DocumentFile(TimeStampedMixin):
         null=True, blank=True, on_delete=models.SET_NULL, related_name="files"
     )
     name = models.CharField("Название файла", max_length=255)
-    url = models.URLField("URL файла")
+    url = models.URLField("URL файла", max_length=2000)
     size_bytes = models.BigIntegerField("Размер, байт", null=True, blank=True)
     content_type = models.CharField("MIME-тип", max_length=128, blank=True)
+    storage_key = models.CharField("Ключ в хранилище", max_length=1024, blank=True)
+    storage_modified_at = models.DateTimeField("Изменён в хранилище", null=True, blank=True)
 
     class Meta:
         verbose_name = "Файл"
         verbose_name_plural = "Файлы"
         ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["object", "storage_key"], condition=~models.Q(storage_key=""), name="uniq_document_object_storage_key"),
+        ]
+        indexes = [
+            models.Index(fields=["object", "-created_at"]),
+            models.Index(fields=["object", "folder"]),
+            models.Index(fields=["object", "name"]),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.content_type or 'unknown'})"
 
+class StorageSyncState(TimeStampedMixin):
+    """Состояние зеркалирования папки объекта из файлового хранилища в Folder/DocumentFile."""
+
+    STATUS = (
+        ("ok", "Синхронизировано"),
+        ("failed", "Ошибка"),
+    )
+    object = models.OneToOneField(
+        ConstructionObject, verbose_name="Объект",
+        on_delete=models.CASCADE, related_name="storage_sync"
+    )
+    cursor = models.DateTimeField("Курсор (последнее изменение в хранилище)", null=True, blank=True)
+    status = models.CharField("Статус", max_length=16, choices=STATUS, default="ok")
+    error = models.TextField("Ошибка", blank=True)
+    last_synced_at = models.DateTimeField("Последняя синхронизация", null=True, blank=True, db_index=True)
+    files_count = models.PositiveIntegerField("Файлов", default=0)
+    total_size_bytes = models.BigIntegerField("Общий размер, байт", default=0)
+
+    class Meta:
+        verbose_name = "Синхронизация хранилища"
+        verbose_name_plural = "Синхронизация хранилища"
+        ordering = ["last_synced_at"]
+
+    def __str__(self):
+        return f"obj={self.object_id} [{self.get_status_display()}] {self.last_synced_at}"
+
 class ExecDocument(TimeStampedMixin):
     KIND = (
         ("general", "Общее"),
@@ -1,6 +1,11 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models.functions import Cast, Upper
 from django.conf import settings
 from api.models.timestamp import TimeStampedMixin
+from api.utils.log_templates import render_log_message
 
 
 class LogLevel(models.TextChoices):
@@ -28,7 +33,23 @@ class LogCategory(models.TextChoices):
 class Log(TimeStampedMixin):
     level = models.CharField("Уровень", max_length=10, choices=LogLevel.choices, default=LogLevel.INFO)
     category = models.CharField("Категория", max_length=20, choices=LogCategory.choices, default=LogCategory.SYSTEM)
-    message = models.TextField("Подробное сообщение")
+    # Записи log_* хранят id шаблона (api.utils.log_templates) и параметры, а не готовый текст;
+    # message — для старых записей и произвольного текста. Для показа — Log.text
+    message = models.TextField("Подробное сообщение", blank=True)
+    template = models.CharField("Шаблон сообщения", max_length=50, blank=True)
+    params = models.JSONField("Параметры сообщения", default=dict, blank=True, encoder=DjangoJSONEncoder)
+    # Структурированные поля. Журнал может жить в отдельной БД (api.db_routers.LogRouter),
+    # поэтому ссылки без внешних ключей в СУБД и без каскадов: id сохраняется и после удаления записи
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name="Пользователь", null=True, blank=True,
+                             on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name="+")
+    object = models.ForeignKey("api.ConstructionObject", verbose_name="Объект", null=True, blank=True,
+                               on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name="+")
+    request_method = models.CharField("HTTP-метод", max_length=10, blank=True)
+    request_path = models.CharField("Путь запроса", max_length=500, blank=True)
+    response_status = models.PositiveSmallIntegerField("HTTP-статус ответа", null=True, blank=True)
+    duration_ms = models.PositiveIntegerField("Время ответа, мс", null=True, blank=True)
+    db_time_ms = models.PositiveIntegerField("Время в БД, мс", null=True, blank=True)
+    db_queries = models.PositiveIntegerField("Запросов к БД", null=True, blank=True)
     
     class Meta:
         verbose_name = "Лог"
@@ -38,10 +59,32 @@ class Log(TimeStampedMixin):
             models.Index(fields=["level"]),
             models.Index(fields=["category"]),
             models.Index(fields=["created_at"]),
+            models.Index(fields=["user", "created_at"]),
+            models.Index(fields=["object", "created_at"]),
+            models.Index(fields=["request_path", "created_at"]),
+            models.Index(fields=["response_status", "created_at"]),
+            models.Index(fields=["template", "created_at"]),
+            # Поиск подстроки (message__icontains → UPPER(message) LIKE ...) по триграммам
+            GinIndex(OpClass(Upper("message"), name="gin_trgm_ops"), name="api_log_message_trgm_idx"),
+            # То же для параметров шаблонных записей (params__icontains → UPPER(params::text) LIKE ...)
+            GinIndex(OpClass(Upper(Cast("params", models.TextField())), name="gin_trgm_ops"), name="api_log_params_trgm_idx"),
+            # Полнотекстовый поиск с ранжированием (режим search_mode=fulltext в LogsListView)
+            GinIndex(SearchVector("message", "params", config="russian"), name="api_log_text_fts_idx"),
         ]
     
     def __str__(self):
-        return f"[{self.level.upper()}] {self.category}: {self.message[:50]}"
+        return f"[{self.level.upper()}] {self.category}: {self.text[:50]}"
+
+    # Структурированные поля, доступные шаблонам наравне с params
+    TEMPLATE_FIELDS = ("request_method", "request_path", "response_status", "duration_ms", "db_time_ms", "db_queries")
+
+    @property
+    def text(self):
+        """Текст записи для показа: message или шаблон с параметрами."""
+        return render_log_message(
+            self.template, self.params, self.message,
+            **{name: getattr(self, name) for name in self.TEMPLATE_FIELDS},
+        )
     
     @classmethod
     def create_log(cls, level, category, message):
@@ -50,3 +93,55 @@ class Log(TimeStampedMixin):
             category=category,
             message=message
         )
+
+
+class LogHourlyRollup(TimeStampedMixin):
+    """Число записей Log за час по уровню и категории; растёт при каждой записи журнала."""
+
+    hour = models.DateTimeField("Час")
+    level = models.CharField("Уровень", max_length=10, choices=LogLevel.choices)
+    category = models.CharField("Категория", max_length=20, choices=LogCategory.choices)
+    count = models.BigIntegerField("Записей", default=0)
+
+    class Meta:
+        verbose_name = "Статистика журнала за час"
+        verbose_name_plural = "Статистика журнала по часам"
+        ordering = ["-hour", "level", "category"]
+        constraints = [
+            models.UniqueConstraint(fields=["hour", "level", "category"], name="uniq_log_rollup_hour_level_category"),
+        ]
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} {self.level}/{self.category}: {self.count}"
+
+
+class ViewEntity(models.TextChoices):
+    OBJECT = "object", "Объект"
+    AREA = "area", "Полигон"
+
+
+class ViewCounter(TimeStampedMixin):
+    """Число просмотров сущности пользователем за час; копится в памяти процесса (api.utils.view_counters)."""
+
+    entity_type = models.CharField("Тип", max_length=20, choices=ViewEntity.choices)
+    entity_id = models.PositiveBigIntegerField("ID")
+    # Как у Log: без внешнего ключа в СУБД, счётчики живут в БД журнала
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name="Пользователь",
+                             on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name="+")
+    hour = models.DateTimeField("Час")
+    count = models.BigIntegerField("Просмотров", default=0)
+
+    class Meta:
+        verbose_name = "Просмотры за час"
+        verbose_name_plural = "Просмотры по часам"
+        ordering = ["-hour", "entity_type", "entity_id"]
+        indexes = [
+            models.Index(fields=["entity_type", "entity_id", "hour"]),
+            models.Index(fields=["user", "hour"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["entity_type", "entity_id", "user", "hour"], name="uniq_view_counter_entity_user_hour"),
+        ]
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} {self.entity_type} #{self.entity_id} / user #{self.user_id}: {self.count}"
@@ -25,6 +25,7 @@ class Prescription(TimeStampedMixin):
     closed_at = models.DateTimeField("Закрыто", null=True, blank=True)
     
     violation_photos_folder_url = models.JSONField("URL папки с фото нарушения", default=list, blank=True, help_text="Массив ссылок на фото нарушения в файловом хранилище")
+    violation_photos_thumbnail_urls = models.JSONField("Превью фото нарушения", default=list, blank=True, help_text="Ссылки на превью в порядке violation_photos_folder_url (null — превью нет)")
 
     class Meta:
         verbose_name = "Предписание"
@@ -43,6 +44,7 @@ class PrescriptionFix(TimeStampedMixin):
     attachments = models.JSONField("Вложения (URL'ы)", default=list, blank=True)
     
     fix_photos_folder_url = models.JSONField("URL папки с фото исправления", default=list, blank=True, help_text="Массив ссылок на фото исправления нарушения в файловом хранилище")
+    fix_photos_thumbnail_urls = models.JSONField("Превью фото исправления", default=list, blank=True, help_text="Ссылки на превью в порядке fix_photos_folder_url (null — превью нет)")
 
     class Meta:
         verbose_name = "Исправление предписания"
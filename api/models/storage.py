@@ -0,0 +1,139 @@
+from django.db import models
+
+from api.models.timestamp import TimeStampedMixin
+
+
+class StoredFile(TimeStampedMixin):
+    """Индекс содержимого, уже лежащего в файловом хранилище: sha256 → URL."""
+
+    scope = models.CharField("Область (тег/сущность)", max_length=255)
+    sha256 = models.CharField("SHA-256 содержимого", max_length=64)
+    url = models.URLField("URL в файловом хранилище", max_length=2000)
+    size_bytes = models.BigIntegerField("Размер, байт", default=0)
+    content_type = models.CharField("MIME-тип", max_length=100, blank=True)
+    hits = models.PositiveIntegerField("Повторных загрузок пропущено", default=0)
+    last_hit_at = models.DateTimeField("Последнее попадание", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Файл в хранилище"
+        verbose_name_plural = "Файлы в хранилище"
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "sha256"], name="uniq_stored_file_scope_sha256"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.sha256[:12]} → {self.url}"
+
+
+class FileDedupeStat(models.Model):
+    """Дневные счётчики попаданий/промахов индекса содержимого."""
+
+    date = models.DateField("Дата", unique=True)
+    hits = models.PositiveIntegerField("Попадания", default=0)
+    misses = models.PositiveIntegerField("Промахи", default=0)
+    bytes_saved = models.BigIntegerField("Сэкономлено, байт", default=0)
+    bytes_uploaded = models.BigIntegerField("Загружено, байт", default=0)
+
+    class Meta:
+        verbose_name = "Статистика дедупликации файлов"
+        verbose_name_plural = "Статистика дедупликации файлов"
+        ordering = ["-date"]
+
+    def __str__(self):
+        return f"{self.date}: {self.hits} попаданий / {self.misses} промахов"
+
+
+class PhotoThumbnail(TimeStampedMixin):
+    """Превью фото, обработанного перед загрузкой (уменьшение, пережатие, без EXIF)."""
+
+    url = models.URLField("URL фото", max_length=2000, unique=True)
+    thumbnail_url = models.URLField("URL превью", max_length=2000)
+    width = models.PositiveIntegerField("Ширина, px", default=0)
+    height = models.PositiveIntegerField("Высота, px", default=0)
+    original_size_bytes = models.BigIntegerField("Исходный размер, байт", default=0)
+    size_bytes = models.BigIntegerField("Размер после обработки, байт", default=0)
+
+    class Meta:
+        verbose_name = "Превью фото"
+        verbose_name_plural = "Превью фото"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.url} → {self.thumbnail_url}"
+
+
+class PhotoHash(TimeStampedMixin):
+    """
+    Перцептивный хэш (dHash, 64 бита) фото для поиска похожих.
+
+    Хэш дополнительно разложен на четыре 16-битных блока с индексами: фото на
+    расстоянии Хэмминга ≤ 3 обязательно совпадают хотя бы в одном блоке, поэтому
+    кандидаты выбираются по индексу, а не полным перебором.
+    """
+
+    KIND = (
+        ("violation", "Фото нарушения"),
+        ("fix", "Фото исправления"),
+        ("invoice", "Фото накладной"),
+    )
+    STATUS = (
+        ("pending", "Ожидает расчёта"),
+        ("hashed", "Рассчитан"),
+        ("failed", "Ошибка"),
+    )
+
+    url = models.URLField("URL фото", max_length=2000, unique=True)
+    kind = models.CharField("Тип фото", max_length=16, choices=KIND, blank=True)
+    entity_id = models.BigIntegerField("ID сущности", null=True, blank=True)
+    object = models.ForeignKey("api.ConstructionObject", verbose_name="Объект", null=True, blank=True, on_delete=models.CASCADE, related_name="photo_hashes")
+    status = models.CharField("Статус", max_length=16, choices=STATUS, default="pending")
+    phash = models.BigIntegerField("dHash (со знаком)", null=True, blank=True)
+    block0 = models.IntegerField("Блок хэша 0", null=True, blank=True, db_index=True)
+    block1 = models.IntegerField("Блок хэша 1", null=True, blank=True, db_index=True)
+    block2 = models.IntegerField("Блок хэша 2", null=True, blank=True, db_index=True)
+    block3 = models.IntegerField("Блок хэша 3", null=True, blank=True, db_index=True)
+    error = models.TextField("Ошибка", blank=True)
+
+    class Meta:
+        verbose_name = "Перцептивный хэш фото"
+        verbose_name_plural = "Перцептивные хэши фото"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["kind", "entity_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.url} [{self.get_status_display()}]"
+
+
+class StorageUsage(TimeStampedMixin):
+    """Счётчики объёма файлов объекта в хранилище по категориям; растут при каждой успешной загрузке."""
+
+    CATEGORY = (
+        ("documents", "Документы"),
+        ("invoices", "Накладные"),
+        ("violations", "Нарушения"),
+        ("fixes", "Исправления"),
+    )
+
+    object = models.ForeignKey(
+        "api.ConstructionObject", verbose_name="Объект",
+        on_delete=models.CASCADE, related_name="storage_usage"
+    )
+    category = models.CharField("Категория", max_length=16, choices=CATEGORY)
+    files_count = models.PositiveIntegerField("Файлов", default=0)
+    size_bytes = models.BigIntegerField("Объём, байт", default=0)
+    last_upload_at = models.DateTimeField("Последняя загрузка", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Объём хранилища объекта"
+        verbose_name_plural = "Объём хранилища по объектам"
+        ordering = ["object", "category"]
+        constraints = [
+            models.UniqueConstraint(fields=["object", "category"], name="uniq_storage_usage_object_category"),
+        ]
+
+    def __str__(self):
+        return f"obj={self.object_id} {self.get_category_display()}: {self.files_count} файлов, {self.size_bytes} байт"
@@ -0,0 +1,144 @@
+import uuid
+from django.db import models
+from django.conf import settings
+
+from api.models.timestamp import TimeStampedMixin
+from api.models.object import ConstructionObject
+from api.models.delivery import Delivery
+
+
+class UploadJob(TimeStampedMixin):
+    KIND = (
+        ("invoice_photos", "Фото накладных"),
+        ("object_documents", "Документы объекта"),
+    )
+    STATUS = (
+        ("pending", "В очереди"),
+        ("running", "Загружается"),
+        ("done", "Завершена"),
+        ("partial", "Завершена частично"),
+        ("failed", "Ошибка"),
+    )
+
+    uuid_job = models.UUIDField("UUID задачи загрузки", default=uuid.uuid4, editable=False, unique=True)
+    kind = models.CharField("Тип загрузки", max_length=32, choices=KIND)
+    status = models.CharField("Статус", max_length=16, choices=STATUS, default="pending")
+    object = models.ForeignKey(ConstructionObject, verbose_name="Объект", on_delete=models.CASCADE, related_name="upload_jobs")
+    delivery = models.ForeignKey(Delivery, verbose_name="Поставка", null=True, blank=True, on_delete=models.CASCADE, related_name="upload_jobs")
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name="Инициатор", null=True, blank=True, on_delete=models.SET_NULL, related_name="upload_jobs")
+    total_files = models.PositiveIntegerField("Всего файлов", default=0)
+    started_at = models.DateTimeField("Начата", null=True, blank=True)
+    finished_at = models.DateTimeField("Завершена", null=True, blank=True)
+    error = models.TextField("Ошибка", blank=True)
+
+    class Meta:
+        verbose_name = "Задача загрузки файлов"
+        verbose_name_plural = "Задачи загрузки файлов"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"UploadJob[{self.uuid_job}] {self.get_kind_display()} — {self.get_status_display()}"
+
+
+class UploadJobFile(TimeStampedMixin):
+    STATUS = (
+        ("pending", "Ожидает"),
+        ("uploaded", "Загружен"),
+        ("failed", "Ошибка"),
+    )
+
+    job = models.ForeignKey(UploadJob, verbose_name="Задача", on_delete=models.CASCADE, related_name="files")
+    position = models.PositiveIntegerField("Порядковый номер")
+    name = models.CharField("Имя файла", max_length=255, blank=True)
+    size_bytes = models.BigIntegerField("Размер, байт", default=0)
+    staging_path = models.CharField("Путь во временном хранилище", max_length=1024)
+    is_base64 = models.BooleanField("Содержимое в base64", default=False)
+    status = models.CharField("Статус", max_length=16, choices=STATUS, default="pending")
+    url = models.URLField("URL в файловом хранилище", max_length=2000, blank=True)
+    error = models.TextField("Ошибка", blank=True)
+
+    class Meta:
+        verbose_name = "Файл задачи загрузки"
+        verbose_name_plural = "Файлы задач загрузки"
+        ordering = ["job", "position"]
+
+    def __str__(self):
+        return f"{self.job_id}#{self.position} {self.name} [{self.status}]"
+
+
+class UploadSession(TimeStampedMixin):
+    """Возобновляемая загрузка большого документа объекта по частям."""
+
+    STATUS = (
+        ("open", "Принимает части"),
+        ("uploading", "Передаётся в хранилище"),
+        ("done", "Загружен"),
+        ("failed", "Ошибка"),
+        ("aborted", "Отменена"),
+    )
+
+    uuid_session = models.UUIDField("UUID сессии загрузки", default=uuid.uuid4, editable=False, unique=True)
+    object = models.ForeignKey(ConstructionObject, verbose_name="Объект", on_delete=models.CASCADE, related_name="upload_sessions")
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name="Инициатор", null=True, blank=True, on_delete=models.SET_NULL, related_name="upload_sessions")
+    filename = models.CharField("Имя файла", max_length=255)
+    content_type = models.CharField("MIME-тип", max_length=100, default="application/pdf")
+    total_size = models.BigIntegerField("Размер файла, байт")
+    received_bytes = models.BigIntegerField("Получено, байт", default=0)
+    received_ranges = models.JSONField("Полученные диапазоны", default=list, blank=True,
+                                       help_text="Отсортированные непересекающиеся диапазоны [начало, конец) в байтах")
+    status = models.CharField("Статус", max_length=16, choices=STATUS, default="open")
+    url = models.URLField("URL в файловом хранилище", max_length=2000, blank=True)
+    error = models.TextField("Ошибка", blank=True)
+    completed_at = models.DateTimeField("Завершена", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Сессия загрузки документа"
+        verbose_name_plural = "Сессии загрузки документов"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "modified_at"]),
+        ]
+
+    def __str__(self):
+        return f"UploadSession[{self.uuid_session}] {self.filename} {self.received_bytes}/{self.total_size}"
+
+
+class UploadTicket(TimeStampedMixin):
+    """Подписанный билет на прямую загрузку фото в хранилище, минуя воркеры приложения."""
+
+    KIND = (
+        ("delivery", "Фото накладных поставки"),
+        ("prescription", "Фото нарушения"),
+        ("fix", "Фото исправления нарушения"),
+        ("object", "Документы объекта"),
+    )
+    STATUS = (
+        ("issued", "Выдан"),
+        ("confirmed", "Подтверждён"),
+    )
+
+    jti = models.UUIDField("Идентификатор билета", default=uuid.uuid4, editable=False, unique=True)
+    kind = models.CharField("Сущность", max_length=16, choices=KIND)
+    entity_id = models.BigIntegerField("ID сущности")
+    object = models.ForeignKey(ConstructionObject, verbose_name="Объект", on_delete=models.CASCADE, related_name="upload_tickets")
+    storage_path = models.CharField("Путь загрузки в хранилище", max_length=512)
+    max_files = models.PositiveIntegerField("Максимум файлов", default=20)
+    status = models.CharField("Статус", max_length=16, choices=STATUS, default="issued")
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, verbose_name="Кому выдан", null=True, blank=True, on_delete=models.SET_NULL, related_name="upload_tickets")
+    expires_at = models.DateTimeField("Действителен до")
+    confirmed_at = models.DateTimeField("Подтверждён", null=True, blank=True)
+    urls = models.JSONField("Загруженные файлы", default=list, blank=True)
+
+    class Meta:
+        verbose_name = "Билет на загрузку"
+        verbose_name_plural = "Билеты на загрузку"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["kind", "entity_id"]),
+        ]
+
+    def __str__(self):
+        return f"UploadTicket[{self.jti}] {self.get_kind_display()} #{self.entity_id} — {self.get_status_display()}"
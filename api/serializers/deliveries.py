@@ -2,6 +2,7 @@ from rest_framework import serializers
 
 from api.models.delivery import Delivery, Invoice, Material
 from api.models.work_plan import WorkItem
+from api.serializers.fields import Base64OrFileField
 
 
 class DeliveryCreateSerializer(serializers.Serializer):
@@ -10,14 +11,15 @@ class DeliveryCreateSerializer(serializers.Serializer):
     planned_date = serializers.DateField(required=False)
     notes = serializers.CharField(required=False, allow_blank=True)
     invoice_photos = serializers.ListField(
-        child=serializers.CharField(), 
+        child=Base64OrFileField(), 
         required=False, 
-        help_text="Список фото накладных в формате base64"
+        help_text="Список фото накладных: строки base64 (JSON) или файлы (multipart/form-data)"
     )
     
     def save(self, **kwargs):
         from api.models.delivery import Delivery
-        from api.utils.file_storage import upload_invoice_photos_base64
+        from api.utils.file_storage import upload_invoice_photos_base64, photo_thumbnail_urls
+        from api.utils.photo_hashes import register_photos
         
         invoice_photos = self.validated_data.pop("invoice_photos", [])
         work_item_id = self.validated_data.pop("work_item_id", None)
@@ -36,8 +38,19 @@ class DeliveryCreateSerializer(serializers.Serializer):
         
         delivery = Delivery.objects.create(**self.validated_data, work_item=work_item, **kwargs)
         
+        self.upload_job = None
         if invoice_photos:
             request = self.context.get("request")
+
+            if self.context.get("upload_async"):
+                from api.utils.upload_jobs import create_upload_job
+
+                self.upload_job = create_upload_job(
+                    "invoice_photos", invoice_photos, delivery.object, delivery=delivery,
+                    user=request.user if request else None,
+                )
+                return delivery
+
             user_name = request.user.full_name if request and request.user else "Система"
             user_role = request.user.role if request and request.user else "system"
             
@@ -45,7 +58,9 @@ class DeliveryCreateSerializer(serializers.Serializer):
             
             if urls:
                 delivery.invoice_photos_folder_url = urls
-                delivery.save(update_fields=["invoice_photos_folder_url"])
+                delivery.invoice_photos_thumbnail_urls = photo_thumbnail_urls(urls)
+                delivery.save(update_fields=["invoice_photos_folder_url", "invoice_photos_thumbnail_urls"])
+                register_photos("invoice", delivery.id, delivery.object_id, urls)
         
         return delivery
 
@@ -75,15 +90,16 @@ class DeliveryOutSerializer(serializers.ModelSerializer):
     class Meta:
         model = Delivery
         fields = ("id", "uuid_delivery", "object", "work_item", "planned_date", "notes", "status", 
-                "created_by", "invoices", "materials", "invoice_photos_folder_url", "created_at", "modified_at")
+                "created_by", "invoices", "materials", "invoice_photos_folder_url", "invoice_photos_thumbnail_urls",
+                "created_at", "modified_at")
 
 class DeliveryReceiveSerializer(serializers.Serializer):
     object_id = serializers.IntegerField()
     notes = serializers.CharField(required=False, allow_blank=True)
     invoice_photos = serializers.ListField(
-        child=serializers.CharField(), 
+        child=Base64OrFileField(), 
         required=False, 
-        help_text="Список фото накладных в формате base64"
+        help_text="Список фото накладных: строки base64 (JSON) или файлы (multipart/form-data)"
     )
 
 class InvoiceCreateSerializer(serializers.Serializer):
@@ -4,7 +4,7 @@ from api.models.documents import DocumentFile, ExecDocument
 class DocumentOutSerializer(serializers.ModelSerializer):
     class Meta:
         model = DocumentFile
-        fields = ("id","uuid_document","object","folder","name","url","size_bytes","content_type","created_at")
+        fields = ("id","uuid_document","object","folder","name","url","size_bytes","content_type","storage_modified_at","created_at")
 
 class ExecDocCreateSerializer(serializers.Serializer):
     object_id = serializers.IntegerField()
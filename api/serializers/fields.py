@@ -0,0 +1,22 @@
+from django.core.files.uploadedfile import UploadedFile
+from rest_framework import serializers
+
+
+class Base64OrFileField(serializers.Field):
+    """Элемент списка файлов: строка base64 из JSON или файл из multipart/form-data."""
+
+    default_error_messages = {
+        "invalid": "Ожидается строка base64 или файл.",
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, UploadedFile):
+            return data
+        if isinstance(data, str) and data:
+            return data
+        self.fail("invalid")
+
+    def to_representation(self, value):
+        if isinstance(value, UploadedFile):
+            return value.name
+        return value
@@ -4,6 +4,7 @@ from django.db.models import Count
 from api.models.user import User, Roles
 from api.models.object import ConstructionObject, ObjectActivation
 from api.models.documents import ExecDocument, DocumentFile
+from api.utils.storage_usage import object_storage_usage
 from api.models.object import ObjectRoleAudit
 from api.models.area import Area, SubArea
 from api.models.work_plan import WorkPlan, WorkItem, ScheduleItem
@@ -11,6 +12,7 @@ from api.models.delivery import Delivery, Invoice, Material
 from api.models.prescription import Prescription, PrescriptionFix
 from api.models.work import Work
 from api.models.checklist import DailyChecklist
+from api.serializers.fields import Base64OrFileField
 
 class UserBriefSerializer(serializers.ModelSerializer):
     class Meta:
@@ -19,9 +21,9 @@ class UserBriefSerializer(serializers.ModelSerializer):
 
 class ObjectCreateSerializer(serializers.ModelSerializer):
     document_files = serializers.ListField(
-        child=serializers.CharField(), 
+        child=Base64OrFileField(), 
         required=False, 
-        help_text="Список файлов документов объекта в формате base64"
+        help_text="Список файлов документов объекта: строки base64 (JSON) или файлы (multipart/form-data)"
     )
     
     class Meta:
@@ -36,7 +38,12 @@ class ObjectCreateSerializer(serializers.ModelSerializer):
         
         obj = ConstructionObject.objects.create(created_by=creator, **validated_data)
         
-        if document_files:
+        self.upload_job = None
+        if document_files and self.context.get("upload_async"):
+            from api.utils.upload_jobs import create_upload_job
+
+            self.upload_job = create_upload_job("object_documents", document_files, obj, user=creator)
+        elif document_files:
             from api.utils.file_storage import upload_object_documents_base64
             
             urls = upload_object_documents_base64(
@@ -84,10 +91,14 @@ class ObjectOutSerializer(serializers.ModelSerializer):
     main_polygon = serializers.SerializerMethodField()
     work_progress = serializers.SerializerMethodField()
     visit_history = serializers.SerializerMethodField()
+    storage_usage = serializers.SerializerMethodField()
 
     class Meta:
         model = ConstructionObject
-        fields = ("id", "uuid_obj", "name", "address", "status", "ssk", "foreman", "iko", "can_proceed", "areas", "main_polygon", "work_progress", "documents_folder_url", "visit_history", "created_at")
+        fields = ("id", "uuid_obj", "name", "address", "status", "ssk", "foreman", "iko", "can_proceed", "areas", "main_polygon", "work_progress", "documents_folder_url", "visit_history", "storage_usage", "created_at")
+
+    def get_storage_usage(self, obj):
+        return object_storage_usage(obj)
 
     def get_work_progress(self, obj):
         try:
@@ -233,9 +244,9 @@ class ObjectPatchSerializer(serializers.Serializer):
     primary_iko_id = serializers.UUIDField(required=False, allow_null=True)
     coordinates_id = serializers.IntegerField(required=False, allow_null=True)
     document_files = serializers.ListField(
-        child=serializers.CharField(), 
+        child=Base64OrFileField(), 
         required=False, 
-        help_text="Список файлов документов объекта в формате base64"
+        help_text="Список файлов документов объекта: строки base64 (JSON) или файлы (multipart/form-data)"
     )
     can_continue_construction = serializers.BooleanField(required=False)
 
@@ -284,7 +295,14 @@ class ObjectPatchSerializer(serializers.Serializer):
             obj.can_proceed = bool(self.validated_data["can_continue_construction"])
 
         document_files = self.validated_data.get("document_files", [])
-        if document_files:
+        self.upload_job = None
+        if document_files and self.context.get("upload_async"):
+            from api.utils.upload_jobs import create_upload_job
+
+            self.upload_job = create_upload_job("object_documents", document_files, obj, user=req.user)
+            # documents_folder_url заполнит воркер: полное сохранение могло бы затереть его запись
+            obj.save(update_fields=["foreman", "ssk", "iko", "can_proceed", "modified_at"])
+        elif document_files:
             from api.utils.file_storage import upload_object_documents_base64
             
             urls = upload_object_documents_base64(
@@ -297,8 +315,8 @@ class ObjectPatchSerializer(serializers.Serializer):
             
             if urls:
                 obj.documents_folder_url = urls
-
-        obj.save()
+        if not self.upload_job:
+            obj.save()
 
         for field in ("ssk", "foreman", "iko"):
             if old[field] != getattr(obj, field):
@@ -338,7 +356,8 @@ class DeliveryDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Delivery
         fields = ("id", "uuid_delivery", "work_item", "planned_date", "notes", "status", 
-                "created_by", "invoices", "invoice_photos_folder_url", "created_at", "modified_at")
+                "created_by", "invoices", "invoice_photos_folder_url", "invoice_photos_thumbnail_urls",
+                "created_at", "modified_at")
 
 class WorkItemDetailSerializer(serializers.ModelSerializer):
     status = serializers.SerializerMethodField()
@@ -368,14 +387,15 @@ class PrescriptionDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Prescription
         fields = ("id", "title", "description", "status", "requires_stop", 
-                "requires_personal_recheck", "attachments", "violation_photos_folder_url", "author", 
+                "requires_personal_recheck", "attachments", "violation_photos_folder_url",
+                "violation_photos_thumbnail_urls", "author", 
                 "created_at", "closed_at", "modified_at")
 
 class PrescriptionFixDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = PrescriptionFix
-        fields = ("id", "comment", "attachments", "fix_photos_folder_url", "author", 
+        fields = ("id", "comment", "attachments", "fix_photos_folder_url", "fix_photos_thumbnail_urls", "author", 
                 "created_at", "modified_at")
 
 class WorkDetailSerializer(serializers.ModelSerializer):
@@ -437,13 +457,14 @@ class ObjectFullDetailSerializer(serializers.ModelSerializer):
     open_prescriptions_count = serializers.SerializerMethodField()
     works_count = serializers.SerializerMethodField()
     daily_checklists_count = serializers.SerializerMethodField()
+    storage_usage = serializers.SerializerMethodField()
     
     class Meta:
         model = ConstructionObject
         fields = (
             "id", "uuid_obj", "name", "address", "status", "can_proceed",
             "ssk", "foreman", "iko", "created_by", "areas", "main_polygon", "work_progress",
-            "documents_folder_url", "visit_history", "created_at", "modified_at",
+            "documents_folder_url", "visit_history", "storage_usage", "created_at", "modified_at",
 
             "deliveries", "work_plans", "prescriptions", "works", 
             "daily_checklists", "activations",
@@ -452,6 +473,9 @@ class ObjectFullDetailSerializer(serializers.ModelSerializer):
             "open_prescriptions_count", "works_count", "daily_checklists_count"
         )
     
+    def get_storage_usage(self, obj):
+        return object_storage_usage(obj)
+
     def get_work_progress(self, obj):
         try:
             work_plan = WorkPlan.objects.filter(object=obj).order_by('-created_at').first()
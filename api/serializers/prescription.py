@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from api.models.prescription import Prescription, PrescriptionFix
 from api.serializers.objects import ObjectShortSerializer
+from api.utils.photo_hashes import register_photos
 
 
 class PrescriptionCreateSerializer(serializers.ModelSerializer):
@@ -20,15 +21,19 @@ class PrescriptionCreateSerializer(serializers.ModelSerializer):
         prescription = super().save(**kwargs)
         
         if violation_photos_urls:
+            from api.utils.file_storage import photo_thumbnail_urls
+
             prescription.violation_photos_folder_url = violation_photos_urls
-            prescription.save(update_fields=["violation_photos_folder_url"])
+            prescription.violation_photos_thumbnail_urls = photo_thumbnail_urls(violation_photos_urls)
+            prescription.save(update_fields=["violation_photos_folder_url", "violation_photos_thumbnail_urls"])
+            register_photos("violation", prescription.id, prescription.object_id, violation_photos_urls)
         
         return prescription
 
 class PrescriptionFixSerializer(serializers.ModelSerializer):
     class Meta:
         model = PrescriptionFix
-        fields = ("id", "uuid_fix", "author", "comment", "attachments", "fix_photos_folder_url", "created_at")
+        fields = ("id", "uuid_fix", "author", "comment", "attachments", "fix_photos_folder_url", "fix_photos_thumbnail_urls", "created_at")
 
 class PrescriptionOutSerializer(serializers.ModelSerializer):
     fixes = PrescriptionFixSerializer(many=True, read_only=True)
@@ -54,8 +59,12 @@ class PrescriptionFixCreateSerializer(serializers.ModelSerializer):
         prescription_fix = super().save(**kwargs)
         
         if fix_photos_urls:
+            from api.utils.file_storage import photo_thumbnail_urls
+
             prescription_fix.fix_photos_folder_url = fix_photos_urls
-            prescription_fix.save(update_fields=["fix_photos_folder_url"])
+            prescription_fix.fix_photos_thumbnail_urls = photo_thumbnail_urls(fix_photos_urls)
+            prescription_fix.save(update_fields=["fix_photos_folder_url", "fix_photos_thumbnail_urls"])
+            register_photos("fix", prescription_fix.id, prescription_fix.prescription.object_id, fix_photos_urls)
         
         return prescription_fix
 
@@ -69,5 +78,5 @@ class PrescriptionListSerializer(serializers.ModelSerializer):
             "id", "uuid_prescription",
             "object", "author", "title",
             "requires_stop", "requires_personal_recheck", "description",
-            "status", "violation_photos_folder_url", "fixes", "created_at", "closed_at",
+            "status", "violation_photos_folder_url", "violation_photos_thumbnail_urls", "fixes", "created_at", "closed_at",
         )
\ No newline at end of file
@@ -0,0 +1,74 @@
+from rest_framework import serializers
+
+from api.models.upload import UploadJob, UploadJobFile, UploadSession, UploadTicket
+
+
+class UploadJobFileOutSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadJobFile
+        fields = ("position", "name", "size_bytes", "status", "url", "error", "modified_at")
+
+
+class UploadJobOutSerializer(serializers.ModelSerializer):
+    files = UploadJobFileOutSerializer(many=True, read_only=True)
+    uploaded_files = serializers.SerializerMethodField()
+    failed_files = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadJob
+        fields = ("id", "uuid_job", "kind", "status", "object", "delivery", "total_files",
+                  "uploaded_files", "failed_files", "files", "error",
+                  "started_at", "finished_at", "created_at")
+
+    def get_uploaded_files(self, obj):
+        return sum(1 for f in obj.files.all() if f.status == "uploaded")
+
+    def get_failed_files(self, obj):
+        return sum(1 for f in obj.files.all() if f.status == "failed")
+
+
+class UploadSessionCreateSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    content_type = serializers.CharField(max_length=100, required=False, default="application/pdf")
+
+    def validate_size(self, value):
+        from django.conf import settings
+
+        max_size = int(getattr(settings, "UPLOAD_SESSION_MAX_SIZE", 2 * 1024 ** 3))
+        if value > max_size:
+            raise serializers.ValidationError(f"Файл больше допустимых {max_size} байт.")
+        return value
+
+
+class UploadSessionOutSerializer(serializers.ModelSerializer):
+    next_offset = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ("id", "uuid_session", "object", "filename", "content_type", "total_size",
+                  "received_bytes", "received_ranges", "next_offset", "status", "url", "error",
+                  "created_at", "completed_at")
+
+    def get_next_offset(self, obj):
+        from api.utils.upload_sessions import next_offset
+
+        return next_offset(obj)
+
+
+class UploadTicketCreateSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=[k for k, _ in UploadTicket.KIND])
+    entity_id = serializers.IntegerField(min_value=1)
+    max_files = serializers.IntegerField(min_value=1, max_value=100, required=False, default=20)
+
+
+class UploadTicketConfirmSerializer(serializers.Serializer):
+    ticket = serializers.CharField()
+    urls = serializers.ListField(child=serializers.URLField(max_length=2000), allow_empty=False)
+
+
+class UploadTicketOutSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadTicket
+        fields = ("jti", "kind", "entity_id", "object", "storage_path", "max_files", "status",
+                  "expires_at", "confirmed_at", "urls", "created_at")
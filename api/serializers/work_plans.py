@@ -190,7 +190,8 @@ class DeliveryBriefSerializer(serializers.ModelSerializer):
     class Meta:
         model = Delivery
         fields = ("id", "uuid_delivery", "planned_date", "notes", "status", 
-                "created_by", "materials", "invoice_photos_folder_url", "created_at", "modified_at")
+                "created_by", "materials", "invoice_photos_folder_url", "invoice_photos_thumbnail_urls",
+                "created_at", "modified_at")
 
 class WorkItemDetailSerializer(serializers.ModelSerializer):
     status = serializers.SerializerMethodField()
@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api import db_routers
+from api.db_routers import LogRouter
+from api.models.log import Log, LogHourlyRollup
+from api.models.object import ConstructionObject
+from api.models.user import User
+
+DEFAULT = {"ENGINE": "django.db.backends.postgresql", "NAME": "demo", "HOST": "127.0.0.1", "PORT": 5432}
+
+
+def _databases(**logs):
+    return SimpleNamespace(DATABASES={"default": DEFAULT, "logs": {**DEFAULT, **logs}})
+
+
+class LogRouterTests(SimpleTestCase):
+    router = LogRouter()
+
+    def test_log_models_use_log_connection(self):
+        self.assertEqual(self.router.db_for_write(Log), "logs")
+        self.assertEqual(self.router.db_for_read(LogHourlyRollup), "logs")
+        self.assertEqual(self.router.db_for_write(ConstructionObject), "default")
+        self.assertTrue(self.router.allow_relation(Log(), ConstructionObject()))
+        self.assertIsNone(self.router.allow_relation(ConstructionObject(), ConstructionObject()))
+
+    def test_related_objects_of_log_entries_use_default(self):
+        # Подсказка instance — запись из БД журнала; переход по FK должен идти в default
+        log = Log()
+        log._state.db = "logs"
+        with mock.patch.object(db_routers, "settings", _databases(NAME="demo_logs")):
+            self.assertEqual(self.router.db_for_read(User, instance=log), "default")
+            self.assertEqual(self.router.db_for_write(ConstructionObject, instance=log), "default")
+            self.assertEqual(self.router.db_for_read(Log, instance=log), "logs")
+
+    def test_without_log_alias_everything_goes_to_default(self):
+        with mock.patch.object(db_routers, "settings", SimpleNamespace(DATABASES={"default": DEFAULT})):
+            self.assertIsNone(self.router.db_for_write(Log))
+            self.assertIsNone(self.router.allow_migrate("default", "api", "log"))
+
+    def test_same_database_is_migrated_by_default_only(self):
+        with mock.patch.object(db_routers, "settings", _databases()):
+            self.assertIsNone(self.router.allow_migrate("default", "api", "log"))
+            self.assertFalse(self.router.allow_migrate("logs", "api", "log"))
+            self.assertFalse(self.router.allow_migrate("logs", "api", "constructionobject"))
+
+    def test_separate_database_gets_only_log_tables(self):
+        with mock.patch.object(db_routers, "settings", _databases(NAME="demo_logs")):
+            self.assertTrue(self.router.allow_migrate("logs", "api", "viewcounter"))
+            self.assertFalse(self.router.allow_migrate("logs", "api", "constructionobject"))
+            self.assertFalse(self.router.allow_migrate("default", "api", "log"))
+            self.assertIsNone(self.router.allow_migrate("default", "api", "constructionobject"))
+
+    def test_test_mirror_is_same_database(self):
+        # При создании тестовой БД NAME default уже подменён, а logs — ещё нет
+        databases = {"default": {**DEFAULT, "NAME": "test_demo"}, "logs": {**DEFAULT, "TEST": {"MIRROR": "default"}}}
+        with mock.patch.object(db_routers, "settings", SimpleNamespace(DATABASES=databases)):
+            self.assertIsNone(self.router.allow_migrate("default", "api", "log"))
+            self.assertFalse(self.router.allow_migrate("logs", "api", "log"))
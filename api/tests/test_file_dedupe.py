@@ -0,0 +1,60 @@
+import base64
+import hashlib
+import io
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.models.storage import FileDedupeStat, StoredFile
+from api.utils import file_storage
+from api.utils.file_dedupe import content_digest, find_stored_file, remember_stored_file
+
+CONTENT = b"%PDF-1.4 " * 20000  # больше одного куска хэширования
+
+
+class ContentDigestTests(SimpleTestCase):
+    def test_same_digest_for_base64_bytes_and_stream(self):
+        encoded = base64.b64encode(CONTENT).decode("ascii")
+        stream = io.BytesIO(CONTENT)
+        stream.content_type = "application/pdf"
+
+        expected = hashlib.sha256(CONTENT).hexdigest()
+        for data in (encoded, f"data:application/pdf;base64,{encoded}", CONTENT, stream):
+            self.assertEqual(content_digest(data).sha256, expected)
+            self.assertEqual(content_digest(data).size, len(CONTENT))
+        self.assertEqual(content_digest(f"data:application/pdf;base64,{encoded}").content_type, "application/pdf")
+        self.assertEqual(stream.tell(), 0)
+
+
+class StoredFileIndexTests(TestCase):
+    def test_find_counts_hits_within_scope(self):
+        digest = content_digest(CONTENT)
+        remember_stored_file("docs/object/1", digest, "https://s/a.pdf")
+        remember_stored_file("docs/object/1", digest, "https://s/b.pdf")
+
+        self.assertIsNone(find_stored_file("docs/object/2", digest))
+        self.assertEqual(find_stored_file("docs/object/1", digest).url, "https://s/a.pdf")
+        stored = StoredFile.objects.get()
+        self.assertEqual((stored.hits, stored.size_bytes), (1, len(CONTENT)))
+
+
+@override_settings(FILE_STORAGE_DEDUPE=True, FILE_STORAGE_UPLOAD_CONCURRENCY=1)
+@mock.patch.object(file_storage, "log_file_storage_dedupe_hits")
+class UploadDedupeTests(TestCase):
+    def test_known_file_is_not_uploaded_again(self, hits_log):
+        encoded = base64.b64encode(CONTENT).decode("ascii")
+        remember_stored_file("docs/object/1", content_digest(CONTENT), "https://s/old.pdf")
+        upload_one = mock.Mock(return_value={"files": [{"url": "https://s/new.pdf"}]})
+
+        results = file_storage._upload_base64_batch(
+            [encoded, base64.b64encode(b"other").decode("ascii")], upload_one, "upload_documents",
+            passthrough=False, dedupe_scope="docs/object/1",
+        )
+
+        self.assertEqual([r["url"] for r in results], ["https://s/old.pdf", "https://s/new.pdf"])
+        self.assertTrue(results[0]["deduplicated"])
+        upload_one.assert_called_once()
+        self.assertEqual(StoredFile.objects.filter(scope="docs/object/1").count(), 2)
+        stat = FileDedupeStat.objects.get()
+        self.assertEqual((stat.hits, stat.misses, stat.bytes_saved), (1, 1, len(CONTENT)))
+        hits_log.assert_called_once_with("upload_documents", 1, 2, len(CONTENT))
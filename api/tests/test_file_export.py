@@ -0,0 +1,69 @@
+import io
+import shutil
+import tempfile
+import threading
+import zipfile
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.models.delivery import Delivery
+from api.models.object import ConstructionObject
+from api.models.prescription import Prescription, PrescriptionFix
+from api.models.user import Roles, User
+from api.utils.file_export import ExportEntry, object_export_entries, stream_zip
+from api.utils.storage_stub import StorageStubServer, StubOptions
+
+
+class ExportEntriesTests(TestCase):
+    def test_entries_cover_all_folders_with_unique_names(self):
+        user = User.objects.create_user("a@a.ru", "x", role=Roles.ADMIN, full_name="A")
+        obj = ConstructionObject.objects.create(
+            name="o", address="a",
+            documents_folder_url=["https://s/upload/docs/object/1/act.pdf", "https://s/upload/docs/object/1/sub/act.pdf"],
+        )
+        delivery = Delivery.objects.create(
+            object=obj, created_by=user,
+            invoice_photos_folder_url=["https://s/upload/delivery/1/2/a.jpg", "https://s/upload/thumbs/delivery/1/2/a.jpg"],
+        )
+        pres = Prescription.objects.create(object=obj, author=user, title="t", violation_photos_folder_url=["https://s/v.jpg"])
+        fix = PrescriptionFix.objects.create(prescription=pres, author=user, comment="c", fix_photos_folder_url=["https://s/f.jpg"])
+
+        self.assertEqual([e.arcname for e in object_export_entries(obj)], [
+            "Документы/act.pdf",
+            "Документы/act (2).pdf",
+            f"Поставки/{delivery.id}/a.jpg",
+            f"Нарушения/{pres.id}/Нарушение/v.jpg",
+            f"Нарушения/{pres.id}/Исправление {fix.id}/f.jpg",
+        ])
+
+
+@override_settings(FILE_EXPORT_CONCURRENCY=2, FILE_EXPORT_SPOOL_MAX=16)
+class StreamZipTests(SimpleTestCase):
+    def setUp(self):
+        storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage_dir, ignore_errors=True)
+        self.server = StorageStubServer(("127.0.0.1", 0), StubOptions(storage_dir=storage_dir))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.files = {}
+        for i in range(5):
+            name = f"f{i}.bin"
+            with open(f"{storage_dir}/{name}", "wb") as fh:
+                fh.write(bytes([i]) * (100 * (i + 1)))
+            self.files[f"dir/{name}"] = f"{self.server.url}/upload/{name}"
+
+    def test_archive_keeps_order_and_lists_failures(self):
+        entries = [ExportEntry(arcname, url) for arcname, url in self.files.items()]
+        entries.insert(2, ExportEntry("dir/missing.bin", f"{self.server.url}/upload/missing.bin"))
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(stream_zip(entries))))
+        self.assertEqual(archive.namelist(), list(self.files) + ["Ошибки экспорта.txt"])
+        self.assertEqual(archive.read("dir/f3.bin"), bytes([3]) * 400)
+        self.assertEqual(archive.getinfo("dir/f3.bin").compress_type, zipfile.ZIP_STORED)
+        self.assertIn("dir/missing.bin", archive.read("Ошибки экспорта.txt").decode("utf-8"))
+
+    def test_closing_stream_early_does_not_hang(self):
+        stream = stream_zip([ExportEntry(arcname, url) for arcname, url in self.files.items()])
+        next(stream)
+        stream.close()
@@ -0,0 +1,236 @@
+import base64
+import io
+import json
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from api.utils import file_storage
+from api.utils.file_storage import (
+    Base64DataUrl,
+    file_storage_client,
+    upload_batch,
+    _payload_size,
+    _prepare_base64_image,
+    _presigned_expiry,
+    _track_peak_memory,
+)
+from api.utils.storage_stub import StorageStubServer, StubOptions
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n" + b"\x00" * 16
+
+
+def _ok(value):
+    return {"url": f"u{value}", "error": None}
+
+
+@mock.patch.object(file_storage, "log_file_storage_late_upload")
+@mock.patch.object(file_storage, "log_file_storage_batch_deadline")
+class UploadBatchTests(SimpleTestCase):
+    def test_results_keep_input_order(self, deadline_log, late_log):
+        def task(value):
+            time.sleep(value / 100)
+            return _ok(value)
+
+        results = upload_batch([3, 1, 2], task, max_workers=3, deadline=5)
+        self.assertEqual([r["url"] for r in results], ["u3", "u1", "u2"])
+        deadline_log.assert_not_called()
+
+    def test_task_errors_do_not_break_the_batch(self, deadline_log, late_log):
+        def task(value):
+            if value == 2:
+                raise ValueError("boom")
+            return _ok(value)
+
+        results = upload_batch([1, 2, 3], task, max_workers=2, deadline=5)
+        self.assertEqual([r["url"] for r in results], ["u1", None, "u3"])
+        self.assertEqual(results[1]["error"], "boom")
+
+    def test_serial_path_honours_deadline(self, deadline_log, late_log):
+        def task(value):
+            time.sleep(0.2)
+            return _ok(value)
+
+        results = upload_batch([1, 2, 3], task, max_workers=1, deadline=0.3)
+        self.assertEqual(results[2], {"url": None, "error": "deadline"})
+        self.assertEqual([r["url"] for r in results[:2]], ["u1", "u2"])
+        deadline_log.assert_called_once_with("upload_batch", 2, 3, 0.3)
+
+    def test_request_timeout_is_capped_by_deadline(self, deadline_log, late_log):
+        seen = []
+
+        def task(value):
+            seen.append(file_storage_client.request_timeout)
+            return _ok(value)
+
+        upload_batch([1], task, deadline=0.5)
+        connect, read = seen[0]
+        self.assertLessEqual(read, 0.5)
+        self.assertLessEqual(connect, 0.5)
+        self.assertEqual(file_storage_client.request_timeout, (file_storage_client.connect_timeout, file_storage_client.timeout))
+
+    def test_parallel_deadline_cancels_pending_and_logs_late_uploads(self, deadline_log, late_log):
+        release = threading.Event()
+        started = []
+
+        def task(value):
+            started.append(value)
+            if value != 1:
+                release.wait(2)
+            return _ok(value)
+
+        progress = []
+        results = upload_batch([1, 2, 3, 4], task, max_workers=2, deadline=0.3, on_result=lambda i, r: progress.append(i))
+        self.assertEqual(results[0]["url"], "u1")
+        self.assertTrue(all(r == {"url": None, "error": "deadline"} for r in results[1:]))
+        self.assertEqual(sorted(progress), [0, 1, 2, 3])
+        deadline_log.assert_called_once()
+
+        release.set()
+        for _ in range(50):
+            if late_log.call_count == 2:
+                break
+            time.sleep(0.02)
+        # Задачи 2 и 3 уже выполнялись и загрузили файлы после дедлайна, задача 4 отменена до старта
+        self.assertEqual(sorted(c.args for c in late_log.call_args_list), [("upload_batch", "u2"), ("upload_batch", "u3")])
+        self.assertNotIn(4, started)
+
+
+class Base64PassthroughTests(SimpleTestCase):
+    def test_valid_data_url_is_passed_as_is(self):
+        data_url = "data:image/png;base64," + base64.b64encode(PNG_HEADER).decode()
+        prepared = _prepare_base64_image(data_url)
+        self.assertIsInstance(prepared, Base64DataUrl)
+        self.assertIs(prepared.data_url, data_url)
+
+    def test_bare_base64_gets_sniffed_mime_and_padding(self):
+        encoded = base64.b64encode(PNG_HEADER + b"x").decode().rstrip("=")
+        prepared = _prepare_base64_image(encoded)
+        self.assertTrue(prepared.data_url.startswith("data:image/png;base64,"))
+        self.assertEqual(base64.b64decode(prepared.data_url.split(",", 1)[1]), PNG_HEADER + b"x")
+
+    def test_invalid_alphabet_falls_back_to_decoding(self):
+        prepared = _prepare_base64_image("aGVs\nbG8=")
+        self.assertEqual(prepared, b"hello")
+
+    def test_payload_size_is_decoded_size(self):
+        for raw in (b"a", b"ab", b"abc", PNG_HEADER):
+            data_url = "data:image/jpeg;base64," + base64.b64encode(raw).decode()
+            self.assertEqual(_payload_size(Base64DataUrl(data_url)), len(raw))
+
+    def test_photos_request_keeps_data_urls(self):
+        data_url = "data:image/jpeg;base64," + base64.b64encode(b"jpeg").decode()
+        kwargs = file_storage_client._photos_request([Base64DataUrl(data_url)], "2025-01-02")
+        self.assertEqual(kwargs["json"], {"photos_base64": [data_url], "date": "2025-01-02"})
+
+    def test_photos_request_streams_files_as_base64(self):
+        upload = io.BytesIO(PNG_HEADER * 100)
+        upload.name = "photo.png"
+        kwargs = file_storage_client._photos_request([upload, b"raw"])
+        body = b"".join(kwargs["data"])
+        self.assertEqual(len(body), len(kwargs["data"]))
+        photos = json.loads(body)["photos_base64"]
+        self.assertTrue(photos[0].startswith("data:image/png;base64,"))
+        self.assertEqual(base64.b64decode(photos[0].split(",", 1)[1]), PNG_HEADER * 100)
+        self.assertEqual(base64.b64decode(photos[1].split(",", 1)[1]), b"raw")
+
+
+class PeakMemoryTests(SimpleTestCase):
+    @override_settings(FILE_STORAGE_TRACE_MEMORY=True)
+    @mock.patch.object(file_storage, "log_file_storage_peak_memory")
+    def test_peak_is_measured_without_stopping_tracing(self, peak_log):
+        with mock.patch.object(file_storage.tracemalloc, "is_tracing", return_value=True), \
+                mock.patch.object(file_storage.tracemalloc, "get_traced_memory", side_effect=[(100, 100), (150, 1100)]), \
+                mock.patch.object(file_storage.tracemalloc, "reset_peak") as reset_peak, \
+                mock.patch.object(file_storage.tracemalloc, "stop") as stop:
+            with _track_peak_memory("op", 2):
+                pass
+        reset_peak.assert_called_once()
+        stop.assert_not_called()
+        peak_log.assert_called_once_with("op", 2, 1000)
+
+    @override_settings(FILE_STORAGE_TRACE_MEMORY=False)
+    @mock.patch.object(file_storage, "log_file_storage_peak_memory")
+    def test_disabled_by_setting(self, peak_log):
+        with _track_peak_memory("op", 1):
+            pass
+        peak_log.assert_not_called()
+
+
+class ClientSessionTests(SimpleTestCase):
+    def test_each_thread_gets_own_session_over_shared_pool(self):
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(file_storage_client.session))
+        thread.start()
+        thread.join()
+        main = file_storage_client.session
+        self.assertIs(main, file_storage_client.session)
+        self.assertIsNot(main, sessions[0])
+        self.assertIs(main.get_adapter("https://storage"), sessions[0].get_adapter("https://storage"))
+
+    @override_settings(FILE_STORAGE_RETRIES=2, FILE_STORAGE_RETRY_BACKOFF=1.0)
+    def test_only_reads_are_retried_after_response(self):
+        retry = file_storage.FileStorageClient._build_adapter().max_retries
+        self.assertEqual(retry.total, 2)
+        self.assertTrue(retry.is_retry("GET", 503))
+        self.assertFalse(retry.is_retry("POST", 503))
+
+    def test_backoff_has_full_jitter(self):
+        retry = file_storage._JitteredRetry(total=5, backoff_factor=1.0)
+        for _ in range(3):
+            retry = retry.increment(method="GET", url="/browse/object/1", error=ConnectionError())
+        backoffs = [retry.get_backoff_time() for _ in range(200)]
+        self.assertTrue(all(0 <= b <= 4 for b in backoffs))
+        self.assertGreater(len(set(backoffs)), 1)
+
+
+class BrowseCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.server = StorageStubServer(("127.0.0.1", 0), StubOptions(presign_ttl=3600))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.client = file_storage.FileStorageClient()
+        self.client.base_url = self.server.url
+        self.addCleanup(cache.clear)
+
+    def _put(self, name):
+        self.server.store.add("docs/object/7", {"key": f"docs/object/7/{name}", "url": f"{self.server.url}/upload/docs/object/7/{name}"})
+
+    def test_listing_is_cached_until_invalidated(self):
+        self._put("a.pdf")
+        self.assertEqual(len(self.client.browse_object(7)["files"]), 1)
+        self._put("b.pdf")
+        self.assertEqual(len(self.client.browse_object(7)["files"]), 1)
+        self.assertEqual(len(self.client.browse_object(7, use_cache=False)["files"]), 2)
+        self.client.invalidate_browse("object", 7)
+        self.assertEqual(len(self.client.browse_object(7)["files"]), 2)
+
+    def test_thumbnails_are_hidden_from_listing(self):
+        self._put("a.jpg")
+        self.server.store.add("thumbs/docs/object/7", {"key": "thumbs/docs/object/7/a.jpg", "url": "x"})
+        keys = [f["key"] for f in self.client.browse_object(7)["files"]]
+        self.assertEqual(keys, ["docs/object/7/a.jpg"])
+
+    def test_presigned_expiry(self):
+        signed = "https://s/a.jpg?X-Amz-Date=20250101T000000Z&X-Amz-Expires=600"
+        data = {"files": [{"presigned_url": signed}, {"presigned_url": "https://s/b.jpg?Expires=1735689000"}]}
+        self.assertEqual(_presigned_expiry(data), 1735689000)
+        self.assertIsNone(_presigned_expiry({"files": [{"url": "https://s/a.jpg"}]}))
+
+    @override_settings(FILE_STORAGE_BROWSE_CACHE_TTL=300, FILE_STORAGE_BROWSE_CACHE_MARGIN=60)
+    def test_ttl_ends_before_links_expire(self):
+        with mock.patch.object(file_storage.cache, "set") as cache_set:
+            soon = {"url": f"https://s/a.jpg?Expires={int(time.time()) + 200}"}
+            file_storage.FileStorageClient._cache_browse("k", soon)
+            self.assertLessEqual(cache_set.call_args.args[2], 140)
+
+            file_storage.FileStorageClient._cache_browse("k", {"url": "https://s/a.jpg"})
+            self.assertEqual(cache_set.call_args.args[2], 300)
+
+            cache_set.reset_mock()
+            file_storage.FileStorageClient._cache_browse("k", {"url": f"https://s/a.jpg?Expires={int(time.time()) + 30}"})
+            cache_set.assert_not_called()
@@ -0,0 +1,114 @@
+import base64
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.models.storage import PhotoThumbnail
+from api.utils import file_storage, images
+from api.utils.file_storage import Base64DataUrl, _image_source, _without_thumbnails, is_thumbnail_path
+from api.utils.images import ProcessedImage, _process_image_source, process_image
+
+
+def _jpeg(size=(1200, 800)):
+    out = io.BytesIO()
+    exif = images.Image.Exif()
+    exif[0x010F] = "Camera"
+    images.Image.new("RGB", size, (200, 10, 10)).save(out, "JPEG", exif=exif)
+    return out.getvalue()
+
+
+class ThumbnailPathTests(SimpleTestCase):
+    def test_is_thumbnail_path(self):
+        self.assertTrue(is_thumbnail_path("thumbs/delivery/1/2/a.jpg"))
+        self.assertTrue(is_thumbnail_path("/upload/thumbs/delivery/1/2/a.jpg"))
+        self.assertTrue(is_thumbnail_path("/upload/thumbs%2Fdelivery/a.jpg"))
+        self.assertFalse(is_thumbnail_path("/upload/delivery/1/2/thumbs.jpg"))
+
+    def test_listing_without_thumbnails(self):
+        data = {
+            "files": [
+                {"key": "delivery/1/2/a.jpg"},
+                {"key": "thumbs/delivery/1/2/a.jpg"},
+                {"url": "https://s/upload/thumbs/delivery/1/2/b.jpg"},
+            ],
+            "total": 3,
+        }
+        self.assertEqual(_without_thumbnails(data), {"files": [{"key": "delivery/1/2/a.jpg"}], "total": 3})
+        self.assertEqual(_without_thumbnails([{"path": "thumbs/x.jpg"}, {"path": "x.jpg"}]), [{"path": "x.jpg"}])
+
+
+class ImageSourceTests(SimpleTestCase):
+    def test_bytes_and_base64_are_passed_as_content(self):
+        self.assertEqual(_image_source(b"raw"), b"raw")
+        data_url = "data:image/jpeg;base64," + base64.b64encode(b"jpeg").decode()
+        self.assertEqual(_image_source(Base64DataUrl(data_url)), b"jpeg")
+
+    def test_files_on_disk_are_passed_by_path(self):
+        upload = TemporaryUploadedFile("a.jpg", "image/jpeg", 3, None)
+        self.addCleanup(upload.close)
+        self.assertEqual(_image_source(upload), upload.temporary_file_path())
+
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as fh:
+            with open(fh.name, "rb") as staged:
+                self.assertEqual(_image_source(staged), fh.name)
+
+    def test_in_memory_stream_is_read(self):
+        stream = io.BytesIO(b"jpeg")
+        stream.read(2)
+        self.assertEqual(_image_source(stream), b"jpeg")
+        self.assertEqual(stream.tell(), 0)
+
+
+@unittest.skipIf(images.Image is None, "нужен Pillow")
+class ProcessImageSourceTests(SimpleTestCase):
+    def test_resizes_strips_exif_and_makes_thumbnail(self):
+        full, thumb, width, height, phash = _process_image_source(_jpeg(), 600, 85, 100)
+        self.assertEqual((width, height), (600, 400))
+        with images.Image.open(io.BytesIO(full)) as img:
+            self.assertEqual(dict(img.getexif()), {})
+        with images.Image.open(io.BytesIO(thumb)) as img:
+            self.assertEqual(img.size, (100, 67))
+        self.assertIsInstance(phash, int)
+
+    def test_path_and_bytes_give_same_result(self):
+        data = _jpeg()
+        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as fh:
+            fh.write(data)
+        self.addCleanup(os.remove, fh.name)
+        self.assertEqual(_process_image_source(fh.name, 600, 85, 100), _process_image_source(data, 600, 85, 100))
+
+    def test_disabled_processing_returns_none(self):
+        with override_settings(IMAGE_PROCESSING_ENABLED=False):
+            self.assertIsNone(process_image(b"anything"))
+
+
+@override_settings(FILE_STORAGE_DEDUPE=False, FILE_STORAGE_UPLOAD_CONCURRENCY=1)
+class ThumbnailUploadTests(TestCase):
+    def test_thumbnail_is_uploaded_and_recorded(self):
+        processed = ProcessedImage(b"full", b"thumb", 600, 400, 12345)
+        upload_one = mock.Mock(return_value={"files": [{"url": "https://s/upload/delivery/1/2/a.jpg"}]})
+        with mock.patch.object(file_storage, "image_processing_enabled", return_value=True), \
+                mock.patch.object(file_storage, "process_image", return_value=processed) as process, \
+                mock.patch.object(file_storage.file_storage_client, "upload_thumbnail",
+                                  return_value={"files": [{"url": "https://s/upload/thumbs/delivery/1/2/a.jpg"}]}) as upload_thumb:
+            results = file_storage._upload_base64_batch(
+                [b"original"], upload_one, "upload_invoice_photos",
+                process_images=True, thumbnail_path="delivery/1/2",
+            )
+
+        process.assert_called_once_with(b"original")
+        upload_one.assert_called_once_with(b"full")
+        upload_thumb.assert_called_once_with("delivery/1/2", b"thumb")
+        self.assertEqual(results[0]["uploaded_bytes"], len(b"full"))
+        thumb = PhotoThumbnail.objects.get()
+        self.assertEqual(thumb.thumbnail_url, "https://s/upload/thumbs/delivery/1/2/a.jpg")
+        self.assertEqual((thumb.width, thumb.height, thumb.size_bytes), (600, 400, len(b"full")))
+        self.assertEqual(
+            file_storage.photo_thumbnail_urls(["https://s/upload/delivery/1/2/a.jpg", "https://s/other.jpg"]),
+            ["https://s/upload/thumbs/delivery/1/2/a.jpg", None],
+        )
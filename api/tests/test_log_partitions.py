@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api.utils import log_partitions
+from api.utils.log_partitions import LogPartition, _parse_bound, add_months, list_partitions, month_start, partition_name
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+def _cursor_connection(rows):
+    connection = mock.MagicMock()
+    connection.cursor.return_value.__enter__.return_value.fetchall.return_value = rows
+    return connection
+
+
+class PartitionHelpersTests(SimpleTestCase):
+    def test_month_arithmetic(self):
+        msk = dt_timezone(timedelta(hours=3))
+        self.assertEqual(month_start(datetime(2025, 3, 1, 1, 0, tzinfo=msk)), _utc(2025, 2, 1))
+        self.assertEqual(add_months(_utc(2025, 11, 1), 3), _utc(2026, 2, 1))
+        self.assertEqual(add_months(_utc(2025, 1, 1), -1), _utc(2024, 12, 1))
+        self.assertEqual(partition_name(_utc(2025, 2, 1)), "api_log_202502")
+
+    def test_bounds(self):
+        self.assertIsNone(_parse_bound("MINVALUE"))
+        self.assertEqual(_parse_bound("'2025-01-01 03:00:00+03'"), _utc(2025, 1, 1))
+
+    def test_list_partitions_sorted_with_legacy_first(self):
+        connection = _cursor_connection([
+            ("api_log_202502", "FOR VALUES FROM ('2025-02-01 00:00:00+00') TO ('2025-03-01 00:00:00+00')"),
+            ("api_log_default", "DEFAULT"),
+            ("api_log_legacy", "FOR VALUES FROM (MINVALUE) TO ('2025-02-01 00:00:00+00')"),
+        ])
+        self.assertEqual(list_partitions(connection), [
+            LogPartition("api_log_legacy", None, _utc(2025, 2, 1)),
+            LogPartition("api_log_202502", _utc(2025, 2, 1), _utc(2025, 3, 1)),
+        ])
+
+
+class MaintainLogPartitionsTests(SimpleTestCase):
+    def setUp(self):
+        self.connection = mock.MagicMock()
+        self.partitions = [
+            LogPartition("api_log_legacy", None, _utc(2024, 3, 1)),
+            LogPartition("api_log_202403", _utc(2024, 3, 1), _utc(2024, 4, 1)),
+            LogPartition("api_log_202404", _utc(2024, 4, 1), _utc(2024, 5, 1)),
+            LogPartition("api_log_202405", _utc(2024, 5, 1), _utc(2024, 6, 1)),
+        ]
+        self.mocks = {}
+        patches = {
+            "log_connection": mock.Mock(return_value=self.connection),
+            "is_partitioned": mock.Mock(return_value=True),
+            "list_partitions": mock.Mock(side_effect=lambda c: list(self.partitions)),
+            "create_partition": mock.Mock(side_effect=lambda c, month: partition_name(month)),
+            "archive_partition": mock.Mock(side_effect=lambda c, name, d, before=None: f"{d}/{name}.csv.gz"),
+            "drop_partition": mock.Mock(),
+            "trim_partition": mock.Mock(return_value=0),
+            "drop_log_rollup": mock.Mock(),
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(log_partitions, name, value)
+            self.mocks[name] = patcher.start()
+            self.addCleanup(patcher.stop)
+        now = mock.patch.object(log_partitions.timezone, "now", return_value=_utc(2025, 4, 15, 12))
+        now.start()
+        self.addCleanup(now.stop)
+
+    def test_creates_ahead_and_drops_expired(self):
+        result = log_partitions.maintain_log_partitions(months_ahead=1, retention_months=12, archive_dir="/arch")
+        cutoff = _utc(2024, 4, 1)
+        self.assertEqual(result["created"], ["api_log_202504", "api_log_202505"])
+        self.assertEqual(result["dropped"], ["api_log_legacy", "api_log_202403"])
+        self.assertEqual(result["trimmed"], [])
+        self.mocks["drop_log_rollup"].assert_called_once_with(cutoff)
+        self.assertEqual(self.mocks["drop_partition"].call_count, 2)
+
+    def test_legacy_partition_straddling_cutoff_is_trimmed(self):
+        self.partitions[0] = LogPartition("api_log_legacy", None, _utc(2024, 6, 1))
+        result = log_partitions.maintain_log_partitions(months_ahead=0, retention_months=12, archive_dir="/arch")
+        cutoff = _utc(2024, 4, 1)
+        self.assertEqual(result["trimmed"], ["api_log_legacy"])
+        self.mocks["trim_partition"].assert_called_once_with(self.connection, "api_log_legacy", cutoff)
+        self.mocks["archive_partition"].assert_any_call(self.connection, "api_log_legacy", "/arch", before=cutoff)
+        self.assertNotIn("api_log_legacy", result["dropped"])
+
+    def test_dry_run_changes_nothing(self):
+        result = log_partitions.maintain_log_partitions(months_ahead=1, retention_months=12, archive_dir="", dry_run=True)
+        self.assertEqual(result["created"], ["api_log_202504", "api_log_202505"])
+        self.assertEqual(result["dropped"], ["api_log_legacy", "api_log_202403"])
+        for name in ("create_partition", "archive_partition", "drop_partition", "trim_partition", "drop_log_rollup"):
+            self.mocks[name].assert_not_called()
+        self.connection.cursor.assert_not_called()
+
+    def test_not_partitioned(self):
+        self.mocks["is_partitioned"].return_value = False
+        self.assertIsNone(log_partitions.maintain_log_partitions())
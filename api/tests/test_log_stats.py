@@ -0,0 +1,65 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.test import TransactionTestCase
+
+from api.models.log import Log, LogCategory, LogHourlyRollup, LogLevel
+from api.utils.log_stats import drop_log_rollup, log_counts, rebuild_log_rollup, record_log_rollup
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class LogStatsTests(TransactionTestCase):
+    # Журнал и его статистика пишутся через подключение logs (api.db_routers.LogRouter)
+    databases = {"default", "logs"}
+
+    def _logs(self, *times, level=LogLevel.INFO, category=LogCategory.SYSTEM):
+        entries = []
+        for created_at in times:
+            entry = Log.objects.create(level=level, category=category, message="m")
+            Log.objects.filter(pk=entry.pk).update(created_at=created_at)
+            entry.created_at = created_at
+            entries.append(entry)
+        return entries
+
+    def _rollup(self):
+        return {(r.hour, r.level, r.category): r.count for r in LogHourlyRollup.objects.all()}
+
+    def test_rollup_is_upserted(self):
+        record_log_rollup(self._logs(_utc(2025, 1, 1, 10, 5), _utc(2025, 1, 1, 10, 50), _utc(2025, 1, 1, 11, 0)))
+        record_log_rollup(self._logs(_utc(2025, 1, 1, 10, 59), level=LogLevel.ERROR))
+        record_log_rollup(self._logs(_utc(2025, 1, 1, 10, 30)))
+        self.assertEqual(self._rollup(), {
+            (_utc(2025, 1, 1, 10), "info", "system"): 3,
+            (_utc(2025, 1, 1, 11), "info", "system"): 1,
+            (_utc(2025, 1, 1, 10), "error", "system"): 1,
+        })
+
+    def test_counts_combine_rollup_and_partial_hours(self):
+        entries = self._logs(
+            _utc(2025, 1, 1, 9, 10),   # вне периода
+            _utc(2025, 1, 1, 9, 40),   # неполный первый час
+            _utc(2025, 1, 1, 10, 0),
+            _utc(2025, 1, 1, 23, 59),
+            _utc(2025, 1, 2, 0, 30),
+            _utc(2025, 1, 2, 1, 10),   # неполный последний час
+            _utc(2025, 1, 2, 1, 50),   # вне периода
+        )
+        record_log_rollup(entries)
+        counts = log_counts(_utc(2025, 1, 1, 9, 30), _utc(2025, 1, 2, 1, 30))
+        self.assertEqual(sorted((str(day), n) for _, _, day, n in counts), [("2025-01-01", 3), ("2025-01-02", 2)])
+
+        # В пределах одного часа считается только сырой журнал
+        counts = log_counts(_utc(2025, 1, 1, 9, 0), _utc(2025, 1, 1, 9, 30))
+        self.assertEqual([n for *_, n in counts], [1])
+
+    def test_rebuild_and_drop(self):
+        self._logs(_utc(2025, 1, 1, 10, 5), _utc(2025, 1, 1, 10, 6), _utc(2025, 1, 1, 12, 0))
+        self.assertEqual(rebuild_log_rollup(), 2)
+        self.assertEqual(self._rollup(), {
+            (_utc(2025, 1, 1, 10), "info", "system"): 2,
+            (_utc(2025, 1, 1, 12), "info", "system"): 1,
+        })
+        self.assertEqual(drop_log_rollup(_utc(2025, 1, 1, 11)), 1)
+        self.assertEqual(list(self._rollup().values()), [1])
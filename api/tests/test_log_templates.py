@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api.models.log import Log, LogCategory, LogLevel
+from api.utils import file_storage
+from api.utils.log_templates import render_log_message
+
+
+class RenderLogMessageTests(SimpleTestCase):
+    def test_plain_message_without_template(self):
+        self.assertEqual(render_log_message("", {"object_name": "o"}, "Готово"), "Готово")
+
+    def test_optional_fragment_needs_all_params(self):
+        params = {"object_name": "Дом", "user_name": "A", "user_role": "admin"}
+        self.assertEqual(
+            render_log_message("object_updated", params),
+            "Объект 'Дом' изменен пользователем A (роль: admin)",
+        )
+        self.assertEqual(
+            render_log_message("object_updated", {**params, "changes": "адрес"}),
+            "Объект 'Дом' изменен пользователем A (роль: admin) Изменения: адрес",
+        )
+
+    def test_derived_values(self):
+        self.assertIn("Успешно загружен 3 файл(ов) фото", render_log_message(
+            "file_upload_success", {"file_count": 3, "file_type": "фото"},
+        ))
+        self.assertIn("Успешно загружен файл фото", render_log_message(
+            "file_upload_success", {"file_count": 1, "file_type": "фото"},
+        ))
+        self.assertIn("(сэкономлено 1.5 МБ)", render_log_message(
+            "file_storage_dedupe_hits", {"bytes_saved": 1536 * 1024},
+        ))
+        self.assertIn("отклонен пользователем", render_log_message(
+            "daily_checklist_reviewed", {"approved": False},
+        ))
+
+    def test_upload_progress_templates(self):
+        self.assertEqual(
+            render_log_message("file_storage_file_uploaded", {"target": "fix", "entity_id": 5, "file_index": 2, "url": "https://s/a.jpg"}),
+            "Файл 2 (фото исправления) загружен для исправления нарушения #5: https://s/a.jpg",
+        )
+        self.assertEqual(
+            render_log_message("file_storage_upload_started", {"target": "delivery", "entity_id": 7, "file_count": 3, "storage_url": "https://s"}),
+            "Начинаем загрузку фото накладных для поставки #7: 3 файл(ов). URL хранилища: https://s",
+        )
+
+    def test_missing_params_stay_as_placeholders(self):
+        self.assertEqual(render_log_message("error", {}), "Ошибка: {error_message}")
+
+    def test_unknown_template_and_bad_values(self):
+        self.assertEqual(render_log_message("gone", {"a": 1}), "[gone] {'a': 1}")
+        # peak_mb форматируется как число; строка в параметрах не должна ронять показ
+        self.assertEqual(
+            render_log_message("file_storage_peak_memory", {"peak_mb": "x"}),
+            "[file_storage_peak_memory] {'peak_mb': 'x'}",
+        )
+
+    def test_log_text_uses_structured_fields(self):
+        log = Log(
+            level=LogLevel.INFO, category=LogCategory.SYSTEM, template="api_request", params={},
+            request_method="GET", request_path="/api/v1/objects/", response_status=200,
+            duration_ms=12, db_time_ms=3, db_queries=2,
+        )
+        self.assertEqual(log.text, "GET /api/v1/objects/ → 200 за 12 мс (запросов к БД: 2, 3 мс)")
+        self.assertEqual(Log(template="", message="m").text, "m")
+
+
+class FileStorageLogTests(SimpleTestCase):
+    @mock.patch("api.utils.logging.log_message")
+    def test_per_file_upload_rows_are_templated(self, log_message):
+        results = [{"url": "https://s/a.jpg"}, {"url": None, "error": "timeout"}]
+        with mock.patch.object(file_storage, "_upload_base64_batch", return_value=results):
+            file_storage.upload_invoice_photos_base64(["a", "b"], 1, 7)
+
+        rows = [(c.kwargs["template"], c.kwargs["params"]) for c in log_message.call_args_list]
+        self.assertTrue(all(not c.args[2:] for c in log_message.call_args_list))  # без готового текста в message
+        self.assertEqual([template for template, _ in rows], [
+            "file_storage_upload_started", "file_storage_file_uploaded", "file_storage_file_failed", "file_storage_upload_finished",
+        ])
+        self.assertEqual(rows[2][1], {"target": "delivery", "entity_id": 7, "file_index": 2, "error_message": "timeout"})
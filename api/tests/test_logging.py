@@ -0,0 +1,84 @@
+import contextvars
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from api.models.log import Log, LogCategory, LogLevel
+from api.utils import logging as log_utils
+from api.utils.logging import buffered_logs, buffered_stream, log_message
+
+
+@override_settings(LOG_BUFFER_ENABLED=True, LOG_BUFFER_MAX_SIZE=3)
+class BufferedLogsTests(SimpleTestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(Log.objects, "bulk_create"),
+            mock.patch.object(Log, "save", autospec=True),
+            mock.patch.object(log_utils, "record_log_rollup"),
+        ]
+        self.bulk_create, self.save, self.rollup = [p.start() for p in patches]
+        for p in patches:
+            self.addCleanup(p.stop)
+
+    def _batches(self):
+        return [[e.message for e in call.args[0]] for call in self.bulk_create.call_args_list]
+
+    def _log(self, message):
+        log_message(LogLevel.INFO, LogCategory.SYSTEM, message)
+
+    def test_entries_are_written_in_batches(self):
+        with buffered_logs():
+            for i in range(4):
+                self._log(f"m{i}")
+            self.assertEqual(self._batches(), [["m0", "m1", "m2"]])
+            with buffered_logs():
+                self._log("nested")
+            self.assertEqual(len(self._batches()), 1)
+        self.assertEqual(self._batches(), [["m0", "m1", "m2"], ["m3", "nested"]])
+        self.save.assert_not_called()
+        self.assertEqual(self.rollup.call_count, 2)
+
+    def test_without_buffer_entries_are_saved_at_once(self):
+        self._log("direct")
+        self.save.assert_called_once()
+        self.bulk_create.assert_not_called()
+        with override_settings(LOG_BUFFER_ENABLED=False), buffered_logs():
+            self._log("disabled")
+        self.assertEqual(self.save.call_count, 2)
+
+    def test_worker_threads_share_request_buffer(self):
+        late = threading.Event()
+        with buffered_logs():
+            ctx = contextvars.copy_context()
+            worker = threading.Thread(target=ctx.run, args=(self._log, "from worker"))
+            worker.start()
+            worker.join()
+            late_worker = threading.Thread(target=ctx.run, args=(lambda: (late.wait(2), self._log("late")),))
+            late_worker.start()
+        self.assertEqual(self._batches(), [["from worker"]])
+
+        # Запись после выхода из блока не теряется, а пишется сразу
+        late.set()
+        late_worker.join()
+        self.save.assert_called_once()
+        self.assertEqual(self.save.call_args.args[0].message, "late")
+
+    def test_write_errors_do_not_propagate(self):
+        self.bulk_create.side_effect = RuntimeError("db down")
+        with self.assertLogs("api.utils.logging", "ERROR"), buffered_logs():
+            self._log("lost")
+        self.rollup.assert_not_called()
+
+    def test_stream_is_buffered_until_exhausted(self):
+        def body():
+            self._log("chunk")
+            yield b"a"
+            self._log("chunk")
+            yield b"b"
+
+        stream = buffered_stream(body())
+        self.assertEqual(next(stream), b"a")
+        self.bulk_create.assert_not_called()
+        self.assertEqual(list(stream), [b"b"])
+        self.assertEqual(self._batches(), [["chunk", "chunk"]])
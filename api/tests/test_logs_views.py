@@ -0,0 +1,109 @@
+import unittest
+from datetime import timedelta
+
+from django.db import connections
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.api.v1.views.logs import _decode_cursor, _encode_cursor
+from api.models.log import Log, LogCategory, LogLevel
+from api.models.user import Roles, User
+
+
+class LogsListTestCase(TransactionTestCase):
+    # Журнал пишется через подключение logs (api.db_routers.LogRouter)
+    databases = {"default", "logs"}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user("a@a.ru", "x", role=Roles.ADMIN, full_name="A")
+        self.client.force_authenticate(self.user)
+
+    def _log(self, message="", **fields):
+        return Log.objects.create(level=LogLevel.INFO, category=LogCategory.OBJECT, message=message, **fields)
+
+    def _get(self, **params):
+        resp = self.client.get("/api/v1/logs", params)
+        self.assertEqual(resp.status_code, 200, resp.content)
+        return resp.json()
+
+
+class LogsUserNamesTests(LogsListTestCase):
+    def test_user_names_are_loaded_from_default(self):
+        self._log("with user", user=self.user)
+        self._log("without user")
+        items = {item["message"]: item for item in self._get()["items"]}
+        self.assertEqual(items["with user"]["user_name"], "A")
+        self.assertIsNone(items["without user"]["user_name"])
+
+
+class LogsSearchTests(LogsListTestCase):
+    def test_substring_search_covers_message_and_params(self):
+        plain = self._log("Upload of report.PDF failed")
+        templated = self._log(template="object_created", params={"object_name": "Report tower", "user_name": "A"})
+        self._log("nothing here")
+
+        ids = {item["id"] for item in self._get(search="report")["items"]}
+        self.assertEqual(ids, {plain.id, templated.id})
+
+    @unittest.skipUnless(connections["logs"].vendor == "postgresql", "полнотекстовый поиск есть только в PostgreSQL")
+    def test_fulltext_search_ranks_and_highlights(self):
+        self._log("Объект принят в эксплуатацию")
+        self._log("Приняты объекты и объект")
+        self._log("Поставка отклонена")
+
+        data = self._get(search="объекты", search_mode="fulltext")
+        self.assertEqual(data["total"], 2)
+        self.assertEqual(data["items"][0]["message"], "Приняты объекты и объект")
+        self.assertGreaterEqual(data["items"][0]["rank"], data["items"][1]["rank"])
+        self.assertIn("<b>", data["items"][0]["highlight"])
+
+
+class LogsCursorTests(LogsListTestCase):
+    def test_cursor_round_trip(self):
+        log = self._log("m")
+        created_at, last_id = _decode_cursor(_encode_cursor(log))
+        self.assertEqual((created_at, last_id), (log.created_at, log.id))
+        for bad in ("not-base64!", _encode_cursor(log)[:-4], "MjAyNS0wMS0wMVQwMDowMDowMHwx"):  # последний — без часового пояса
+            with self.assertRaises(ValueError, msg=bad):
+                _decode_cursor(bad)
+
+    def test_pages_follow_created_at_and_id(self):
+        same_time = timezone.now()
+        logs = [self._log(f"m{i}") for i in range(5)]
+        # Три записи с одинаковым временем: порядок между ними задаёт id
+        Log.objects.filter(pk__in=[l.pk for l in logs[1:4]]).update(created_at=same_time)
+
+        seen, cursor = [], ""
+        while cursor is not None:
+            data = self._get(cursor=cursor, limit=2)
+            self.assertNotIn("total", data)
+            seen += [item["id"] for item in data["items"]]
+            cursor = data["next_cursor"]
+        expected = list(Log.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        with self.assertLogs("django.request", "WARNING"):
+            resp = self.client.get("/api/v1/logs", {"cursor": "garbage"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_offset_pagination_without_cursor(self):
+        for i in range(3):
+            self._log(f"m{i}")
+        self.assertEqual(self._get()["total"], 3)
+
+
+class LogsStatsTests(LogsListTestCase):
+    def test_daily_stats_has_one_point_per_day(self):
+        self._log("today")
+        stale = self._log("three days ago")
+        Log.objects.filter(pk=stale.pk).update(created_at=timezone.now() - timedelta(days=3))
+
+        resp = self.client.get("/api/v1/logs/stats", {"days": 7})
+        self.assertEqual(resp.status_code, 200, resp.content)
+        daily = resp.json()["daily_stats"]
+        self.assertEqual(len(daily), 7)
+        self.assertEqual(daily[-1], {"date": timezone.localdate().isoformat(), "count": 1})
+        self.assertEqual(sum(point["count"] for point in daily), resp.json()["total_logs"])
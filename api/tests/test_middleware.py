@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from api import middleware
+from api.middleware import RequestTimingMiddleware
+from api.models.object import ConstructionObject
+
+
+@override_settings(LOG_REQUESTS_ENABLED=True, LOG_REQUESTS_PATH_PREFIX="/api/", LOG_REQUESTS_SAMPLE_RATE=1.0, LOG_REQUESTS_SLOW_MS=1000)
+@mock.patch.object(middleware, "log_api_request")
+class RequestTimingMiddlewareTests(TestCase):
+    factory = RequestFactory()
+
+    def _call(self, request, status=200):
+        def view(req):
+            ConstructionObject.objects.count()
+            ConstructionObject.objects.exists()
+            return HttpResponse(status=status)
+        return RequestTimingMiddleware(view)(request)
+
+    def test_request_is_logged_with_db_stats(self, log_request):
+        request = self.factory.get("/api/v1/objects/7/")
+        request.resolver_match = SimpleNamespace(route="api/v1/objects/<int:id>/", kwargs={"id": 7})
+        request.user = SimpleNamespace(pk=None, is_authenticated=False)
+        self._call(request)
+
+        method, path, status, duration_ms, db_time_ms, db_queries = log_request.call_args.args
+        self.assertEqual((method, path, status, db_queries), ("GET", "/api/v1/objects/7/", 200, 2))
+        self.assertGreaterEqual(duration_ms, db_time_ms)
+        self.assertEqual(log_request.call_args.kwargs, {"user_id": None, "object_id": 7})
+
+    def test_object_id_from_query_string(self, log_request):
+        self._call(self.factory.get("/api/v1/deliveries/", {"object_id": "12"}))
+        self.assertEqual(log_request.call_args.kwargs["object_id"], 12)
+
+    def test_other_paths_and_disabled_logging_are_skipped(self, log_request):
+        self._call(self.factory.get("/admin/"))
+        with override_settings(LOG_REQUESTS_ENABLED=False):
+            self._call(self.factory.get("/api/v1/objects/"))
+        log_request.assert_not_called()
+
+    @override_settings(LOG_REQUESTS_SAMPLE_RATE=0.0)
+    def test_sampling_keeps_errors(self, log_request):
+        self._call(self.factory.get("/api/v1/objects/"))
+        log_request.assert_not_called()
+        self._call(self.factory.get("/api/v1/objects/"), status=502)
+        self.assertEqual(log_request.call_args.args[2], 502)
+
+    @override_settings(LOG_REQUESTS_SAMPLE_RATE=0.0, LOG_REQUESTS_SLOW_MS=0)
+    def test_sampling_keeps_slow_requests(self, log_request):
+        self._call(self.factory.get("/api/v1/objects/"))
+        log_request.assert_called_once()
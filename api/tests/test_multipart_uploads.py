@@ -0,0 +1,44 @@
+import io
+import re
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from api.serializers.deliveries import DeliveryReceiveSerializer
+from api.utils.file_storage import file_storage_client
+
+
+class Base64OrFileFieldTests(SimpleTestCase):
+    def test_accepts_base64_strings_from_json(self):
+        ser = DeliveryReceiveSerializer(data={"object_id": 1, "invoice_photos": ["aGVsbG8="]})
+        self.assertTrue(ser.is_valid(), ser.errors)
+        self.assertEqual(ser.validated_data["invoice_photos"], ["aGVsbG8="])
+
+    def test_accepts_uploaded_files_from_multipart(self):
+        photos = [SimpleUploadedFile("a.jpg", b"a", "image/jpeg"), SimpleUploadedFile("b.jpg", b"b", "image/jpeg")]
+        ser = DeliveryReceiveSerializer(data={"object_id": "1", "invoice_photos": photos})
+        self.assertTrue(ser.is_valid(), ser.errors)
+        self.assertEqual([f.name for f in ser.validated_data["invoice_photos"]], ["a.jpg", "b.jpg"])
+
+    def test_rejects_other_values(self):
+        ser = DeliveryReceiveSerializer(data={"object_id": 1, "invoice_photos": [""]})
+        self.assertFalse(ser.is_valid())
+        self.assertIn("invoice_photos", ser.errors)
+
+
+class FileRequestTests(SimpleTestCase):
+    def test_stream_is_sent_as_streaming_multipart(self):
+        document = io.BytesIO(b"%PDF-1.4 " + b"x" * 100_000)
+        document.name = "/tmp/staging/0001.pdf"
+        kwargs = file_storage_client._file_request(document, "document.pdf", "application/pdf")
+        body = b"".join(kwargs["data"])
+        self.assertEqual(len(body), len(kwargs["data"]))
+        boundary = re.search(r"boundary=(\w+)", kwargs["headers"]["Content-Type"]).group(1)
+        self.assertIn(b'filename="0001.pdf"', body)
+        self.assertIn(b"Content-Type: application/pdf", body)
+        self.assertIn(b"%PDF-1.4 " + b"x" * 100_000, body)
+        self.assertTrue(body.endswith(f"--{boundary}--\r\n".encode()))
+
+    def test_bytes_use_requests_files(self):
+        kwargs = file_storage_client._file_request(b"data", "document.pdf", "application/pdf")
+        self.assertEqual(kwargs["files"]["file"], ("document.pdf", b"data", "application/pdf"))
@@ -0,0 +1,57 @@
+import base64
+import io
+import json
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.exceptions import ParseError
+
+from api.api.v1.views.parsers import SpooledFilesJSONParser
+
+PHOTO = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 40  # больше одного куска чтения
+
+
+@override_settings(JSON_SPOOL_CHUNK_SIZE=4096)
+class SpooledFilesJSONParserTests(SimpleTestCase):
+    def _parse(self, body):
+        data = SpooledFilesJSONParser().parse(io.BytesIO(body))
+        self.addCleanup(lambda: [f.close() for f in data.get("invoice_photos", []) if hasattr(f, "close")])
+        return data
+
+    def test_files_are_spooled_and_other_fields_parsed(self):
+        encoded = base64.b64encode(PHOTO).decode()
+        # Как у JSON.stringify с экранированием «/» и base64 с переносами строк
+        wrapped = "\\n".join(encoded[i:i + 76] for i in range(0, len(encoded), 76)).replace("/", "\\/")
+        body = (
+            '{"object_id": 7, "meta": {"tags": ["a", "b"], "note": "x,y]"}, '
+            f'"invoice_photos": ["data:image/png;base64,{encoded}", "{wrapped}", ""]}}'
+        )
+
+        data = self._parse(body.encode())
+        self.assertEqual(data["object_id"], 7)
+        self.assertEqual(data["meta"], {"tags": ["a", "b"], "note": "x,y]"})
+        first, second, empty = data["invoice_photos"]
+        self.assertEqual((first.content_type, first.name, first.size), ("image/png", "invoice_photos_1.png", len(PHOTO)))
+        self.assertEqual(first.read(), PHOTO)
+        self.assertEqual((second.content_type, second.name), ("image/jpeg", "invoice_photos_2.jpg"))
+        self.assertEqual(second.read(), PHOTO)
+        self.assertEqual(empty, "")
+
+    def test_unpadded_base64(self):
+        encoded = base64.b64encode(b"%PDF-1").decode().rstrip("=")
+        data = self._parse(json.dumps({"invoice_photos": [encoded]}).encode())
+        self.assertEqual(data["invoice_photos"][0].read(), b"%PDF-1")
+        self.assertEqual(data["invoice_photos"][0].content_type, "application/pdf")
+
+    def test_other_bodies(self):
+        self.assertEqual(self._parse(b' {"invoice_photos": [], "a": null} '), {"invoice_photos": [], "a": None})
+        self.assertEqual(SpooledFilesJSONParser().parse(io.BytesIO(b"[1, 2]")), [1, 2])
+
+    def test_keys_with_escapes(self):
+        body = json.dumps({"😀 ключ": 1, "\ud83d": 2}).encode()  # ensure_ascii: суррогатная пара и одиночный суррогат
+        self.assertEqual(self._parse(body), json.loads(body))
+
+    def test_malformed_bodies(self):
+        for body in (b'{"a": 1', b'{"a": 1} x', b'{"invoice_photos": ["abc', b'{"invoice_photos": ["a"]}', b'{"a" 1}',
+                     b'{"\xff": 1}'):
+            with self.assertRaises(ParseError, msg=body):
+                SpooledFilesJSONParser().parse(io.BytesIO(body))
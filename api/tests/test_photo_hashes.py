@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.models.storage import PhotoHash
+from api.utils.photo_hashes import _to_signed, _to_unsigned, find_similar, hamming_distance, register_photos, store_photo_hashes
+
+BASE = 0xF0F0_1234_ABCD_8001  # старший бит установлен: хранится отрицательным
+
+
+class HashArithmeticTests(SimpleTestCase):
+    def test_signed_round_trip(self):
+        self.assertLess(_to_signed(BASE), 0)
+        self.assertEqual(_to_unsigned(_to_signed(BASE)), BASE)
+        self.assertEqual(_to_signed(5), 5)
+
+    def test_hamming_distance_ignores_sign(self):
+        self.assertEqual(hamming_distance(BASE, _to_signed(BASE ^ 0b101)), 2)
+
+
+class FindSimilarTests(TestCase):
+    def test_finds_close_photos_sorted_by_distance(self):
+        store_photo_hashes({
+            "https://s/same.jpg": BASE,
+            "https://s/near.jpg": BASE ^ 0b111,
+            "https://s/far.jpg": BASE ^ 0xFF,
+            "https://s/other.jpg": ~BASE & 0xFFFF_FFFF_FFFF_FFFF,
+        })
+        matches = find_similar(BASE, max_distance=6, exclude_urls=["https://s/same.jpg"])
+        self.assertEqual([(m["url"], m["distance"]) for m in matches], [("https://s/near.jpg", 3)])
+
+    @override_settings(PHOTO_SIMILARITY_MAX_CANDIDATES=1)
+    def test_candidate_limit_keeps_rows_with_most_matched_blocks(self):
+        # Кандидат с одним совпавшим блоком добавлен раньше, но лимит должен оставить близкое фото
+        store_photo_hashes({"https://s/one-block.jpg": BASE ^ 0xFFFF_FFFF_FFFF_0000})
+        store_photo_hashes({"https://s/close.jpg": BASE ^ 0b1})
+        matches = find_similar(BASE, max_distance=6)
+        self.assertEqual([m["url"] for m in matches], ["https://s/close.jpg"])
+
+    def test_pending_photos_are_not_candidates(self):
+        register_photos("violation", 1, None, ["https://s/pending.jpg"])
+        self.assertEqual(PhotoHash.objects.get().status, "pending")
+        self.assertEqual(find_similar(0), [])
@@ -0,0 +1,72 @@
+import base64
+import io
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from api.management.commands.benchmark_file_storage import _percentile
+from api.utils import file_storage
+from api.utils.storage_stub import StorageStubServer, StubOptions
+
+
+class StorageStubTests(SimpleTestCase):
+    def _start(self, **options):
+        server = StorageStubServer(("127.0.0.1", 0), StubOptions(**options))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        client = file_storage.FileStorageClient()
+        client.base_url = server.url
+        self.addCleanup(cache.clear)
+        return server, client
+
+    def test_uploads_are_listed_by_browse(self):
+        server, client = self._start()
+        photo = "data:image/png;base64," + base64.b64encode(b"png").decode()
+        result = client.upload_delivery_photos(5, 9, [file_storage.Base64DataUrl(photo), b"jpeg"])
+        self.assertEqual([f["content_type"] for f in result["files"]], ["image/png", "image/jpeg"])
+
+        doc = io.BytesIO(b"%PDF-1.4")
+        doc.name = "act.pdf"
+        client.upload_object_pdf(5, doc)
+
+        listing = client.browse_object(5)
+        keys = sorted(f["key"].rsplit("/", 1)[0] for f in listing["files"])
+        self.assertEqual(keys, ["delivery/5/9", "delivery/5/9", "docs/object/5"])
+        self.assertTrue(all("X-Amz-Expires=3600" in f["presigned_url"] for f in listing["files"]))
+
+    def test_files_are_served_from_storage_dir(self):
+        storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage_dir, ignore_errors=True)
+        server, client = self._start(storage_dir=storage_dir)
+        doc = io.BytesIO(b"%PDF-1.4 content")
+        doc.name = "act.pdf"
+        url = file_storage._extract_file_url(client.upload_object_pdf(5, doc))
+        self.assertTrue(url.startswith(f"{server.url}/upload/docs/object/5/"))
+
+        resp = requests.get(url, timeout=5)
+        self.assertEqual(resp.content, b"%PDF-1.4 content")
+        self.assertEqual(resp.headers["Content-Type"], "application/pdf")
+        self.assertEqual(requests.get(f"{server.url}/upload/docs/../../etc/passwd", timeout=5).status_code, 404)
+
+    @mock.patch.object(file_storage, "log_file_storage_response_error")
+    def test_injected_errors(self, response_error):
+        server, client = self._start(error_rate=1.0, error_status=500)
+        self.assertIsNone(client.upload_delivery_photos(5, 9, [b"jpeg"]))
+        response_error.assert_called_once()
+        self.assertEqual(response_error.call_args.args[:2], ("upload_delivery_photos", 500))
+        self.assertEqual(server.store.list("delivery/5"), [])
+
+
+class PercentileTests(SimpleTestCase):
+    def test_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(_percentile(values, 50), 50.0)
+        self.assertEqual(_percentile(values, 95), 95.0)
+        self.assertEqual(_percentile(values, 100), 100.0)
+        self.assertEqual(_percentile([], 50), 0.0)
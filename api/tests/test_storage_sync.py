@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from api.models.documents import DocumentFile, Folder, StorageSyncState
+from api.models.object import ConstructionObject
+from api.utils.file_storage import file_storage_client
+from api.utils.storage_sync import StorageSyncError, _parse_entry, objects_due_for_sync, sync_object_storage
+
+
+def _item(key, modified="2025-01-01T10:00:00", size=10):
+    return {"key": key, "url": f"https://s/upload/{key}", "size": size, "last_modified": modified}
+
+
+class ParseEntryTests(SimpleTestCase):
+    def test_entry_fields(self):
+        entry = _parse_entry(_item("docs/object/1/Акты/act.pdf", size="42"))
+        self.assertEqual(entry["folder"], "docs/object/1/Акты")
+        self.assertEqual(entry["name"], "act.pdf")
+        self.assertEqual(entry["size_bytes"], 42)
+        self.assertEqual(entry["content_type"], "application/pdf")
+        self.assertEqual(entry["storage_modified_at"], datetime(2025, 1, 1, 10, tzinfo=dt_timezone.utc))
+
+    def test_key_falls_back_to_url_path(self):
+        entry = _parse_entry({"presigned_url": "https://s/docs/object/1/a%20b.pdf?X-Amz-Expires=60"})
+        self.assertEqual(entry["key"], "docs/object/1/a b.pdf")
+        self.assertIsNone(entry["size_bytes"])
+
+    def test_skips_thumbnails_and_entries_without_url(self):
+        self.assertIsNone(_parse_entry(_item("thumbs/delivery/1/2/a.jpg")))
+        self.assertIsNone(_parse_entry({"key": "docs/object/1/a.pdf"}))
+        self.assertIsNone(_parse_entry("docs/object/1/a.pdf"))
+
+
+class SyncObjectStorageTests(TestCase):
+    def setUp(self):
+        self.obj = ConstructionObject.objects.create(name="o", address="a")
+
+    def _sync(self, items, **kwargs):
+        with mock.patch.object(file_storage_client, "browse_object", return_value={"files": items}) as browse:
+            result = sync_object_storage(self.obj, **kwargs)
+        browse.assert_called_once_with(self.obj.id, use_cache=False)
+        return result
+
+    def test_incremental_sync(self):
+        result = self._sync([_item("docs/object/1/a/x.pdf"), _item("docs/object/1/a/b/y.pdf")])
+        self.assertEqual(result, {"new": 2, "changed": 0, "removed": 0, "total": 2})
+        self.assertEqual(
+            sorted(Folder.objects.filter(object=self.obj).values_list("path", flat=True)),
+            ["docs", "docs/object", "docs/object/1", "docs/object/1/a", "docs/object/1/a/b"],
+        )
+        self.assertEqual(Folder.objects.get(path="docs/object/1/a/b").parent.path, "docs/object/1/a")
+
+        # Изменился только x.pdf; y.pdf исчез из хранилища
+        result = self._sync([_item("docs/object/1/a/x.pdf", "2025-01-02T10:00:00", 20)])
+        self.assertEqual(result, {"new": 0, "changed": 1, "removed": 1, "total": 1})
+        self.assertEqual(DocumentFile.objects.get(object=self.obj).size_bytes, 20)
+        self.assertFalse(Folder.objects.filter(path="docs/object/1/a/b").exists())
+        state = StorageSyncState.objects.get(object=self.obj)
+        self.assertEqual((state.status, state.files_count, state.total_size_bytes), ("ok", 1, 20))
+        self.assertEqual(state.cursor, datetime(2025, 1, 2, 10, tzinfo=dt_timezone.utc))
+
+    def test_entries_not_newer_than_cursor_are_skipped_unless_full(self):
+        self._sync([_item("docs/object/1/x.pdf", "2025-01-02T10:00:00")])
+        stale = [_item("docs/object/1/x.pdf", "2025-01-01T10:00:00", 99)]
+        self.assertEqual(self._sync(stale)["changed"], 0)
+        self.assertEqual(self._sync(stale, full=True)["changed"], 1)
+
+    def test_failed_listing_is_recorded(self):
+        with mock.patch.object(file_storage_client, "browse_object", return_value=None):
+            with self.assertRaises(StorageSyncError):
+                sync_object_storage(self.obj)
+        self.assertEqual(StorageSyncState.objects.get(object=self.obj).status, "failed")
+
+    def test_objects_due_for_sync(self):
+        synced = ConstructionObject.objects.create(name="synced", address="a")
+        StorageSyncState.objects.create(object=synced, last_synced_at=timezone.now())
+        old = ConstructionObject.objects.create(name="old", address="a")
+        StorageSyncState.objects.create(object=old, last_synced_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(list(objects_due_for_sync(10)), [self.obj, old])
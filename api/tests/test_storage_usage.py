@@ -0,0 +1,39 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from api.models.object import ConstructionObject
+from api.models.storage import StorageUsage
+from api.utils import file_storage
+from api.utils.storage_usage import object_storage_usage, record_storage_usage
+
+
+class StorageUsageTests(TestCase):
+    def setUp(self):
+        self.obj = ConstructionObject.objects.create(name="o", address="a")
+
+    def test_counters_accumulate_by_category(self):
+        record_storage_usage(self.obj.id, "documents", 2, 300)
+        record_storage_usage(self.obj.id, "documents", 1, 100)
+        record_storage_usage(self.obj.id, "invoices", 1, 50)
+        record_storage_usage(self.obj.id, "fixes", 0, 0)
+        record_storage_usage(None, "fixes", 1, 10)
+
+        usage = object_storage_usage(self.obj)
+        self.assertEqual(usage["categories"]["documents"], {"files_count": 3, "size_bytes": 400})
+        self.assertEqual(usage["categories"]["fixes"], {"files_count": 0, "size_bytes": 0})
+        self.assertEqual((usage["files_count"], usage["size_bytes"]), (4, 450))
+        self.assertEqual(StorageUsage.objects.count(), 2)
+
+    @override_settings(FILE_STORAGE_DEDUPE=True, FILE_STORAGE_UPLOAD_CONCURRENCY=1)
+    @mock.patch.object(file_storage, "log_file_storage_dedupe_hits")
+    def test_batch_counts_only_uploaded_files(self, hits_log):
+        urls = iter(["https://s/1.pdf", None])
+        upload_one = mock.Mock(side_effect=lambda data: {"files": [{"url": next(urls)}]})
+        file_storage._upload_base64_batch(
+            [b"12345", b"12345", b"failed"], upload_one, "upload_documents",
+            dedupe_scope=f"docs/object/{self.obj.id}", usage=(self.obj.id, "documents"),
+        )
+        # Второй файл — дубль первого, третий не загрузился
+        usage = StorageUsage.objects.get(object=self.obj, category="documents")
+        self.assertEqual((usage.files_count, usage.size_bytes), (1, 5))
@@ -0,0 +1,83 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.models.object import ConstructionObject
+from api.models.upload import UploadJob
+from api.utils.upload_jobs import cleanup_upload_staging, create_upload_job, process_upload_job
+
+
+def _fake_upload(results):
+    """Подмена upload_object_documents_base64: отдаёт results по порядку через on_result."""
+    def upload(items, object_id, object_name=None, user_name=None, user_role=None, on_result=None):
+        for i, _ in enumerate(items):
+            on_result(i, results[i])
+        return [r["url"] for r in results if r.get("url")]
+    return upload
+
+
+class UploadJobTests(TestCase):
+    def setUp(self):
+        self.staging = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.staging, ignore_errors=True)
+        settings_patch = override_settings(UPLOAD_STAGING_DIR=self.staging, UPLOAD_STAGING_TTL=3600)
+        settings_patch.enable()
+        self.addCleanup(settings_patch.disable)
+        self.obj = ConstructionObject.objects.create(name="o", address="a")
+
+    def _job(self):
+        doc = io.BytesIO(b"%PDF-1.4")
+        doc.name = "act.pdf"
+        return create_upload_job("object_documents", ["aGVsbG8=", doc], self.obj)
+
+    def test_create_stages_files(self):
+        job = self._job()
+        files = list(job.files.order_by("position"))
+        self.assertEqual(job.total_files, 2)
+        self.assertTrue(files[0].is_base64)
+        with open(files[0].staging_path, encoding="utf-8") as fh:
+            self.assertEqual(fh.read(), "aGVsbG8=")
+        self.assertEqual(files[1].name, "act.pdf")
+        self.assertTrue(files[1].staging_path.endswith("0001.pdf"))
+        self.assertEqual(files[1].size_bytes, 8)
+
+    def test_done_job_removes_staging(self):
+        job = self._job()
+        results = [{"url": "https://s/1"}, {"url": "https://s/2"}]
+        with mock.patch("api.utils.file_storage.upload_object_documents_base64", _fake_upload(results)):
+            job = process_upload_job(job)
+        self.assertEqual(job.status, "done")
+        self.assertFalse(os.path.exists(os.path.join(self.staging, str(job.uuid_job))))
+        self.obj.refresh_from_db()
+        self.assertEqual(self.obj.documents_folder_url, ["https://s/1", "https://s/2"])
+
+    def test_partial_job_keeps_staging(self):
+        job = self._job()
+        results = [{"url": "https://s/1"}, {"error": "503"}]
+        with mock.patch("api.utils.file_storage.upload_object_documents_base64", _fake_upload(results)):
+            job = process_upload_job(job)
+        self.assertEqual(job.status, "partial")
+        self.assertTrue(os.path.isdir(os.path.join(self.staging, str(job.uuid_job))))
+        self.assertEqual(job.files.get(position=1).error, "503")
+
+    def test_cleanup_removes_done_and_expired_dirs_only(self):
+        done, fresh, expired = self._job(), self._job(), self._job()
+        UploadJob.objects.filter(pk=done.pk).update(status="done")
+        UploadJob.objects.filter(pk=fresh.pk).update(status="failed", finished_at=timezone.now())
+        UploadJob.objects.filter(pk=expired.pk).update(status="failed", finished_at=timezone.now() - timedelta(hours=2))
+        orphan = os.path.join(self.staging, str(uuid.uuid4()))
+        os.makedirs(orphan)
+        old = time.time() - 7200
+        os.utime(orphan, (old, old))
+        os.makedirs(os.path.join(self.staging, "sessions"))
+
+        self.assertEqual(cleanup_upload_staging(), 3)
+        self.assertEqual(sorted(os.listdir(self.staging)), sorted(["sessions", str(fresh.uuid_job)]))
@@ -0,0 +1,101 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.models.object import ConstructionObject
+from api.models.upload import UploadSession
+from api.models.user import Roles, User
+from api.utils.file_storage import file_storage_client
+from api.utils.upload_sessions import (
+    UploadSessionError,
+    complete_upload_session,
+    create_upload_session,
+    merge_range,
+    next_offset,
+    parse_content_range,
+    session_path,
+    write_chunk,
+)
+
+
+class RangeTests(SimpleTestCase):
+    def test_merge_range(self):
+        self.assertEqual(merge_range([], 10, 20), [[10, 20]])
+        self.assertEqual(merge_range([[0, 10]], 10, 20), [[0, 20]])
+        self.assertEqual(merge_range([[0, 10], [30, 40]], 15, 20), [[0, 10], [15, 20], [30, 40]])
+        self.assertEqual(merge_range([[0, 10], [30, 40]], 5, 35), [[0, 40]])
+        self.assertEqual(merge_range([[0, 10]], 2, 8), [[0, 10]])
+
+    def test_next_offset_is_first_gap(self):
+        self.assertEqual(next_offset(mock.Mock(received_ranges=[])), 0)
+        self.assertEqual(next_offset(mock.Mock(received_ranges=[[0, 10], [20, 30]])), 10)
+        self.assertEqual(next_offset(mock.Mock(received_ranges=[[5, 10]])), 0)
+
+    def test_parse_content_range(self):
+        self.assertEqual(parse_content_range("bytes 0-1048575/314572800"), (0, 1048576, 314572800))
+        self.assertEqual(parse_content_range(" bytes 9-9/10 "), (9, 10, 10))
+        for header in ("bytes 5-4/10", "bytes 0-10/10", "items 0-1/2", "bytes 0-1", "bytes a-b/c", ""):
+            with self.assertRaises(UploadSessionError, msg=header):
+                parse_content_range(header)
+
+
+class UploadSessionTests(TestCase):
+    def setUp(self):
+        staging = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, staging, ignore_errors=True)
+        settings_patch = override_settings(UPLOAD_STAGING_DIR=staging)
+        settings_patch.enable()
+        self.addCleanup(settings_patch.disable)
+        self.obj = ConstructionObject.objects.create(name="o", address="a")
+
+    @mock.patch("api.utils.logging.log_object_documents_uploaded")
+    def test_chunks_in_any_order_then_complete(self, uploaded_log):
+        content = b"0123456789" * 3
+        session = create_upload_session(self.obj, "../act.pdf", len(content))
+        self.assertEqual(session.filename, "act.pdf")
+
+        write_chunk(session, 20, 30, io.BytesIO(content[20:]))
+        with self.assertRaises(UploadSessionError):
+            write_chunk(session, 0, 10, io.BytesIO(content[:5]))
+        session = write_chunk(session, 0, 20, io.BytesIO(content[:20]))
+        self.assertEqual(session.received_ranges, [[0, 30]])
+        self.assertEqual(session.received_bytes, 30)
+
+        def upload(object_id, file):
+            self.assertEqual(file.read(), content)
+            return {"files": [{"url": "https://s/act.pdf"}]}
+
+        path = session_path(session)
+        with mock.patch.object(file_storage_client, "upload_object_pdf", side_effect=upload):
+            session = complete_upload_session(session)
+        self.assertEqual(session.status, "done")
+        self.obj.refresh_from_db()
+        self.assertEqual(self.obj.documents_folder_url, ["https://s/act.pdf"])
+        self.assertFalse(os.path.exists(path))
+
+    def test_incomplete_session_cannot_be_completed(self):
+        session = create_upload_session(self.obj, "act.pdf", 30)
+        session = write_chunk(session, 0, 10, io.BytesIO(b"x" * 10))
+        with self.assertRaises(UploadSessionError):
+            complete_upload_session(session)
+
+    def test_only_admin_and_ssk_open_sessions(self):
+        client = APIClient()
+        body = {"filename": "act.pdf", "size": 10}
+        foreman = User.objects.create_user("f@a.ru", "x", role=Roles.FOREMAN, full_name="F")
+        self.obj.foreman = foreman
+        self.obj.save(update_fields=["foreman"])
+        client.force_authenticate(foreman)
+        with self.assertLogs("django.request", "WARNING"):
+            resp = client.post(f"/api/v1/objects/{self.obj.id}/upload-sessions", body, format="json")
+        self.assertEqual(resp.status_code, 403)
+        self.assertFalse(UploadSession.objects.exists())
+
+        client.force_authenticate(User.objects.create_user("a@a.ru", "x", role=Roles.ADMIN, full_name="A"))
+        resp = client.post(f"/api/v1/objects/{self.obj.id}/upload-sessions", body, format="json")
+        self.assertEqual(resp.status_code, 201, resp.content)
@@ -0,0 +1,148 @@
+import base64
+import threading
+from datetime import timedelta
+from unittest import mock
+
+import jwt
+import requests
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models.delivery import Delivery
+from api.models.object import ConstructionObject
+from api.models.prescription import Prescription, PrescriptionFix
+from api.models.user import Roles, User
+from api.utils.file_storage import file_storage_client
+from api.utils.storage_stub import StorageStubServer, StubOptions
+from api.utils.upload_tickets import (
+    TICKET_AUDIENCE,
+    UploadTicketError,
+    _check_urls,
+    confirm_upload_ticket,
+    decode_upload_ticket,
+    issue_upload_ticket,
+)
+
+SECRET = "test-ticket-secret-0123456789abcdef"
+OTHER_SECRET = "other-ticket-secret-0123456789abcdef"
+
+
+@override_settings(FILE_STORAGE_TICKET_SECRET=SECRET, FILE_STORAGE_CONFIRM_HOSTS="storage.local", FILE_STORAGE_TICKET_CONFIRM_GRACE=0)
+class UploadTicketTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("a@a.ru", "x", role=Roles.ADMIN, full_name="A")
+        self.obj = ConstructionObject.objects.create(name="o", address="a")
+        self.delivery = Delivery.objects.create(object=self.obj, created_by=self.user)
+        self.folder = f"https://storage.local/upload/delivery/{self.obj.id}/{self.delivery.id}"
+
+    def test_issue_and_decode(self):
+        ticket, token = issue_upload_ticket("delivery", self.delivery.id, self.user, max_files=2)
+        payload = jwt.decode(token, SECRET, algorithms=["HS256"], audience=TICKET_AUDIENCE)
+        self.assertEqual(payload["path"], f"/upload/delivery/{self.obj.id}/{self.delivery.id}")
+        self.assertEqual(payload["max_files"], 2)
+        self.assertEqual(decode_upload_ticket(token), ticket)
+
+    def test_decode_rejects_foreign_and_expired_tokens(self):
+        ticket, token = issue_upload_ticket("delivery", self.delivery.id, self.user)
+        with self.assertRaisesMessage(UploadTicketError, "Недействительный билет"):
+            decode_upload_ticket(jwt.encode({"jti": str(ticket.jti), "aud": TICKET_AUDIENCE}, OTHER_SECRET, algorithm="HS256"))
+        expired = jwt.encode(
+            {"jti": str(ticket.jti), "aud": TICKET_AUDIENCE, "exp": int((timezone.now() - timedelta(minutes=1)).timestamp())},
+            SECRET, algorithm="HS256",
+        )
+        with self.assertRaisesMessage(UploadTicketError, "Срок действия билета истёк"):
+            decode_upload_ticket(expired)
+
+    def test_check_urls(self):
+        ticket, _ = issue_upload_ticket("delivery", self.delivery.id, self.user, max_files=2)
+        _check_urls(ticket, [f"{self.folder}/a.jpg"])
+        bad = [
+            [f"https://evil.local/upload/delivery/{self.obj.id}/{self.delivery.id}/a.jpg"],
+            [f"https://storage.local/upload/delivery/{self.obj.id}/999/a.jpg"],
+            [f"{self.folder}/../999/a.jpg"],
+            [f"https://storage.local/upload/delivery/{self.obj.id}/{self.delivery.id}%2F..%2F999/a.jpg"],
+            [f"{self.folder}/{n}.jpg" for n in range(3)],
+        ]
+        for urls in bad:
+            with self.assertRaises(UploadTicketError, msg=urls):
+                _check_urls(ticket, urls)
+        with override_settings(FILE_STORAGE_CONFIRM_HOSTS=""):
+            with self.assertRaisesMessage(UploadTicketError, "FILE_STORAGE_CONFIRM_HOSTS"):
+                _check_urls(ticket, [f"{self.folder}/a.jpg"])
+
+    @mock.patch.object(file_storage_client, "invalidate_browse")
+    def test_confirm_appends_urls_once(self, invalidate):
+        Delivery.objects.filter(pk=self.delivery.pk).update(invoice_photos_folder_url=[f"{self.folder}/old.jpg"])
+        ticket, _ = issue_upload_ticket("delivery", self.delivery.id, self.user)
+        urls = [f"{self.folder}/old.jpg", f"{self.folder}/new.jpg"]
+
+        result = confirm_upload_ticket(ticket, urls)
+        self.assertEqual(result["invoice_photos_folder_url"], urls)
+        self.delivery.refresh_from_db()
+        self.assertEqual(self.delivery.invoice_photos_thumbnail_urls, [None, None])
+        ticket.refresh_from_db()
+        self.assertEqual((ticket.status, ticket.urls), ("confirmed", urls))
+        invalidate.assert_called_once_with("object", self.obj.id)
+
+        with self.assertRaisesMessage(UploadTicketError, "Билет уже подтверждён"):
+            confirm_upload_ticket(ticket, urls)
+
+
+@override_settings(FILE_STORAGE_TICKET_SECRET=SECRET)
+@mock.patch("api.api.v1.views.uploads.log_upload_ticket_issued")
+class UploadTicketRolesTests(TestCase):
+    def setUp(self):
+        self.foreman = User.objects.create_user("f@a.ru", "x", role=Roles.FOREMAN, full_name="F")
+        self.iko = User.objects.create_user("i@a.ru", "x", role=Roles.IKO, full_name="I")
+        self.obj = ConstructionObject.objects.create(name="o", address="a", foreman=self.foreman, iko=self.iko)
+        self.delivery = Delivery.objects.create(object=self.obj, created_by=self.foreman)
+        self.prescription = Prescription.objects.create(object=self.obj, author=self.iko, title="t")
+        self.fix = PrescriptionFix.objects.create(prescription=self.prescription, author=self.foreman, comment="c")
+        self.client = APIClient()
+
+    def _issue(self, user, kind, entity_id):
+        self.client.force_authenticate(user)
+        return self.client.post("/api/v1/upload-tickets", {"kind": kind, "entity_id": entity_id}, format="json")
+
+    def test_each_kind_is_limited_to_roles_of_its_endpoint(self, issued_log):
+        entities = {"object": self.obj.id, "delivery": self.delivery.id, "prescription": self.prescription.id, "fix": self.fix.id}
+        allowed = {self.foreman: {"delivery", "fix"}, self.iko: {"prescription"}}
+        for user, kinds in allowed.items():
+            for kind, entity_id in entities.items():
+                if kind in kinds:
+                    self.assertEqual(self._issue(user, kind, entity_id).status_code, 201, (user.role, kind))
+                    continue
+                with self.assertLogs("django.request", "WARNING"):
+                    self.assertEqual(self._issue(user, kind, entity_id).status_code, 403, (user.role, kind))
+
+class StubTicketTests(SimpleTestCase):
+    def setUp(self):
+        self.server = StorageStubServer(("127.0.0.1", 0), StubOptions(ticket_secret=SECRET))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def _post(self, path, token, count=1):
+        photo = "data:image/jpeg;base64," + base64.b64encode(b"jpeg").decode()
+        return requests.post(
+            f"{self.server.url}{path}", json={"photos_base64": [photo] * count},
+            headers={"X-Upload-Ticket": token}, timeout=5,
+        )
+
+    def _token(self, path, max_files=2):
+        return jwt.encode({"jti": "t1", "aud": TICKET_AUDIENCE, "path": path, "max_files": max_files}, SECRET, algorithm="HS256")
+
+    def test_ticket_limits_path_and_file_count(self):
+        token = self._token("/upload/delivery/1/2")
+        resp = self._post("/upload/delivery/1/2", token)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.json()["files"][0]["url"].startswith(f"{self.server.url}/upload/delivery/1/2/"))
+
+        self.assertEqual(self._post("/upload/delivery/1/3", token).status_code, 403)
+        self.assertEqual(self._post("/upload/delivery/1/2", token, count=2).status_code, 403)
+        self.assertEqual(self._post("/upload/delivery/1/2", token).status_code, 200)
+
+    def test_invalid_ticket_is_rejected(self):
+        token = jwt.encode({"jti": "t2", "aud": TICKET_AUDIENCE, "path": "/upload/delivery/1/2", "max_files": 1}, OTHER_SECRET, algorithm="HS256")
+        self.assertEqual(self._post("/upload/delivery/1/2", token).status_code, 403)
@@ -0,0 +1,68 @@
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from api.models.log import ViewCounter, ViewEntity
+from api.models.user import Roles, User
+from api.utils import view_counters
+from api.utils.view_counters import flush_view_counters, record_view
+
+
+@override_settings(VIEW_COUNTERS_FLUSH_SECONDS=3600, VIEW_COUNTERS_MAX_KEYS=1000)
+class ViewCountersTests(TransactionTestCase):
+    # Счётчики пишутся через подключение logs (api.db_routers.LogRouter)
+    databases = {"default", "logs"}
+
+    def setUp(self):
+        view_counters._pending.clear()
+        self.addCleanup(view_counters._pending.clear)
+        # Фоновый поток записи в тестах не нужен
+        patcher = mock.patch.object(view_counters, "_ensure_flusher")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user_id = User.objects.create_user("a@a.ru", "x", role=Roles.ADMIN, full_name="A").pk
+
+    def _counts(self):
+        return {(c.entity_type, c.entity_id): c.count for c in ViewCounter.objects.filter(user_id=self.user_id)}
+
+    def test_flush_upserts_accumulated_views(self):
+        record_view(ViewEntity.OBJECT, 1, self.user_id)
+        record_view(ViewEntity.OBJECT, 1, self.user_id)
+        record_view(ViewEntity.AREA, 2, self.user_id)
+        record_view(ViewEntity.OBJECT, 1, None)  # анонимные просмотры не считаются
+        self.assertFalse(ViewCounter.objects.exists())
+        self.assertEqual(flush_view_counters(), 2)
+
+        record_view(ViewEntity.OBJECT, 1, self.user_id)
+        self.assertEqual(flush_view_counters(), 1)
+        self.assertEqual(flush_view_counters(), 0)
+        self.assertEqual(self._counts(), {("object", 1): 3, ("area", 2): 1})
+
+    @override_settings(VIEW_COUNTERS_MAX_KEYS=2)
+    def test_flush_when_too_many_keys(self):
+        record_view(ViewEntity.OBJECT, 1, self.user_id)
+        self.assertFalse(ViewCounter.objects.exists())
+        record_view(ViewEntity.OBJECT, 2, self.user_id)
+        self.assertEqual(self._counts(), {("object", 1): 1, ("object", 2): 1})
+        self.assertFalse(view_counters._pending)
+
+    def test_failed_flush_keeps_views(self):
+        record_view(ViewEntity.OBJECT, 1, self.user_id)
+        with mock.patch.object(view_counters, "_upsert", side_effect=RuntimeError), \
+                self.assertLogs(view_counters.logger, "ERROR"):
+            self.assertEqual(flush_view_counters(), 0)
+        record_view(ViewEntity.OBJECT, 1, self.user_id)
+        flush_view_counters()
+        self.assertEqual(self._counts(), {("object", 1): 2})
+
+
+class FlusherThreadTests(SimpleTestCase):
+    def test_one_thread_per_process(self):
+        with mock.patch.object(view_counters, "_flusher_pid", None), \
+                mock.patch.object(view_counters.threading, "Thread") as thread:
+            view_counters._ensure_flusher()
+            view_counters._ensure_flusher()
+            thread.assert_called_once()
+            thread.return_value.start.assert_called_once()
+            self.assertEqual(view_counters._flusher_pid, os.getpid())
@@ -0,0 +1,83 @@
+import base64
+import hashlib
+from typing import Any, NamedTuple, Optional, Union
+
+from django.db.models import F
+from django.utils import timezone
+
+from api.models.storage import StoredFile, FileDedupeStat
+
+
+_HASH_CHUNK_SIZE = 64 * 1024  # кратно 4: куски base64 декодируются независимо
+
+
+class ContentDigest(NamedTuple):
+    sha256: str
+    size: int
+    content_type: str
+
+
+def content_digest(data: Union[str, bytes, Any]) -> ContentDigest:
+    """
+    Считает sha256 исходных байтов файла, не собирая их целиком в памяти.
+
+    Принимает data URL / base64-строку (хэшируются декодированные байты, так что
+    одинаковое фото из base64 и из multipart даёт одинаковый хэш), bytes или
+    файловый объект с read/seek.
+    """
+    h = hashlib.sha256()
+    size = 0
+    content_type = ""
+
+    if isinstance(data, str):
+        start = data.index(",") + 1 if "," in data else 0
+        if data.startswith("data:"):
+            content_type = data[5:start - 1].split(";", 1)[0]
+        for pos in range(start, len(data), _HASH_CHUNK_SIZE):
+            chunk = base64.b64decode(data[pos:pos + _HASH_CHUNK_SIZE])
+            h.update(chunk)
+            size += len(chunk)
+    elif isinstance(data, (bytes, bytearray, memoryview)):
+        h.update(data)
+        size = len(data)
+    else:
+        content_type = getattr(data, "content_type", "") or ""
+        if hasattr(data, "seek"):
+            data.seek(0)
+        while True:
+            chunk = data.read(_HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            h.update(chunk)
+            size += len(chunk)
+        if hasattr(data, "seek"):
+            data.seek(0)
+
+    return ContentDigest(h.hexdigest(), size, content_type)
+
+
+def find_stored_file(scope: str, digest: ContentDigest) -> Optional[StoredFile]:
+    stored = StoredFile.objects.filter(scope=scope, sha256=digest.sha256).only("id", "url").first()
+    if stored:
+        StoredFile.objects.filter(pk=stored.pk).update(hits=F("hits") + 1, last_hit_at=timezone.now())
+    return stored
+
+
+def remember_stored_file(scope: str, digest: ContentDigest, url: str) -> None:
+    StoredFile.objects.get_or_create(
+        scope=scope,
+        sha256=digest.sha256,
+        defaults={"url": url, "size_bytes": digest.size, "content_type": digest.content_type[:100]},
+    )
+
+
+def record_dedupe_stats(hits: int, misses: int, bytes_saved: int, bytes_uploaded: int) -> None:
+    if not hits and not misses:
+        return
+    stat, _ = FileDedupeStat.objects.get_or_create(date=timezone.localdate())
+    FileDedupeStat.objects.filter(pk=stat.pk).update(
+        hits=F("hits") + hits,
+        misses=F("misses") + misses,
+        bytes_saved=F("bytes_saved") + bytes_saved,
+        bytes_uploaded=F("bytes_uploaded") + bytes_uploaded,
+    )
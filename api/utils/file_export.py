@@ -0,0 +1,145 @@
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterator, List, NamedTuple, Set
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+
+from api.models.delivery import Delivery
+from api.models.object import ConstructionObject
+from api.models.prescription import Prescription
+from api.utils.file_storage import is_thumbnail_path
+
+
+_COPY_CHUNK_SIZE = 64 * 1024
+
+
+class ExportEntry(NamedTuple):
+    arcname: str
+    url: str
+
+
+class _ZipSink:
+    """Приёмник для zipfile: копит записанные байты, пока генератор их не заберёт."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _file_name(url: str, index: int) -> str:
+    name = os.path.basename(unquote(urlsplit(url).path))
+    return name or f"file_{index}"
+
+
+def _unique(arcname: str, used: Set[str]) -> str:
+    candidate, n = arcname, 1
+    base, ext = os.path.splitext(arcname)
+    while candidate in used:
+        n += 1
+        candidate = f"{base} ({n}){ext}"
+    used.add(candidate)
+    return candidate
+
+
+def object_export_entries(obj: ConstructionObject) -> List[ExportEntry]:
+    """Все файлы объекта: документы, фото накладных, фото нарушений и исправлений."""
+    entries: List[ExportEntry] = []
+    used: Set[str] = set()
+
+    def add(folder: str, urls) -> None:
+        for i, url in enumerate(urls or [], start=1):
+            if url and not is_thumbnail_path(urlsplit(url).path):
+                entries.append(ExportEntry(_unique(f"{folder}/{_file_name(url, i)}", used), url))
+
+    add("Документы", obj.documents_folder_url)
+    for delivery in Delivery.objects.filter(object=obj).only("id", "invoice_photos_folder_url").order_by("id"):
+        add(f"Поставки/{delivery.id}", delivery.invoice_photos_folder_url)
+    for pres in Prescription.objects.filter(object=obj).prefetch_related("fixes").order_by("id"):
+        add(f"Нарушения/{pres.id}/Нарушение", pres.violation_photos_folder_url)
+        for fix in pres.fixes.all():
+            add(f"Нарушения/{pres.id}/Исправление {fix.id}", fix.fix_photos_folder_url)
+    return entries
+
+
+def _fetch(url: str):
+    """Скачивает файл во временный файл: в памяти до FILE_EXPORT_SPOOL_MAX байт, дальше — на диске."""
+    from api.utils.file_storage import file_storage_client
+
+    spool = tempfile.SpooledTemporaryFile(max_size=int(getattr(settings, "FILE_EXPORT_SPOOL_MAX", 8 * 1024 * 1024)))
+    try:
+        with file_storage_client.session.get(url, timeout=file_storage_client.request_timeout, stream=True) as resp:
+            resp.raise_for_status()
+            for chunk in resp.iter_content(_COPY_CHUNK_SIZE):
+                spool.write(chunk)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def stream_zip(entries: List[ExportEntry]) -> Iterator[bytes]:
+    """
+    Отдаёт ZIP-архив кусками по мере скачивания файлов.
+
+    Одновременно скачивается не больше FILE_EXPORT_CONCURRENCY файлов, в архив
+    они пишутся в исходном порядке, поэтому память ограничена окном загрузки,
+    а не размером архива. Файлы пишутся без сжатия (фото и PDF уже сжаты).
+    Не скачавшиеся файлы перечисляются в «Ошибки экспорта.txt» в конце архива.
+    """
+    concurrency = max(1, int(getattr(settings, "FILE_EXPORT_CONCURRENCY", 4)))
+    sink = _ZipSink()
+    failed: List[str] = []
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="file-export")
+    pending = {}
+    try:
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+            for i in range(min(concurrency, len(entries))):
+                pending[i] = executor.submit(_fetch, entries[i].url)
+            for i, entry in enumerate(entries):
+                future = pending.pop(i)
+                if i + concurrency < len(entries):
+                    pending[i + concurrency] = executor.submit(_fetch, entries[i + concurrency].url)
+                try:
+                    spool = future.result()
+                except Exception as e:
+                    failed.append(f"{entry.arcname}\t{entry.url}\t{e}")
+                    continue
+                with spool:
+                    spool.seek(0, os.SEEK_END)
+                    info = zipfile.ZipInfo(entry.arcname, date_time=datetime.now().timetuple()[:6])
+                    info.file_size = spool.tell()
+                    spool.seek(0)
+                    with zf.open(info, "w") as dest:
+                        while True:
+                            chunk = spool.read(_COPY_CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            dest.write(chunk)
+                            yield sink.drain()
+                yield sink.drain()
+            if failed:
+                zf.writestr("Ошибки экспорта.txt", "\n".join(failed) + "\n")
+        yield sink.drain()
+    finally:
+        # Клиент мог оборвать скачивание: не ждём оставшиеся загрузки
+        for future in pending.values():
+            future.cancel()
+            if future.done() and not future.cancelled() and future.exception() is None:
+                future.result().close()
+        executor.shutdown(wait=False, cancel_futures=True)
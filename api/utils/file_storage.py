@@ -1,22 +1,198 @@
 import base64
+import calendar
+import contextvars
+import json
 import mimetypes
-from typing import List, Dict, Optional, Union, Tuple, Any
+import os
+import random
+import re
+import threading
+import time
+import uuid
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Union, Tuple, Any, Callable
 from datetime import date as dt_date
+from urllib.parse import parse_qs, quote, unquote, urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
 
 from api.utils.logging import (
     log_file_storage_connection_failed,
     log_file_storage_timeout,
     log_file_storage_response_error,
+    log_file_storage_batch_deadline,
+    log_file_storage_late_upload,
+    log_file_storage_peak_memory,
+    log_file_storage_dedupe_hits,
 )
+from api.utils.file_dedupe import content_digest, find_stored_file, remember_stored_file, record_dedupe_stats
+from api.utils.images import image_processing_enabled, process_image
+from api.utils.photo_hashes import store_photo_hashes
+from api.utils.storage_usage import record_storage_usage
+from api.models.prescription import Prescription
+from api.models.storage import PhotoThumbnail
 
 
 Readable = Union[bytes, str, Any]  # Любой файловый объект
 
+_IMAGE_MIME_TYPES = {"image/jpeg", "image/jpg", "image/png", "image/webp", "image/heic", "image/heif"}
+_DATA_URL_RE = re.compile(r"data:([\w.+-]+/[\w.+-]+);base64,")
+_BASE64_RE = re.compile(r"[A-Za-z0-9+/]*={0,2}")
+_VIOLATION_TAGS = ("ССК", "ИКО")
+_STREAM_CHUNK_SIZE = 48 * 1024  # кратно 3: куски base64 склеиваются без промежуточного паддинга
+# Превью фото лежат отдельно от оригиналов: thumbs/<путь папки оригинала>
+THUMBNAILS_PREFIX = "thumbs/"
+
+
+class Base64DataUrl:
+    """Фото, уже закодированное в data URL: отправляется в photos_base64 как есть."""
+
+    __slots__ = ("data_url",)
+
+    def __init__(self, data_url: str):
+        self.data_url = data_url
+
+
+class _FilePart:
+    """Файл на диске, который читается кусками при отправке тела запроса."""
+
+    __slots__ = ("file", "size", "as_base64")
+
+    def __init__(self, file: Any, size: int, as_base64: bool = False):
+        self.file = file
+        self.size = size
+        self.as_base64 = as_base64
+
+    def __len__(self) -> int:
+        if self.as_base64:
+            return 4 * ((self.size + 2) // 3)
+        return self.size
+
+    def __iter__(self):
+        if hasattr(self.file, "seek"):
+            self.file.seek(0)
+        while True:
+            chunk = self.file.read(_STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield base64.b64encode(chunk) if self.as_base64 else chunk
+
+
+class _StreamingBody:
+    """
+    Тело запроса из байтовых кусков и файлов.
+
+    requests отправляет его итерацией, не собирая в памяти, а __len__ позволяет
+    выставить Content-Length вместо chunked-кодирования.
+    """
+
+    def __init__(self, parts: List[Union[bytes, _FilePart]]):
+        self.parts = parts
+
+    def __len__(self) -> int:
+        return sum(len(p) for p in self.parts)
+
+    def __iter__(self):
+        for part in self.parts:
+            if isinstance(part, bytes):
+                yield part
+            else:
+                yield from part
+
+
+def _is_stream(file: Readable) -> bool:
+    return not isinstance(file, (bytes, bytearray, str, Base64DataUrl)) and hasattr(file, "read")
+
+
+def _stream_size(file: Any) -> int:
+    size = getattr(file, "size", None)
+    if size is not None:
+        return int(size)
+    try:
+        return os.fstat(file.fileno()).st_size
+    except Exception:
+        pos = file.tell()
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        file.seek(pos)
+        return size
+
+
+def is_thumbnail_path(path: str) -> bool:
+    """Ключ хранилища или путь URL (/upload/...) указывает на файл из папки превью."""
+    path = unquote(path).lstrip("/")
+    if path.startswith("upload/"):
+        path = path[len("upload/"):]
+    return path.startswith(THUMBNAILS_PREFIX)
+
+
+def _without_thumbnails(data: Any) -> Any:
+    """Убирает из листинга browse_* файлы превью: они не должны попадать в папки, экспорт и синхронизацию."""
+    def keep(item) -> bool:
+        if not isinstance(item, dict):
+            return True
+        key = item.get("key") or item.get("path") or urlsplit(item.get("url") or item.get("presigned_url") or "").path
+        return not is_thumbnail_path(key)
+
+    if isinstance(data, list):
+        return [item for item in data if keep(item)]
+    if isinstance(data, dict):
+        return {k: [item for item in v if keep(item)] if k in ("files", "items", "objects") and isinstance(v, list) else v for k, v in data.items()}
+    return data
+
+
+def _presigned_expiry(data: Any) -> Optional[float]:
+    """Ближайший момент истечения (unix time) среди presigned-ссылок в ответе хранилища."""
+    earliest: Optional[float] = None
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, str) and "?" in item and "Expires" in item:
+            query = parse_qs(urlsplit(item).query)
+            try:
+                if "X-Amz-Expires" in query and "X-Amz-Date" in query:
+                    signed_at = calendar.timegm(time.strptime(query["X-Amz-Date"][0], "%Y%m%dT%H%M%SZ"))
+                    expires_at = signed_at + int(query["X-Amz-Expires"][0])
+                elif "Expires" in query:
+                    expires_at = float(query["Expires"][0])
+                else:
+                    continue
+            except (ValueError, TypeError):
+                continue
+            if earliest is None or expires_at < earliest:
+                earliest = expires_at
+    return earliest
+
+
+class _JitteredRetry(Retry):
+    """Retry с полным джиттером: пауза перед повтором случайна в [0, backoff]."""
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff > 0 else 0
+
 
 class FileStorageClient:
+    """
+    Клиент файлового хранилища.
+
+    Один экземпляр безопасно использовать из нескольких потоков: у каждого потока
+    своя requests.Session, а соединения берутся из общего пула HTTPAdapter.
+    GET-запросы (browse_*) повторяются при сетевых ошибках и 429/5xx с
+    экспоненциальной паузой и джиттером; загрузки (POST) повторяются только если
+    соединение не удалось установить, т.е. запрос точно не дошёл до хранилища.
+    """
 
     def __init__(self):
         self.base_url: str = getattr(settings, "FILE_STORAGE_URL", "https://building-s3-api.itc-hub.ru").rstrip("/")
@@ -26,7 +202,81 @@ class FileStorageClient:
             or getattr(settings, "S3_MEDIA_UPLOAD_TOKEN", None)
         )
         self.timeout: int = int(getattr(settings, "FILE_STORAGE_TIMEOUT", 30))
-        self.session = requests.Session()
+        self.connect_timeout: float = float(getattr(settings, "FILE_STORAGE_CONNECT_TIMEOUT", 5))
+        self.adapter = self._build_adapter()
+        self._local = threading.local()
+
+    @staticmethod
+    def _build_adapter() -> HTTPAdapter:
+        retries = int(getattr(settings, "FILE_STORAGE_RETRIES", 3))
+        retry = _JitteredRetry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            status_forcelist=(429, 502, 503, 504),
+            backoff_factor=float(getattr(settings, "FILE_STORAGE_RETRY_BACKOFF", 0.5)),
+            raise_on_status=False,
+        )
+        return HTTPAdapter(
+            pool_connections=int(getattr(settings, "FILE_STORAGE_POOL_CONNECTIONS", 4)),
+            pool_maxsize=int(getattr(settings, "FILE_STORAGE_POOL_MAXSIZE", 16)),
+            max_retries=retry,
+        )
+
+    @property
+    def session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self.adapter)
+            session.mount("https://", self.adapter)
+            self._local.session = session
+        return session
+
+    @property
+    def request_timeout(self) -> Tuple[float, float]:
+        deadline_at = getattr(self._local, "deadline_at", None)
+        if deadline_at is None:
+            return self.connect_timeout, self.timeout
+        # Внутри upload_batch запрос не должен пережить дедлайн пачки
+        remaining = max(0.001, deadline_at - time.monotonic())
+        return min(self.connect_timeout, remaining), min(self.timeout, remaining)
+
+    @contextmanager
+    def deadline(self, deadline_at: Optional[float]):
+        """Ограничивает таймауты запросов текущего потока моментом deadline_at (time.monotonic())."""
+        previous = getattr(self._local, "deadline_at", None)
+        self._local.deadline_at = deadline_at
+        try:
+            yield
+        finally:
+            self._local.deadline_at = previous
+
+    @staticmethod
+    def _browse_cache_key(kind: str, *parts: Union[int, str]) -> str:
+        return "file_storage:browse:" + ":".join([kind] + [quote(str(p), safe="") for p in parts])
+
+    @staticmethod
+    def _cache_browse(key: str, data: Optional[Dict]) -> None:
+        """
+        Кэширует листинг папки, пока действительны presigned-ссылки в нём.
+
+        TTL ограничен FILE_STORAGE_BROWSE_CACHE_TTL и заканчивается за
+        FILE_STORAGE_BROWSE_CACHE_MARGIN секунд до истечения первой ссылки.
+        """
+        if data is None:
+            return
+        ttl = float(getattr(settings, "FILE_STORAGE_BROWSE_CACHE_TTL", 300))
+        expires_at = _presigned_expiry(data)
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time() - float(getattr(settings, "FILE_STORAGE_BROWSE_CACHE_MARGIN", 60)))
+        if ttl >= 1:
+            cache.set(key, data, int(ttl))
+
+    def invalidate_browse(self, kind: str, *parts: Union[int, str]) -> None:
+        cache.delete(self._browse_cache_key(kind, *parts))
 
     def _headers(self) -> Dict[str, str]:
         if not self.token:
@@ -81,27 +331,86 @@ class FileStorageClient:
     def _encode_images(self, files: List[Readable]) -> List[str]:
         out: List[str] = []
         for f in files:
+            if isinstance(f, Base64DataUrl):
+                out.append(f.data_url)
+                continue
             data, filename, content_type = self._read_bytes(f)
             if not content_type and filename:
                 content_type = mimetypes.guess_type(filename)[0] or None
-            if content_type not in {"image/jpeg", "image/jpg", "image/png", "image/webp", "image/heic", "image/heif"}:
+            if content_type not in _IMAGE_MIME_TYPES:
                 content_type = "image/jpeg"
             out.append(self._to_data_url(data, content_type))
         return out
 
 
-    def upload_object_pdf(self, object_id: Union[int, str], file: Readable) -> Optional[Dict]:
-        url = f"{self.base_url}/upload/docs/object/{object_id}"
-        try:
+    def _photos_request(self, images: List[Readable], date: Optional[Union[str, dt_date]] = None) -> Dict:
+        """
+        Аргументы session.post для загрузки фото в photos_base64.
+
+        Если среди фото есть файлы (multipart-загрузка, временные файлы на
+        диске), JSON собирается потоком: base64 кодируется кусками при отправке.
+        """
+        iso = self._ensure_iso_date(date)
+        if not any(_is_stream(f) for f in images):
+            payload: Dict = {"photos_base64": self._encode_images(images)}
+            if iso:
+                payload["date"] = iso
+            return {"headers": self._headers(), "json": payload}
+
+        parts: List[Union[bytes, _FilePart]] = [b'{"photos_base64": [']
+        for i, f in enumerate(images):
+            if i:
+                parts.append(b", ")
+            if _is_stream(f):
+                content_type = getattr(f, "content_type", None)
+                if not content_type and getattr(f, "name", None):
+                    content_type = mimetypes.guess_type(f.name)[0]
+                if content_type not in _IMAGE_MIME_TYPES:
+                    content_type = "image/jpeg"
+                parts.append(f'"data:{content_type};base64,'.encode("ascii"))
+                parts.append(_FilePart(f, _stream_size(f), as_base64=True))
+                parts.append(b'"')
+            else:
+                parts.append(json.dumps(self._encode_images([f])[0]).encode("ascii"))
+        parts.append(b"]")
+        if iso:
+            parts.append(f', "date": {json.dumps(iso)}'.encode("ascii"))
+        parts.append(b"}")
+
+        headers = self._headers()
+        headers["Content-Type"] = "application/json"
+        return {"headers": headers, "data": _StreamingBody(parts)}
+
+    def _file_request(self, file: Readable, default_name: str, default_type: str) -> Dict:
+        """
+        Аргументы session.post для multipart-загрузки одного файла.
+
+        Файловый объект не читается целиком: multipart-тело собирается потоком.
+        """
+        if not _is_stream(file):
             data, filename, content_type = self._read_bytes(file)
-            content_type = content_type or "application/pdf"
-            filename = (filename or "document.pdf").rsplit("/", 1)[-1]
+            content_type = content_type or default_type
+            filename = (filename or default_name).rsplit("/", 1)[-1]
+            return {"headers": self._headers(), "files": {"file": (filename, data, content_type)}}
+
+        filename = (getattr(file, "name", None) or default_name).replace("\\", "/").rsplit("/", 1)[-1].replace('"', "%22")
+        content_type = getattr(file, "content_type", None) or mimetypes.guess_type(filename)[0] or default_type
+        boundary = uuid.uuid4().hex
+        head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        tail = f"\r\n--{boundary}--\r\n".encode("ascii")
 
-            files = {
-                "file": (filename, data, content_type),
-            }
+        headers = self._headers()
+        headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+        return {"headers": headers, "data": _StreamingBody([head, _FilePart(file, _stream_size(file)), tail])}
 
-            resp = self.session.post(url, headers=self._headers(), files=files, timeout=self.timeout)
+    def upload_object_pdf(self, object_id: Union[int, str], file: Readable) -> Optional[Dict]:
+        url = f"{self.base_url}/upload/docs/object/{object_id}"
+        try:
+            resp = self.session.post(url, timeout=self.request_timeout, **self._file_request(file, "document.pdf", "application/pdf"))
             resp.raise_for_status()
             return resp.json()
         except requests.exceptions.ConnectionError as e:
@@ -112,6 +421,8 @@ class FileStorageClient:
             log_file_storage_response_error("upload_object_pdf", e.response.status_code, e.response.text)
         except Exception as e:
             log_file_storage_connection_failed("upload_object_pdf", str(e))
+        finally:
+            self.invalidate_browse("object", object_id)
         return None
 
     def upload_foreman_visit(
@@ -121,13 +432,8 @@ class FileStorageClient:
         date: Optional[Union[str, dt_date]] = None,
     ) -> Optional[Dict]:
         url = f"{self.base_url}/upload/foreman/visit/{foreman_id}"
-        payload: Dict = {"photos_base64": self._encode_images(images)}
-        iso = self._ensure_iso_date(date)
-        if iso:
-            payload["date"] = iso
-
         try:
-            resp = self.session.post(url, headers=self._headers(), json=payload, timeout=self.timeout)
+            resp = self.session.post(url, timeout=self.request_timeout, **self._photos_request(images, date))
             resp.raise_for_status()
             return resp.json()
         except requests.exceptions.ConnectionError as e:
@@ -138,6 +444,8 @@ class FileStorageClient:
             log_file_storage_response_error("upload_foreman_visit", e.response.status_code, e.response.text)
         except Exception as e:
             log_file_storage_connection_failed("upload_foreman_visit", str(e))
+        finally:
+            self.invalidate_browse("foreman", foreman_id)
         return None
 
     def upload_violation_creation(
@@ -148,13 +456,8 @@ class FileStorageClient:
         date: Optional[Union[str, dt_date]] = None,
     ) -> Optional[Dict]:
         url = f"{self.base_url}/upload/violation/{tag}/{entity_id}/creation"
-        payload: Dict = {"photos_base64": self._encode_images(images)}
-        iso = self._ensure_iso_date(date)
-        if iso:
-            payload["date"] = iso
-
         try:
-            resp = self.session.post(url, headers=self._headers(), json=payload, timeout=self.timeout)
+            resp = self.session.post(url, timeout=self.request_timeout, **self._photos_request(images, date))
             resp.raise_for_status()
             return resp.json()
         except requests.exceptions.ConnectionError as e:
@@ -165,6 +468,8 @@ class FileStorageClient:
             log_file_storage_response_error("upload_violation_creation", e.response.status_code, e.response.text)
         except Exception as e:
             log_file_storage_connection_failed("upload_violation_creation", str(e))
+        finally:
+            self.invalidate_browse("violation", tag, entity_id)
         return None
 
     def upload_violation_correction(
@@ -175,13 +480,8 @@ class FileStorageClient:
         date: Optional[Union[str, dt_date]] = None,
     ) -> Optional[Dict]:
         url = f"{self.base_url}/upload/violation/{violation_id}/correction/by-foreman/{foreman_id}"
-        payload: Dict = {"photos_base64": self._encode_images(images)}
-        iso = self._ensure_iso_date(date)
-        if iso:
-            payload["date"] = iso
-
         try:
-            resp = self.session.post(url, headers=self._headers(), json=payload, timeout=self.timeout)
+            resp = self.session.post(url, timeout=self.request_timeout, **self._photos_request(images, date))
             resp.raise_for_status()
             return resp.json()
         except requests.exceptions.ConnectionError as e:
@@ -192,6 +492,9 @@ class FileStorageClient:
             log_file_storage_response_error("upload_violation_correction", e.response.status_code, e.response.text)
         except Exception as e:
             log_file_storage_connection_failed("upload_violation_correction", str(e))
+        finally:
+            for tag in _VIOLATION_TAGS:
+                self.invalidate_browse("violation", tag, violation_id)
         return None
 
     def upload_delivery_photos(
@@ -202,13 +505,8 @@ class FileStorageClient:
         date: Optional[Union[str, dt_date]] = None,
     ) -> Optional[Dict]:
         url = f"{self.base_url}/upload/delivery/{object_id}/{delivery_id}"
-        payload: Dict = {"photos_base64": self._encode_images(images)}
-        iso = self._ensure_iso_date(date)
-        if iso:
-            payload["date"] = iso
-
         try:
-            resp = self.session.post(url, headers=self._headers(), json=payload, timeout=self.timeout)
+            resp = self.session.post(url, timeout=self.request_timeout, **self._photos_request(images, date))
             resp.raise_for_status()
             return resp.json()
         except requests.exceptions.ConnectionError as e:
@@ -219,14 +517,39 @@ class FileStorageClient:
             log_file_storage_response_error("upload_delivery_photos", e.response.status_code, e.response.text)
         except Exception as e:
             log_file_storage_connection_failed("upload_delivery_photos", str(e))
+        finally:
+            self.invalidate_browse("object", object_id)
         return None
 
-    def browse_object(self, object_id: Union[int, str]) -> Optional[Dict]:
-        url = f"{self.base_url}/browse/object/{object_id}"
+    def upload_thumbnail(self, storage_path: str, image: Readable) -> Optional[Dict]:
+        """Превью фото из папки storage_path; кладётся в thumbs/storage_path, вне листингов browse_*."""
+        url = f"{self.base_url}/upload/{THUMBNAILS_PREFIX}{storage_path}"
         try:
-            resp = self.session.get(url, headers=self._headers(), timeout=self.timeout)
+            resp = self.session.post(url, timeout=self.request_timeout, **self._photos_request([image]))
             resp.raise_for_status()
             return resp.json()
+        except requests.exceptions.ConnectionError as e:
+            log_file_storage_connection_failed("upload_thumbnail", str(e))
+        except requests.exceptions.Timeout:
+            log_file_storage_timeout("upload_thumbnail", self.timeout)
+        except requests.exceptions.HTTPError as e:
+            log_file_storage_response_error("upload_thumbnail", e.response.status_code, e.response.text)
+        except Exception as e:
+            log_file_storage_connection_failed("upload_thumbnail", str(e))
+        return None
+
+    def browse_object(self, object_id: Union[int, str], use_cache: bool = True) -> Optional[Dict]:
+        url = f"{self.base_url}/browse/object/{object_id}"
+        key = self._browse_cache_key("object", object_id)
+        cached = cache.get(key) if use_cache else None
+        if cached is not None:
+            return cached
+        try:
+            resp = self.session.get(url, headers=self._headers(), timeout=self.request_timeout)
+            resp.raise_for_status()
+            data = _without_thumbnails(resp.json())
+            self._cache_browse(key, data)
+            return data
         except requests.exceptions.ConnectionError as e:
             log_file_storage_connection_failed("browse_object", str(e))
         except requests.exceptions.Timeout:
@@ -239,10 +562,16 @@ class FileStorageClient:
 
     def browse_foreman(self, foreman_id: Union[int, str]) -> Optional[Dict]:
         url = f"{self.base_url}/browse/foreman/{foreman_id}"
+        key = self._browse_cache_key("foreman", foreman_id)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
         try:
-            resp = self.session.get(url, headers=self._headers(), timeout=self.timeout)
+            resp = self.session.get(url, headers=self._headers(), timeout=self.request_timeout)
             resp.raise_for_status()
-            return resp.json()
+            data = _without_thumbnails(resp.json())
+            self._cache_browse(key, data)
+            return data
         except requests.exceptions.ConnectionError as e:
             log_file_storage_connection_failed("browse_foreman", str(e))
         except requests.exceptions.Timeout:
@@ -255,10 +584,16 @@ class FileStorageClient:
 
     def browse_violation(self, tag: str, entity_id: Union[int, str]) -> Optional[Dict]:
         url = f"{self.base_url}/browse/violation/{tag}/{entity_id}"
+        key = self._browse_cache_key("violation", tag, entity_id)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
         try:
-            resp = self.session.get(url, headers=self._headers(), timeout=self.timeout)
+            resp = self.session.get(url, headers=self._headers(), timeout=self.request_timeout)
             resp.raise_for_status()
-            return resp.json()
+            data = _without_thumbnails(resp.json())
+            self._cache_browse(key, data)
+            return data
         except requests.exceptions.ConnectionError as e:
             log_file_storage_connection_failed("browse_violation", str(e))
         except requests.exceptions.Timeout:
@@ -273,31 +608,365 @@ class FileStorageClient:
 file_storage_client = FileStorageClient()
 
 
+def violation_tag_for_role(user_role: Optional[str]) -> str:
+    return "ИКО" if user_role == "iko" else "ССК"
 
-def upload_object_documents_base64(base64_files: List[str], object_id: int, object_name: str = None, user_name: str = None, user_role: str = None) -> Optional[List[str]]:
-    from api.utils.logging import log_object_documents_uploaded, log_object_documents_upload_failed
-    
-    uploaded_urls = []
-    
-    for i, base64_data in enumerate(base64_files):
+
+def _run_upload_task(task: Callable[[Any], Dict], item: Any, deadline_at: float, expired: threading.Event, operation: str) -> Dict:
+    # Каждый поток пула открывает своё соединение с БД (логирование ошибок
+    # клиента), поэтому закрываем его по завершении задачи.
+    try:
+        with file_storage_client.deadline(deadline_at):
+            result = task(item)
+        if expired.is_set() and result.get("url"):
+            # Пачка уже вернула "deadline": файл лежит в хранилище, но ни к чему не привязан
+            log_file_storage_late_upload(operation, result["url"])
+        return result
+    finally:
+        connections.close_all()
+
+
+def upload_batch(
+    items: List[Any],
+    task: Callable[[Any], Dict],
+    max_workers: Optional[int] = None,
+    deadline: Optional[float] = None,
+    operation: str = "upload_batch",
+    on_result: Optional[Callable[[int, Dict], None]] = None,
+) -> List[Dict]:
+    """
+    Выполняет task для каждого элемента пачки с ограниченной параллельностью.
+
+    Возвращает список результатов в исходном порядке. Каждый результат — словарь
+    с ключами "url" и "error"; задачи, не успевшие завершиться до дедлайна пачки,
+    получают error="deadline". on_result(index, result) вызывается в текущем
+    потоке по мере завершения файлов — для отображения прогресса.
+    """
+    if not items:
+        return []
+
+    if max_workers is None:
+        max_workers = int(getattr(settings, "FILE_STORAGE_UPLOAD_CONCURRENCY", 4))
+    if deadline is None:
+        deadline = float(getattr(settings, "FILE_STORAGE_BATCH_DEADLINE", 120))
+
+    results: List[Dict] = [{"url": None, "error": "deadline"} for _ in items]
+    deadline_at = time.monotonic() + deadline
+
+    if len(items) == 1 or max_workers <= 1:
+        done = 0
+        for i, item in enumerate(items):
+            if time.monotonic() < deadline_at:
+                # Таймауты запросов обрезаются до остатка дедлайна — см. FileStorageClient.request_timeout
+                try:
+                    with file_storage_client.deadline(deadline_at):
+                        results[i] = task(item)
+                except Exception as e:
+                    results[i] = {"url": None, "error": str(e)}
+                done += 1
+            if on_result:
+                on_result(i, results[i])
+        if done < len(items):
+            log_file_storage_batch_deadline(operation, done, len(items), deadline)
+        return results
+
+    expired = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(items)), thread_name_prefix="file-storage")
+    # Своя копия контекста на задачу: потоки пула пишут лог в буфер запроса (buffered_logs)
+    futures = {
+        executor.submit(contextvars.copy_context().run, _run_upload_task, task, item, deadline_at, expired, operation): i
+        for i, item in enumerate(items)
+    }
+    collected = set()
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                results[i] = {"url": None, "error": str(e)}
+            collected.add(i)
+            if on_result:
+                on_result(i, results[i])
+    except FuturesTimeoutError:
+        expired.set()
+        for future, i in futures.items():
+            if i not in collected:
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    # Завершилась, пока истекал дедлайн: результат ещё можно использовать
+                    results[i] = future.result()
+                    collected.add(i)
+                else:
+                    future.cancel()
+                if on_result:
+                    on_result(i, results[i])
+        log_file_storage_batch_deadline(operation, len(collected), len(items), deadline)
+    finally:
+        # Не начатые задачи отменяются; начатые не ждём — их запросы ограничены
+        # тем же дедлайном, а успевшие загрузиться файлы логируются в _run_upload_task
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def _decode_base64_file(base64_data: str) -> bytes:
+    if ',' in base64_data:
+        base64_data = base64_data.split(',', 1)[1]
+    missing_padding = len(base64_data) % 4
+    if missing_padding:
+        base64_data += '=' * (4 - missing_padding)
+    return base64.b64decode(base64_data)
+
+
+def _extract_file_url(result: Optional[Dict]) -> Optional[str]:
+    if result and result.get('files') and len(result['files']) > 0:
+        file_info = result['files'][0]
+        return file_info.get('url') or file_info.get('presigned_url')
+    return None
+
+
+def _prepare_base64_image(base64_data: str) -> Readable:
+    """
+    Готовит фото из запроса к отправке в photos_base64 без декодирования.
+
+    Проверяет алфавит и длину base64 и возвращает Base64DataUrl. Корректный
+    data URL уходит в хранилище тем же объектом строки, без копий. Если строка
+    не проходит проверку, декодируем её как раньше (b64decode терпим к переводам
+    строк и мусору).
+    """
+    m = _DATA_URL_RE.match(base64_data)
+    if m:
+        start = m.end()
+    elif ',' in base64_data:
+        start = base64_data.index(',') + 1
+    else:
+        start = 0
+
+    length = len(base64_data) - start
+    if length == 0 or length % 4 == 1 or not _BASE64_RE.fullmatch(base64_data, start):
+        return _decode_base64_file(base64_data)
+
+    padding = '=' * ((4 - length % 4) % 4)
+    mime = m.group(1).lower() if m else None
+    if mime in _IMAGE_MIME_TYPES and not padding:
+        return Base64DataUrl(base64_data)
+
+    if mime not in _IMAGE_MIME_TYPES:
+        mime = _sniff_image_mime(base64_data[start:start + 16])
+    return Base64DataUrl(f"data:{mime};base64,{base64_data[start:]}{padding}")
+
+
+def _sniff_image_mime(head: str) -> str:
+    # 16 символов base64 = 12 байт, этого хватает для сигнатур JPEG/PNG/WEBP/HEIC
+    try:
+        data = base64.b64decode(head)
+    except Exception:
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[4:8] == b"ftyp":
+        return "image/heif" if data[8:12] in (b"mif1", b"msf1") else "image/heic"
+    return "image/jpeg"
+
+
+def _image_source(file_data: Readable) -> Union[bytes, str]:
+    """Что передать в process_image: путь к файлу на диске, если он есть, иначе содержимое."""
+    if isinstance(file_data, Base64DataUrl):
+        return _decode_base64_file(file_data.data_url)
+    if isinstance(file_data, (bytes, bytearray)):
+        return bytes(file_data)
+    # Временный файл загрузки или файл из UPLOAD_STAGING_DIR: процесс пула прочитает его сам
+    temporary_file_path = getattr(file_data, "temporary_file_path", None)
+    if callable(temporary_file_path):
+        return temporary_file_path()
+    name = getattr(file_data, "name", None)
+    if isinstance(name, str) and os.path.isabs(name) and os.path.isfile(name):
+        return name
+    file_data.seek(0)
+    data = file_data.read()
+    file_data.seek(0)
+    return data
+
+
+def _payload_size(file_data: Readable) -> int:
+    """Размер файла, отправляемого в хранилище, байт (для base64 — после декодирования)."""
+    if isinstance(file_data, Base64DataUrl):
+        data_url = file_data.data_url
+        encoded = len(data_url) - data_url.index(",") - 1
+        return encoded * 3 // 4 - data_url.endswith("=") - data_url.endswith("==")
+    if isinstance(file_data, (bytes, bytearray)):
+        return len(file_data)
+    if isinstance(file_data, str):
+        return len(file_data.encode("utf-8"))
+    return _stream_size(file_data)
+
+
+def _prescription_object_id(prescription_id: int) -> Optional[int]:
+    return Prescription.objects.filter(id=prescription_id).values_list("object_id", flat=True).first()
+
+
+def photo_thumbnail_urls(urls: List[str]) -> List[Optional[str]]:
+    """Ссылки на превью в порядке urls; None — для фото без превью."""
+    if not urls:
+        return []
+    thumbnails = dict(PhotoThumbnail.objects.filter(url__in=urls).values_list("url", "thumbnail_url"))
+    return [thumbnails.get(url) for url in urls]
+
+
+_tracked_operations = 0
+_tracked_lock = threading.Lock()
+
+
+@contextmanager
+def _track_peak_memory(operation: str, file_count: int):
+    # tracemalloc запускается один раз при старте процесса (ApiConfig.ready);
+    # здесь только снимаются показания до и после операции.
+    global _tracked_operations
+    if not getattr(settings, "FILE_STORAGE_TRACE_MEMORY", False) or not tracemalloc.is_tracing():
+        yield
+        return
+
+    with _tracked_lock:
+        if _tracked_operations == 0:
+            # Пик общий на процесс: сбрасываем его, только если параллельно
+            # не идёт другая отслеживаемая операция
+            tracemalloc.reset_peak()
+        _tracked_operations += 1
+    base, _ = tracemalloc.get_traced_memory()
+    try:
+        yield
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        with _tracked_lock:
+            _tracked_operations -= 1
+        log_file_storage_peak_memory(operation, file_count, max(0, peak - base))
+
+
+def _upload_base64_batch(
+    base64_files: List[Union[str, Any]],
+    upload_one: Callable[[Readable], Optional[Dict]],
+    operation: str,
+    passthrough: bool = True,
+    on_result: Optional[Callable[[int, Dict], None]] = None,
+    dedupe_scope: Optional[str] = None,
+    process_images: bool = False,
+    usage: Optional[Tuple[Optional[int], str]] = None,
+    thumbnail_path: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Загружает пачку файлов через upload_one.
+
+    Если задан dedupe_scope (тег/сущность, под которыми файлы лежат в хранилище),
+    перед загрузкой ищем sha256 содержимого в индексе StoredFile: совпавший файл
+    не отправляется повторно, в результат попадает уже известный URL.
+
+    С process_images фото перед загрузкой уменьшаются и пережимаются без EXIF
+    (см. api.utils.images); если задан thumbnail_path (путь папки в хранилище),
+    превью загружается в thumbs/thumbnail_path, пары фото/превью сохраняются
+    в PhotoThumbnail.
+
+    usage — (id объекта, категория): загруженные файлы и байты (фото после
+    обработки, без превью) прибавляются к счётчикам StorageUsage.
+    """
+    if not getattr(settings, "FILE_STORAGE_DEDUPE", True):
+        dedupe_scope = None
+    process_images = process_images and image_processing_enabled()
+
+    def _task(base64_data: Union[str, Any]) -> Dict:
         try:
-            import base64
-            if ',' in base64_data:
-                base64_data = base64_data.split(',', 1)[1]
-            missing_padding = len(base64_data) % 4
-            if missing_padding:
-                base64_data += '=' * (4 - missing_padding)
-            file_data = base64.b64decode(base64_data)
-            result = file_storage_client.upload_object_pdf(object_id, file_data)
-            if result and result.get('files') and len(result['files']) > 0:
-                file_info = result['files'][0]
-                file_url = file_info.get('url') or file_info.get('presigned_url')
-                if file_url:
-                    uploaded_urls.append(file_url)
+            if not isinstance(base64_data, str):
+                # Файл из multipart-запроса: отдаём клиенту хранилища как поток
+                file_data = base64_data
+            elif passthrough:
+                file_data = _prepare_base64_image(base64_data)
+            else:
+                file_data = _decode_base64_file(base64_data)
         except Exception as e:
-            from api.utils.logging import log_message, LogLevel, LogCategory
-            log_message(LogLevel.ERROR, LogCategory.FILE_STORAGE, f"Ошибка декодирования base64 файла {i+1}: {str(e)}")
-    
+            return {"url": None, "result": None, "error": f"base64: {e}"}
+
+        digest = None
+        if dedupe_scope:
+            try:
+                digest = content_digest(file_data.data_url if isinstance(file_data, Base64DataUrl) else file_data)
+                stored = find_stored_file(dedupe_scope, digest)
+            except Exception:
+                # Индекс — только оптимизация: при любой ошибке просто загружаем файл
+                digest, stored = None, None
+            if stored:
+                return {"url": stored.url, "result": None, "error": None, "deduplicated": True, "size": digest.size}
+
+        processed = process_image(_image_source(file_data)) if process_images else None
+        thumbnail_url = None
+        if processed:
+            original_size = digest.size if digest else None
+            file_data = processed.data
+            if thumbnail_path:
+                thumbnail_url = _extract_file_url(file_storage_client.upload_thumbnail(thumbnail_path, processed.thumbnail))
+
+        result = upload_one(file_data)
+        url = _extract_file_url(result)
+        if digest and url:
+            remember_stored_file(dedupe_scope, digest, url)
+        res = {"url": url, "result": result, "error": None, "deduplicated": False, "size": digest.size if digest else 0}
+        if url:
+            res["uploaded_bytes"] = _payload_size(file_data)
+        if url and processed:
+            res["phash"] = processed.phash
+        if url and thumbnail_url:
+            res["thumbnail"] = PhotoThumbnail(
+                url=url,
+                thumbnail_url=thumbnail_url,
+                width=processed.width,
+                height=processed.height,
+                original_size_bytes=original_size or 0,
+                size_bytes=len(processed.data),
+            )
+        return res
+
+    with _track_peak_memory(operation, len(base64_files)):
+        results = upload_batch(base64_files, _task, operation=operation, on_result=on_result)
+
+    thumbnails = [r["thumbnail"] for r in results if r.get("thumbnail")]
+    if thumbnails:
+        PhotoThumbnail.objects.bulk_create(thumbnails, ignore_conflicts=True)
+    phashes = {r["url"]: r["phash"] for r in results if r.get("phash") is not None}
+    if phashes:
+        store_photo_hashes(phashes)
+    if usage:
+        uploaded = [r for r in results if r["url"] and not r.get("deduplicated")]
+        record_storage_usage(usage[0], usage[1], len(uploaded), sum(r.get("uploaded_bytes", 0) for r in uploaded))
+
+    if dedupe_scope:
+        hits = [r for r in results if r.get("deduplicated")]
+        misses = [r for r in results if r["url"] and not r.get("deduplicated")]
+        bytes_saved = sum(r["size"] for r in hits)
+        record_dedupe_stats(len(hits), len(misses), bytes_saved, sum(r["size"] for r in misses))
+        if hits:
+            log_file_storage_dedupe_hits(operation, len(hits), len(results), bytes_saved)
+    return results
+
+
+def upload_object_documents_base64(base64_files: List[str], object_id: int, object_name: str = None, user_name: str = None, user_role: str = None, on_result: Callable[[int, Dict], None] = None) -> Optional[List[str]]:
+    from api.utils.logging import log_object_documents_uploaded, log_object_documents_upload_failed, log_file_storage_file_failed
+
+    uploaded_urls = []
+
+    results = _upload_base64_batch(
+        base64_files,
+        lambda file_data: file_storage_client.upload_object_pdf(object_id, file_data),
+        "upload_object_documents_base64",
+        passthrough=False,
+        on_result=on_result,
+        dedupe_scope=f"docs/object/{object_id}",
+        usage=(object_id, "documents"),
+    )
+    for i, res in enumerate(results):
+        if res["url"]:
+            uploaded_urls.append(res["url"])
+        elif res["error"]:
+            log_file_storage_file_failed("object", object_id, i + 1, res["error"])
+
     if uploaded_urls:
         if object_name and user_name and user_role:
             log_object_documents_uploaded(object_name, object_id, f"{len(uploaded_urls)} файлов", user_name, user_role, len(base64_files))
@@ -312,13 +981,16 @@ def upload_object_documents(files: List[Readable], object_id: int, object_name:
     from api.utils.logging import log_object_documents_uploaded, log_object_documents_upload_failed
     
     uploaded_urls = []
+    uploaded_bytes = 0
     
     for file in files:
         result = file_storage_client.upload_object_pdf(object_id, file)
         if result and result.get('url'):
             uploaded_urls.append(result['url'])
+            uploaded_bytes += _payload_size(file)
     
     if uploaded_urls:
+        record_storage_usage(object_id, "documents", len(uploaded_urls), uploaded_bytes)
         folder_url = uploaded_urls[0] if len(uploaded_urls) == 1 else f"{len(uploaded_urls)} файлов загружено"
         if object_name and user_name and user_role:
             log_object_documents_uploaded(object_name, object_id, folder_url, user_name, user_role, len(files))
@@ -330,221 +1002,114 @@ def upload_object_documents(files: List[Readable], object_id: int, object_name:
 
 
 def upload_violation_photos_base64(base64_files: List[str], prescription_id: int, prescription_title: str = None, user_name: str = None, user_role: str = None) -> Optional[List[str]]:
-    from api.utils.logging import log_violation_photos_uploaded, log_violation_photos_upload_failed, log_message, LogLevel, LogCategory
+    from api.utils.logging import (log_violation_photos_uploaded, log_violation_photos_upload_failed, log_file_storage_upload_started,
+                                   log_file_storage_file_uploaded, log_file_storage_file_failed, log_file_storage_upload_finished)
     
-    tag = "ССК" if user_role == "ssk" else "ИКО" if user_role == "iko" else "ССК"
+    tag = violation_tag_for_role(user_role)
     
-    log_message(
-        LogLevel.INFO, 
-        LogCategory.FILE_STORAGE, 
-        f"Начинаем загрузку фото нарушения из base64. Тег: {tag}, prescription_id: {prescription_id}, файлов: {len(base64_files)}. URL хранилища: {file_storage_client.base_url}"
-    )
+    log_file_storage_upload_started("prescription", prescription_id, len(base64_files), file_storage_client.base_url, tag=tag)
     
     uploaded_urls = []
-    
-    for i, base64_data in enumerate(base64_files):
-        log_message(
-            LogLevel.INFO, 
-            LogCategory.FILE_STORAGE, 
-            f"Загружаем файл {i+1}/{len(base64_files)} для нарушения {prescription_id}"
-        )
-        
-        try:
-            import base64
-            if ',' in base64_data:
-                base64_data = base64_data.split(',', 1)[1]
-            missing_padding = len(base64_data) % 4
-            if missing_padding:
-                base64_data += '=' * (4 - missing_padding)
-            file_data = base64.b64decode(base64_data)
-            result = file_storage_client.upload_violation_creation(tag, prescription_id, [file_data])
-            
-            if result and result.get('files') and len(result['files']) > 0:
-                file_info = result['files'][0]
-                file_url = file_info.get('url') or file_info.get('presigned_url')
-                if file_url:
-                    uploaded_urls.append(file_url)
-                    log_message(
-                        LogLevel.INFO, 
-                        LogCategory.FILE_STORAGE, 
-                        f"Файл {i+1} успешно загружен для нарушения {prescription_id}. URL: {file_url}"
-                    )
-                else:
-                    log_message(
-                        LogLevel.ERROR, 
-                        LogCategory.FILE_STORAGE, 
-                        f"Файл {i+1} загружен для нарушения {prescription_id}, но URL не найден. Результат: {result}"
-                    )
-            else:
-                log_message(
-                    LogLevel.ERROR, 
-                    LogCategory.FILE_STORAGE, 
-                    f"Ошибка загрузки файла {i+1} для нарушения {prescription_id}. Результат: {result}"
-                )
-        except Exception as e:
-            log_message(
-                LogLevel.ERROR, 
-                LogCategory.FILE_STORAGE, 
-                f"Ошибка декодирования base64 файла {i+1} для нарушения {prescription_id}: {str(e)}"
-            )
+
+    results = _upload_base64_batch(
+        base64_files,
+        lambda file_data: file_storage_client.upload_violation_creation(tag, prescription_id, [file_data]),
+        "upload_violation_photos_base64",
+        process_images=True,
+        thumbnail_path=f"violation/{tag}/{prescription_id}/creation",
+        dedupe_scope=f"violation/{tag}/{prescription_id}/creation",
+        usage=(_prescription_object_id(prescription_id), "violations"),
+    )
+    for i, res in enumerate(results):
+        if res["url"]:
+            uploaded_urls.append(res["url"])
+            log_file_storage_file_uploaded("prescription", prescription_id, i + 1, res["url"])
+        else:
+            log_file_storage_file_failed("prescription", prescription_id, i + 1, res["error"] or f"результат {res.get('result')}")
     
     if uploaded_urls:
         if prescription_title and user_name and user_role:
             log_violation_photos_uploaded(prescription_title, prescription_id, f"{len(uploaded_urls)} файлов", user_name, user_role, len(base64_files))
-        
-        log_message(
-            LogLevel.INFO, 
-            LogCategory.FILE_STORAGE, 
-            f"Загрузка фото нарушения {prescription_id} завершена успешно. Загружено: {len(uploaded_urls)}/{len(base64_files)} файлов. Возвращаем массив из {len(uploaded_urls)} URL"
-        )
+        log_file_storage_upload_finished("prescription", prescription_id, len(uploaded_urls), len(base64_files))
         return uploaded_urls
     else:
         if prescription_title and user_name and user_role:
             log_violation_photos_upload_failed(prescription_title, prescription_id, "Не удалось загрузить файлы", user_name, user_role, len(base64_files))
-        
-        log_message(
-            LogLevel.ERROR, 
-            LogCategory.FILE_STORAGE, 
-            f"Загрузка фото нарушения {prescription_id} завершилась неудачей. Ни один файл не был загружен из {len(base64_files)} файлов."
-        )
+        log_file_storage_upload_finished("prescription", prescription_id, 0, len(base64_files))
         return None
 
 
 def upload_violation_photos(files: List[Readable], prescription_id: int, prescription_title: str = None, user_name: str = None, user_role: str = None) -> Optional[str]:
-    from api.utils.logging import log_violation_photos_uploaded, log_violation_photos_upload_failed, log_message, LogLevel, LogCategory
+    from api.utils.logging import (log_violation_photos_uploaded, log_violation_photos_upload_failed, log_file_storage_upload_started,
+                                   log_file_storage_file_uploading, log_file_storage_file_uploaded, log_file_storage_file_failed,
+                                   log_file_storage_upload_finished)
     
-    tag = "ССК" if user_role == "ssk" else "ИКО" if user_role == "iko" else "ССК"
+    tag = violation_tag_for_role(user_role)
     
-    log_message(
-        LogLevel.INFO, 
-        LogCategory.FILE_STORAGE, 
-        f"Начинаем загрузку фото нарушения. Тег: {tag}, prescription_id: {prescription_id}, файлов: {len(files)}. URL хранилища: {file_storage_client.base_url}"
-    )
+    log_file_storage_upload_started("prescription", prescription_id, len(files), file_storage_client.base_url, tag=tag)
     
     uploaded_urls = []
+    uploaded_bytes = 0
     
     for i, file in enumerate(files):
-        log_message(
-            LogLevel.INFO, 
-            LogCategory.FILE_STORAGE, 
-            f"Загружаем файл {i+1}/{len(files)} для нарушения {prescription_id}"
-        )
+        log_file_storage_file_uploading("prescription", prescription_id, i + 1, len(files))
         
         result = file_storage_client.upload_violation_creation(tag, prescription_id, [file])
         
         if result and result.get('url'):
             uploaded_urls.append(result['url'])
-            log_message(
-                LogLevel.INFO, 
-                LogCategory.FILE_STORAGE, 
-                f"Файл {i+1} успешно загружен для нарушения {prescription_id}. URL: {result['url']}"
-            )
+            uploaded_bytes += _payload_size(file)
+            log_file_storage_file_uploaded("prescription", prescription_id, i + 1, result["url"])
         else:
-            log_message(
-                LogLevel.ERROR, 
-                LogCategory.FILE_STORAGE, 
-                f"Ошибка загрузки файла {i+1} для нарушения {prescription_id}. Результат: {result}"
-            )
+            log_file_storage_file_failed("prescription", prescription_id, i + 1, f"результат {result}")
     
     if uploaded_urls:
+        record_storage_usage(_prescription_object_id(prescription_id), "violations", len(uploaded_urls), uploaded_bytes)
         folder_url = uploaded_urls[0] if len(uploaded_urls) == 1 else f"{len(uploaded_urls)} файлов загружено"
         if prescription_title and user_name and user_role:
             log_violation_photos_uploaded(prescription_title, prescription_id, folder_url, user_name, user_role, len(files))
-        
-        log_message(
-            LogLevel.INFO, 
-            LogCategory.FILE_STORAGE, 
-            f"Загрузка фото нарушения {prescription_id} завершена успешно. Загружено: {len(uploaded_urls)}/{len(files)} файлов. Возвращаем: {folder_url}"
-        )
+        log_file_storage_upload_finished("prescription", prescription_id, len(uploaded_urls), len(files))
         return folder_url
     else:
         if prescription_title and user_name and user_role:
             log_violation_photos_upload_failed(prescription_title, prescription_id, "Не удалось загрузить файлы", user_name, user_role, len(files))
-        
-        log_message(
-            LogLevel.ERROR, 
-            LogCategory.FILE_STORAGE, 
-            f"Загрузка фото нарушения {prescription_id} завершилась неудачей. Ни один файл не был загружен из {len(files)} файлов."
-        )
+        log_file_storage_upload_finished("prescription", prescription_id, 0, len(files))
         return None
 
 
 def upload_fix_photos_base64(base64_files: List[str], prescription_id: int, foreman_id: int, prescription_title: str = None, user_name: str = None, user_role: str = None) -> Optional[List[str]]:
-    from api.utils.logging import log_fix_photos_uploaded, log_fix_photos_upload_failed, log_message, LogLevel, LogCategory
+    from api.utils.logging import (log_fix_photos_uploaded, log_fix_photos_upload_failed, log_file_storage_upload_started,
+                                   log_file_storage_file_uploaded, log_file_storage_file_failed, log_file_storage_upload_finished)
     
-    log_message(
-        LogLevel.INFO, 
-        LogCategory.FILE_STORAGE, 
-        f"Начинаем загрузку фото исправления из base64. prescription_id: {prescription_id}, foreman_id: {foreman_id}, файлов: {len(base64_files)}. URL хранилища: {file_storage_client.base_url}"
-    )
+    log_file_storage_upload_started("fix", prescription_id, len(base64_files), file_storage_client.base_url)
     
     uploaded_urls = []
-    
-    for i, base64_data in enumerate(base64_files):
-        log_message(
-            LogLevel.INFO, 
-            LogCategory.FILE_STORAGE, 
-            f"Загружаем файл {i+1}/{len(base64_files)} для исправления нарушения {prescription_id}"
-        )
-        
-        try:
-            import base64
-            if ',' in base64_data:
-                base64_data = base64_data.split(',', 1)[1]
-            missing_padding = len(base64_data) % 4
-            if missing_padding:
-                base64_data += '=' * (4 - missing_padding)
-            file_data = base64.b64decode(base64_data)
-            result = file_storage_client.upload_violation_correction(prescription_id, foreman_id, [file_data])
-            
-            if result and result.get('files') and len(result['files']) > 0:
-                file_info = result['files'][0]
-                file_url = file_info.get('url') or file_info.get('presigned_url')
-                if file_url:
-                    uploaded_urls.append(file_url)
-                    log_message(
-                        LogLevel.INFO, 
-                        LogCategory.FILE_STORAGE, 
-                        f"Файл {i+1} успешно загружен для исправления нарушения {prescription_id}. URL: {file_url}"
-                    )
-                else:
-                    log_message(
-                        LogLevel.ERROR, 
-                        LogCategory.FILE_STORAGE, 
-                        f"Файл {i+1} загружен для исправления нарушения {prescription_id}, но URL не найден. Результат: {result}"
-                    )
-            else:
-                log_message(
-                    LogLevel.ERROR, 
-                    LogCategory.FILE_STORAGE, 
-                    f"Ошибка загрузки файла {i+1} для исправления нарушения {prescription_id}. Результат: {result}"
-                )
-        except Exception as e:
-            log_message(
-                LogLevel.ERROR, 
-                LogCategory.FILE_STORAGE, 
-                f"Ошибка декодирования base64 файла {i+1} для исправления нарушения {prescription_id}: {str(e)}"
-            )
+
+    results = _upload_base64_batch(
+        base64_files,
+        lambda file_data: file_storage_client.upload_violation_correction(prescription_id, foreman_id, [file_data]),
+        "upload_fix_photos_base64",
+        process_images=True,
+        thumbnail_path=f"violation/{prescription_id}/correction/by-foreman/{foreman_id}",
+        dedupe_scope=f"violation/{prescription_id}/correction/by-foreman/{foreman_id}",
+        usage=(_prescription_object_id(prescription_id), "fixes"),
+    )
+    for i, res in enumerate(results):
+        if res["url"]:
+            uploaded_urls.append(res["url"])
+            log_file_storage_file_uploaded("fix", prescription_id, i + 1, res["url"])
+        else:
+            log_file_storage_file_failed("fix", prescription_id, i + 1, res["error"] or f"результат {res.get('result')}")
     
     if uploaded_urls:
         if prescription_title and user_name and user_role:
             log_fix_photos_uploaded(prescription_title, prescription_id, f"{len(uploaded_urls)} файлов", user_name, user_role, len(base64_files))
-        
-        log_message(
-            LogLevel.INFO, 
-            LogCategory.FILE_STORAGE, 
-            f"Загрузка фото исправления нарушения {prescription_id} завершена успешно. Загружено: {len(uploaded_urls)}/{len(base64_files)} файлов. Возвращаем массив из {len(uploaded_urls)} URL"
-        )
+        log_file_storage_upload_finished("fix", prescription_id, len(uploaded_urls), len(base64_files))
         return uploaded_urls
     else:
         if prescription_title and user_name and user_role:
             log_fix_photos_upload_failed(prescription_title, prescription_id, "Не удалось загрузить файлы", user_name, user_role, len(base64_files))
-        
-        log_message(
-            LogLevel.ERROR, 
-            LogCategory.FILE_STORAGE, 
-            f"Загрузка фото исправления нарушения {prescription_id} завершилась неудачей. Ни один файл не был загружен из {len(base64_files)} файлов."
-        )
+        log_file_storage_upload_finished("fix", prescription_id, 0, len(base64_files))
         return None
 
 
@@ -552,13 +1117,16 @@ def upload_fix_photos(files: List[Readable], prescription_id: int, foreman_id: i
     from api.utils.logging import log_fix_photos_uploaded, log_fix_photos_upload_failed
     
     uploaded_urls = []
+    uploaded_bytes = 0
     
     for file in files:
         result = file_storage_client.upload_violation_correction(prescription_id, foreman_id, [file])
         if result and result.get('url'):
             uploaded_urls.append(result['url'])
+            uploaded_bytes += _payload_size(file)
     
     if uploaded_urls:
+        record_storage_usage(_prescription_object_id(prescription_id), "fixes", len(uploaded_urls), uploaded_bytes)
         folder_url = uploaded_urls[0] if len(uploaded_urls) == 1 else f"{len(uploaded_urls)} файлов загружено"
         if prescription_title and user_name and user_role:
             log_fix_photos_uploaded(prescription_title, prescription_id, folder_url, user_name, user_role, len(files))
@@ -569,82 +1137,41 @@ def upload_fix_photos(files: List[Readable], prescription_id: int, foreman_id: i
         return None
 
 
-def upload_invoice_photos_base64(base64_files: List[str], object_id: int, delivery_id: int, user_name: str = None, user_role: str = None) -> Optional[List[str]]:
-    from api.utils.logging import log_invoice_photos_uploaded, log_invoice_photos_upload_failed, log_message, LogLevel, LogCategory
+def upload_invoice_photos_base64(base64_files: List[str], object_id: int, delivery_id: int, user_name: str = None, user_role: str = None, on_result: Callable[[int, Dict], None] = None) -> Optional[List[str]]:
+    from api.utils.logging import (log_invoice_photos_uploaded, log_invoice_photos_upload_failed, log_file_storage_upload_started,
+                                   log_file_storage_file_uploaded, log_file_storage_file_failed, log_file_storage_upload_finished)
     
-    log_message(
-        LogLevel.INFO, 
-        LogCategory.FILE_STORAGE, 
-        f"Начинаем загрузку фото накладных из base64. object_id: {object_id}, delivery_id: {delivery_id}, файлов: {len(base64_files)}. URL хранилища: {file_storage_client.base_url}"
-    )
+    log_file_storage_upload_started("delivery", delivery_id, len(base64_files), file_storage_client.base_url)
     
     uploaded_urls = []
-    
-    for i, base64_data in enumerate(base64_files):
-        log_message(
-            LogLevel.INFO, 
-            LogCategory.FILE_STORAGE, 
-            f"Загружаем файл {i+1}/{len(base64_files)} для поставки {delivery_id}"
-        )
-        
-        try:
-            import base64
-            if ',' in base64_data:
-                base64_data = base64_data.split(',', 1)[1]
-            missing_padding = len(base64_data) % 4
-            if missing_padding:
-                base64_data += '=' * (4 - missing_padding)
-            file_data = base64.b64decode(base64_data)
-            result = file_storage_client.upload_delivery_photos(object_id, delivery_id, [file_data])
-            
-            if result and result.get('files') and len(result['files']) > 0:
-                file_info = result['files'][0]
-                file_url = file_info.get('url') or file_info.get('presigned_url')
-                if file_url:
-                    uploaded_urls.append(file_url)
-                    log_message(
-                        LogLevel.INFO, 
-                        LogCategory.FILE_STORAGE, 
-                        f"Файл {i+1} успешно загружен для поставки {delivery_id}. URL: {file_url}"
-                    )
-                else:
-                    log_message(
-                        LogLevel.ERROR, 
-                        LogCategory.FILE_STORAGE, 
-                        f"Файл {i+1} загружен для поставки {delivery_id}, но URL не найден. Результат: {result}"
-                    )
-            else:
-                log_message(
-                    LogLevel.ERROR, 
-                    LogCategory.FILE_STORAGE, 
-                    f"Ошибка загрузки файла {i+1} для поставки {delivery_id}. Результат: {result}"
-                )
-        except Exception as e:
-            log_message(
-                LogLevel.ERROR, 
-                LogCategory.FILE_STORAGE, 
-                f"Ошибка декодирования base64 файла {i+1} для поставки {delivery_id}: {str(e)}"
-            )
+
+    results = _upload_base64_batch(
+        base64_files,
+        lambda file_data: file_storage_client.upload_delivery_photos(object_id, delivery_id, [file_data]),
+        "upload_invoice_photos_base64",
+        on_result=on_result,
+        process_images=True,
+        thumbnail_path=f"delivery/{object_id}/{delivery_id}",
+        # Только в пределах поставки: URL чужой поставки может быть presigned и уже истечь
+        dedupe_scope=f"delivery/{object_id}/{delivery_id}",
+        usage=(object_id, "invoices"),
+    )
+    for i, res in enumerate(results):
+        if res["url"]:
+            uploaded_urls.append(res["url"])
+            log_file_storage_file_uploaded("delivery", delivery_id, i + 1, res["url"])
+        else:
+            log_file_storage_file_failed("delivery", delivery_id, i + 1, res["error"] or f"результат {res.get('result')}")
     
     if uploaded_urls:
         if user_name and user_role:
-            log_invoice_photos_uploaded(f"Поставка {delivery_id}", delivery_id, f"{len(uploaded_urls)} файлов", user_name, user_role, len(base64_files))
-        
-        log_message(
-            LogLevel.INFO, 
-            LogCategory.FILE_STORAGE, 
-            f"Загрузка фото накладных поставки {delivery_id} завершена успешно. Загружено: {len(uploaded_urls)}/{len(base64_files)} файлов. Возвращаем массив из {len(uploaded_urls)} URL"
-        )
+            log_invoice_photos_uploaded(delivery_id, f"{len(uploaded_urls)} файлов", user_name, user_role, len(base64_files))
+        log_file_storage_upload_finished("delivery", delivery_id, len(uploaded_urls), len(base64_files))
         return uploaded_urls
     else:
         if user_name and user_role:
-            log_invoice_photos_upload_failed(f"Поставка {delivery_id}", delivery_id, "Не удалось загрузить файлы", user_name, user_role, len(base64_files))
-        
-        log_message(
-            LogLevel.ERROR, 
-            LogCategory.FILE_STORAGE, 
-            f"Загрузка фото накладных поставки {delivery_id} завершилась неудачей. Ни один файл не был загружен из {len(base64_files)} файлов."
-        )
+            log_invoice_photos_upload_failed(delivery_id, "Не удалось загрузить файлы", user_name, user_role, len(base64_files))
+        log_file_storage_upload_finished("delivery", delivery_id, 0, len(base64_files))
         return None
 
 
@@ -652,13 +1179,16 @@ def upload_invoice_photos(files: List[Readable], object_id: int, delivery_id: in
     from api.utils.logging import log_invoice_photos_uploaded, log_invoice_photos_upload_failed
     
     uploaded_urls = []
+    uploaded_bytes = 0
     
     for file in files:
         result = file_storage_client.upload_delivery_photos(object_id, delivery_id, [file])
         if result and result.get('url'):
             uploaded_urls.append(result['url'])
+            uploaded_bytes += _payload_size(file)
     
     if uploaded_urls:
+        record_storage_usage(object_id, "invoices", len(uploaded_urls), uploaded_bytes)
         folder_url = uploaded_urls[0] if len(uploaded_urls) == 1 else f"{len(uploaded_urls)} файлов загружено"
         if user_name and user_role:
             log_invoice_photos_uploaded(delivery_id, folder_url, user_name, user_role, len(files))
@@ -0,0 +1,116 @@
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional, Tuple, Union
+
+from django.conf import settings
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow не установлен — фото загружаются как есть
+    Image = None
+    ImageOps = None
+
+
+class ProcessedImage(NamedTuple):
+    data: bytes
+    thumbnail: bytes
+    width: int
+    height: int
+    phash: int
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def image_processing_enabled() -> bool:
+    return Image is not None and getattr(settings, "IMAGE_PROCESSING_ENABLED", True)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, а не fork: воркеры gunicorn многопоточны, форк с чужими блокировками опасен
+            _pool = ProcessPoolExecutor(
+                max_workers=int(getattr(settings, "IMAGE_PROCESS_WORKERS", 2)),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _encode_jpeg(img, quality: int) -> bytes:
+    out = io.BytesIO()
+    # exif не передаём — метаданные (в т.ч. геопозиция) в файл не попадают
+    img.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def _dhash(img) -> int:
+    """64-битный difference hash: яркость соседних пикселей на сетке 9×8."""
+    pixels = list(img.convert("L").resize((9, 8), Image.LANCZOS).getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] < pixels[row * 9 + col + 1])
+    return value
+
+
+def _dhash_bytes(data: bytes) -> int:
+    with Image.open(io.BytesIO(data)) as src:
+        return _dhash(ImageOps.exif_transpose(src))
+
+
+def _process_image_source(source: Union[bytes, str], max_side: int, quality: int, thumbnail_side: int) -> Tuple[bytes, bytes, int, int, int]:
+    """Выполняется в процессе пула: только Pillow, без Django. source — содержимое или путь к файлу."""
+    with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as src:
+        img = ImageOps.exif_transpose(src)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+        full = _encode_jpeg(img, quality)
+        width, height = img.size
+        phash = _dhash(img)
+        img.thumbnail((thumbnail_side, thumbnail_side), Image.LANCZOS)
+        thumb = _encode_jpeg(img, quality)
+        return full, thumb, width, height, phash
+
+
+def process_image(source: Union[bytes, str]) -> Optional[ProcessedImage]:
+    """
+    Уменьшает фото до IMAGE_MAX_SIDE, пережимает в JPEG без EXIF и делает превью.
+
+    source — содержимое файла или путь к нему: файлы на диске процесс пула
+    читает сам, и они не копируются в память вызывающего процесса целиком.
+    Работа идёт в пуле процессов, вызывающий поток только ждёт результата.
+    Возвращает None, если Pillow недоступен или изображение не удалось
+    обработать (например, HEIC без плагина) — тогда загружается оригинал.
+    """
+    if not image_processing_enabled():
+        return None
+    future = _get_pool().submit(
+        _process_image_source,
+        source,
+        int(getattr(settings, "IMAGE_MAX_SIDE", 2560)),
+        int(getattr(settings, "IMAGE_JPEG_QUALITY", 85)),
+        int(getattr(settings, "IMAGE_THUMBNAIL_SIDE", 320)),
+    )
+    try:
+        return ProcessedImage(*future.result(timeout=float(getattr(settings, "IMAGE_PROCESS_TIMEOUT", 30))))
+    except Exception:
+        future.cancel()
+        return None
+
+
+def perceptual_hash(data: bytes) -> Optional[int]:
+    """dHash изображения (в пуле процессов); None — если Pillow нет или файл не читается."""
+    if Image is None:
+        return None
+    future = _get_pool().submit(_dhash_bytes, data)
+    try:
+        return future.result(timeout=float(getattr(settings, "IMAGE_PROCESS_TIMEOUT", 30)))
+    except Exception:
+        future.cancel()
+        return None
@@ -0,0 +1,194 @@
+import gzip
+import os
+import re
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from api.models.log import Log
+from api.utils.log_stats import drop_log_rollup
+
+LOG_TABLE = "api_log"
+DEFAULT_PARTITION = "api_log_default"
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+class LogPartition(NamedTuple):
+    name: str
+    # None — MINVALUE/MAXVALUE (секция с данными до секционирования)
+    start: Optional[datetime]
+    end: Optional[datetime]
+
+
+def month_start(value: datetime) -> datetime:
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{LOG_TABLE}_{month:%Y%m}"
+
+
+def _literal(value: datetime) -> str:
+    return f"'{value.astimezone(dt_timezone.utc):%Y-%m-%d %H:%M:%S}+00'"
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    value = value.strip().strip("'")
+    if value.upper() in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value).astimezone(dt_timezone.utc)
+
+
+def log_connection():
+    """Подключение, через которое пишется Log (см. api.db_routers.LogRouter)."""
+    return connections[router.db_for_write(Log)]
+
+
+def is_partitioned(connection) -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [LOG_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(connection) -> List[LogPartition]:
+    """Секции по диапазонам месяцев, по возрастанию; секция DEFAULT не входит."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s AND pg_table_is_visible(p.oid)",
+            [LOG_TABLE],
+        )
+        rows = cursor.fetchall()
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND_RE.search(bound or "")
+        if match:
+            partitions.append(LogPartition(name, _parse_bound(match.group(1)), _parse_bound(match.group(2))))
+    return sorted(partitions, key=lambda p: p.start or datetime.min.replace(tzinfo=dt_timezone.utc))
+
+
+def create_partition(connection, month: datetime) -> Optional[str]:
+    """
+    Создаёт секцию месяца, если её нет. Строки этого месяца, попавшие в секцию
+    DEFAULT (секцию вовремя не создали), переносятся в новую.
+    """
+    start = month_start(month)
+    end = add_months(start, 1)
+    for p in list_partitions(connection):
+        if (p.start is None or p.start < end) and (p.end is None or p.end > start):
+            return None
+    name = partition_name(start)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE "{name}" (LIKE "{LOG_TABLE}" INCLUDING DEFAULTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE created_at >= %s AND created_at < %s RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end],
+        )
+        cursor.execute(
+            f'ALTER TABLE "{LOG_TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM ({_literal(start)}) TO ({_literal(end)})'
+        )
+    return name
+
+
+def archive_partition(connection, name: str, archive_dir: str, before: Optional[datetime] = None) -> str:
+    """
+    Выгружает секцию (или только её строки раньше before) в gzip CSV с
+    заголовком и возвращает путь к файлу.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    where = f" WHERE created_at < {_literal(before)}" if before else ""
+    path = os.path.join(archive_dir, f"{name}_before_{before:%Y%m}.csv.gz" if before else f"{name}.csv.gz")
+    with gzip.open(path, "wt", encoding="utf-8") as fh, connection.cursor() as cursor:
+        cursor.copy_expert(f'COPY (SELECT * FROM "{name}"{where} ORDER BY id) TO STDOUT WITH CSV HEADER', fh)
+    return path
+
+
+def drop_partition(connection, name: str) -> None:
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{LOG_TABLE}" DETACH PARTITION "{name}"')
+        cursor.execute(f'DROP TABLE "{name}"')
+
+
+def trim_partition(connection, name: str, before: datetime) -> int:
+    """Удаляет из секции строки раньше before (секция целиком ещё не устарела). Возвращает их число."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM "{name}" WHERE created_at < %s', [before])
+        return cursor.rowcount
+
+
+def maintain_log_partitions(
+    months_ahead: Optional[int] = None,
+    retention_months: Optional[int] = None,
+    archive_dir: Optional[str] = None,
+    dry_run: bool = False,
+) -> Optional[Dict[str, List[str]]]:
+    """
+    Создаёт секции на months_ahead месяцев вперёд и удаляет (с выгрузкой в
+    archive_dir, если он задан) секции целиком старше retention_months месяцев.
+    Из секции api_log_legacy (MINVALUE — граница на момент секционирования),
+    пока она не устарела целиком, устаревшие строки удаляются DELETE.
+    Возвращает None, если таблица журнала не секционирована (не PostgreSQL).
+    """
+    connection = log_connection()
+    if not is_partitioned(connection):
+        return None
+    if months_ahead is None:
+        months_ahead = int(getattr(settings, "LOG_PARTITIONS_AHEAD", 3))
+    if retention_months is None:
+        retention_months = int(getattr(settings, "LOG_RETENTION_MONTHS", 12))
+    if archive_dir is None:
+        archive_dir = getattr(settings, "LOG_ARCHIVE_DIR", "")
+
+    current = month_start(timezone.now())
+    result = {"created": [], "archived": [], "dropped": [], "trimmed": []}
+    for n in range(months_ahead + 1):
+        month = add_months(current, n)
+        if dry_run:
+            if not any((p.start is None or p.start <= month) and (p.end is None or p.end > month) for p in list_partitions(connection)):
+                result["created"].append(partition_name(month))
+            continue
+        name = create_partition(connection, month)
+        if name:
+            result["created"].append(name)
+
+    if retention_months > 0:
+        cutoff = add_months(current, -retention_months)
+        for p in list_partitions(connection):
+            if p.end is not None and p.end <= cutoff:
+                if not dry_run:
+                    if archive_dir:
+                        result["archived"].append(archive_partition(connection, p.name, archive_dir))
+                    drop_partition(connection, p.name)
+                result["dropped"].append(p.name)
+            elif p.start is None or p.start < cutoff:
+                # Секция захватывает срок хранения лишь частью (legacy с MINVALUE)
+                if not dry_run:
+                    if archive_dir:
+                        result["archived"].append(archive_partition(connection, p.name, archive_dir, before=cutoff))
+                    trim_partition(connection, p.name, cutoff)
+                result["trimmed"].append(p.name)
+        if not dry_run:
+            # В DEFAULT попадают только строки вне созданных секций — их чистим обычным DELETE
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM "{DEFAULT_PARTITION}" WHERE created_at < %s', [cutoff])
+            # Почасовая статистика не должна показывать удалённые строки
+            drop_log_rollup(cutoff)
+    return result
@@ -0,0 +1,122 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import connections, router, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from api.models.log import Log, LogHourlyRollup
+
+logger = logging.getLogger(__name__)
+
+
+def _floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil_hour(value: datetime) -> datetime:
+    floor = _floor_hour(value)
+    return floor if floor == value else floor + timedelta(hours=1)
+
+
+def record_log_rollup(entries: Iterable[Log]) -> None:
+    """
+    Прибавляет только что записанные строки журнала к почасовым счётчикам:
+    группы пачки суммируются в памяти и пишутся одним INSERT ... ON CONFLICT DO UPDATE.
+    """
+    groups = Counter((_floor_hour(e.created_at), e.level, e.category) for e in entries if e.created_at)
+    if not groups:
+        return
+    try:
+        _upsert_rollup(groups)
+    except Exception:
+        # Статистику можно пересчитать командой rebuild_log_rollup, запись журнала важнее
+        logger.exception("Не удалось обновить почасовую статистику журнала")
+
+
+def _upsert_rollup(groups: Dict[Tuple[datetime, str, str], int]) -> None:
+    connection = connections[router.db_for_write(LogHourlyRollup)]
+    qn = connection.ops.quote_name
+    table = qn(LogHourlyRollup._meta.db_table)
+    columns = ("hour", "level", "category", "count", "created_at", "modified_at")
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    params = []
+    for (hour, level, category), n in groups.items():
+        params += [connection.ops.adapt_datetimefield_value(hour), level, category, n, now, now]
+    placeholders = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(groups))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(qn(c) for c in columns)}) VALUES {placeholders} "
+            f"ON CONFLICT ({qn('hour')}, {qn('level')}, {qn('category')}) DO UPDATE SET "
+            f"{qn('count')} = {table}.{qn('count')} + EXCLUDED.{qn('count')}, "
+            f"{qn('modified_at')} = EXCLUDED.{qn('modified_at')}",
+            params,
+        )
+
+
+def drop_log_rollup(before: datetime) -> int:
+    """Удаляет счётчики часов раньше before — вслед за удалёнными по сроку хранения строками журнала."""
+    deleted, _ = LogHourlyRollup.objects.filter(hour__lt=before).delete()
+    return deleted
+
+
+def rebuild_log_rollup(date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> int:
+    """Пересчитывает почасовые счётчики по сырому журналу за [date_from, date_to) (границы — по часам)."""
+    logs = Log.objects.all()
+    rollups = LogHourlyRollup.objects.all()
+    if date_from:
+        date_from = _floor_hour(date_from)
+        logs, rollups = logs.filter(created_at__gte=date_from), rollups.filter(hour__gte=date_from)
+    if date_to:
+        date_to = _ceil_hour(date_to)
+        logs, rollups = logs.filter(created_at__lt=date_to), rollups.filter(hour__lt=date_to)
+    rows = (
+        logs.annotate(hour=TruncHour("created_at"))
+        .values("hour", "level", "category")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    with transaction.atomic(using=rollups.db):
+        rollups.delete()
+        created = LogHourlyRollup.objects.bulk_create(
+            [LogHourlyRollup(hour=r["hour"], level=r["level"], category=r["category"], count=r["n"]) for r in rows],
+            batch_size=1000,
+        )
+    return len(created)
+
+
+def log_counts(date_from: datetime, date_to: datetime) -> List[Tuple[str, str, object, int]]:
+    """
+    Число записей журнала за [date_from, date_to) по (уровень, категория, день).
+
+    Целые часы периода берутся из LogHourlyRollup, неполные часы по краям —
+    из Log: два GROUP BY вместо сканирования всего периода.
+    """
+    start_hour, end_hour = _ceil_hour(date_from), _floor_hour(date_to)
+    counts: Dict[Tuple[str, str, object], int] = Counter()
+    if start_hour < end_hour:
+        raw = Q(created_at__gte=date_from, created_at__lt=start_hour) | Q(created_at__gte=end_hour, created_at__lt=date_to)
+        rollup_rows = (
+            LogHourlyRollup.objects.filter(hour__gte=start_hour, hour__lt=end_hour)
+            .annotate(day=TruncDate("hour"))
+            .values("level", "category", "day")
+            .annotate(n=Sum("count"))
+            .order_by()
+        )
+        for r in rollup_rows:
+            counts[(r["level"], r["category"], r["day"])] += r["n"]
+    else:
+        raw = Q(created_at__gte=date_from, created_at__lt=date_to)
+    raw_rows = (
+        Log.objects.filter(raw)
+        .annotate(day=TruncDate("created_at"))
+        .values("level", "category", "day")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    for r in raw_rows:
+        counts[(r["level"], r["category"], r["day"])] += r["n"]
+    return [(level, category, day, n) for (level, category, day), n in counts.items()]
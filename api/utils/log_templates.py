@@ -0,0 +1,105 @@
+import re
+from typing import Any, Dict, Optional
+
+# Шаблоны записей журнала: в Log хранятся id шаблона и параметры, текст собирается при показе.
+# Id и имена параметров — контракт с уже записанными строками: текст можно уточнять,
+# но менять смысл или переименовывать параметры нельзя — для этого заводится новый id.
+# [ ... ] — необязательный фрагмент: выводится, только если все его параметры непустые.
+LOG_TEMPLATES = {
+    "object_created": "Создан новый объект строительства '{object_name}' по адресу '{object_address}' пользователем {user_name} (роль: {user_role})",
+    "object_updated": "Объект '{object_name}' изменен пользователем {user_name} (роль: {user_role})[ Изменения: {changes}]",
+    "object_files_exported": "Выгрузка архива файлов объекта '{object_name}' ({file_count} файл(ов)) пользователем {user_name} (роль: {user_role})",
+    "object_status_changed": "Статус объекта '{object_name}' изменен с '{old_status}' на '{new_status}' пользователем {user_name} (роль: {user_role})[ Причина: {reason}]",
+    "activation_requested": "Запрос активации объекта '{object_name}' отправлен пользователем {user_name} (роль: {user_role})[ Назначен ИКО: {iko_name}]",
+    "activation_approved": "Активация объекта '{object_name}' одобрена ИКО {iko_name} (роль: {user_role}). Объект переведен в статус 'Активен'",
+    "activation_rejected": "Активация объекта '{object_name}' отклонена ИКО {iko_name} (роль: {user_role})[ Причина отклонения: {reason}]",
+    "prescription_created": "Создано нарушение '{prescription_title}' для объекта '{object_name}' пользователем {user_name} (роль: {user_role})",
+    "prescription_fixed": "Нарушение '{prescription_title}' для объекта '{object_name}' исправлено пользователем {user_name} (роль: {user_role})",
+    "prescription_approved": "Нарушение '{prescription_title}' для объекта '{object_name}' подтверждено пользователем {user_name} (роль: {user_role})",
+    "prescription_rejected": "Нарушение '{prescription_title}' для объекта '{object_name}' отклонено пользователем {user_name} (роль: {user_role})[ Причина отклонения: {reason}]",
+    "delivery_created": "Создана поставка #{delivery_id} для объекта '{object_name}' пользователем {user_name} (роль: {user_role})",
+    "delivery_received": "Поставка #{delivery_id} для объекта '{object_name}' получена пользователем {user_name} (роль: {user_role})",
+    "delivery_accepted": "Поставка #{delivery_id} для объекта '{object_name}' принята пользователем {user_name} (роль: {user_role})",
+    "delivery_sent_to_lab": "Поставка #{delivery_id} для объекта '{object_name}' отправлена в лабораторию пользователем {user_name} (роль: {user_role})",
+    "work_plan_created": "Создан график работ '{work_plan_title}' для объекта '{object_name}' пользователем {user_name} (роль: {user_role})",
+    "work_item_completed": "Работа '{work_item_name}' для объекта '{object_name}' завершена пользователем {user_name} (роль: {user_role})",
+    "user_login": "Пользователь {user_name} (роль: {user_role}) успешно вошел в систему",
+    "user_login_failed": "Неудачная попытка входа пользователя {user_name}",
+    "user_logout": "Пользователь {user_name} (роль: {user_role}) вышел из системы",
+    "error": "Ошибка: {error_message}",
+    "warning": "Предупреждение: {warning_message}",
+    "notification_sent": "Отправлено уведомление '{subject}' на {recipient_email} от {user_name} (роль: {user_role})",
+    "notification_failed": "Ошибка отправки уведомления '{subject}' на {recipient_email}: {error_message}. Отправитель: {user_name} (роль: {user_role})",
+    "area_created": "Создан полигон '{area_name}' для объекта '{object_name}' пользователем {user_name} (роль: {user_role})",
+    "user_created": "Создан пользователь {user_name} ({user_email}) с ролью {user_role} пользователем {created_by_name} (роль: {created_by_role})",
+    "user_updated": "Пользователь {user_name} ({user_email}) с ролью {user_role} изменен пользователем {updated_by_name} (роль: {updated_by_role})",
+    "daily_checklist_created": "Создан ежедневный чек-лист #{checklist_id} для объекта '{object_name}' пользователем {user_name} (роль: {user_role})",
+    "daily_checklist_reviewed": "Ежедневный чек-лист #{checklist_id} для объекта '{object_name}' {review_status} пользователем {user_name} (роль: {user_role})",
+    "work_created": "Создана работа '{work_title}' для объекта '{object_name}' пользователем {user_name} (роль: {user_role})",
+    "memo_created": "Создано мемо '{memo_title}' для объекта '{object_name}' пользователем {user_name} (роль: {user_role})",
+    "file_upload_success": "Успешно загружен {files_text} {file_type} для '{entity_name}' (ID: {entity_id}) в файловое хранилище: {folder_url}. Пользователь: {user_name} (роль: {user_role})",
+    "file_upload_failed": "Ошибка загрузки {files_text} {file_type} для '{entity_name}' (ID: {entity_id}): {error_message}. Пользователь: {user_name} (роль: {user_role})",
+    "file_storage_connection_failed": "Ошибка подключения к файловому хранилищу при операции '{operation}': {error_message}",
+    "file_storage_timeout": "Таймаут при операции '{operation}' с файловым хранилищем (превышено {timeout_seconds} секунд)",
+    "file_storage_response_error": "Ошибка ответа от файлового хранилища при операции '{operation}': HTTP {status_code}, ответ: {response_text}...",
+    "file_storage_batch_deadline": "Дедлайн пачки при операции '{operation}' с файловым хранилищем (превышено {deadline_seconds} секунд): завершено {done_count} из {total_count} файлов",
+    "file_storage_late_upload": "Файл загружен в хранилище после дедлайна пачки при операции '{operation}' и не привязан к записи: {url}",
+    "file_storage_peak_memory": "Пиковая память при операции '{operation}' ({file_count} файл(ов)): {peak_mb:.1f} МБ",
+    "upload_ticket_issued": "Выдан билет на прямую загрузку в хранилище: {kind_display} #{entity_id}. Пользователь: {user_name} (роль: {user_role})",
+    "file_storage_dedupe_hits": "Операция '{operation}': {hit_count}/{total_count} файл(ов) уже были в хранилище, загрузка пропущена (сэкономлено {saved_mb:.1f} МБ)",
+    # Пофайловый ход загрузки; target — что загружается (ключ _UPLOAD_TARGETS)
+    "file_storage_upload_started": "Начинаем загрузку {target_files} для {target_entity} #{entity_id}: {file_count} файл(ов)[, тег {tag}]. URL хранилища: {storage_url}",
+    "file_storage_file_uploading": "Загружаем файл {file_index}/{file_count} ({target_files}) для {target_entity} #{entity_id}",
+    "file_storage_file_uploaded": "Файл {file_index} ({target_files}) загружен для {target_entity} #{entity_id}: {url}",
+    "file_storage_file_failed": "Ошибка загрузки файла {file_index} ({target_files}) для {target_entity} #{entity_id}: {error_message}",
+    "file_storage_upload_finished": "Загрузка {target_files} для {target_entity} #{entity_id} завершена: загружено {uploaded_count}/{file_count} файл(ов)",
+    "file_storage_upload_empty": "Загрузка {target_files} для {target_entity} #{entity_id} завершилась неудачей: не загружен ни один из {file_count} файл(ов)",
+    # Параметры — структурированные поля записи (request_method, duration_ms, ...)
+    "api_request": "{request_method} {request_path} → {response_status} за {duration_ms} мс (запросов к БД: {db_queries}, {db_time_ms} мс)",
+}
+
+# target → (что загружается, для чего)
+_UPLOAD_TARGETS = {
+    "object": ("документов объекта", "объекта"),
+    "prescription": ("фото нарушения", "нарушения"),
+    "fix": ("фото исправления", "исправления нарушения"),
+    "delivery": ("фото накладных", "поставки"),
+}
+
+# Значения, которые вычисляются из сохранённых параметров, а не хранятся
+_DERIVED = {
+    "target_files": lambda p: _UPLOAD_TARGETS.get(p.get("target"), ("файлов", ""))[0],
+    "target_entity": lambda p: _UPLOAD_TARGETS.get(p.get("target"), ("", p.get("target")))[1],
+    "files_text": lambda p: f"{p['file_count']} файл(ов)" if (p.get("file_count") or 1) > 1 else "файл",
+    "peak_mb": lambda p: (p.get("peak_bytes") or 0) / (1024 * 1024),
+    "saved_mb": lambda p: (p.get("bytes_saved") or 0) / (1024 * 1024),
+    "review_status": lambda p: "одобрен" if p.get("approved", True) else "отклонен",
+}
+
+_OPTIONAL_RE = re.compile(r"\[([^\[\]]*)\]")
+_FIELD_RE = re.compile(r"\{(\w+)[^}]*\}")
+
+
+class _Params(dict):
+    def __missing__(self, key):
+        if key in _DERIVED:
+            return _DERIVED[key](self)
+        return f"{{{key}}}"
+
+
+def render_log_message(template: str, params: Optional[Dict[str, Any]], message: str = "", **fields) -> str:
+    """Текст записи: message для записей без шаблона, иначе шаблон с параметрами и полями записи."""
+    if not template:
+        return message
+    fmt = LOG_TEMPLATES.get(template)
+    values = _Params({**fields, **(params or {})})
+    if fmt is None:
+        return f"[{template}] {dict(params or {})}"
+    fmt = _OPTIONAL_RE.sub(
+        lambda m: m.group(1) if all(values.get(name) for name in _FIELD_RE.findall(m.group(1))) else "",
+        fmt,
+    )
+    try:
+        return fmt.format_map(values)
+    except (ValueError, TypeError):
+        return f"[{template}] {dict(params or {})}"
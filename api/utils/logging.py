@@ -1,201 +1,388 @@
 import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from django.conf import settings
+
 from api.models.log import Log, LogLevel, LogCategory
+from api.utils.log_stats import record_log_rollup
+
+logger = logging.getLogger(__name__)
+
+class _LogBuffer:
+    """Записи, ещё не записанные в БД. Общий для потоков, получивших копию контекста запроса."""
+
+    def __init__(self):
+        self.entries: List[Log] = []
+        self.lock = threading.Lock()
+        # После выхода из buffered_logs поздние записи (из потоков пула) пишутся сразу
+        self.closed = False
 
 
-def log_message(level, category, message):
-    Log.objects.create(
+# Записи лога текущего запроса (или задачи воркера), ещё не записанные в БД
+_log_buffer: ContextVar[Optional[_LogBuffer]] = ContextVar("log_buffer", default=None)
+
+
+def log_message(level, category, message="", **fields):
+    """fields — структурированные поля Log: user, object, request_method, duration_ms и т.д."""
+    entry = Log(
         level=level,
         category=category,
-        message=message
+        message=message,
+        **fields
     )
+    buffer = _log_buffer.get()
+    if buffer is not None:
+        with buffer.lock:
+            accepted = not buffer.closed
+            if accepted:
+                buffer.entries.append(entry)
+            full = len(buffer.entries) >= int(getattr(settings, "LOG_BUFFER_MAX_SIZE", 100))
+        if accepted:
+            if full:
+                flush_log_buffer()
+            return
+    # Вне buffered_logs (команды, shell) — пишем сразу, как раньше
+    entry.save()
+    record_log_rollup([entry])
+
+
+def flush_log_buffer():
+    """Записывает накопленные записи одним bulk_create; ошибка записи не должна ломать ответ."""
+    buffer = _log_buffer.get()
+    if buffer is None:
+        return
+    with buffer.lock:
+        entries = buffer.entries[:]
+        buffer.entries.clear()
+    if not entries:
+        return
+    try:
+        Log.objects.bulk_create(entries)
+    except Exception:
+        logger.exception("Не удалось записать %s записей лога", len(entries))
+        return
+    record_log_rollup(entries)
+
+
+def log_event(level, category, template, params=None, **fields):
+    """
+    Запись по шаблону из api.utils.log_templates: хранятся id шаблона и параметры,
+    текст собирается только при показе (Log.text).
+    """
+    # Пустые необязательные параметры (changes, reason...) не храним
+    params = {key: value for key, value in (params or {}).items() if value is not None}
+    log_message(level, category, template=template, params=params, **fields)
+
+
+@contextmanager
+def buffered_logs():
+    """
+    Копит записи log_message и пишет их пачкой при выходе из блока или
+    при достижении LOG_BUFFER_MAX_SIZE. Вложенные блоки используют внешний буфер.
+    LOG_BUFFER_ENABLED=False возвращает запись каждой строки сразу.
+    """
+    if not getattr(settings, "LOG_BUFFER_ENABLED", True) or _log_buffer.get() is not None:
+        yield
+        return
+    buffer = _LogBuffer()
+    token = _log_buffer.set(buffer)
+    try:
+        yield
+    finally:
+        with buffer.lock:
+            buffer.closed = True
+        flush_log_buffer()
+        _log_buffer.reset(token)
+
+
+def buffered_stream(iterable):
+    """
+    Отдаёт iterable внутри buffered_logs: тело StreamingHttpResponse читается
+    уже после LogBufferMiddleware, поэтому записи, сделанные при его отдаче,
+    копятся своим буфером и пишутся по окончании потока.
+    """
+    with buffered_logs():
+        yield from iterable
 
 
 def log_object_created(object_name, object_address, user_name, user_role):
-    message = f"Создан новый объект строительства '{object_name}' по адресу '{object_address}' пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.OBJECT, message)
+    log_event(LogLevel.INFO, LogCategory.OBJECT, "object_created", {
+        "object_name": object_name, "object_address": object_address, "user_name": user_name, "user_role": user_role,
+    })
 
 
-def log_object_viewed(object_name, user_name, user_role):
-    message = f"Просмотр объекта '{object_name}' пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.OBJECT, message)
+def log_object_updated(object_name, user_name, user_role, changes=None):
+    log_event(LogLevel.INFO, LogCategory.OBJECT, "object_updated", {
+        "object_name": object_name, "user_name": user_name, "user_role": user_role, "changes": changes,
+    })
 
 
-def log_object_updated(object_name, user_name, user_role, changes=None):
-    changes_text = f" Изменения: {changes}" if changes else ""
-    message = f"Объект '{object_name}' изменен пользователем {user_name} (роль: {user_role}){changes_text}"
-    log_message(LogLevel.INFO, LogCategory.OBJECT, message)
+def log_object_files_exported(object_name, file_count, user_name, user_role):
+    log_event(LogLevel.INFO, LogCategory.OBJECT, "object_files_exported", {
+        "object_name": object_name, "file_count": file_count, "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_object_status_changed(object_name, old_status, new_status, user_name, user_role, reason=None):
-    reason_text = f" Причина: {reason}" if reason else ""
-    message = f"Статус объекта '{object_name}' изменен с '{old_status}' на '{new_status}' пользователем {user_name} (роль: {user_role}){reason_text}"
-    log_message(LogLevel.INFO, LogCategory.OBJECT, message)
+    log_event(LogLevel.INFO, LogCategory.OBJECT, "object_status_changed", {
+        "object_name": object_name, "old_status": old_status, "new_status": new_status,
+        "user_name": user_name, "user_role": user_role, "reason": reason,
+    })
 
 
 def log_activation_requested(object_name, user_name, user_role, iko_name=None):
-    iko_text = f" Назначен ИКО: {iko_name}" if iko_name else ""
-    message = f"Запрос активации объекта '{object_name}' отправлен пользователем {user_name} (роль: {user_role}){iko_text}"
-    log_message(LogLevel.INFO, LogCategory.ACTIVATION, message)
+    log_event(LogLevel.INFO, LogCategory.ACTIVATION, "activation_requested", {
+        "object_name": object_name, "user_name": user_name, "user_role": user_role, "iko_name": iko_name,
+    })
 
 
 def log_activation_approved(object_name, iko_name, user_role):
-    message = f"Активация объекта '{object_name}' одобрена ИКО {iko_name} (роль: {user_role}). Объект переведен в статус 'Активен'"
-    log_message(LogLevel.INFO, LogCategory.ACTIVATION, message)
+    log_event(LogLevel.INFO, LogCategory.ACTIVATION, "activation_approved", {
+        "object_name": object_name, "iko_name": iko_name, "user_role": user_role,
+    })
 
 
 def log_activation_rejected(object_name, iko_name, user_role, reason=None):
-    reason_text = f" Причина отклонения: {reason}" if reason else ""
-    message = f"Активация объекта '{object_name}' отклонена ИКО {iko_name} (роль: {user_role}){reason_text}"
-    log_message(LogLevel.WARNING, LogCategory.ACTIVATION, message)
+    log_event(LogLevel.WARNING, LogCategory.ACTIVATION, "activation_rejected", {
+        "object_name": object_name, "iko_name": iko_name, "user_role": user_role, "reason": reason,
+    })
 
 
 def log_prescription_created(object_name, prescription_title, user_name, user_role):
-    message = f"Создано нарушение '{prescription_title}' для объекта '{object_name}' пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.PRESCRIPTION, message)
+    log_event(LogLevel.INFO, LogCategory.PRESCRIPTION, "prescription_created", {
+        "object_name": object_name, "prescription_title": prescription_title, "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_prescription_fixed(object_name, prescription_title, user_name, user_role):
-    message = f"Нарушение '{prescription_title}' для объекта '{object_name}' исправлено пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.PRESCRIPTION, message)
+    log_event(LogLevel.INFO, LogCategory.PRESCRIPTION, "prescription_fixed", {
+        "object_name": object_name, "prescription_title": prescription_title, "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_prescription_verified(object_name, prescription_title, user_name, user_role, approved=True, reason=None):
+    params = {"object_name": object_name, "prescription_title": prescription_title, "user_name": user_name, "user_role": user_role}
     if approved:
-        message = f"Нарушение '{prescription_title}' для объекта '{object_name}' подтверждено пользователем {user_name} (роль: {user_role})"
+        log_event(LogLevel.INFO, LogCategory.PRESCRIPTION, "prescription_approved", params)
     else:
-        reason_text = f" Причина отклонения: {reason}" if reason else ""
-        message = f"Нарушение '{prescription_title}' для объекта '{object_name}' отклонено пользователем {user_name} (роль: {user_role}){reason_text}"
-    log_message(LogLevel.INFO, LogCategory.PRESCRIPTION, message)
+        log_event(LogLevel.INFO, LogCategory.PRESCRIPTION, "prescription_rejected", {**params, "reason": reason})
 
 
 def log_delivery_created(object_name, delivery_id, user_name, user_role):
-    message = f"Создана поставка #{delivery_id} для объекта '{object_name}' пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.DELIVERY, message)
+    log_event(LogLevel.INFO, LogCategory.DELIVERY, "delivery_created", {
+        "object_name": object_name, "delivery_id": delivery_id, "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_delivery_received(object_name, delivery_id, user_name, user_role):
-    message = f"Поставка #{delivery_id} для объекта '{object_name}' получена пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.DELIVERY, message)
+    log_event(LogLevel.INFO, LogCategory.DELIVERY, "delivery_received", {
+        "object_name": object_name, "delivery_id": delivery_id, "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_delivery_accepted(object_name, delivery_id, user_name, user_role):
-    message = f"Поставка #{delivery_id} для объекта '{object_name}' принята пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.DELIVERY, message)
+    log_event(LogLevel.INFO, LogCategory.DELIVERY, "delivery_accepted", {
+        "object_name": object_name, "delivery_id": delivery_id, "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_delivery_sent_to_lab(object_name, delivery_id, user_name, user_role):
-    message = f"Поставка #{delivery_id} для объекта '{object_name}' отправлена в лабораторию пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.DELIVERY, message)
+    log_event(LogLevel.INFO, LogCategory.DELIVERY, "delivery_sent_to_lab", {
+        "object_name": object_name, "delivery_id": delivery_id, "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_work_plan_created(object_name, work_plan_title, user_name, user_role):
-    message = f"Создан график работ '{work_plan_title}' для объекта '{object_name}' пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.WORK_PLAN, message)
+    log_event(LogLevel.INFO, LogCategory.WORK_PLAN, "work_plan_created", {
+        "object_name": object_name, "work_plan_title": work_plan_title, "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_work_item_completed(object_name, work_item_name, user_name, user_role):
-    message = f"Работа '{work_item_name}' для объекта '{object_name}' завершена пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.WORK_PLAN, message)
+    log_event(LogLevel.INFO, LogCategory.WORK_PLAN, "work_item_completed", {
+        "object_name": object_name, "work_item_name": work_item_name, "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_user_login(user_name, user_role, success=True):
     if success:
-        message = f"Пользователь {user_name} (роль: {user_role}) успешно вошел в систему"
-        log_message(LogLevel.INFO, LogCategory.AUTH, message)
+        log_event(LogLevel.INFO, LogCategory.AUTH, "user_login", {"user_name": user_name, "user_role": user_role})
     else:
-        message = f"Неудачная попытка входа пользователя {user_name}"
-        log_message(LogLevel.WARNING, LogCategory.AUTH, message)
+        log_event(LogLevel.WARNING, LogCategory.AUTH, "user_login_failed", {"user_name": user_name})
 
 
 def log_user_logout(user_name, user_role):
-    message = f"Пользователь {user_name} (роль: {user_role}) вышел из системы"
-    log_message(LogLevel.INFO, LogCategory.AUTH, message)
+    log_event(LogLevel.INFO, LogCategory.AUTH, "user_logout", {"user_name": user_name, "user_role": user_role})
 
 
 def log_error(error_message, category=LogCategory.SYSTEM):
-    log_message(LogLevel.ERROR, category, f"Ошибка: {error_message}")
+    log_event(LogLevel.ERROR, category, "error", {"error_message": str(error_message)})
 
 
 def log_warning(warning_message, category=LogCategory.SYSTEM):
-    log_message(LogLevel.WARNING, category, f"Предупреждение: {warning_message}")
+    log_event(LogLevel.WARNING, category, "warning", {"warning_message": str(warning_message)})
 
 
 def log_notification_sent(recipient_email, recipient_name, subject, user_name, user_role):
-    message = f"Отправлено уведомление '{subject}' на {recipient_email} от {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.SYSTEM, message)
+    log_event(LogLevel.INFO, LogCategory.SYSTEM, "notification_sent", {
+        "recipient_email": recipient_email, "subject": subject, "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_notification_failed(recipient_email, subject, error_message, user_name, user_role):
-    message = f"Ошибка отправки уведомления '{subject}' на {recipient_email}: {error_message}. Отправитель: {user_name} (роль: {user_role})"
-    log_message(LogLevel.ERROR, LogCategory.SYSTEM, message)
+    log_event(LogLevel.ERROR, LogCategory.SYSTEM, "notification_failed", {
+        "recipient_email": recipient_email, "subject": subject, "error_message": str(error_message),
+        "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_area_created(area_name, object_name, user_name, user_role):
-    message = f"Создан полигон '{area_name}' для объекта '{object_name}' пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.AREA, message)
-
-
-def log_area_viewed(area_name, user_name, user_role):
-    message = f"Просмотр полигона '{area_name}' пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.AREA, message)
+    log_event(LogLevel.INFO, LogCategory.AREA, "area_created", {
+        "area_name": area_name, "object_name": object_name, "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_user_created(user_name, user_email, user_role, created_by_name, created_by_role):
-    message = f"Создан пользователь {user_name} ({user_email}) с ролью {user_role} пользователем {created_by_name} (роль: {created_by_role})"
-    log_message(LogLevel.INFO, LogCategory.USER, message)
+    log_event(LogLevel.INFO, LogCategory.USER, "user_created", {
+        "user_name": user_name, "user_email": user_email, "user_role": user_role,
+        "created_by_name": created_by_name, "created_by_role": created_by_role,
+    })
 
 
 def log_user_updated(user_name, user_email, user_role, updated_by_name, updated_by_role):
-    message = f"Пользователь {user_name} ({user_email}) с ролью {user_role} изменен пользователем {updated_by_name} (роль: {updated_by_role})"
-    log_message(LogLevel.INFO, LogCategory.USER, message)
+    log_event(LogLevel.INFO, LogCategory.USER, "user_updated", {
+        "user_name": user_name, "user_email": user_email, "user_role": user_role,
+        "updated_by_name": updated_by_name, "updated_by_role": updated_by_role,
+    })
 
 
 def log_daily_checklist_created(object_name, checklist_id, user_name, user_role):
-    message = f"Создан ежедневный чек-лист #{checklist_id} для объекта '{object_name}' пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.SYSTEM, message)
+    log_event(LogLevel.INFO, LogCategory.SYSTEM, "daily_checklist_created", {
+        "object_name": object_name, "checklist_id": checklist_id, "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_daily_checklist_reviewed(object_name, checklist_id, user_name, user_role, approved=True):
-    status = "одобрен" if approved else "отклонен"
-    message = f"Ежедневный чек-лист #{checklist_id} для объекта '{object_name}' {status} пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.SYSTEM, message)
+    log_event(LogLevel.INFO, LogCategory.SYSTEM, "daily_checklist_reviewed", {
+        "object_name": object_name, "checklist_id": checklist_id, "user_name": user_name, "user_role": user_role,
+        "approved": bool(approved),
+    })
 
 
 def log_work_created(object_name, work_title, user_name, user_role):
-    message = f"Создана работа '{work_title}' для объекта '{object_name}' пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.SYSTEM, message)
+    log_event(LogLevel.INFO, LogCategory.SYSTEM, "work_created", {
+        "object_name": object_name, "work_title": work_title, "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_memo_created(object_name, memo_title, user_name, user_role):
-    message = f"Создано мемо '{memo_title}' для объекта '{object_name}' пользователем {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.SYSTEM, message)
+    log_event(LogLevel.INFO, LogCategory.SYSTEM, "memo_created", {
+        "object_name": object_name, "memo_title": memo_title, "user_name": user_name, "user_role": user_role,
+    })
 
 
 def log_file_upload_success(file_type, entity_name, entity_id, folder_url, user_name, user_role, file_count=1):
-    files_text = f"{file_count} файл(ов)" if file_count > 1 else "файл"
-    message = f"Успешно загружен {files_text} {file_type} для '{entity_name}' (ID: {entity_id}) в файловое хранилище: {folder_url}. Пользователь: {user_name} (роль: {user_role})"
-    log_message(LogLevel.INFO, LogCategory.FILE_STORAGE, message)
+    log_event(LogLevel.INFO, LogCategory.FILE_STORAGE, "file_upload_success", {
+        "file_type": file_type, "entity_name": entity_name, "entity_id": entity_id, "folder_url": folder_url,
+        "user_name": user_name, "user_role": user_role, "file_count": file_count,
+    })
 
 
 def log_file_upload_failed(file_type, entity_name, entity_id, error_message, user_name, user_role, file_count=1):
-    files_text = f"{file_count} файл(ов)" if file_count > 1 else "файл"
-    message = f"Ошибка загрузки {files_text} {file_type} для '{entity_name}' (ID: {entity_id}): {error_message}. Пользователь: {user_name} (роль: {user_role})"
-    log_message(LogLevel.ERROR, LogCategory.FILE_STORAGE, message)
+    log_event(LogLevel.ERROR, LogCategory.FILE_STORAGE, "file_upload_failed", {
+        "file_type": file_type, "entity_name": entity_name, "entity_id": entity_id, "error_message": str(error_message),
+        "user_name": user_name, "user_role": user_role, "file_count": file_count,
+    })
 
 
 def log_file_storage_connection_failed(operation, error_message):
-    message = f"Ошибка подключения к файловому хранилищу при операции '{operation}': {error_message}"
-    log_message(LogLevel.ERROR, LogCategory.FILE_STORAGE, message)
+    log_event(LogLevel.ERROR, LogCategory.FILE_STORAGE, "file_storage_connection_failed", {
+        "operation": operation, "error_message": str(error_message),
+    })
 
 
 def log_file_storage_timeout(operation, timeout_seconds):
-    message = f"Таймаут при операции '{operation}' с файловым хранилищем (превышено {timeout_seconds} секунд)"
-    log_message(LogLevel.WARNING, LogCategory.FILE_STORAGE, message)
+    log_event(LogLevel.WARNING, LogCategory.FILE_STORAGE, "file_storage_timeout", {
+        "operation": operation, "timeout_seconds": timeout_seconds,
+    })
 
 
 def log_file_storage_response_error(operation, status_code, response_text):
-    message = f"Ошибка ответа от файлового хранилища при операции '{operation}': HTTP {status_code}, ответ: {response_text[:200]}..."
-    log_message(LogLevel.ERROR, LogCategory.FILE_STORAGE, message)
+    log_event(LogLevel.ERROR, LogCategory.FILE_STORAGE, "file_storage_response_error", {
+        "operation": operation, "status_code": status_code, "response_text": response_text[:200],
+    })
+
+
+def log_file_storage_batch_deadline(operation, done_count, total_count, deadline_seconds):
+    log_event(LogLevel.WARNING, LogCategory.FILE_STORAGE, "file_storage_batch_deadline", {
+        "operation": operation, "done_count": done_count, "total_count": total_count, "deadline_seconds": deadline_seconds,
+    })
+
+
+def log_file_storage_late_upload(operation, url):
+    log_event(LogLevel.WARNING, LogCategory.FILE_STORAGE, "file_storage_late_upload", {
+        "operation": operation, "url": url,
+    })
+
+
+def log_file_storage_peak_memory(operation, file_count, peak_bytes):
+    log_event(LogLevel.INFO, LogCategory.FILE_STORAGE, "file_storage_peak_memory", {
+        "operation": operation, "file_count": file_count, "peak_bytes": peak_bytes,
+    })
+
+
+def log_upload_ticket_issued(kind_display, entity_id, user_name, user_role):
+    log_event(LogLevel.INFO, LogCategory.FILE_STORAGE, "upload_ticket_issued", {
+        "kind_display": kind_display, "entity_id": entity_id, "user_name": user_name, "user_role": user_role,
+    })
+
+
+def log_upload_ticket_confirmed(kind_display, entity_id, file_count, user_name, user_role):
+    log_file_upload_success(f"({kind_display.lower()}, прямая загрузка)", f"#{entity_id}", entity_id, f"{file_count} файл(ов)", user_name, user_role, file_count)
+
+
+def log_file_storage_dedupe_hits(operation, hit_count, total_count, bytes_saved):
+    log_event(LogLevel.INFO, LogCategory.FILE_STORAGE, "file_storage_dedupe_hits", {
+        "operation": operation, "hit_count": hit_count, "total_count": total_count, "bytes_saved": bytes_saved,
+    })
+
+
+def log_file_storage_upload_started(target, entity_id, file_count, storage_url, tag=None):
+    log_event(LogLevel.INFO, LogCategory.FILE_STORAGE, "file_storage_upload_started", {
+        "target": target, "entity_id": entity_id, "file_count": file_count, "storage_url": storage_url, "tag": tag,
+    })
+
+
+def log_file_storage_file_uploading(target, entity_id, file_index, file_count):
+    log_event(LogLevel.INFO, LogCategory.FILE_STORAGE, "file_storage_file_uploading", {
+        "target": target, "entity_id": entity_id, "file_index": file_index, "file_count": file_count,
+    })
+
+
+def log_file_storage_file_uploaded(target, entity_id, file_index, url):
+    log_event(LogLevel.INFO, LogCategory.FILE_STORAGE, "file_storage_file_uploaded", {
+        "target": target, "entity_id": entity_id, "file_index": file_index, "url": url,
+    })
+
+
+def log_file_storage_file_failed(target, entity_id, file_index, error_message):
+    log_event(LogLevel.ERROR, LogCategory.FILE_STORAGE, "file_storage_file_failed", {
+        "target": target, "entity_id": entity_id, "file_index": file_index, "error_message": str(error_message),
+    })
+
+
+def log_file_storage_upload_finished(target, entity_id, uploaded_count, file_count):
+    if uploaded_count:
+        log_event(LogLevel.INFO, LogCategory.FILE_STORAGE, "file_storage_upload_finished", {
+            "target": target, "entity_id": entity_id, "uploaded_count": uploaded_count, "file_count": file_count,
+        })
+    else:
+        log_event(LogLevel.ERROR, LogCategory.FILE_STORAGE, "file_storage_upload_empty", {
+            "target": target, "entity_id": entity_id, "file_count": file_count,
+        })
 
 
 def log_object_documents_uploaded(object_name, object_id, folder_url, user_name, user_role, file_count):
@@ -228,3 +415,18 @@ def log_invoice_photos_uploaded(delivery_id, folder_url, user_name, user_role, f
 
 def log_invoice_photos_upload_failed(delivery_id, error_message, user_name, user_role, file_count):
     log_file_upload_failed("фото накладных", f"поставка #{delivery_id}", delivery_id, error_message, user_name, user_role, file_count)
+
+
+def log_api_request(method, path, status, duration_ms, db_time_ms, db_queries, user_id=None, object_id=None):
+    if status >= 500:
+        level = LogLevel.ERROR
+    elif status >= 400:
+        level = LogLevel.WARNING
+    else:
+        level = LogLevel.INFO
+    # Всё нужное для текста уже в структурированных полях — параметры не дублируются
+    log_event(
+        level, LogCategory.API, "api_request",
+        user_id=user_id, object_id=object_id, request_method=method, request_path=path[:500],
+        response_status=status, duration_ms=duration_ms, db_time_ms=db_time_ms, db_queries=db_queries,
+    )
@@ -0,0 +1,144 @@
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db.models import Case, ExpressionWrapper, IntegerField, Q, Value, When
+
+from api.models.storage import PhotoHash
+
+
+_HASH_BITS = 64
+_BLOCK_BITS = 16
+_BLOCKS = _HASH_BITS // _BLOCK_BITS
+
+
+def _to_signed(value: int) -> int:
+    # BigIntegerField знаковый, храним 64 бита хэша в дополнительном коде
+    return value - (1 << _HASH_BITS) if value >= 1 << (_HASH_BITS - 1) else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value & ((1 << _HASH_BITS) - 1)
+
+
+def _blocks(value: int) -> List[int]:
+    mask = (1 << _BLOCK_BITS) - 1
+    return [(value >> (_BLOCK_BITS * (_BLOCKS - 1 - i))) & mask for i in range(_BLOCKS)]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(_to_unsigned(a) ^ _to_unsigned(b)).count("1")
+
+
+def _hash_fields(value: int) -> Dict:
+    fields = {"phash": _to_signed(value), "status": "hashed", "error": ""}
+    for i, block in enumerate(_blocks(value)):
+        fields[f"block{i}"] = block
+    return fields
+
+
+def store_photo_hashes(hashes: Dict[str, int]) -> None:
+    """Сохраняет хэши, посчитанные при обработке фото перед загрузкой (url → dHash)."""
+    for url, value in hashes.items():
+        PhotoHash.objects.update_or_create(url=url, defaults=_hash_fields(value))
+
+
+def register_photos(kind: str, entity_id: int, object_id: Optional[int], urls: Iterable[str]) -> None:
+    """
+    Привязывает фото к сущности и ставит ещё не посчитанные хэши в очередь.
+
+    Хэши для ссылок, загруженных клиентом напрямую, считает run_upload_worker
+    (hash_pending_photos): скачивает фото и считает dHash в пуле процессов.
+    """
+    urls = [u for u in dict.fromkeys(urls or []) if u]
+    if not urls:
+        return
+    existing = set(PhotoHash.objects.filter(url__in=urls).values_list("url", flat=True))
+    PhotoHash.objects.filter(url__in=existing, entity_id__isnull=True).update(kind=kind, entity_id=entity_id, object_id=object_id)
+    PhotoHash.objects.bulk_create(
+        [PhotoHash(url=u, kind=kind, entity_id=entity_id, object_id=object_id) for u in urls if u not in existing],
+        ignore_conflicts=True,
+    )
+
+
+def hash_pending_photos(limit: int = 20) -> int:
+    from api.utils.file_storage import file_storage_client
+    from api.utils.images import perceptual_hash
+
+    max_bytes = int(getattr(settings, "PHOTO_HASH_MAX_DOWNLOAD", 30 * 1024 * 1024))
+    processed = 0
+    for photo in PhotoHash.objects.filter(status="pending").order_by("created_at")[:limit]:
+        processed += 1
+        try:
+            resp = file_storage_client.session.get(photo.url, timeout=file_storage_client.request_timeout, stream=True)
+            resp.raise_for_status()
+            data = resp.raw.read(max_bytes + 1, decode_content=True)
+            resp.close()
+            if len(data) > max_bytes:
+                raise ValueError("Файл слишком большой для расчёта хэша")
+            value = perceptual_hash(data)
+            if value is None:
+                raise ValueError("Не удалось прочитать изображение")
+        except Exception as e:
+            PhotoHash.objects.filter(pk=photo.pk).update(status="failed", error=str(e)[:1000])
+            continue
+        PhotoHash.objects.filter(pk=photo.pk).update(**_hash_fields(value))
+    return processed
+
+
+def find_similar(value: int, max_distance: Optional[int] = None, exclude_urls: Iterable[str] = ()) -> List[Dict]:
+    """
+    Фото с расстоянием Хэмминга до value не больше max_distance.
+
+    Кандидаты — строки, совпадающие с value хотя бы в одном 16-битном блоке
+    (индексный поиск); для них считается точное расстояние. При max_distance ≤ 3
+    поиск полный, при большем — находит только фото с хотя бы одним общим блоком.
+
+    Кандидатов не больше PHOTO_SIMILARITY_MAX_CANDIDATES; отбираются строки с
+    наибольшим числом совпавших блоков: у фото на расстоянии d их не меньше
+    4 - d, поэтому близкие совпадения не отсекаются лимитом.
+    """
+    if max_distance is None:
+        max_distance = int(getattr(settings, "PHOTO_SIMILARITY_MAX_DISTANCE", 6))
+    condition = Q()
+    matched_blocks = Value(0)
+    for i, block in enumerate(_blocks(value)):
+        condition |= Q(**{f"block{i}": block})
+        matched_blocks = matched_blocks + Case(When(**{f"block{i}": block}, then=Value(1)), default=Value(0))
+
+    max_candidates = int(getattr(settings, "PHOTO_SIMILARITY_MAX_CANDIDATES", 1000))
+    matches = []
+    candidates = (
+        PhotoHash.objects.filter(condition, status="hashed")
+        .exclude(url__in=list(exclude_urls))
+        .annotate(matched_blocks=ExpressionWrapper(matched_blocks, output_field=IntegerField()))
+        .order_by("-matched_blocks", "id")
+        .values("url", "kind", "entity_id", "object_id", "phash")[:max_candidates]
+    )
+    for row in candidates:
+        distance = hamming_distance(value, row.pop("phash"))
+        if distance <= max_distance:
+            row["distance"] = distance
+            matches.append(row)
+    matches.sort(key=lambda m: m["distance"])
+    return matches
+
+
+def similar_photos_for_prescription(prescription) -> List[Dict]:
+    """Для каждого фото нарушения и исправлений — похожие фото в других местах."""
+    own = [(url, "violation") for url in prescription.violation_photos_folder_url or []]
+    for fix in prescription.fixes.all():
+        own += [(url, "fix") for url in fix.fix_photos_folder_url or []]
+    if not own:
+        return []
+
+    hashes = dict(PhotoHash.objects.filter(url__in=[u for u, _ in own], status="hashed").values_list("url", "phash"))
+    result = []
+    for url, kind in own:
+        if url not in hashes:
+            continue
+        matches = find_similar(hashes[url], exclude_urls=[url])
+        if matches:
+            for m in matches:
+                m["same_object"] = m["object_id"] == prescription.object_id
+            result.append({"url": url, "kind": kind, "matches": matches})
+    return result
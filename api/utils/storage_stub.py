@@ -0,0 +1,276 @@
+import base64
+import binascii
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+import jwt
+
+
+# Локальная заглушка файлового хранилища: те же маршруты /upload/... и /browse/...,
+# что использует FileStorageClient, с искусственной задержкой и ошибками.
+# Модуль не зависит от Django — сервер можно запускать в отдельном процессе.
+
+_UPLOAD_ROUTES = [
+    re.compile(r"^/upload/docs/object/(?P<object>[^/]+)$"),
+    re.compile(r"^/upload/foreman/visit/(?P<foreman>[^/]+)$"),
+    re.compile(r"^/upload/violation/(?P<tag>[^/]+)/(?P<violation>[^/]+)/creation$"),
+    re.compile(r"^/upload/violation/(?P<violation>[^/]+)/correction/by-foreman/(?P<foreman>[^/]+)$"),
+    re.compile(r"^/upload/delivery/(?P<object>[^/]+)/(?P<delivery>[^/]+)$"),
+    # Превью фото: thumbs/ + путь папки оригинала, в листинги browse не попадают
+    re.compile(r"^/upload/thumbs/(?P<folder>.+[^/])$"),
+]
+_BROWSE_ROUTES = [
+    re.compile(r"^/browse/object/(?P<object>[^/]+)$"),
+    re.compile(r"^/browse/foreman/(?P<foreman>[^/]+)$"),
+    re.compile(r"^/browse/violation/(?P<tag>[^/]+)/(?P<violation>[^/]+)$"),
+]
+# Аудитория билетов прямой загрузки (api.utils.upload_tickets.TICKET_AUDIENCE)
+_TICKET_AUDIENCE = "file-storage"
+_EXTENSIONS = {"image/png": "png", "image/webp": "webp", "image/heic": "heic", "image/heif": "heif", "application/pdf": "pdf"}
+_READ_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class StubOptions:
+    latency: float = 0.0          # базовая задержка ответа, секунд
+    jitter: float = 0.0           # случайная добавка к задержке, секунд
+    error_rate: float = 0.0       # доля запросов, на которые отвечаем error_status
+    error_status: int = 503
+    presign_ttl: int = 3600       # X-Amz-Expires у ссылок в листингах
+    storage_dir: Optional[str] = None  # куда сохранять файлы; без него хранятся только метаданные
+    ticket_secret: Optional[str] = None  # секрет билетов прямой загрузки (X-Upload-Ticket); без него билеты не принимаются
+
+
+class _Store:
+    """Метаданные загруженных файлов по папкам (путь upload без префикса)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.folders: Dict[str, List[Dict]] = {}
+        self.ticket_files: Dict[str, int] = {}  # jti → сколько файлов уже принято по билету
+
+    def use_ticket(self, jti: str, count: int, max_files: int) -> bool:
+        with self.lock:
+            used = self.ticket_files.get(jti, 0)
+            if used + count > max_files:
+                return False
+            self.ticket_files[jti] = used + count
+            return True
+
+    def add(self, folder: str, entry: Dict) -> None:
+        with self.lock:
+            self.folders.setdefault(folder, []).append(entry)
+
+    def list(self, prefix: str) -> List[Dict]:
+        with self.lock:
+            return [dict(e) for folder, entries in self.folders.items() if folder == prefix or folder.startswith(prefix + "/") for e in entries]
+
+
+class StorageStubHandler(BaseHTTPRequestHandler):
+    server_version = "StorageStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def options(self) -> StubOptions:
+        return self.server.options
+
+    def _delay_or_fail(self) -> bool:
+        opts = self.options
+        delay = opts.latency + (random.uniform(0, opts.jitter) if opts.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+        if opts.error_rate and random.random() < opts.error_rate:
+            self._send_json(opts.error_status, {"detail": "Искусственная ошибка заглушки"})
+            return True
+        return False
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        remaining = int(self.headers.get("Content-Length") or 0)
+        chunks = []
+        while remaining > 0:
+            chunk = self.rfile.read(min(_READ_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+    @staticmethod
+    def _match(routes, path: str) -> bool:
+        return any(r.match(path) for r in routes)
+
+    def _file_url(self, folder: str, name: str) -> str:
+        host = self.headers.get("Host") or "%s:%s" % self.server.server_address[:2]
+        return f"http://{host}/upload/{quote(folder)}/{quote(name)}"
+
+    def _save(self, folder: str, data: bytes, content_type: str, name: Optional[str] = None) -> Dict:
+        # Имена уникальны, как у настоящего хранилища: повторная загрузка не затирает файл
+        name = f"{uuid.uuid4().hex[:8]}_{name}" if name else f"{uuid.uuid4().hex}.{_EXTENSIONS.get(content_type, 'jpg')}"
+        if self.options.storage_dir:
+            path = os.path.join(self.options.storage_dir, folder, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as fh:
+                fh.write(data)
+        entry = {
+            "key": f"{folder}/{name}",
+            "name": name,
+            "url": self._file_url(folder, name),
+            "size": len(data),
+            "content_type": content_type,
+            "last_modified": datetime.now(timezone.utc).isoformat(),
+        }
+        self.server.store.add(folder, entry)
+        return entry
+
+    def _parse_photos(self, body: bytes) -> List[Tuple[bytes, str]]:
+        payload = json.loads(body)
+        photos = []
+        for item in payload.get("photos_base64") or []:
+            header, _, data = item.partition(",") if item.startswith("data:") else ("", "", item)
+            content_type = header[5:].split(";", 1)[0] if header else "image/jpeg"
+            photos.append((base64.b64decode(data), content_type or "image/jpeg"))
+        return photos
+
+    def _parse_multipart(self, body: bytes) -> List[Tuple[bytes, str, str]]:
+        match = re.search(r"boundary=([^;]+)", self.headers.get("Content-Type", ""))
+        if not match:
+            raise ValueError("multipart без boundary")
+        boundary = b"--" + match.group(1).strip('"').encode("ascii")
+        files = []
+        for part in body.split(boundary)[1:-1]:
+            head, _, data = part.lstrip(b"\r\n").partition(b"\r\n\r\n")
+            head_text = head.decode("utf-8", "replace")
+            filename = re.search(r'filename="([^"]*)"', head_text)
+            content_type = re.search(r"Content-Type:\s*([^\r\n]+)", head_text, re.I)
+            files.append((
+                data[:-2] if data.endswith(b"\r\n") else data,
+                content_type.group(1).strip() if content_type else "application/octet-stream",
+                os.path.basename(unquote(filename.group(1))) if filename else "",
+            ))
+        return files
+
+    def _check_ticket(self, token: str, path: str, count: int) -> Optional[str]:
+        """Проверяет билет прямой загрузки как настоящее хранилище; возвращает текст ошибки."""
+        if not self.options.ticket_secret:
+            return "Прямая загрузка не настроена"
+        try:
+            payload = jwt.decode(token, self.options.ticket_secret, algorithms=["HS256"], audience=_TICKET_AUDIENCE)
+            jti, ticket_path, max_files = str(payload["jti"]), payload["path"], int(payload["max_files"])
+        except (jwt.InvalidTokenError, KeyError, TypeError, ValueError) as e:
+            return f"Недействительный билет: {e}"
+        if ticket_path != path:
+            return "Билет выдан на другой путь"
+        if not self.server.store.use_ticket(jti, count, max_files):
+            return f"Билет допускает не больше {max_files} файлов"
+        return None
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        body = self._read_body()
+        if not self._match(_UPLOAD_ROUTES, path):
+            return self._send_json(404, {"detail": "Not found"})
+        if self._delay_or_fail():
+            return
+        folder = unquote(path[len("/upload/"):])
+        try:
+            if self.headers.get("Content-Type", "").startswith("multipart/form-data"):
+                parsed = [(data, ctype, name or None) for data, ctype, name in self._parse_multipart(body)]
+            else:
+                parsed = [(data, ctype, None) for data, ctype in self._parse_photos(body)]
+        except (ValueError, binascii.Error) as e:
+            return self._send_json(400, {"detail": f"Некорректное тело запроса: {e}"})
+        # Загрузка клиента напрямую идёт по билету; бэкенд ходит со своим токеном без билета
+        token = self.headers.get("X-Upload-Ticket")
+        if token:
+            error = self._check_ticket(token, unquote(path), len(parsed))
+            if error:
+                return self._send_json(403, {"detail": error})
+        files = [self._save(folder, data, ctype, name) for data, ctype, name in parsed]
+        self._send_json(200, {"files": files})
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path.startswith("/upload/"):
+            return self._serve_file(unquote(path[len("/upload/"):]))
+        if not self._match(_BROWSE_ROUTES, path):
+            return self._send_json(404, {"detail": "Not found"})
+        if self._delay_or_fail():
+            return
+
+        kind, _, rest = unquote(path[len("/browse/"):]).partition("/")
+        prefix = {"object": "docs/object/{0}", "foreman": "foreman/visit/{0}"}.get(kind, "violation/{0}").format(rest)
+        files = self.server.store.list(prefix)
+        if kind == "object":
+            files += self.server.store.list(f"delivery/{rest}")
+        elif kind == "violation":
+            violation_id = rest.split("/", 1)[-1]
+            files += self.server.store.list(f"violation/{violation_id}/correction")
+        signed_at = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        for f in files:
+            f["presigned_url"] = f"{f['url']}?X-Amz-Date={signed_at}&X-Amz-Expires={self.options.presign_ttl}"
+        self._send_json(200, {"files": files})
+
+    def _serve_file(self, rel_path: str) -> None:
+        if not self.options.storage_dir or ".." in rel_path.split("/"):
+            return self._send_json(404, {"detail": "Not found"})
+        try:
+            with open(os.path.join(self.options.storage_dir, rel_path), "rb") as fh:
+                data = fh.read()
+        except OSError:
+            return self._send_json(404, {"detail": "Not found"})
+        self.send_response(200)
+        self.send_header("Content-Type", _content_type_for(rel_path))
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _content_type_for(name: str) -> str:
+    ext = name.rsplit(".", 1)[-1].lower()
+    return {v: k for k, v in _EXTENSIONS.items()}.get(ext, "image/jpeg")
+
+
+class StorageStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], options: Optional[StubOptions] = None):
+        super().__init__(address, StorageStubHandler)
+        self.options = options or StubOptions()
+        self.store = _Store()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def serve_storage_stub(host: str, port: int, options: StubOptions, ready=None) -> None:
+    """Запускает заглушку до остановки процесса; в ready (очередь) кладёт её URL."""
+    server = StorageStubServer((host, port), options)
+    if ready is not None:
+        ready.put(server.url)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
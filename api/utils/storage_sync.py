@@ -0,0 +1,188 @@
+import mimetypes
+import posixpath
+from datetime import timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from api.models.documents import DocumentFile, Folder, StorageSyncState
+from api.models.object import ConstructionObject
+from api.utils.file_storage import is_thumbnail_path
+
+
+class StorageSyncError(Exception):
+    pass
+
+
+def _listing_items(data) -> List[Dict]:
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        for field in ("files", "items", "objects"):
+            if isinstance(data.get(field), list):
+                return data[field]
+    return []
+
+
+def _parse_entry(item: Dict) -> Optional[Dict]:
+    """Запись листинга хранилища → ключ, папка, имя, URL, размер, тип, время изменения."""
+    if not isinstance(item, dict):
+        return None
+    url = item.get("url") or item.get("presigned_url")
+    if not url:
+        return None
+    key = item.get("key") or item.get("path") or unquote(urlsplit(url).path).lstrip("/")
+    key = key.strip("/")
+    if is_thumbnail_path(key):
+        # Превью фото — служебные файлы, в документы объекта не зеркалируются
+        return None
+    name = item.get("name") or posixpath.basename(key)
+    modified = item.get("last_modified") or item.get("modified_at") or item.get("modified")
+    modified_at = parse_datetime(modified) if isinstance(modified, str) else None
+    if modified_at is not None and timezone.is_naive(modified_at):
+        modified_at = timezone.make_aware(modified_at, dt_timezone.utc)
+    size = item.get("size")
+    return {
+        "key": key[:1024],
+        "folder": posixpath.dirname(key),
+        "name": name[:255],
+        "url": url,
+        "size_bytes": int(size) if isinstance(size, (int, float)) or (isinstance(size, str) and size.isdigit()) else None,
+        "content_type": (item.get("content_type") or mimetypes.guess_type(name)[0] or "")[:128],
+        "storage_modified_at": modified_at,
+    }
+
+
+def _ensure_folders(obj: ConstructionObject, paths: List[str], folders: Dict[str, Folder]) -> None:
+    """Создаёт недостающие папки вместе с родительскими; folders — кэш путь → Folder."""
+    for path in sorted(set(paths)):
+        parts = path.split("/") if path else []
+        for depth in range(1, len(parts) + 1):
+            sub_path = "/".join(parts[:depth])
+            if sub_path in folders:
+                continue
+            folders[sub_path], _ = Folder.objects.get_or_create(
+                object=obj,
+                path=sub_path,
+                defaults={"name": parts[depth - 1][:255], "parent": folders.get("/".join(parts[:depth - 1]))},
+            )
+
+
+def sync_object_storage(obj: ConstructionObject, full: bool = False) -> Dict[str, int]:
+    """
+    Приводит Folder/DocumentFile объекта к листингу browse_object.
+
+    Записи, изменённые в хранилище не позже курсора и уже известные, не
+    трогаются; записываются только новые и изменившиеся файлы, исчезнувшие из
+    листинга удаляются. full=True игнорирует курсор.
+    """
+    from api.utils.file_storage import file_storage_client
+
+    state, _ = StorageSyncState.objects.get_or_create(object=obj)
+    data = file_storage_client.browse_object(obj.id, use_cache=False)
+    if data is None:
+        state.status, state.error, state.last_synced_at = "failed", "Хранилище не вернуло листинг", timezone.now()
+        state.save(update_fields=["status", "error", "last_synced_at", "modified_at"])
+        raise StorageSyncError(state.error)
+
+    entries = {}
+    for item in _listing_items(data):
+        entry = _parse_entry(item)
+        if entry:
+            entries[entry["key"]] = entry
+
+    cursor = None if full else state.cursor
+    existing = {
+        row["storage_key"]: row
+        for row in DocumentFile.objects.filter(object=obj).exclude(storage_key="").values(
+            "id", "storage_key", "url", "size_bytes", "storage_modified_at"
+        )
+    }
+    new = [e for key, e in entries.items() if key not in existing]
+    changed = []
+    for key, e in entries.items():
+        row = existing.get(key)
+        if row is None:
+            continue
+        if cursor is not None and e["storage_modified_at"] is not None and e["storage_modified_at"] <= cursor:
+            continue
+        if (e["url"], e["size_bytes"], e["storage_modified_at"]) != (row["url"], row["size_bytes"], row["storage_modified_at"]):
+            changed.append((row["id"], e))
+    removed = [row["id"] for key, row in existing.items() if key not in entries]
+
+    with transaction.atomic():
+        folders = {f.path: f for f in Folder.objects.filter(object=obj).exclude(path="")}
+        _ensure_folders(obj, [e["folder"] for e in new] + [e["folder"] for _, e in changed], folders)
+        DocumentFile.objects.bulk_create(
+            [
+                DocumentFile(
+                    object=obj,
+                    folder=folders.get(e["folder"]),
+                    name=e["name"],
+                    url=e["url"],
+                    size_bytes=e["size_bytes"],
+                    content_type=e["content_type"],
+                    storage_key=e["key"],
+                    storage_modified_at=e["storage_modified_at"],
+                )
+                for e in new
+            ],
+            ignore_conflicts=True,
+        )
+        for pk, e in changed:
+            DocumentFile.objects.filter(pk=pk).update(
+                folder=folders.get(e["folder"]),
+                name=e["name"],
+                url=e["url"],
+                size_bytes=e["size_bytes"],
+                content_type=e["content_type"],
+                storage_modified_at=e["storage_modified_at"],
+                modified_at=timezone.now(),
+            )
+        if removed:
+            DocumentFile.objects.filter(pk__in=removed).delete()
+        if removed or full:
+            # Папки без файлов и подпапок больше не нужны (от листьев к корню)
+            for folder in sorted(folders.values(), key=lambda f: -f.path.count("/")):
+                if not folder.files.exists() and not folder.children.exists():
+                    folder.delete()
+
+        modified = [e["storage_modified_at"] for e in entries.values() if e["storage_modified_at"]]
+        if modified:
+            state.cursor = max(modified + ([state.cursor] if state.cursor and not full else []))
+        state.status, state.error = "ok", ""
+        state.last_synced_at = timezone.now()
+        state.files_count = len(entries)
+        state.total_size_bytes = sum(e["size_bytes"] or 0 for e in entries.values())
+        state.save()
+
+    return {"new": len(new), "changed": len(changed), "removed": len(removed), "total": len(entries)}
+
+
+def objects_due_for_sync(limit: int):
+    """Объекты, которые ни разу не синхронизировались или синхронизировались дольше STORAGE_SYNC_INTERVAL назад."""
+    interval = timedelta(seconds=int(getattr(settings, "STORAGE_SYNC_INTERVAL", 900)))
+    return (
+        ConstructionObject.objects.filter(
+            Q(storage_sync__isnull=True) | Q(storage_sync__last_synced_at__isnull=True)
+            | Q(storage_sync__last_synced_at__lt=timezone.now() - interval)
+        )
+        .order_by(F("storage_sync__last_synced_at").asc(nulls_first=True), "id")[:limit]
+    )
+
+
+def sync_storage_tree(limit: int = 10) -> int:
+    """Синхронизирует до limit объектов, давно не сверявшихся с хранилищем. Возвращает их число."""
+    synced = 0
+    for obj in objects_due_for_sync(limit):
+        try:
+            sync_object_storage(obj)
+        except StorageSyncError:
+            pass
+        synced += 1
+    return synced
@@ -0,0 +1,30 @@
+from typing import Dict, Optional
+
+from django.db.models import F
+from django.utils import timezone
+
+from api.models.storage import StorageUsage
+
+
+def record_storage_usage(object_id: Optional[int], category: str, files: int, size_bytes: int) -> None:
+    """Прибавляет загруженные файлы к счётчикам объекта (атомарно, через F-выражения)."""
+    if not object_id or (not files and not size_bytes):
+        return
+    usage, _ = StorageUsage.objects.get_or_create(object_id=object_id, category=category)
+    StorageUsage.objects.filter(pk=usage.pk).update(
+        files_count=F("files_count") + files,
+        size_bytes=F("size_bytes") + size_bytes,
+        last_upload_at=timezone.now(),
+    )
+
+
+def object_storage_usage(obj) -> Dict:
+    """Счётчики объекта по категориям и итог; obj.storage_usage можно заранее подгрузить prefetch_related."""
+    categories = {key: {"files_count": 0, "size_bytes": 0} for key, _ in StorageUsage.CATEGORY}
+    for usage in obj.storage_usage.all():
+        categories[usage.category] = {"files_count": usage.files_count, "size_bytes": usage.size_bytes}
+    return {
+        "categories": categories,
+        "files_count": sum(c["files_count"] for c in categories.values()),
+        "size_bytes": sum(c["size_bytes"] for c in categories.values()),
+    }
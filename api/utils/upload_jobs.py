@@ -0,0 +1,197 @@
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import List, Optional, Any, Union, Dict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from api.models.delivery import Delivery
+from api.models.object import ConstructionObject
+from api.models.upload import UploadJob, UploadJobFile
+from api.utils.photo_hashes import register_photos
+
+
+def _staging_root() -> str:
+    return str(getattr(settings, "UPLOAD_STAGING_DIR", os.path.join(settings.BASE_DIR, "media", "staging")))
+
+
+def _job_dir(job: UploadJob) -> str:
+    return os.path.join(_staging_root(), str(job.uuid_job))
+
+
+def create_upload_job(
+    kind: str,
+    files: List[Union[str, Any]],
+    obj: ConstructionObject,
+    delivery: Optional[Delivery] = None,
+    user=None,
+) -> UploadJob:
+    """
+    Складывает файлы запроса во временное хранилище и ставит задачу в очередь.
+
+    Строки base64 пишутся как есть (декодирует уже воркер), файлы из multipart
+    копируются кусками. Задача становится видна воркеру только после коммита.
+    """
+    with transaction.atomic():
+        job = UploadJob.objects.create(
+            kind=kind, object=obj, delivery=delivery, created_by=user, total_files=len(files)
+        )
+        job_dir = _job_dir(job)
+        os.makedirs(job_dir, exist_ok=True)
+
+        rows = []
+        for i, f in enumerate(files):
+            if isinstance(f, str):
+                path = os.path.join(job_dir, f"{i:04d}.b64")
+                with open(path, "w", encoding="utf-8") as fh:
+                    fh.write(f)
+                rows.append(UploadJobFile(
+                    job=job, position=i, name=f"file_{i + 1}", size_bytes=len(f) * 3 // 4,
+                    staging_path=path, is_base64=True,
+                ))
+            else:
+                name = os.path.basename(getattr(f, "name", None) or f"file_{i + 1}")
+                path = os.path.join(job_dir, f"{i:04d}{os.path.splitext(name)[1].lower()}")
+                if hasattr(f, "seek"):
+                    f.seek(0)
+                with open(path, "wb") as fh:
+                    shutil.copyfileobj(f, fh, 1024 * 1024)
+                rows.append(UploadJobFile(
+                    job=job, position=i, name=name[:255], size_bytes=os.path.getsize(path),
+                    staging_path=path,
+                ))
+        UploadJobFile.objects.bulk_create(rows)
+    return job
+
+
+def claim_next_upload_job() -> Optional[UploadJob]:
+    # Задачи, зависшие в running дольше UPLOAD_JOB_STALE_AFTER (упавший воркер), забираются повторно
+    stale_after = timedelta(seconds=int(getattr(settings, "UPLOAD_JOB_STALE_AFTER", 3600)))
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            UploadJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status="pending") | Q(status="running", started_at__lt=now - stale_after))
+            .order_by("created_at")
+            .first()
+        )
+        if job:
+            job.status = "running"
+            job.started_at = now
+            job.save(update_fields=["status", "started_at", "modified_at"])
+    return job
+
+
+def process_upload_job(job: UploadJob) -> UploadJob:
+    from api.utils.file_storage import upload_invoice_photos_base64, upload_object_documents_base64, photo_thumbnail_urls
+
+    files = list(job.files.order_by("position"))
+    pending = [jf for jf in files if jf.status != "uploaded"]
+    user = job.created_by
+    user_name = user.full_name if user else "Система"
+    user_role = user.role if user else "system"
+
+    def _on_result(i: int, res: Dict) -> None:
+        jf = pending[i]
+        if res.get("url"):
+            jf.status, jf.url, jf.error = "uploaded", res["url"], ""
+        else:
+            jf.status, jf.error = "failed", res.get("error") or "Хранилище не вернуло URL"
+        jf.save(update_fields=["status", "url", "error", "modified_at"])
+
+    handles = []
+    try:
+        items: List[Union[str, Any]] = []
+        for jf in pending:
+            if jf.is_base64:
+                with open(jf.staging_path, encoding="utf-8") as fh:
+                    items.append(fh.read())
+            else:
+                fh = open(jf.staging_path, "rb")
+                handles.append(fh)
+                items.append(fh)
+
+        if job.kind == "invoice_photos":
+            upload_invoice_photos_base64(items, job.object_id, job.delivery_id, user_name, user_role, on_result=_on_result)
+        else:
+            upload_object_documents_base64(items, job.object_id, job.object.name, user_name, user_role, on_result=_on_result)
+    except Exception as e:
+        job.error = str(e)
+    finally:
+        for fh in handles:
+            fh.close()
+
+    urls = [jf.url for jf in files if jf.status == "uploaded"]
+    if urls:
+        if job.kind == "invoice_photos":
+            Delivery.objects.filter(id=job.delivery_id).update(
+                invoice_photos_folder_url=urls,
+                invoice_photos_thumbnail_urls=photo_thumbnail_urls(urls),
+                modified_at=timezone.now(),
+            )
+            register_photos("invoice", job.delivery_id, job.object_id, urls)
+        else:
+            ConstructionObject.objects.filter(id=job.object_id).update(documents_folder_url=urls, modified_at=timezone.now())
+
+    if len(urls) == len(files):
+        job.status = "done"
+    elif urls:
+        job.status = "partial"
+    else:
+        job.status = "failed"
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "finished_at", "error", "modified_at"])
+
+    # Файлы незавершённой задачи остаются для повторной попытки (статус pending в админке);
+    # их уберёт cleanup_upload_staging по истечении UPLOAD_STAGING_TTL
+    if job.status == "done":
+        shutil.rmtree(_job_dir(job), ignore_errors=True)
+    return job
+
+
+def cleanup_upload_staging() -> int:
+    """
+    Удаляет из временного хранилища папки выполненных задач, а также папки
+    задач, завершившихся с ошибкой (или пропавших из БД) больше
+    UPLOAD_STAGING_TTL секунд назад. Возвращает число удалённых папок.
+    """
+    root = _staging_root()
+    if not os.path.isdir(root):
+        return 0
+    ttl = timedelta(seconds=int(getattr(settings, "UPLOAD_STAGING_TTL", 7 * 86400)))
+    cutoff = timezone.now() - ttl
+    # Папки задач названы по uuid_job; остальное (например, sessions/) не наше
+    dirs = {}
+    for entry in os.scandir(root):
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        try:
+            dirs[str(uuid.UUID(entry.name))] = entry
+        except ValueError:
+            continue
+    if not dirs:
+        return 0
+
+    jobs = {
+        str(job.uuid_job): job
+        for job in UploadJob.objects.filter(uuid_job__in=list(dirs)).only("uuid_job", "status", "finished_at")
+    }
+
+    removed = 0
+    for name, entry in dirs.items():
+        job = jobs.get(name)
+        if job is None:
+            # Задача ещё не закоммичена или уже удалена — ориентируемся на возраст папки
+            stale = datetime.fromtimestamp(entry.stat().st_mtime, tz=dt_timezone.utc) < cutoff
+        elif job.status == "done":
+            stale = True
+        else:
+            stale = job.status in ("partial", "failed") and job.finished_at is not None and job.finished_at < cutoff
+        if stale:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    return removed
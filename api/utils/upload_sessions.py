@@ -0,0 +1,175 @@
+import os
+from datetime import timedelta
+from typing import List, Tuple
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from api.models.object import ConstructionObject
+from api.models.upload import UploadSession
+from api.utils.storage_usage import record_storage_usage
+
+
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadSessionError(Exception):
+    pass
+
+
+def _sessions_root() -> str:
+    staging = str(getattr(settings, "UPLOAD_STAGING_DIR", os.path.join(settings.BASE_DIR, "media", "staging")))
+    return os.path.join(staging, "sessions")
+
+
+def session_path(session: UploadSession) -> str:
+    return os.path.join(_sessions_root(), f"{session.uuid_session}.part")
+
+
+def merge_range(ranges: List[List[int]], start: int, end: int) -> List[List[int]]:
+    """Добавляет [start, end) к отсортированному списку непересекающихся диапазонов."""
+    merged: List[List[int]] = []
+    for r_start, r_end in sorted(ranges + [[start, end]]):
+        if merged and r_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], r_end)
+        else:
+            merged.append([r_start, r_end])
+    return merged
+
+
+def next_offset(session: UploadSession) -> int:
+    """Начало первого пропуска: с него клиент продолжает загрузку."""
+    ranges = session.received_ranges
+    if ranges and ranges[0][0] == 0:
+        return ranges[0][1]
+    return 0
+
+
+def parse_content_range(header: str) -> Tuple[int, int, int]:
+    """'bytes 0-1048575/314572800' → (0, 1048576, 314572800), конец не включается."""
+    try:
+        unit, spec = header.strip().split(" ", 1)
+        span, total = spec.split("/", 1)
+        first, last = span.split("-", 1)
+        start, end, total_size = int(first), int(last) + 1, int(total)
+    except (ValueError, AttributeError):
+        raise UploadSessionError("Некорректный заголовок Content-Range")
+    if unit != "bytes" or start < 0 or end <= start or end > total_size:
+        raise UploadSessionError("Некорректный заголовок Content-Range")
+    return start, end, total_size
+
+
+def create_upload_session(obj: ConstructionObject, filename: str, total_size: int, content_type: str = "application/pdf", user=None) -> UploadSession:
+    session = UploadSession.objects.create(
+        object=obj,
+        created_by=user,
+        filename=os.path.basename(filename)[:255],
+        content_type=content_type,
+        total_size=total_size,
+    )
+    os.makedirs(_sessions_root(), exist_ok=True)
+    # Файл сразу нужного размера: части пишутся по своим смещениям в любом порядке
+    with open(session_path(session), "wb") as fh:
+        fh.truncate(total_size)
+    return session
+
+
+def write_chunk(session: UploadSession, start: int, end: int, stream) -> UploadSession:
+    """
+    Пишет часть [start, end) из потока запроса в файл сессии и отмечает диапазон.
+
+    Тело читается кусками, поэтому размер части не ограничен памятью. Диапазон
+    отмечается, только если пришли все заявленные байты: оборванная на LTE часть
+    просто отправляется заново.
+    """
+    if session.status != "open":
+        raise UploadSessionError("Сессия загрузки уже закрыта")
+    if end > session.total_size:
+        raise UploadSessionError("Диапазон выходит за размер файла")
+
+    written = 0
+    with open(session_path(session), "r+b") as fh:
+        fh.seek(start)
+        while written < end - start:
+            chunk = stream.read(min(_COPY_CHUNK_SIZE, end - start - written))
+            if not chunk:
+                break
+            fh.write(chunk)
+            written += len(chunk)
+    if written != end - start:
+        raise UploadSessionError(f"Получено {written} байт из {end - start}")
+
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)
+        session.received_ranges = merge_range(session.received_ranges, start, end)
+        session.received_bytes = sum(r_end - r_start for r_start, r_end in session.received_ranges)
+        session.save(update_fields=["received_ranges", "received_bytes", "modified_at"])
+    return session
+
+
+def complete_upload_session(session: UploadSession) -> UploadSession:
+    """Передаёт собранный файл в хранилище потоком и добавляет ссылку в документы объекта."""
+    from api.utils.file_storage import file_storage_client, _extract_file_url
+    from api.utils.logging import log_object_documents_uploaded, log_object_documents_upload_failed
+
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().select_related("object", "created_by").get(pk=session.pk)
+        if session.status != "open":
+            raise UploadSessionError("Сессия загрузки уже закрыта")
+        if session.received_ranges != [[0, session.total_size]]:
+            raise UploadSessionError("Файл получен не полностью")
+        session.status = "uploading"
+        session.save(update_fields=["status", "modified_at"])
+
+    obj = session.object
+    user = session.created_by
+    user_name = user.full_name if user else "Система"
+    user_role = user.role if user else "system"
+
+    with open(session_path(session), "rb") as fh:
+        result = file_storage_client.upload_object_pdf(obj.id, File(fh, name=session.filename))
+    url = _extract_file_url(result) or (result or {}).get("url")
+
+    if url:
+        with transaction.atomic():
+            locked = ConstructionObject.objects.select_for_update().get(pk=obj.pk)
+            locked.documents_folder_url = list(locked.documents_folder_url or []) + [url]
+            locked.save(update_fields=["documents_folder_url", "modified_at"])
+        session.status, session.url, session.error = "done", url, ""
+        record_storage_usage(obj.id, "documents", 1, session.total_size)
+        log_object_documents_uploaded(obj.name, obj.id, url, user_name, user_role, 1)
+    else:
+        # Файл остаётся на диске: завершение можно повторить
+        session.status, session.error = "open", "Хранилище не вернуло URL"
+        log_object_documents_upload_failed(obj.name, obj.id, "Не удалось загрузить файл", user_name, user_role, 1)
+
+    session.completed_at = timezone.now() if url else None
+    session.save(update_fields=["status", "url", "error", "completed_at", "modified_at"])
+    if url:
+        _remove_file(session)
+    return session
+
+
+def abort_upload_session(session: UploadSession) -> UploadSession:
+    session.status = "aborted"
+    session.save(update_fields=["status", "modified_at"])
+    _remove_file(session)
+    return session
+
+
+def expire_upload_sessions() -> int:
+    """Удаляет части брошенных сессий (без активности дольше UPLOAD_SESSION_TTL)."""
+    ttl = timedelta(seconds=int(getattr(settings, "UPLOAD_SESSION_TTL", 86400)))
+    expired = list(UploadSession.objects.filter(status__in=["open", "uploading"], modified_at__lt=timezone.now() - ttl))
+    for session in expired:
+        abort_upload_session(session)
+    return len(expired)
+
+
+def _remove_file(session: UploadSession) -> None:
+    try:
+        os.remove(session_path(session))
+    except FileNotFoundError:
+        pass
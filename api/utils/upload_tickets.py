@@ -0,0 +1,193 @@
+import uuid
+from datetime import timedelta
+from typing import Dict, List, Tuple
+from urllib.parse import unquote, urlsplit
+
+import jwt
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from api.models.delivery import Delivery
+from api.models.object import ConstructionObject
+from api.models.prescription import Prescription, PrescriptionFix
+from api.models.upload import UploadTicket
+from api.models.user import Roles
+from api.utils.photo_hashes import register_photos
+from api.utils.storage_usage import record_storage_usage
+
+
+TICKET_AUDIENCE = "file-storage"
+TICKET_ALGORITHM = "HS256"
+
+# Поле сущности, в которое подтверждение дописывает ссылки на загруженные файлы
+_TICKET_TARGETS = {
+    "delivery": (Delivery, "invoice_photos_folder_url"),
+    "prescription": (Prescription, "violation_photos_folder_url"),
+    "fix": (PrescriptionFix, "fix_photos_folder_url"),
+    "object": (ConstructionObject, "documents_folder_url"),
+}
+
+# Кто может получить билет: те же роли, что пишут это поле обычными эндпоинтами
+# (документы — PATCH /objects/{id}, фото нарушения — создание предписания,
+# исправления — прораб объекта, накладные — создание и приёмка поставки).
+# Привязку к самому объекту дополнительно проверяет вызывающий код по видимости объекта
+TICKET_ROLES = {
+    "delivery": (Roles.ADMIN, Roles.SSK, Roles.FOREMAN),
+    "prescription": (Roles.ADMIN, Roles.SSK, Roles.IKO),
+    "fix": (Roles.ADMIN, Roles.FOREMAN),
+    "object": (Roles.ADMIN, Roles.SSK),
+}
+
+# Поле превью, идущее параллельно полю ссылок (у документов объекта превью нет)
+_THUMBNAIL_FIELDS = {
+    "delivery": "invoice_photos_thumbnail_urls",
+    "prescription": "violation_photos_thumbnail_urls",
+    "fix": "fix_photos_thumbnail_urls",
+}
+
+# Тип фото в индексе перцептивных хэшей
+_PHOTO_KINDS = {"delivery": "invoice", "prescription": "violation", "fix": "fix"}
+
+# Категория счётчиков StorageUsage
+_USAGE_CATEGORIES = {"delivery": "invoices", "prescription": "violations", "fix": "fixes", "object": "documents"}
+
+
+class UploadTicketError(Exception):
+    pass
+
+
+def _ticket_secret() -> str:
+    secret = getattr(settings, "FILE_STORAGE_TICKET_SECRET", None)
+    if not secret:
+        raise UploadTicketError("Прямая загрузка в хранилище не настроена (FILE_STORAGE_TICKET_SECRET)")
+    return secret
+
+
+def resolve_ticket_entity(kind: str, entity_id: int, user) -> Tuple[int, str]:
+    """Возвращает (id объекта, путь загрузки в хранилище) для сущности билета."""
+    from api.utils.file_storage import violation_tag_for_role
+
+    if kind == "delivery":
+        delivery = Delivery.objects.only("id", "object_id").get(id=entity_id)
+        return delivery.object_id, f"delivery/{delivery.object_id}/{delivery.id}"
+    if kind == "prescription":
+        pres = Prescription.objects.only("id", "object_id").get(id=entity_id)
+        return pres.object_id, f"violation/{violation_tag_for_role(user.role)}/{pres.id}/creation"
+    if kind == "fix":
+        fix = PrescriptionFix.objects.select_related("prescription").only("id", "author_id", "prescription__object_id").get(id=entity_id)
+        return fix.prescription.object_id, f"violation/{fix.prescription_id}/correction/by-foreman/{fix.author_id}"
+    if kind == "object":
+        return ConstructionObject.objects.only("id").get(id=entity_id).id, f"docs/object/{entity_id}"
+    raise UploadTicketError(f"Неизвестный тип сущности: {kind}")
+
+
+def issue_upload_ticket(kind: str, entity_id: int, user, max_files: int = 20) -> Tuple[UploadTicket, str]:
+    """
+    Выдаёт билет на прямую загрузку: запись UploadTicket и подписанный JWT.
+
+    Хранилище проверяет JWT общим секретом FILE_STORAGE_TICKET_SECRET и
+    принимает не больше max_files файлов только по пути из билета.
+    """
+    secret = _ticket_secret()
+    object_id, storage_path = resolve_ticket_entity(kind, entity_id, user)
+    ttl = int(getattr(settings, "FILE_STORAGE_TICKET_TTL", 900))
+
+    ticket = UploadTicket.objects.create(
+        kind=kind,
+        entity_id=entity_id,
+        object_id=object_id,
+        storage_path=storage_path,
+        max_files=max_files,
+        created_by=user,
+        expires_at=timezone.now() + timedelta(seconds=ttl),
+    )
+    payload = {
+        "jti": str(ticket.jti),
+        "aud": TICKET_AUDIENCE,
+        "sub": str(user.id),
+        "path": f"/upload/{storage_path}",
+        "max_files": max_files,
+        "iat": int(ticket.created_at.timestamp()),
+        "exp": int(ticket.expires_at.timestamp()),
+    }
+    return ticket, jwt.encode(payload, secret, algorithm=TICKET_ALGORITHM)
+
+
+def decode_upload_ticket(token: str) -> UploadTicket:
+    # Подтверждение приходит после загрузки, поэтому допускаем небольшое опоздание
+    grace = int(getattr(settings, "FILE_STORAGE_TICKET_CONFIRM_GRACE", 300))
+    try:
+        payload = jwt.decode(token, _ticket_secret(), algorithms=[TICKET_ALGORITHM], audience=TICKET_AUDIENCE, leeway=grace)
+        jti = uuid.UUID(payload["jti"])
+    except jwt.ExpiredSignatureError:
+        raise UploadTicketError("Срок действия билета истёк")
+    except (jwt.InvalidTokenError, KeyError, ValueError):
+        raise UploadTicketError("Недействительный билет")
+    try:
+        return UploadTicket.objects.get(jti=jti)
+    except UploadTicket.DoesNotExist:
+        raise UploadTicketError("Недействительный билет")
+
+
+def _check_urls(ticket: UploadTicket, urls: List[str]) -> None:
+    """Ссылки должны вести в хранилище (FILE_STORAGE_CONFIRM_HOSTS) и в папку из билета."""
+    if len(urls) > ticket.max_files:
+        raise UploadTicketError(f"Билет допускает не больше {ticket.max_files} файлов")
+    allowed_hosts = {h.strip().lower() for h in getattr(settings, "FILE_STORAGE_CONFIRM_HOSTS", "").split(",") if h.strip()}
+    if not allowed_hosts:
+        # Без списка хостов подтверждение приняло бы любую ссылку
+        raise UploadTicketError("Подтверждение прямой загрузки не настроено (FILE_STORAGE_CONFIRM_HOSTS)")
+    prefix = f"/upload/{ticket.storage_path}/"
+    for url in urls:
+        parts = urlsplit(url)
+        path = unquote(parts.path)
+        if parts.hostname not in allowed_hosts:
+            raise UploadTicketError(f"Ссылка не из файлового хранилища: {url}")
+        if not path.startswith(prefix) or ".." in path.split("/"):
+            raise UploadTicketError(f"Ссылка не из папки билета: {url}")
+
+
+def confirm_upload_ticket(ticket: UploadTicket, urls: List[str]) -> Dict:
+    """Дописывает ссылки загруженных файлов в поле сущности. Билет подтверждается один раз."""
+    from api.utils.file_storage import file_storage_client, photo_thumbnail_urls, _VIOLATION_TAGS
+
+    model, field = _TICKET_TARGETS[ticket.kind]
+    thumbnail_field = _THUMBNAIL_FIELDS.get(ticket.kind)
+    with transaction.atomic():
+        ticket = UploadTicket.objects.select_for_update().get(pk=ticket.pk)
+        if ticket.status != "issued":
+            raise UploadTicketError("Билет уже подтверждён")
+        _check_urls(ticket, urls)
+
+        entity = model.objects.select_for_update().get(pk=ticket.entity_id)
+        current = list(getattr(entity, field) or [])
+        setattr(entity, field, current + [u for u in urls if u not in current])
+        update_fields = [field, "modified_at"]
+        if thumbnail_field:
+            # Превью сделаны только для фото, прошедших через бэкенд; у остальных — null
+            setattr(entity, thumbnail_field, photo_thumbnail_urls(getattr(entity, field)))
+            update_fields.append(thumbnail_field)
+        entity.save(update_fields=update_fields)
+
+        ticket.status = "confirmed"
+        ticket.confirmed_at = timezone.now()
+        ticket.urls = urls
+        ticket.save(update_fields=["status", "confirmed_at", "urls", "modified_at"])
+
+    if ticket.kind in _PHOTO_KINDS:
+        register_photos(_PHOTO_KINDS[ticket.kind], ticket.entity_id, ticket.object_id, urls)
+    # Размер файлов, загруженных клиентом напрямую, бэкенду неизвестен — считаем только количество
+    record_storage_usage(ticket.object_id, _USAGE_CATEGORIES[ticket.kind], len(urls), 0)
+
+    # Листинг папки в кэше browse_* больше не актуален
+    _, *parts = ticket.storage_path.split("/")
+    if ticket.kind in ("delivery", "object"):
+        file_storage_client.invalidate_browse("object", ticket.object_id)
+    elif ticket.kind == "prescription":
+        file_storage_client.invalidate_browse("violation", parts[0], parts[1])
+    else:
+        for tag in _VIOLATION_TAGS:
+            file_storage_client.invalidate_browse("violation", tag, parts[0])
+
+    return {field: getattr(entity, field)}
@@ -0,0 +1,128 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+from django.conf import settings
+from django.db import connections, router
+from django.utils import timezone
+
+from api.models.log import ViewCounter
+
+logger = logging.getLogger(__name__)
+
+# (entity_type, entity_id, user_id, час) → просмотров, ещё не записанных в БД
+_pending: Dict[Tuple[str, int, Any, datetime], int] = Counter()
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+_UPSERT_BATCH = 500
+
+# Поток периодической записи; после fork (gunicorn --preload) запускается заново в дочернем процессе
+_flusher_pid = None
+
+
+def record_view(entity_type: str, entity_id: int, user_id) -> None:
+    """
+    Засчитывает просмотр без записи в БД: счётчики копятся в памяти процесса и
+    пишутся пачкой фоновым потоком раз в VIEW_COUNTERS_FLUSH_SECONDS секунд,
+    раньше — при VIEW_COUNTERS_MAX_KEYS разных ключей, и при штатном
+    завершении процесса (atexit). Если процесс убит (SIGKILL, OOM), теряются
+    просмотры не больше чем за один интервал записи.
+    """
+    if user_id is None:
+        return
+    _ensure_flusher()
+    hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+    with _lock:
+        _pending[(str(entity_type), int(entity_id), user_id, hour)] += 1
+        due = (
+            time.monotonic() - _last_flush >= int(getattr(settings, "VIEW_COUNTERS_FLUSH_SECONDS", 60))
+            or len(_pending) >= int(getattr(settings, "VIEW_COUNTERS_MAX_KEYS", 1000))
+        )
+    if due:
+        flush_view_counters()
+
+
+def flush_view_counters() -> int:
+    """Прибавляет накопленное к ViewCounter (INSERT ... ON CONFLICT DO UPDATE); возвращает число ключей."""
+    global _last_flush
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not pending:
+        return 0
+    try:
+        _upsert(pending)
+    except Exception:
+        # Не теряем просмотры: вернём их в очередь до следующей попытки
+        with _lock:
+            for key, n in pending.items():
+                _pending[key] += n
+        logger.exception("Не удалось записать счётчики просмотров (%s ключей)", len(pending))
+        return 0
+    return len(pending)
+
+
+def _upsert(pending: Dict[Tuple[str, int, Any, datetime], int]) -> None:
+    connection = connections[router.db_for_write(ViewCounter)]
+    qn = connection.ops.quote_name
+    table = qn(ViewCounter._meta.db_table)
+    columns = ("entity_type", "entity_id", "user_id", "hour", "count", "created_at", "modified_at")
+    user_field = ViewCounter._meta.get_field("user")
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    items = list(pending.items())
+    with connection.cursor() as cursor:
+        for start in range(0, len(items), _UPSERT_BATCH):
+            batch = items[start:start + _UPSERT_BATCH]
+            params = []
+            for (entity_type, entity_id, user_id, hour), n in batch:
+                params += [entity_type, entity_id, user_field.get_db_prep_value(user_id, connection), connection.ops.adapt_datetimefield_value(hour), n, now, now]
+            placeholders = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(batch))
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(qn(c) for c in columns)}) VALUES {placeholders} "
+                f"ON CONFLICT ({qn('entity_type')}, {qn('entity_id')}, {qn('user_id')}, {qn('hour')}) DO UPDATE SET "
+                f"{qn('count')} = {table}.{qn('count')} + EXCLUDED.{qn('count')}, "
+                f"{qn('modified_at')} = EXCLUDED.{qn('modified_at')}",
+                params,
+            )
+
+
+def _ensure_flusher() -> None:
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_periodically, name="view-counters-flush", daemon=True).start()
+
+
+def _flush_periodically() -> None:
+    interval = max(1, int(getattr(settings, "VIEW_COUNTERS_FLUSH_SECONDS", 60)))
+    while True:
+        # Запросы могли прекратиться: без потока счётчики ждали бы следующего просмотра
+        wait = interval - (time.monotonic() - _last_flush)
+        if wait > 0:
+            time.sleep(wait)
+            continue
+        try:
+            flush_view_counters()
+        finally:
+            connections.close_all()
+
+
+def _flush_at_exit() -> None:
+    try:
+        flush_view_counters()
+    except Exception:
+        pass
+
+
+atexit.register(_flush_at_exit)
@@ -11,3 +11,21 @@ DATABASES = {
         }
     }
 }
+
+# Отдельное подключение для журнала (модель Log, см. api.db_routers.LogRouter):
+# записи лога коммитятся сами по себе, вне транзакций бизнес-логики.
+# По умолчанию — та же БД; LOGS_POSTGRES_* переносят журнал в отдельную БД
+# (тогда её схему создаёт `migrate --database logs`).
+DATABASES['logs'] = {
+    **DATABASES['default'],
+    'NAME': os.environ.get('LOGS_POSTGRES_DB') or DATABASES['default']['NAME'],
+    'USER': os.environ.get('LOGS_POSTGRES_USER') or DATABASES['default']['USER'],
+    'PASSWORD': os.environ.get('LOGS_POSTGRES_PASSWORD') or DATABASES['default']['PASSWORD'],
+    'HOST': os.environ.get('LOGS_POSTGRES_HOST') or DATABASES['default']['HOST'],
+    'PORT': os.environ.get('LOGS_POSTGRES_PORT') or DATABASES['default']['PORT'],
+    'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+}
+if not os.environ.get('LOGS_POSTGRES_DB') and not os.environ.get('LOGS_POSTGRES_HOST'):
+    DATABASES['logs']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['api.db_routers.LogRouter']
@@ -47,6 +47,95 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 NOTIFY_SERVICE_URL = os.getenv("NOTIFY_SERVICE_URL", "")
 FILE_STORAGE_URL = os.getenv("FILE_STORAGE_URL", "https://building-s3-api.itc-hub.ru")
+# Таймауты: установка соединения и ожидание ответа, секунд
+FILE_STORAGE_CONNECT_TIMEOUT = float(os.getenv("FILE_STORAGE_CONNECT_TIMEOUT", 5))
+FILE_STORAGE_TIMEOUT = int(os.getenv("FILE_STORAGE_TIMEOUT", 30))
+# Пул соединений к хранилищу: число хостов и соединений на хост (не меньше параллельных загрузок)
+FILE_STORAGE_POOL_CONNECTIONS = int(os.getenv("FILE_STORAGE_POOL_CONNECTIONS", 4))
+FILE_STORAGE_POOL_MAXSIZE = int(os.getenv("FILE_STORAGE_POOL_MAXSIZE", 16))
+# Повторы GET-запросов (и неудачных подключений) с экспоненциальной паузой и джиттером
+FILE_STORAGE_RETRIES = int(os.getenv("FILE_STORAGE_RETRIES", 3))
+FILE_STORAGE_RETRY_BACKOFF = float(os.getenv("FILE_STORAGE_RETRY_BACKOFF", 0.5))
+# Прямая загрузка в хранилище по билетам: общий с хранилищем секрет подписи, время жизни билета,
+# допустимое опоздание подтверждения и хосты, ссылки на которые принимаются (пусто — подтверждение отключено)
+FILE_STORAGE_TICKET_SECRET = os.getenv("FILE_STORAGE_TICKET_SECRET", "")
+FILE_STORAGE_TICKET_TTL = int(os.getenv("FILE_STORAGE_TICKET_TTL", 900))
+FILE_STORAGE_TICKET_CONFIRM_GRACE = int(os.getenv("FILE_STORAGE_TICKET_CONFIRM_GRACE", 300))
+FILE_STORAGE_CONFIRM_HOSTS = os.getenv("FILE_STORAGE_CONFIRM_HOSTS", "")
+# Кэш листингов browse_*: не дольше TTL и с запасом до истечения presigned-ссылок, секунд
+FILE_STORAGE_BROWSE_CACHE_TTL = int(os.getenv("FILE_STORAGE_BROWSE_CACHE_TTL", 300))
+FILE_STORAGE_BROWSE_CACHE_MARGIN = int(os.getenv("FILE_STORAGE_BROWSE_CACHE_MARGIN", 60))
+FILE_STORAGE_UPLOAD_CONCURRENCY = int(os.getenv("FILE_STORAGE_UPLOAD_CONCURRENCY", 4))
+FILE_STORAGE_BATCH_DEADLINE = float(os.getenv("FILE_STORAGE_BATCH_DEADLINE", 120))
+FILE_STORAGE_TRACE_MEMORY = os.getenv("FILE_STORAGE_TRACE_MEMORY", "False") == "True"
+# Не загружать повторно файлы с тем же содержимым (sha256) в ту же папку хранилища
+FILE_STORAGE_DEDUPE = os.getenv("FILE_STORAGE_DEDUPE", "True") == "True"
+
+# Обработка фото перед загрузкой (нужен Pillow): максимальная сторона, качество JPEG, сторона превью,
+# число процессов пула и таймаут обработки одного фото, секунд
+IMAGE_PROCESSING_ENABLED = os.getenv("IMAGE_PROCESSING_ENABLED", "True") == "True"
+IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", 2560))
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", 85))
+IMAGE_THUMBNAIL_SIDE = int(os.getenv("IMAGE_THUMBNAIL_SIDE", 320))
+IMAGE_PROCESS_WORKERS = int(os.getenv("IMAGE_PROCESS_WORKERS", 2))
+IMAGE_PROCESS_TIMEOUT = float(os.getenv("IMAGE_PROCESS_TIMEOUT", 30))
+# Поиск похожих фото: максимальное расстояние Хэмминга между dHash, предел кандидатов на одно фото
+# и максимальный размер скачиваемого для расчёта хэша файла, байт
+PHOTO_SIMILARITY_MAX_DISTANCE = int(os.getenv("PHOTO_SIMILARITY_MAX_DISTANCE", 6))
+PHOTO_SIMILARITY_MAX_CANDIDATES = int(os.getenv("PHOTO_SIMILARITY_MAX_CANDIDATES", 1000))
+PHOTO_HASH_MAX_DOWNLOAD = int(os.getenv("PHOTO_HASH_MAX_DOWNLOAD", 30 * 1024 * 1024))
+
+# ZIP-выгрузка файлов объекта: сколько файлов скачивать из хранилища одновременно
+# и сколько байт одного файла держать в памяти (больше — во временном файле)
+FILE_EXPORT_CONCURRENCY = int(os.getenv("FILE_EXPORT_CONCURRENCY", 4))
+FILE_EXPORT_SPOOL_MAX = int(os.getenv("FILE_EXPORT_SPOOL_MAX", 8 * 1024 * 1024))
+
+# Зеркалирование папок объектов в Folder/DocumentFile: как часто сверять объект с хранилищем, секунд
+STORAGE_SYNC_INTERVAL = int(os.getenv("STORAGE_SYNC_INTERVAL", 900))
+
+# JSON с массивами файлов в base64 (invoice_photos, document_files) читается кусками такого размера, байт;
+# каждый файл декодируется сразу во временный файл на диске
+JSON_SPOOL_CHUNK_SIZE = int(os.getenv("JSON_SPOOL_CHUNK_SIZE", 64 * 1024))
+
+# Записи лога (Log) копятся за время запроса и пишутся одним bulk_create в конце
+# или по достижении LOG_BUFFER_MAX_SIZE записей; LOG_BUFFER_ENABLED=False — запись каждой строки сразу
+LOG_BUFFER_ENABLED = os.getenv("LOG_BUFFER_ENABLED", "True") == "True"
+LOG_BUFFER_MAX_SIZE = int(os.getenv("LOG_BUFFER_MAX_SIZE", 100))
+
+# Секции журнала (Log) по месяцам: сколько месяцев создавать наперёд, сколько месяцев хранить
+# (0 — хранить всё) и куда выгружать удаляемые секции в gzip CSV (пусто — удалять без выгрузки)
+LOG_PARTITIONS_AHEAD = int(os.getenv("LOG_PARTITIONS_AHEAD", 3))
+LOG_RETENTION_MONTHS = int(os.getenv("LOG_RETENTION_MONTHS", 12))
+LOG_ARCHIVE_DIR = os.getenv("LOG_ARCHIVE_DIR", "")
+
+# Журнал запросов к API (RequestTimingMiddleware): включение, префикс путей, доля записываемых запросов
+# (0..1) и порог «медленного» запроса, мс — такие и ответы 5xx записываются всегда
+LOG_REQUESTS_ENABLED = os.getenv("LOG_REQUESTS_ENABLED", "False") == "True"
+LOG_REQUESTS_PATH_PREFIX = os.getenv("LOG_REQUESTS_PATH_PREFIX", "/api/")
+LOG_REQUESTS_SAMPLE_RATE = float(os.getenv("LOG_REQUESTS_SAMPLE_RATE", 1.0))
+LOG_REQUESTS_SLOW_MS = int(os.getenv("LOG_REQUESTS_SLOW_MS", 1000))
+
+# Счётчики просмотров объектов и полигонов (ViewCounter) копятся в памяти процесса и пишутся
+# в БД раз в столько секунд или при стольких разных ключах (сущность, пользователь, час).
+# Если процесс убит (SIGKILL, OOM), теряются просмотры не больше чем за VIEW_COUNTERS_FLUSH_SECONDS
+VIEW_COUNTERS_FLUSH_SECONDS = int(os.getenv("VIEW_COUNTERS_FLUSH_SECONDS", 60))
+VIEW_COUNTERS_MAX_KEYS = int(os.getenv("VIEW_COUNTERS_MAX_KEYS", 1000))
+
+# Файлы из multipart-запросов всегда пишутся во временные файлы на диске,
+# откуда клиент файлового хранилища отправляет их потоком
+FILE_UPLOAD_HANDLERS = ["django.core.files.uploadhandler.TemporaryFileUploadHandler"]
+FILE_UPLOAD_TEMP_DIR = os.getenv("FILE_UPLOAD_TEMP_DIR") or None
+
+# Отложенная загрузка файлов (?async=1): файлы ждут воркер run_upload_worker здесь.
+# Каталог должен быть общим для web и воркера.
+UPLOAD_STAGING_DIR = os.getenv("UPLOAD_STAGING_DIR", os.path.join(BASE_DIR, "media", "staging"))
+UPLOAD_JOB_STALE_AFTER = int(os.getenv("UPLOAD_JOB_STALE_AFTER", 3600))
+# Сколько секунд хранить файлы незавершённых задач загрузки для повторной попытки
+UPLOAD_STAGING_TTL = int(os.getenv("UPLOAD_STAGING_TTL", 7 * 86400))
+# Возобновляемая загрузка документов по частям: максимальный размер файла и части, время жизни брошенной сессии
+UPLOAD_SESSION_MAX_SIZE = int(os.getenv("UPLOAD_SESSION_MAX_SIZE", 2 * 1024 ** 3))
+UPLOAD_SESSION_MAX_CHUNK = int(os.getenv("UPLOAD_SESSION_MAX_CHUNK", 64 * 1024 * 1024))
+UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", 86400))
 
 LOGGING = {
     'version': 1,
@@ -7,6 +7,7 @@ while ! nc -z $POSTGRES_HOST $POSTGRES_PORT; do
     echo "PostgreSQL started"
 
 python manage.py migrate
+python manage.py migrate --database logs
 
 
 exec "$@"